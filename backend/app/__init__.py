@@ -3,8 +3,12 @@ from flask_cors import CORS
 from flask_sock import Sock
 import os
 
+from . import telemetry
+
 def create_app():
+    telemetry.configure_logging()
     app = Flask(__name__)
+    telemetry.init_app(app)
     sock = Sock(app)
     # A secret key is required for session management
     app.secret_key = os.environ.get('FLASK_SECRET_KEY', os.urandom(24))
@@ -0,0 +1,234 @@
+# backend/app/archive.py
+
+import base64
+import binascii
+import json
+import re
+import tarfile
+import time
+import zlib
+from datetime import datetime, timezone
+
+# Read/write size for archive transfers; a transfer holds about one chunk in memory
+ARCHIVE_CHUNK_SIZE = 64 * 1024
+
+STAT_HEADER = 'X-Docker-Container-Path-Stat'
+# Go os.FileMode type bits, as found in the path stat's `mode`
+_MODE_DIR = 1 << 31
+_MODE_SYMLINK = 1 << 27
+_MODE_SPECIAL = (1 << 26) | (1 << 25) | (1 << 24) | (1 << 21) | (1 << 19)
+
+_RANGE_RE = re.compile(r'^bytes=(\d*)-(\d*)$')
+
+
+def decode_path_stat(header):
+    """
+    The base64 JSON of an X-Docker-Container-Path-Stat header as a dict
+    with name, size, mode, mtime and linkTarget, plus `type` (directory,
+    file, symlink or other). None if the header is missing or malformed.
+    """
+    if not header:
+        return None
+    try:
+        stat = json.loads(base64.b64decode(header))
+    except (binascii.Error, ValueError):
+        return None
+    mode = stat.get('mode') or 0
+    if mode & _MODE_DIR:
+        stat['type'] = 'directory'
+    elif mode & _MODE_SYMLINK:
+        stat['type'] = 'symlink'
+    elif mode & _MODE_SPECIAL:
+        stat['type'] = 'other'
+    else:
+        stat['type'] = 'file'
+    return stat
+
+
+def stat_path(api, container_id, path):
+    """Stat a path in a container (HEAD /containers/{id}/archive). Raises docker.errors.APIError."""
+    response = api.head(api._url('/containers/{0}/archive', container_id), params={'path': path}, timeout=api.timeout)
+    api._raise_for_status(response)
+    return decode_path_stat(response.headers.get(STAT_HEADER))
+
+
+def open_archive(api, container_id, path):
+    """
+    Start streaming a tar archive of `path` from a container. Returns
+    (response, stat); nothing beyond the headers has been read, and the
+    caller closes the response. Raises docker.errors.APIError.
+    """
+    response = api._get(api._url('/containers/{0}/archive', container_id), params={'path': path}, stream=True)
+    api._raise_for_status(response)
+    return response, decode_path_stat(response.headers.get(STAT_HEADER))
+
+
+def archive_root(stat):
+    """Name of the top-level entry in an archive of the path described by `stat`."""
+    name = (stat or {}).get('name') or ''
+    return '.' if name in ('', '/') else name
+
+
+def gzip_chunks(chunks, level=1):
+    """Gzip a stream of byte chunks on the fly."""
+    compressor = zlib.compressobj(level, zlib.DEFLATED, 31)
+    for chunk in chunks:
+        data = compressor.compress(chunk)
+        if data:
+            yield data
+    yield compressor.flush()
+
+
+def iter_archive(response, compress=None, level=1):
+    """Yield an archive response in chunks, gzip-compressed if compress == 'gzip'. Closes the response."""
+    try:
+        chunks = response.iter_content(ARCHIVE_CHUNK_SIZE)
+        if compress == 'gzip':
+            chunks = gzip_chunks(chunks, level)
+        yield from chunks
+    finally:
+        response.close()
+
+
+def _members(response):
+    """Yield the TarInfo headers of a streamed archive without keeping them (tarfile otherwise does)."""
+    with tarfile.open(fileobj=response.raw, mode='r|', bufsize=ARCHIVE_CHUNK_SIZE) as tar:
+        while True:
+            member = tar.next()
+            if member is None:
+                return
+            tar.members.clear()
+            yield member
+
+
+def directory_entry(name, member):
+    if member.isdir():
+        kind = 'directory'
+    elif member.issym():
+        kind = 'symlink'
+    elif member.isreg() or member.islnk():
+        kind = 'file'
+    else:
+        kind = 'other'
+    return {
+        'name': name,
+        'type': kind,
+        'size': member.size if member.isreg() else 0,
+        'mode': f"{member.mode & 0o7777:04o}",
+        'mtime': datetime.fromtimestamp(member.mtime, timezone.utc).isoformat(),
+        'linkTarget': member.linkname or None,
+    }
+
+
+def list_directory(response, root, max_entries=None):
+    """
+    Entries directly inside the directory archived in `response`, in
+    archive order, up to `max_entries`. Only tar headers are parsed; file
+    contents stream past unread. The response is closed as soon as enough
+    entries have been seen, so the rest of a large subtree is not
+    transferred.
+    """
+    entries = []
+    # An archive of / has entries named with or without a leading './'
+    root = '' if root == '.' else root
+    try:
+        for member in _members(response):
+            path = member.name.rstrip('/')
+            if not root and path.startswith('./'):
+                path = path[2:]
+            parent, _, name = path.rpartition('/')
+            if parent != root or name in ('', '.'):
+                continue
+            if max_entries is not None and len(entries) >= max_entries:
+                break
+            entries.append(directory_entry(name, member))
+    finally:
+        response.close()
+    return entries
+
+
+def parse_range(header, size):
+    """
+    (start, end), inclusive, for a single-range `Range: bytes=...` header
+    against a `size`-byte file, or None to send the whole file (no header,
+    or a multi-range or malformed one, which may be ignored). Raises
+    ValueError if the range cannot be satisfied.
+    """
+    match = _RANGE_RE.match((header or '').strip())
+    if not match or match.groups() == ('', ''):
+        return None
+    first, last = match.groups()
+    if not first:
+        if int(last) == 0 or size == 0:
+            raise ValueError('Range not satisfiable')
+        return max(size - int(last), 0), size - 1
+    start = int(first)
+    if last and int(last) < start:
+        return None
+    if start >= size:
+        raise ValueError('Range not satisfiable')
+    return start, min(int(last), size - 1) if last else size - 1
+
+
+def iter_file(response, start=0, end=None):
+    """
+    Yield bytes start..end (inclusive; end None for the rest) of the
+    regular file archived in `response`, in chunks of up to
+    ARCHIVE_CHUNK_SIZE. The Engine API has no offset, so bytes before
+    `start` are read and dropped; the response is closed once `end` has
+    been sent. Raises ValueError if the archive does not start with a
+    regular file.
+    """
+    try:
+        with tarfile.open(fileobj=response.raw, mode='r|', bufsize=ARCHIVE_CHUNK_SIZE) as tar:
+            member = tar.next()
+            if member is None or not member.isreg():
+                raise ValueError('Archive does not hold a regular file')
+            f = tar.extractfile(member)
+            skip = start
+            while skip > 0:
+                data = f.read(min(skip, ARCHIVE_CHUNK_SIZE))
+                if not data:
+                    return
+                skip -= len(data)
+            remaining = (member.size if end is None else end + 1) - start
+            while remaining > 0:
+                data = f.read(min(remaining, ARCHIVE_CHUNK_SIZE))
+                if not data:
+                    return
+                remaining -= len(data)
+                yield data
+    finally:
+        response.close()
+
+
+def iter_body(stream, chunk_size=ARCHIVE_CHUNK_SIZE):
+    """Yield a request body stream in chunks until it is exhausted."""
+    while True:
+        data = stream.read(chunk_size)
+        if not data:
+            return
+        yield data
+
+
+def tar_single_file(name, size, chunks, mode=0o644, mtime=None):
+    """
+    Yield a tar archive holding one file of `size` bytes whose contents
+    come from `chunks`, as they arrive. Raises ValueError if the chunks do
+    not add up to exactly `size` bytes, so a short upload fails instead of
+    writing a corrupt archive.
+    """
+    info = tarfile.TarInfo(name)
+    info.size = size
+    info.mode = mode
+    info.mtime = time.time() if mtime is None else mtime
+    yield info.tobuf(format=tarfile.PAX_FORMAT)
+    sent = 0
+    for chunk in chunks:
+        sent += len(chunk)
+        if sent > size:
+            raise ValueError(f"Body is longer than its Content-Length ({size} bytes)")
+        yield chunk
+    if sent != size:
+        raise ValueError(f"Body ended after {sent} of {size} bytes")
+    yield tarfile.NUL * (-size % tarfile.BLOCKSIZE + 2 * tarfile.BLOCKSIZE)
@@ -0,0 +1,98 @@
+# backend/app/bulk.py
+
+import logging
+import time
+from concurrent.futures import FIRST_COMPLETED, wait
+
+import docker
+
+logger = logging.getLogger(__name__)
+
+BULK_ACTIONS = ('start', 'stop', 'restart', 'kill', 'delete')
+
+
+def container_action(api, action, container_id, stop_timeout):
+    """One lifecycle call on the low-level API, without inspecting the container first."""
+    if action == 'start':
+        api.start(container_id)
+    elif action == 'stop':
+        api.stop(container_id, timeout=stop_timeout)
+    elif action == 'restart':
+        api.restart(container_id, timeout=stop_timeout)
+    elif action == 'kill':
+        api.kill(container_id)
+    elif action == 'delete':
+        api.remove_container(container_id, force=True)
+    else:
+        raise ValueError(f"Unknown action '{action}'")
+
+
+def _run_item(api, action, container_id, stop_timeout):
+    started = time.monotonic()
+    result = {'id': container_id, 'action': action, 'ok': True}
+    try:
+        container_action(api, action, container_id, stop_timeout)
+    except docker.errors.NotFound:
+        result.update(ok=False, error='Container not found')
+    except docker.errors.APIError as e:
+        result.update(ok=False, error=e.explanation or str(e))
+    except Exception as e:
+        result.update(ok=False, error=str(e))
+    result['elapsed_ms'] = round((time.monotonic() - started) * 1000, 1)
+    return result
+
+
+def run_bulk(executor, api, action, container_ids, concurrency, timeout, stop_timeout):
+    """
+    Run `action` on every container and yield one result per container in
+    completion order.
+
+    At most `concurrency` operations of this batch are submitted to the
+    shared `executor` at a time; the next one starts as soon as one
+    finishes. An operation still unfinished `timeout` seconds after it was
+    submitted is reported as timed out: if it has not started yet it is
+    cancelled, otherwise the daemon call is left to finish in the
+    background (bounded by the client's HTTP timeout). `stop_timeout` is
+    the grace period the daemon gives stop/restart before killing.
+
+    Closing the generator (the client disconnected) cancels the operations
+    that have not started and submits no more.
+    """
+    remaining = iter(container_ids)
+    pending = {}
+
+    def fill():
+        while len(pending) < concurrency:
+            container_id = next(remaining, None)
+            if container_id is None:
+                return
+            future = executor.submit(_run_item, api, action, container_id, stop_timeout)
+            pending[future] = (container_id, time.monotonic() + timeout)
+
+    fill()
+    try:
+        while pending:
+            next_deadline = min(deadline for _, deadline in pending.values())
+            done, _ = wait(pending, timeout=max(next_deadline - time.monotonic(), 0), return_when=FIRST_COMPLETED)
+            for future in done:
+                del pending[future]
+                yield future.result()
+
+            now = time.monotonic()
+            for future, (container_id, deadline) in list(pending.items()):
+                if deadline > now:
+                    continue
+                del pending[future]
+                if future.cancel():
+                    error = f'Timed out after {timeout:g}s before starting'
+                else:
+                    error = f'Timed out after {timeout:g}s; the operation may still complete'
+                    logger.warning(f"bulk {action} {container_id}: still running after {timeout:g}s")
+                yield {'id': container_id, 'action': action, 'ok': False, 'error': error,
+                       'elapsed_ms': round(timeout * 1000, 1)}
+            fill()
+    finally:
+        # Closed early (the client went away): drop the operations that have not started
+        cancelled = sum(future.cancel() for future in pending)
+        if cancelled:
+            logger.info(f"bulk {action}: cancelled {cancelled} queued operations")
@@ -0,0 +1,110 @@
+# backend/app/cache.py
+
+import logging
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future
+
+logger = logging.getLogger(__name__)
+
+
+class TTLCache:
+    """
+    Small in-process cache with stale-while-revalidate.
+
+    A value younger than `ttl` is served as is. A value older than `ttl` but
+    younger than `ttl + stale_ttl` is served immediately while a background
+    thread refreshes it. Anything older is loaded synchronously. Loads are
+    single-flight per key: concurrent callers wait on the same load instead
+    of hitting the upstream once each. At most `max_entries` keys are kept,
+    least recently used first out.
+
+    `ttl_for(value)`, if given, replaces `ttl` per value. `age_of(value)`,
+    if given, is the age in seconds a value already has when it is stored,
+    for values that were produced elsewhere (for example read from disk).
+    """
+
+    def __init__(self, ttl, stale_ttl=0, max_entries=1024, ttl_for=None, age_of=None):
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self.max_entries = max_entries
+        self.ttl_for = ttl_for
+        self.age_of = age_of
+        self._entries = OrderedDict()
+        self._inflight = {}
+        self._lock = threading.Lock()
+
+    def get(self, key, loader):
+        """Return the cached value for `key`, calling `loader()` when needed."""
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                value, stored_at = entry
+                age = now - stored_at
+                ttl = self.ttl_for(value) if self.ttl_for else self.ttl
+                if age < ttl + self.stale_ttl:
+                    self._entries.move_to_end(key)
+                    if age >= ttl and key not in self._inflight:
+                        self._start_load_locked(key, loader, background=True)
+                    return value
+            future = self._inflight.get(key)
+            owner = future is None
+            if owner:
+                future = self._start_load_locked(key, loader, background=False)
+        if owner:
+            self._load(key, loader, future)
+        return future.result()
+
+    def peek(self, key):
+        """Return the cached value for `key` regardless of age, or None."""
+        with self._lock:
+            entry = self._entries.get(key)
+            return entry[0] if entry is not None else None
+
+    def set(self, key, value):
+        with self._lock:
+            self._store_locked(key, value)
+
+    def invalidate(self, key):
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def _start_load_locked(self, key, loader, background):
+        future = Future()
+        self._inflight[key] = future
+        if background:
+            threading.Thread(
+                target=self._load, args=(key, loader, future),
+                name=f"cache-refresh-{key}", daemon=True
+            ).start()
+        return future
+
+    def _load(self, key, loader, future):
+        try:
+            value = loader()
+        except BaseException as e:
+            logger.debug(f"TTLCache: load failed for {key!r}: {e}")
+            with self._lock:
+                self._inflight.pop(key, None)
+            future.set_exception(e)
+            return
+        with self._lock:
+            self._store_locked(key, value)
+            self._inflight.pop(key, None)
+        future.set_result(value)
+
+    def _store_locked(self, key, value):
+        age = self.age_of(value) if self.age_of else 0
+        self._entries[key] = (value, time.monotonic() - age)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
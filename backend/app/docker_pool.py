@@ -0,0 +1,216 @@
+# backend/app/docker_pool.py
+
+import logging
+import threading
+import time
+from collections import OrderedDict
+
+import docker
+
+from .metrics import docker_call_errors, docker_call_seconds, docker_calls_in_flight, docker_operation
+from .telemetry import record_docker_call
+
+logger = logging.getLogger(__name__)
+
+
+class PooledDockerClient(docker.DockerClient):
+    """
+    DockerClient kept warm by DockerClientPool.
+
+    Callers never see it directly; they get a DockerClientLease. shutdown()
+    closes the underlying HTTP connection pool. Every API round trip (up to
+    the response headers, for streams) is recorded in the Docker latency
+    metrics and added to the current request's timing span.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        send = self.api.send
+        host = self.api.base_url
+
+        def timed_send(request, **send_kwargs):
+            operation = docker_operation(request.method, request.url)
+            docker_calls_in_flight.inc(host)
+            started = time.perf_counter()
+            try:
+                response = send(request, **send_kwargs)
+            except Exception as e:
+                docker_call_errors.inc(host, operation, type(e).__name__)
+                raise
+            finally:
+                elapsed = time.perf_counter() - started
+                docker_calls_in_flight.dec(host)
+                docker_call_seconds.observe(elapsed, host, operation)
+                record_docker_call(elapsed)
+            if response.status_code >= 400:
+                docker_call_errors.inc(host, operation, str(response.status_code))
+            return response
+
+        self.api.send = timed_send
+
+    def shutdown(self):
+        try:
+            super().close()
+        except Exception:
+            logger.debug('PooledDockerClient.shutdown: close failed', exc_info=True)
+
+
+class DockerClientLease:
+    """
+    One caller's lease on a pooled client.
+
+    Attribute access goes to the client. close() hands the lease back to the
+    pool instead of tearing down the connection, so existing
+    `finally: client.close()` blocks keep working. Closing the same lease
+    twice releases it only once.
+    """
+
+    __slots__ = ('_pool', '_key', '_entry', '_released')
+
+    def __init__(self, pool, key, entry):
+        self._pool = pool
+        self._key = key
+        self._entry = entry
+        self._released = False
+
+    def __getattr__(self, name):
+        return getattr(self._entry.client, name)
+
+    def close(self):
+        self._pool.release(self)
+
+
+class _PoolEntry:
+    __slots__ = ('client', 'leases', 'last_used', 'retired')
+
+    def __init__(self, client):
+        self.client = client
+        self.leases = 0
+        self.last_used = time.monotonic()
+        self.retired = False
+
+
+class DockerClientPool:
+    """
+    Keeps warm Docker clients keyed by connection details.
+
+    Clients are reused across requests so the TLS handshake and the HTTP
+    keep-alive pool survive between calls. Entries are evicted after
+    `idle_ttl` seconds without use, when the pool grows beyond `max_clients`
+    (least recently used first), or explicitly via evict(). A client that is
+    still leased by a running stream is only shut down once its last lease
+    is released.
+
+    All bookkeeping is guarded by a lock, which is greenlet-aware once gevent
+    has monkey-patched `threading`. Clients are built outside the lock so a
+    slow host never blocks lookups for other hosts.
+    """
+
+    def __init__(self, max_clients=64, idle_ttl=300, max_pool_size=10):
+        self.max_clients = max_clients
+        self.idle_ttl = idle_ttl
+        self.max_pool_size = max_pool_size
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def acquire(self, key, client_kwargs):
+        """
+        Lease the client for `key`, creating it with the keyword arguments
+        returned by `client_kwargs()` if there is no warm one. Returns a
+        DockerClientLease; close it once done.
+        """
+        with self._lock:
+            expired = self._sweep_locked()
+            entry = self._entries.get(key)
+            if entry is not None:
+                entry.leases += 1
+                entry.last_used = time.monotonic()
+                self._entries.move_to_end(key)
+        self._shutdown_all(expired)
+        if entry is not None:
+            return DockerClientLease(self, key, entry)
+
+        client = PooledDockerClient(max_pool_size=self.max_pool_size, **client_kwargs())
+        logger.info(f"DockerClientPool: opened client for {client.api.base_url}")
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                entry = _PoolEntry(client)
+                self._entries[key] = entry
+                loser = None
+            else:
+                # Another caller won the race; keep theirs.
+                loser = client
+            entry.leases += 1
+            entry.last_used = time.monotonic()
+            self._entries.move_to_end(key)
+            overflow = self._trim_locked()
+        if loser is not None:
+            loser.shutdown()
+        self._shutdown_all(overflow)
+        return DockerClientLease(self, key, entry)
+
+    def release(self, lease):
+        """Return a lease. Retired clients are shut down on their last release."""
+        entry = lease._entry
+        with self._lock:
+            if lease._released:
+                return
+            lease._released = True
+            entry.leases -= 1
+            entry.last_used = time.monotonic()
+            if not entry.retired:
+                # Keep the entries ordered by last use for _sweep_locked()
+                self._entries.move_to_end(lease._key)
+            shutdown = entry.retired and entry.leases == 0
+        if shutdown:
+            entry.client.shutdown()
+
+    def evict(self, key):
+        """Drop the client for `key`, e.g. on disconnect."""
+        with self._lock:
+            entry = self._entries.pop(key, None)
+            victims = self._retire_locked([entry] if entry else [])
+        self._shutdown_all(victims)
+
+    def clear(self):
+        with self._lock:
+            victims = self._retire_locked(list(self._entries.values()))
+            self._entries.clear()
+        self._shutdown_all(victims)
+
+    def __len__(self):
+        return len(self._entries)
+
+    def _sweep_locked(self):
+        if not self.idle_ttl:
+            return []
+        cutoff = time.monotonic() - self.idle_ttl
+        expired = []
+        for key, entry in list(self._entries.items()):
+            if entry.last_used > cutoff:
+                break
+            if entry.leases == 0:
+                expired.append(self._entries.pop(key))
+        return self._retire_locked(expired)
+
+    def _trim_locked(self):
+        overflow = []
+        while len(self._entries) > self.max_clients:
+            _, entry = self._entries.popitem(last=False)
+            overflow.append(entry)
+        return self._retire_locked(overflow)
+
+    def _retire_locked(self, entries):
+        """Mark entries retired and return the clients that can close now."""
+        victims = []
+        for entry in entries:
+            entry.retired = True
+            if entry.leases == 0:
+                victims.append(entry.client)
+        return victims
+
+    def _shutdown_all(self, clients):
+        for client in clients:
+            client.shutdown()
@@ -0,0 +1,169 @@
+# backend/app/exec_bridge.py
+
+import json
+import logging
+import select
+import socket
+import ssl
+import threading
+import time
+
+from simple_websocket import ConnectionClosed
+
+from .metrics import exec_sessions_active
+
+logger = logging.getLogger(__name__)
+
+# Largest read from the exec stream; a busy terminal sends few large frames instead of many small ones
+EXEC_READ_SIZE = 64 * 1024
+# Longest wait in select() before the pump checks whether the session has closed
+_POLL_INTERVAL = 0.5
+# A non-blocking socket (plain or TLS) that cannot make progress right now
+_WOULD_BLOCK = (ssl.SSLWantReadError, ssl.SSLWantWriteError, BlockingIOError)
+
+
+def raw_socket(stream):
+    """The OS-level socket under the object docker-py returns for a hijacked exec stream."""
+    return getattr(stream, '_sock', stream)
+
+
+def parse_control(message):
+    """A text frame's control message ({'type': 'resize', ...}), or None if it is terminal input."""
+    if not message.startswith('{'):
+        return None
+    try:
+        control = json.loads(message)
+    except ValueError:
+        return None
+    return control if isinstance(control, dict) and control.get('type') else None
+
+
+class ExecBridge:
+    """
+    Shuttles bytes between one WebSocket and one hijacked `docker exec`
+    stream (TTY, so output is not multiplexed).
+
+    Output is read in chunks of up to EXEC_READ_SIZE and sent as binary
+    frames by a pump thread; a slow browser blocks that send, which stops
+    reads from the daemon, so the process is throttled by TCP flow control
+    instead of output queueing up here. Input frames are written to the
+    stream from the request thread. Nothing is logged per chunk.
+
+    On a TLS host the stream is an SSLSocket, which must not be read and
+    written from two threads at once. The socket is therefore put in
+    non-blocking mode and every recv/send/shutdown runs under one lock,
+    with waiting done in select() outside it, so neither direction holds
+    the lock while blocked and any worker type (threads or gevent) works.
+    """
+
+    def __init__(self, ws, stream, resize, exec_inspect):
+        self.ws = ws
+        self.sock = raw_socket(stream)
+        self.stream = stream
+        self.resize = resize
+        self.exec_inspect = exec_inspect
+        self.bytes_in = 0
+        self.bytes_out = 0
+        self.exited = False
+        self._closed = threading.Event()
+        self._io_lock = threading.Lock()
+
+    def _recv(self):
+        """Up to EXEC_READ_SIZE bytes of output; b'' at end of stream, None if nothing is ready yet."""
+        with self._io_lock:
+            try:
+                return self.sock.recv(EXEC_READ_SIZE)
+            except _WOULD_BLOCK:
+                return None
+
+    def _pump_output(self):
+        try:
+            while not self._closed.is_set():
+                data = self._recv()
+                if data is None:
+                    select.select([self.sock], [], [], _POLL_INTERVAL)
+                    continue
+                if not data:
+                    break
+                self.bytes_out += len(data)
+                self.ws.send(data)
+        except (OSError, ValueError, ConnectionClosed):
+            pass
+        finally:
+            if not self._closed.is_set():
+                # The process ended (or the daemon dropped us); report the exit code, then hang up
+                self.exited = True
+                try:
+                    exit_code = self.exec_inspect().get('ExitCode')
+                    self.ws.send(json.dumps({'type': 'exit', 'code': exit_code}))
+                except Exception:
+                    logger.debug('exec: could not report exit code', exc_info=True)
+                try:
+                    self.ws.close(reason=1000, message='Process exited')
+                except ConnectionClosed:
+                    # The client hung up at the same moment
+                    pass
+            self._closed.set()
+
+    def _write_input(self, data):
+        self.bytes_in += len(data)
+        view = memoryview(data)
+        while view:
+            with self._io_lock:
+                try:
+                    # A TLS write that would block must be retried with the same data
+                    view = view[self.sock.send(view):]
+                    continue
+                except _WOULD_BLOCK:
+                    pass
+            select.select([], [self.sock], [], _POLL_INTERVAL)
+
+    def _handle_control(self, control):
+        if control['type'] == 'resize':
+            try:
+                self.resize(int(control['rows']), int(control['cols']))
+            except (KeyError, TypeError, ValueError):
+                self.ws.send(json.dumps({'type': 'error', 'error': 'resize needs numeric rows and cols'}))
+        else:
+            self.ws.send(json.dumps({'type': 'error', 'error': f"Unknown control message '{control['type']}'"}))
+
+    def run(self):
+        """Bridge until the process exits or the client disconnects."""
+        self.sock.setblocking(False)
+        if self.sock.family in (socket.AF_INET, socket.AF_INET6):
+            self.sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        pump = threading.Thread(target=self._pump_output, name='exec-output', daemon=True)
+        exec_sessions_active.inc()
+        started = time.monotonic()
+        pump.start()
+        try:
+            while not self._closed.is_set():
+                message = self.ws.receive()
+                if message is None:
+                    break
+                if isinstance(message, str):
+                    control = parse_control(message)
+                    if control is not None:
+                        self._handle_control(control)
+                        continue
+                    message = message.encode()
+                self._write_input(message)
+        except (OSError, ConnectionClosed):
+            pass
+        finally:
+            self._closed.set()
+            with self._io_lock:
+                try:
+                    self.sock.shutdown(socket.SHUT_RDWR)
+                except (OSError, ValueError):
+                    pass
+            pump.join(timeout=5)
+            try:
+                self.stream.close()
+            except Exception:
+                pass
+            exec_sessions_active.dec()
+            logger.info(
+                f"exec session ended ({'process exited' if self.exited else 'client closed'}) after "
+                f"{time.monotonic() - started:.1f}s, {self.bytes_in} bytes in, {self.bytes_out} bytes out"
+            )
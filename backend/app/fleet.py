@@ -0,0 +1,202 @@
+# backend/app/fleet.py
+
+import json
+import logging
+import os
+import re
+import shutil
+import tempfile
+import threading
+import time
+import uuid
+from concurrent.futures import wait
+
+logger = logging.getLogger(__name__)
+
+HOST_NAME = re.compile(r'^[A-Za-z0-9][A-Za-z0-9_.-]{0,62}$')
+
+
+def write_tls_material(certs_dir, ca_cert, client_cert, client_key):
+    """
+    Store a CA, client certificate and key as ca.pem/cert.pem/key.pem
+    (mode 0600) in a new directory under `certs_dir`; returns its name,
+    which docker_config calls the session_id.
+    """
+    session_id = uuid.uuid4().hex
+    cert_dir = os.path.join(certs_dir, session_id)
+    os.makedirs(cert_dir, exist_ok=True)
+    for filename, content in (('ca.pem', ca_cert), ('cert.pem', client_cert), ('key.pem', client_key)):
+        path = os.path.join(cert_dir, filename)
+        with open(path, 'w') as f:
+            f.write(content)
+        os.chmod(path, 0o600)
+    return session_id
+
+
+class FleetRegistry:
+    """
+    Named Docker host connections shared by all users, kept in a JSON file.
+
+    Each host is stored as a docker_config of the same shape api_connect
+    keeps in the session (TLS files under `certs_dir`/<session_id>), so
+    pooled clients, inventories and caches serve fleet hosts unchanged.
+    """
+
+    def __init__(self, path, certs_dir):
+        self.path = path
+        self.certs_dir = certs_dir
+        self._hosts = {}
+        self._lock = threading.Lock()
+        self._load()
+
+    def _load(self):
+        try:
+            with open(self.path) as f:
+                entries = json.load(f).get('hosts') or []
+        except FileNotFoundError:
+            return
+        except (OSError, ValueError) as e:
+            logger.warning(f"fleet: could not read {self.path}: {e}")
+            return
+        for entry in entries:
+            session_id = entry['config'].get('session_id')
+            if session_id and not os.path.isdir(os.path.join(self.certs_dir, session_id)):
+                logger.warning(f"fleet: TLS files for host {entry['name']} are missing; skipping it")
+                continue
+            self._hosts[entry['name']] = entry
+        logger.info(f"fleet: loaded {len(self._hosts)} hosts from {self.path}")
+
+    def _save(self):
+        """Write the registry atomically; the caller holds the lock."""
+        directory = os.path.dirname(os.path.abspath(self.path))
+        os.makedirs(directory, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=directory, prefix='.fleet-')
+        try:
+            with os.fdopen(fd, 'w') as f:
+                json.dump({'hosts': sorted(self._hosts.values(), key=lambda e: e['name'])}, f, indent=2)
+            os.chmod(tmp_path, 0o600)
+            os.replace(tmp_path, self.path)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+
+    def build_config(self, host_ip, ca_cert, client_cert, client_key, port=2376):
+        """docker_config for a new host, with its TLS files written; not registered yet."""
+        session_id = write_tls_material(self.certs_dir, ca_cert, client_cert, client_key)
+        return {
+            'host_ip': host_ip,
+            'mode': 'https',
+            'base_url': f"https://{host_ip}:{port}",
+            'session_id': session_id,
+        }
+
+    def discard_config(self, config):
+        """Delete the TLS files of a config that was built but not kept."""
+        if config.get('session_id'):
+            shutil.rmtree(os.path.join(self.certs_dir, config['session_id']), ignore_errors=True)
+
+    def add(self, name, config, labels=None):
+        """Register a host under `name`. Raises ValueError if the name is taken."""
+        with self._lock:
+            if name in self._hosts:
+                raise ValueError(f"A host named '{name}' is already registered")
+            self._hosts[name] = {'name': name, 'labels': labels or {}, 'added': time.time(), 'config': config}
+            self._save()
+
+    def remove(self, name):
+        """Unregister a host and delete its TLS files; returns its config, or None."""
+        with self._lock:
+            entry = self._hosts.pop(name, None)
+            if entry is not None:
+                self._save()
+        if entry is None:
+            return None
+        self.discard_config(entry['config'])
+        return entry['config']
+
+    def get(self, name):
+        entry = self._hosts.get(name)
+        return dict(entry['config']) if entry else None
+
+    def entries(self):
+        """Registered hosts sorted by name, as {'name', 'labels', 'added', 'config'} dicts."""
+        with self._lock:
+            return [dict(self._hosts[name]) for name in sorted(self._hosts)]
+
+    def __len__(self):
+        return len(self._hosts)
+
+
+class FanOut:
+    """
+    Run one function against many hosts concurrently and collect whatever
+    answers within a deadline.
+
+    A host that raises or does not answer in time is reported as failed and
+    skipped for `cooldown` seconds, so a dead host does not keep executor
+    threads blocked on connect timeouts. A call that finishes after its
+    deadline still counts: success clears the host's failure mark.
+    """
+
+    def __init__(self, executor, cooldown=30):
+        self.executor = executor
+        self.cooldown = cooldown
+        self._down_until = {}
+        self._lock = threading.Lock()
+
+    def _mark(self, name, ok):
+        with self._lock:
+            if ok:
+                self._down_until.pop(name, None)
+            else:
+                self._down_until[name] = time.monotonic() + self.cooldown
+
+    def _call(self, func, name, config):
+        started = time.monotonic()
+        try:
+            value = func(name, config)
+        except Exception as e:
+            logger.warning(f"fleet: host {name} failed: {e}")
+            self._mark(name, False)
+            return False, str(e), time.monotonic() - started
+        self._mark(name, True)
+        return True, value, time.monotonic() - started
+
+    def run(self, hosts, func, timeout):
+        """
+        Call `func(name, config)` for every (name, config) in `hosts`.
+
+        Returns ({name: value} for the hosts that answered, {name: status}
+        for every host), where a status is {'ok', 'elapsed_ms'} plus
+        'error', and 'timed_out' or 'skipped' when applicable.
+        """
+        results, statuses, futures = {}, {}, {}
+        now = time.monotonic()
+        for name, config in hosts:
+            retry_at = self._down_until.get(name)
+            if retry_at is not None and retry_at > now:
+                statuses[name] = {
+                    'ok': False, 'skipped': True, 'elapsed_ms': 0.0,
+                    'error': f"Host failed recently; retrying in {retry_at - now:.0f}s",
+                }
+                continue
+            futures[self.executor.submit(self._call, func, name, config)] = name
+
+        wait(futures, timeout=timeout)
+        for future, name in futures.items():
+            if not future.done():
+                if not future.cancel():
+                    logger.warning(f"fleet: host {name} did not answer within {timeout:g}s")
+                self._mark(name, False)
+                statuses[name] = {
+                    'ok': False, 'timed_out': True, 'elapsed_ms': round(timeout * 1000, 1),
+                    'error': f"No answer within {timeout:g}s",
+                }
+                continue
+            ok, value, elapsed = future.result()
+            statuses[name] = {'ok': ok, 'elapsed_ms': round(elapsed * 1000, 1)}
+            if ok:
+                results[name] = value
+            else:
+                statuses[name]['error'] = value
+        return results, statuses
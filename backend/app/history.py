@@ -0,0 +1,291 @@
+# backend/app/history.py
+
+import logging
+import threading
+import time
+from array import array
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+from .stats import derive_container_stats
+
+logger = logging.getLogger(__name__)
+
+# Metrics kept per sample, all gauges so they can be averaged when rolled up.
+# Network counters are stored as byte rates for that reason.
+HISTORY_METRICS = (
+    'cpu_percent', 'memory_usage_mb', 'memory_percent', 'pids',
+    'network_rx_bps', 'network_tx_bps',
+)
+
+# (resolution in seconds, number of slots): 1 s for 10 min, 30 s for 6 h, 5 min for 7 days,
+# 3336 slots or about 91 KB per container once every tier has filled
+DEFAULT_TIERS = ((1, 600), (30, 720), (300, 2016))
+
+# Slot storage: bucket numbers as uint32, metric values as float32
+_BUCKET_TYPECODE = 'I'
+_VALUE_TYPECODE = 'f'
+
+
+class RingTier:
+    """
+    Fixed-capacity ring of rolled-up samples at one resolution.
+
+    Slot i holds bucket number b (epoch seconds // resolution) where
+    (b - origin) % capacity == i, origin being the first bucket recorded,
+    plus one float per metric, in flat typed arrays. The arrays grow as
+    time passes, up to `capacity` slots, so a coarse tier costs little until
+    it has been fed for its whole span. A slot whose stored bucket does not
+    match is empty or has been overwritten by a newer bucket.
+    """
+
+    def __init__(self, resolution, capacity):
+        self.resolution = resolution
+        self.capacity = capacity
+        self.origin = None
+        self.buckets = array(_BUCKET_TYPECODE)
+        self.columns = [array(_VALUE_TYPECODE) for _ in HISTORY_METRICS]
+        self._pending_bucket = 0
+        self._pending_count = 0
+        self._pending_sums = [0.0] * len(HISTORY_METRICS)
+
+    @property
+    def nbytes(self):
+        """Bytes allocated so far (at most capacity slots)."""
+        return len(self.buckets) * (self.buckets.itemsize + sum(c.itemsize for c in self.columns))
+
+    def add(self, ts, values):
+        bucket = int(ts // self.resolution)
+        if self.origin is None:
+            self.origin = bucket
+        if bucket != self._pending_bucket:
+            self._flush()
+            self._pending_bucket = bucket
+            self._pending_count = 0
+            self._pending_sums = [0.0] * len(HISTORY_METRICS)
+        self._pending_count += 1
+        sums = self._pending_sums
+        for i, value in enumerate(values):
+            sums[i] += value
+
+    def _flush(self):
+        if not self._pending_count:
+            return
+        slot = (self._pending_bucket - self.origin) % self.capacity
+        grow = slot + 1 - len(self.buckets)
+        if grow > 0:
+            self.buckets.extend([0] * grow)
+            for column in self.columns:
+                column.extend([0.0] * grow)
+        self.buckets[slot] = self._pending_bucket
+        for column, total in zip(self.columns, self._pending_sums):
+            column[slot] = total / self._pending_count
+
+    def points(self, start, end):
+        """Yield (timestamp, values) for stored buckets in [start, end], oldest first."""
+        if self.origin is None:
+            return
+        newest = self._pending_bucket
+        first = max(int(start // self.resolution), newest - self.capacity + 1)
+        last = min(int(end // self.resolution), newest)
+        for bucket in range(first, last + 1):
+            if bucket == newest and self._pending_count:
+                yield bucket * self.resolution, [s / self._pending_count for s in self._pending_sums]
+                continue
+            slot = (bucket - self.origin) % self.capacity
+            if slot < len(self.buckets) and self.buckets[slot] == bucket:
+                yield bucket * self.resolution, [column[slot] for column in self.columns]
+
+    def covers(self, start, now):
+        return start >= (int(now // self.resolution) - self.capacity + 1) * self.resolution
+
+
+class ContainerHistory:
+    """All resolutions for one container; every sample feeds every tier."""
+
+    def __init__(self, tiers):
+        self.name = None
+        self.tiers = [RingTier(resolution, capacity) for resolution, capacity in tiers]
+        self._last_network = None
+        self._lock = threading.Lock()
+
+    def add(self, ts, sample):
+        memory = sample.get('memory_mb', {})
+        networks = (sample.get('network') or {}).values()
+        rx = sum(net.get('rx', 0) for net in networks)
+        tx = sum(net.get('tx', 0) for net in networks)
+
+        with self._lock:
+            rx_rate = tx_rate = 0.0
+            if self._last_network is not None:
+                last_ts, last_rx, last_tx = self._last_network
+                elapsed = ts - last_ts
+                if elapsed > 0 and rx >= last_rx and tx >= last_tx:
+                    rx_rate = (rx - last_rx) / elapsed
+                    tx_rate = (tx - last_tx) / elapsed
+            self._last_network = (ts, rx, tx)
+
+            values = (
+                sample.get('cpu_percent', 0.0),
+                memory.get('usage', 0),
+                memory.get('percent', 0.0),
+                sample.get('pids', 0),
+                rx_rate,
+                tx_rate,
+            )
+            for tier in self.tiers:
+                tier.add(ts, values)
+
+    def query(self, start, end, step=None):
+        """
+        Columnar samples between `start` and `end` (epoch seconds).
+
+        Uses the coarsest tier that reaches back to `start` and is no coarser
+        than `step` (the finest one reaching back when no step is given),
+        then averages its points into `step`-second buckets.
+        """
+        now = time.time()
+        covering = [t for t in self.tiers if t.covers(start, now)] or [self.tiers[-1]]
+        fitting = [t for t in covering if step is not None and t.resolution <= step]
+        tier = fitting[-1] if fitting else covering[0]
+        step = max(step or tier.resolution, tier.resolution)
+
+        result = {'t': [], **{metric: [] for metric in HISTORY_METRICS}}
+        with self._lock:
+            group_start, sums, count = None, None, 0
+            for ts, values in tier.points(start, end):
+                bucket_start = ts - ts % step
+                if sums is not None and bucket_start != group_start:
+                    self._emit(result, group_start, sums, count)
+                    sums = None
+                if sums is None:
+                    group_start, sums, count = bucket_start, list(values), 1
+                else:
+                    sums = [a + b for a, b in zip(sums, values)]
+                    count += 1
+            if sums is not None:
+                self._emit(result, group_start, sums, count)
+        result['step'] = step
+        return result
+
+    @staticmethod
+    def _emit(result, ts, sums, count):
+        result['t'].append(ts)
+        for metric, total in zip(HISTORY_METRICS, sums):
+            result[metric].append(round(total / count, 2))
+
+
+class StatsHistory:
+    """
+    Per-container metric history for every host, fed by the stats broker.
+
+    Memory per tracked container grows with how long it has been recorded,
+    up to bytes_per_container, and at most `max_containers` are kept, least
+    recently updated dropped first, so the worst case is
+    bytes_per_container * max_containers.
+    """
+
+    def __init__(self, tiers=DEFAULT_TIERS, max_containers=1000):
+        self.tiers = tuple(tiers)
+        self.max_containers = max_containers
+        self._series = OrderedDict()
+        self._lock = threading.Lock()
+
+    @property
+    def bytes_per_container(self):
+        slot = array(_BUCKET_TYPECODE).itemsize + array(_VALUE_TYPECODE).itemsize * len(HISTORY_METRICS)
+        return sum(capacity * slot for _, capacity in self.tiers)
+
+    def record(self, key, stat, sample):
+        """StatsBroker listener: store one sample under the container's full ID."""
+        container_id = stat.get('id')
+        if not container_id:
+            return
+        series_key = (key, container_id)
+        with self._lock:
+            series = self._series.get(series_key)
+            if series is None:
+                series = self._series[series_key] = ContainerHistory(self.tiers)
+                while len(self._series) > self.max_containers:
+                    self._series.popitem(last=False)
+            else:
+                self._series.move_to_end(series_key)
+        series.name = (stat.get('name') or '').lstrip('/') or series.name
+        series.add(time.time(), sample)
+
+    def find(self, key, container_ref):
+        """Look up a container's history by full ID, ID prefix or name."""
+        with self._lock:
+            candidates = [(cid, s) for (k, cid), s in self._series.items() if k == key]
+        for cid, series in candidates:
+            if cid == container_ref:
+                return series
+        for cid, series in candidates:
+            if cid.startswith(container_ref) or series.name == container_ref:
+                return series
+        return None
+
+
+class HistorySampler:
+    """
+    Records history for running containers nobody is streaming.
+
+    Every `interval` seconds, takes one stats sample of each running
+    container of every host in `registry` (an InventoryRegistry) and hands
+    it to `record` (StatsHistory.record). Containers for which
+    `is_streaming(key, container_id)` is true are skipped, as their open
+    stats stream records them every second already. A host is sampled while
+    its inventory runs, so until nobody has listed its objects for the
+    inventory's idle timeout. A non-streaming stats call takes the daemon
+    about a second (it waits for a second CPU reading), so up to `workers`
+    run at once and a cycle that overruns delays the next one.
+    """
+
+    def __init__(self, registry, record, is_streaming, interval=10, workers=8):
+        self.registry = registry
+        self.record = record
+        self.is_streaming = is_streaming
+        self.interval = interval
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='history-sample')
+        self._thread = None
+        self._lock = threading.Lock()
+
+    def start(self):
+        with self._lock:
+            if self._thread is not None:
+                return
+            self._thread = threading.Thread(target=self._run, name='history-sampler', daemon=True)
+            self._thread.start()
+
+    def sample_once(self):
+        """Sample every running, unstreamed container once. Returns the number of samples recorded."""
+        jobs = []
+        for inventory in self.registry.running():
+            for row in inventory.peek('containers'):
+                container_id = row.get('Id')
+                if row.get('State') == 'running' and not self.is_streaming(inventory.key, container_id):
+                    jobs.append((inventory, container_id))
+        return sum(self._executor.map(lambda job: self._sample(*job), jobs))
+
+    def _sample(self, inventory, container_id):
+        try:
+            stat = inventory.client.api.stats(container_id, stream=False)
+        except Exception as e:
+            # Stopped or removed since the inventory last saw it, or the host went away
+            logger.debug(f"HistorySampler: no sample for {container_id[:12]} on {inventory.key}: {e}")
+            return 0
+        self.record(inventory.key, stat, derive_container_stats(stat))
+        return 1
+
+    def _run(self):
+        while True:
+            started = time.monotonic()
+            try:
+                recorded = self.sample_once()
+                if recorded:
+                    logger.debug(
+                        f"HistorySampler: {recorded} samples in {time.monotonic() - started:.3f}s"
+                    )
+            except Exception:
+                logger.exception('HistorySampler: sampling cycle failed')
+            time.sleep(max(self.interval - (time.monotonic() - started), 0))
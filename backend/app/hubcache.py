@@ -0,0 +1,140 @@
+# backend/app/hubcache.py
+
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from .cache import TTLCache
+
+logger = logging.getLogger(__name__)
+
+DOCKER_HUB_API_URL = 'https://hub.docker.com'
+
+
+class HubMetadataCache:
+    """
+    Docker Hub repository metadata, looked up in three tiers.
+
+    A lookup checks an in-process TTLCache, then a JSON file per repository
+    under `cache_dir` (so restarts and other workers start warm), then the
+    Hub API at `base_url` through one pooled HTTP session. Records are
+    stored with the wall-clock time they were fetched:
+
+    - younger than `ttl` (`negative_ttl` for a 404): served as is;
+    - up to `stale_ttl` seconds older: served while a background thread
+      refreshes them;
+    - older: fetched synchronously, falling back to the old record if the
+      Hub cannot be reached.
+
+    Fetches are single-flight per repository (TTLCache). get() returns
+    (status, data) where status is 200 or 404.
+    """
+
+    def __init__(self, base_url=DOCKER_HUB_API_URL, cache_dir=None, ttl=3600, stale_ttl=86400,
+                 negative_ttl=300, max_entries=512, timeout=10, pool_size=10):
+        self.base_url = base_url.rstrip('/')
+        self.cache_dir = cache_dir
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self.negative_ttl = negative_ttl
+        self.max_entries = max_entries
+        self.timeout = timeout
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+        self._memory = TTLCache(
+            ttl, stale_ttl=stale_ttl, max_entries=max_entries,
+            ttl_for=lambda record: ttl if record['status'] == 200 else negative_ttl,
+            age_of=lambda record: max(time.time() - record['fetched_at'], 0),
+        )
+        if cache_dir:
+            os.makedirs(cache_dir, exist_ok=True)
+
+    def get(self, repository):
+        """Return (status, data) for 'namespace/name'."""
+        if self._memory.peek(repository) is None:
+            record = self._disk_get(repository)
+            if record is not None:
+                self._memory.set(repository, record)
+        record = self._memory.get(repository, lambda: self._fetch(repository))
+        return record['status'], record['data']
+
+    def invalidate(self, repository):
+        self._memory.invalidate(repository)
+        path = self._path(repository)
+        if path:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+    def _fetch(self, repository):
+        """Loader for the memory tier: fetch from the Hub, or keep the old record if that fails."""
+        try:
+            record = self._request(repository)
+        except Exception as e:
+            old = self._memory.peek(repository)
+            if old is None:
+                raise
+            logger.warning(f"HubMetadataCache: serving stale {repository} after fetch failed: {e}")
+            return old
+        self._disk_set(repository, record)
+        return record
+
+    def _request(self, repository):
+        started = time.monotonic()
+        resp = self.session.get(f"{self.base_url}/v2/repositories/{repository}", timeout=self.timeout)
+        logger.debug(
+            f"HubMetadataCache: GET {repository} -> {resp.status_code} "
+            f"in {time.monotonic() - started:.3f}s"
+        )
+        if resp.status_code == 404:
+            return {'status': 404, 'data': None, 'fetched_at': time.time()}
+        resp.raise_for_status()
+        return {'status': 200, 'data': resp.json(), 'fetched_at': time.time()}
+
+    def _path(self, repository):
+        if not self.cache_dir:
+            return None
+        digest = hashlib.sha256(repository.encode('utf-8')).hexdigest()
+        return os.path.join(self.cache_dir, f"{digest}.json")
+
+    def _disk_get(self, repository):
+        path = self._path(repository)
+        if not path:
+            return None
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                record = json.load(f)
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError) as e:
+            logger.debug(f"HubMetadataCache: unreadable cache file for {repository}: {e}")
+            return None
+        if record.get('repository') != repository or 'fetched_at' not in record:
+            return None
+        return record
+
+    def _disk_set(self, repository, record):
+        path = self._path(repository)
+        if not path:
+            return
+        # Write then rename so readers never see a partial file
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump({'repository': repository, **record}, f)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            logger.debug(f"HubMetadataCache: could not write cache file for {repository}: {e}")
+            try:
+                os.remove(tmp_path)
+            except OSError:
+                pass
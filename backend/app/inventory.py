@@ -0,0 +1,308 @@
+# backend/app/inventory.py
+
+import logging
+import threading
+import time
+import uuid
+
+logger = logging.getLogger(__name__)
+
+INVENTORY_KINDS = ('containers', 'images', 'networks', 'volumes')
+
+# Container actions that change what /containers/json reports for a container
+CONTAINER_REFRESH_ACTIONS = {
+    'create', 'start', 'restart', 'stop', 'die', 'kill', 'oom',
+    'pause', 'unpause', 'rename', 'update',
+}
+# Image actions after which the image list has to be read again
+IMAGE_REFRESH_ACTIONS = {'pull', 'tag', 'untag', 'import', 'load'}
+
+
+def list_raw(api, kind):
+    """Fetch the raw list rows for one kind of object straight from the daemon."""
+    if kind == 'containers':
+        return api.containers(all=True)
+    if kind == 'images':
+        return api.images(all=True)
+    if kind == 'networks':
+        return api.networks()
+    if kind == 'volumes':
+        return (api.volumes() or {}).get('Volumes') or []
+    raise ValueError(f"Unknown inventory kind: {kind}")
+
+
+def row_key(kind, row):
+    return row.get('Name') if kind == 'volumes' else row.get('Id')
+
+
+class HostInventory:
+    """
+    In-memory copy of one host's containers, images, networks and volumes.
+
+    A background thread follows the daemon's /events stream and applies each
+    event as an incremental update, re-reading only the affected object.
+    Every `reconcile_interval` seconds the stream is cycled and all lists are
+    read again to repair any drift. A new stream is always opened before the
+    full read, so no event falls in the gap between two streams.
+
+    Rows are stored exactly as the daemon's list endpoints return them and
+    must be treated as read-only by callers. Each kind has a version that
+    changes only when its rows do, so callers can cache what they derive
+    from a snapshot.
+    """
+
+    def __init__(self, key, client, reconcile_interval=60, idle_timeout=600):
+        self.key = key
+        self.client = client
+        self.reconcile_interval = reconcile_interval
+        self.idle_timeout = idle_timeout
+        self.last_read = time.monotonic()
+        self.last_reconcile = None
+        self.running = False
+        self._objects = {kind: {} for kind in INVENTORY_KINDS}
+        # Generations restart with each inventory; the epoch keeps versions from two inventories apart
+        self._epoch = uuid.uuid4().hex[:8]
+        self._generations = dict.fromkeys(INVENTORY_KINDS, 0)
+        self._lock = threading.Lock()
+        self._stream = None
+        self._stopping = False
+        self._thread = None
+
+    def start(self):
+        """Take the first snapshot synchronously, then follow events in the background."""
+        stream = self._open_cycle()
+        self.running = True
+        self._thread = threading.Thread(
+            target=self._run, args=(stream,), name=f"inventory-{self.key}", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self):
+        self._stopping = True
+        self.running = False
+        stream = self._stream
+        if stream is not None:
+            try:
+                stream.close()
+            except Exception:
+                pass
+
+    def rows(self, kind):
+        """Snapshot of the rows for `kind`."""
+        self.last_read = time.monotonic()
+        with self._lock:
+            return list(self._objects[kind].values())
+
+    def peek(self, kind):
+        """Like rows(), but not counted as a read, so it does not keep the inventory from going idle."""
+        with self._lock:
+            return list(self._objects[kind].values())
+
+    def version(self, kind):
+        """Opaque token that changes whenever the rows for `kind` change."""
+        self.last_read = time.monotonic()
+        return f"{self._epoch}.{self._generations[kind]}"
+
+    def snapshot(self, kind):
+        """(version, rows) for `kind`, taken together."""
+        self.last_read = time.monotonic()
+        with self._lock:
+            return f"{self._epoch}.{self._generations[kind]}", list(self._objects[kind].values())
+
+    def _open_cycle(self):
+        stream = self.client.api.events(decode=True)
+        self._stream = stream
+        self._reconcile()
+        return stream
+
+    def _run(self, stream):
+        try:
+            while not self._stopping:
+                cycle_ended = threading.Event()
+                timer = threading.Timer(self.reconcile_interval, self._end_cycle, args=(stream, cycle_ended))
+                timer.daemon = True
+                timer.start()
+                try:
+                    for event in stream:
+                        try:
+                            self._apply(event)
+                        except Exception as e:
+                            # Reconcile repairs whatever this event would have changed
+                            logger.debug(f"HostInventory {self.key}: failed to apply event: {e}")
+                except Exception:
+                    # Closing the stream from the timer surfaces as a read error
+                    if self._stopping or not cycle_ended.is_set():
+                        raise
+                finally:
+                    timer.cancel()
+
+                if self._stopping:
+                    break
+                if time.monotonic() - self.last_read > self.idle_timeout:
+                    logger.info(f"HostInventory {self.key}: idle, stopping")
+                    break
+                stream = self._open_cycle()
+        except Exception:
+            if not self._stopping:
+                logger.exception(f"HostInventory {self.key}: event loop failed")
+        finally:
+            self.running = False
+            self._stream = None
+            try:
+                stream.close()
+            except Exception:
+                pass
+            self.client.close()
+
+    @staticmethod
+    def _end_cycle(stream, cycle_ended):
+        # Set before closing: the reader can see the closed stream before close() returns
+        cycle_ended.set()
+        stream.close()
+
+    def _reconcile(self):
+        started = time.monotonic()
+        fresh = {}
+        for kind in INVENTORY_KINDS:
+            fresh[kind] = {row_key(kind, row): row for row in list_raw(self.client.api, kind)}
+        with self._lock:
+            for kind in INVENTORY_KINDS:
+                if fresh[kind] != self._objects[kind]:
+                    self._generations[kind] += 1
+            self._objects = fresh
+        self.last_reconcile = time.monotonic()
+        logger.debug(
+            f"HostInventory {self.key}: reconciled "
+            + ", ".join(f"{len(fresh[k])} {k}" for k in INVENTORY_KINDS)
+            + f" in {self.last_reconcile - started:.3f}s"
+        )
+
+    def _apply(self, event):
+        kind = event.get('Type')
+        action = (event.get('Action') or event.get('status') or '').split(':', 1)[0]
+        actor = event.get('Actor') or {}
+        object_id = actor.get('ID') or event.get('id')
+        if not object_id:
+            return
+
+        api = self.client.api
+        if kind == 'container':
+            if action == 'destroy':
+                self._discard('containers', object_id)
+            elif action in CONTAINER_REFRESH_ACTIONS or action == 'health_status':
+                self._refresh_container(object_id)
+            if action == 'commit':
+                self._replace_all('images')
+        elif kind == 'image':
+            if action == 'delete':
+                self._discard('images', object_id)
+            elif action in IMAGE_REFRESH_ACTIONS:
+                self._replace_all('images')
+        elif kind == 'network':
+            if action == 'destroy':
+                self._discard('networks', object_id)
+            elif action == 'create':
+                for row in api.networks(ids=[object_id]):
+                    self._store('networks', row)
+            elif action in ('connect', 'disconnect'):
+                container_id = (actor.get('Attributes') or {}).get('container')
+                if container_id:
+                    self._refresh_container(container_id)
+        elif kind == 'volume':
+            if action == 'destroy':
+                self._discard('volumes', object_id)
+            elif action == 'create':
+                self._store('volumes', api.inspect_volume(object_id))
+
+    def _refresh_container(self, container_id):
+        rows = self.client.api.containers(all=True, filters={'id': [container_id]})
+        if rows:
+            self._store('containers', rows[0])
+        else:
+            self._discard('containers', container_id)
+
+    def _replace_all(self, kind):
+        fresh = {row_key(kind, row): row for row in list_raw(self.client.api, kind)}
+        with self._lock:
+            if fresh != self._objects[kind]:
+                self._objects[kind] = fresh
+                self._generations[kind] += 1
+
+    def _store(self, kind, row):
+        key = row_key(kind, row)
+        with self._lock:
+            if self._objects[kind].get(key) != row:
+                self._objects[kind][key] = row
+                self._generations[kind] += 1
+
+    def _discard(self, kind, object_id):
+        with self._lock:
+            if self._objects[kind].pop(object_id, None) is not None:
+                self._generations[kind] += 1
+
+
+class InventoryRegistry:
+    """
+    One HostInventory per host, started on first use.
+
+    `client_factory(config)` must return a Docker client whose close()
+    releases it; the inventory holds it for as long as it runs. Inventories
+    stop themselves after `idle_timeout` seconds without reads, and are
+    replaced on the next read if their event loop died.
+    """
+
+    def __init__(self, client_factory, reconcile_interval=60, idle_timeout=600):
+        self.client_factory = client_factory
+        self.reconcile_interval = reconcile_interval
+        self.idle_timeout = idle_timeout
+        self._inventories = {}
+        self._starting = {}
+        self._lock = threading.Lock()
+
+    def get(self, key, config):
+        with self._lock:
+            inventory = self._inventories.get(key)
+            if inventory is not None and inventory.running:
+                return inventory
+            ready = self._starting.get(key)
+            owner = ready is None
+            if owner:
+                ready = self._starting[key] = threading.Event()
+        if not owner:
+            ready.wait()
+            with self._lock:
+                inventory = self._inventories.get(key)
+            if inventory is None or not inventory.running:
+                raise Exception('Host inventory is not available. Please retry.')
+            return inventory
+
+        try:
+            client = self.client_factory(config)
+            inventory = HostInventory(
+                key, client,
+                reconcile_interval=self.reconcile_interval,
+                idle_timeout=self.idle_timeout,
+            )
+            try:
+                inventory.start()
+            except Exception:
+                client.close()
+                raise
+            with self._lock:
+                self._inventories[key] = inventory
+            return inventory
+        finally:
+            with self._lock:
+                self._starting.pop(key, None)
+            ready.set()
+
+    def running(self):
+        """The inventories whose event loop is running."""
+        with self._lock:
+            return [inventory for inventory in self._inventories.values() if inventory.running]
+
+    def evict(self, key):
+        with self._lock:
+            inventory = self._inventories.pop(key, None)
+        if inventory is not None:
+            inventory.stop()
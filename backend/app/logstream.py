@@ -0,0 +1,583 @@
+# backend/app/logstream.py
+
+import base64
+import binascii
+import calendar
+import json
+import logging
+import queue
+import re
+import struct
+import threading
+import time
+from collections import deque
+from itertools import takewhile
+
+from .telemetry import LogSampler
+
+logger = logging.getLogger(__name__)
+# Flushes and rate-limit drops are logged one in LOG_SAMPLE_EVERY
+flush_sampler = LogSampler()
+
+STREAM_NAMES = {0: 'stdout', 1: 'stdout', 2: 'stderr'}
+_HEADER = struct.Struct('>BxxxL')
+_NS = 1_000_000_000
+
+# Severity order used by the `level` filter
+LOG_LEVELS = {
+    'trace': 0, 'debug': 10, 'info': 20, 'notice': 25, 'warn': 30, 'warning': 30,
+    'err': 40, 'error': 40, 'crit': 50, 'critical': 50, 'fatal': 50, 'panic': 50,
+}
+_LEVEL_RE = re.compile(r'\b(' + '|'.join(sorted(LOG_LEVELS, key=len, reverse=True)) + r')\b', re.IGNORECASE)
+MAX_CONTEXT_LINES = 100
+
+# Widening look-back windows (seconds) used to find the page before a point in time
+BACKWARD_WINDOWS = (300, 3600, 86400, None)
+
+
+def open_container_logs(api, container_id, follow=True, tail=250, **params):
+    """
+    Start a raw logs request for a container.
+
+    Returns (response, tty). docker-py's logs() merges stdout and stderr, so
+    the request is made directly and the multiplexed frames are decoded by
+    iter_log_frames(), which keeps the two streams apart.
+    """
+    tty = bool(((api.inspect_container(container_id) or {}).get('Config') or {}).get('Tty'))
+    query = {'stdout': 1, 'stderr': 1, 'follow': 1 if follow else 0, 'tail': tail}
+    query.update({k: v for k, v in params.items() if v is not None})
+    response = api._get(
+        api._url('/containers/{0}/logs', container_id),
+        params=query, stream=True,
+        # A followed stream may stay quiet for longer than the client timeout
+        timeout=None if follow else api.timeout,
+    )
+    api._raise_for_status(response)
+    return response, tty
+
+
+def iter_log_frames(response, tty):
+    """Yield (stream_name, payload bytes) from a logs response."""
+    if tty:
+        for chunk in response.iter_content(chunk_size=None):
+            if chunk:
+                yield 'stdout', chunk
+        return
+    raw = response.raw
+    while True:
+        header = raw.read(_HEADER.size)
+        if len(header) < _HEADER.size:
+            return
+        stream_id, length = _HEADER.unpack(header)
+        if not length:
+            continue
+        data = raw.read(length)
+        if not data:
+            return
+        yield STREAM_NAMES.get(stream_id, 'stdout'), data
+
+
+def docker_time(ns):
+    """Format epoch nanoseconds the way the logs API expects `since`/`until`."""
+    return f"{ns // _NS}.{ns % _NS:09d}"
+
+
+def parse_time_arg(value):
+    """Epoch nanoseconds from an RFC 3339 timestamp or a number of epoch seconds."""
+    value = (value or '').strip()
+    if not value:
+        return None
+    try:
+        return int(float(value) * _NS)
+    except ValueError:
+        pass
+    ns = TimestampParser().parse(value if value.endswith('Z') else value + 'Z')
+    if ns is None:
+        raise ValueError(f"Invalid time: {value}")
+    return ns
+
+
+class TimestampParser:
+    """
+    Splits the RFC 3339 prefix the daemon adds with `timestamps=1`.
+
+    Consecutive lines usually share the same second, so the date part is
+    converted once and reused.
+    """
+
+    def __init__(self):
+        self._prefix = None
+        self._epoch = 0
+
+    def parse(self, stamp):
+        """Epoch nanoseconds for '2024-01-02T03:04:05.123456789Z', or None."""
+        if len(stamp) < 20 or stamp[10] != 'T' or stamp[-1] != 'Z':
+            return None
+        prefix = stamp[:19]
+        if prefix != self._prefix:
+            try:
+                self._epoch = calendar.timegm(time.strptime(prefix, '%Y-%m-%dT%H:%M:%S'))
+            except ValueError:
+                return None
+            self._prefix = prefix
+        fraction = stamp[20:-1] if stamp[19] == '.' else ''
+        if fraction and not fraction.isdigit():
+            return None
+        return self._epoch * _NS + int((fraction + '000000000')[:9])
+
+    def split(self, line):
+        """(nanoseconds or None, message) for one timestamped line."""
+        stamp, _, message = line.partition(' ')
+        ns = self.parse(stamp)
+        if ns is None:
+            return None, line
+        return ns, message
+
+
+def format_log_time(ns):
+    """RFC 3339 with nanoseconds, as the daemon writes it."""
+    if ns is None:
+        return None
+    return time.strftime('%Y-%m-%dT%H:%M:%S', time.gmtime(ns // _NS)) + f".{ns % _NS:09d}Z"
+
+
+def encode_log_cursor(ts, skip, **window):
+    """
+    Opaque position in a container's log: just after the first `skip`
+    lines stamped `ts` (or before the last `skip`, for backward paging).
+    Extra keyword arguments (the since/until window) travel with it.
+    """
+    payload = {'ts': ts, 'skip': skip, **{k: v for k, v in window.items() if v is not None}}
+    return base64.urlsafe_b64encode(json.dumps(payload, separators=(',', ':')).encode()).decode().rstrip('=')
+
+
+def decode_log_cursor(cursor):
+    """Inverse of encode_log_cursor(). Raises ValueError."""
+    try:
+        payload = json.loads(base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)))
+        if not isinstance(payload, dict):
+            raise ValueError
+        payload['ts'] = int(payload['ts'])
+        payload['skip'] = int(payload.get('skip', 0))
+        return payload
+    except (binascii.Error, ValueError, KeyError, TypeError):
+        raise ValueError('Invalid cursor')
+
+
+class LogFilter:
+    """
+    grep-style line selection applied before lines are serialized.
+
+    `pattern` is a regular expression compiled once per stream; `invert`
+    keeps non-matching lines instead; `level` keeps lines whose first
+    severity word (ERROR, warn, ...) is at least that severe. `before` and
+    `after` add that many context lines around each match, like grep -B/-A.
+    State is kept across calls, so context spans daemon frame boundaries.
+    """
+
+    def __init__(self, pattern=None, invert=False, level=None, before=0, after=0, ignore_case=False):
+        self.regex = re.compile(pattern, re.IGNORECASE if ignore_case else 0) if pattern else None
+        self.invert = invert
+        self.min_level = LOG_LEVELS[level.lower()] if level else None
+        self.after = after
+        self._before = deque(maxlen=before) if before else None
+        self._after_left = 0
+
+    @classmethod
+    def from_args(cls, args):
+        """Build a filter from request arguments, or None when none are set. Raises ValueError."""
+        pattern = args.get('grep') or None
+        level = (args.get('level') or '').strip().lower() or None
+        if not pattern and not level:
+            return None
+        if level and level not in LOG_LEVELS:
+            raise ValueError(f"Unknown level '{level}'")
+        try:
+            context = int(args.get('C') or 0)
+            before = int(args.get('B') or context)
+            after = int(args.get('A') or context)
+        except ValueError:
+            raise ValueError('A, B and C must be integers')
+        if not (0 <= before <= MAX_CONTEXT_LINES and 0 <= after <= MAX_CONTEXT_LINES):
+            raise ValueError(f"Context must be between 0 and {MAX_CONTEXT_LINES} lines")
+        truthy = ('1', 'true', 'yes')
+        try:
+            return cls(
+                pattern=pattern, level=level, before=before, after=after,
+                invert=(args.get('invert') or '').lower() in truthy,
+                ignore_case=(args.get('ignore_case') or '').lower() in truthy,
+            )
+        except re.error as e:
+            raise ValueError(f"Invalid grep pattern: {e}")
+
+    def reset(self):
+        if self._before is not None:
+            self._before.clear()
+        self._after_left = 0
+
+    def matches(self, line):
+        if self.min_level is not None:
+            found = _LEVEL_RE.search(line)
+            if found is None or LOG_LEVELS[found.group(1).lower()] < self.min_level:
+                return False
+        if self.regex is not None:
+            return (self.regex.search(line) is None) == self.invert
+        return True
+
+    def feed(self, entry):
+        """Entries to emit for one (ts, stream, line) entry, context included."""
+        if self.matches(entry[2]):
+            self._after_left = self.after
+            if self._before:
+                kept = list(self._before)
+                self._before.clear()
+                kept.append(entry)
+                return kept
+            return [entry]
+        if self._after_left:
+            self._after_left -= 1
+            return [entry]
+        if self._before is not None:
+            self._before.append(entry)
+        return []
+
+    def select(self, entries):
+        for entry in entries:
+            yield from self.feed(entry)
+
+
+def iter_log_entry_batches(response, tty):
+    """
+    Yield lists of (ts_ns, stream, message), one list per daemon frame, from
+    a logs response opened with timestamps=1.
+    """
+    splitter = LineSplitter()
+    parser = TimestampParser()
+    for stream, data in iter_log_frames(response, tty):
+        lines = splitter.feed(stream, data)
+        if lines:
+            yield [(ts, stream, message) for ts, message in map(parser.split, lines)]
+    leftovers = [(stream, *parser.split(line)) for stream, line in splitter.flush()]
+    if leftovers:
+        yield [(ts, stream, message) for stream, ts, message in leftovers]
+
+
+def iter_log_entries(response, tty):
+    """Yield (ts_ns, stream, message) from a logs response opened with timestamps=1."""
+    for batch in iter_log_entry_batches(response, tty):
+        yield from batch
+
+
+def read_log_page(api, container_id, limit, direction='forward', since=None, until=None,
+                  after=None, before=None, line_filter=None):
+    """
+    One page of a container's log between `since` and `until` (epoch ns).
+
+    `after`/`before` are (ts, skip) positions from a cursor: the page starts
+    after the first `skip` lines stamped `ts`, or ends before the last
+    `skip` of them. Returns (entries, has_more, first_skip, last_skip) with
+    entries in chronological order. `first_skip` is how many lines stamped
+    like the first entry there are from it to the end of their run, and
+    `last_skip` how many stamped like the last entry there are up to and
+    including it, counting lines outside the page, which a burst of equal
+    timestamps longer than the page has. They are the skip counts for the
+    cursors before and after the page. With a LogFilter, only selected
+    lines count towards the page and cursor positions refer to selected
+    lines.
+
+    Forward pages stop reading as soon as `limit` lines are in (and the run
+    of the last timestamp has been counted). Backward pages scan a widening
+    window before the end point and keep only the newest `limit` lines in a
+    bounded deque, since the daemon applies `tail` before `until` and cannot
+    page backwards by itself. Worker memory stays proportional to `limit`
+    either way.
+    """
+    if direction == 'forward':
+        start, skip_ts, skip = since, None, 0
+        if after is not None:
+            start, skip = after
+            skip_ts = start
+        response, tty = open_container_logs(
+            api, container_id, follow=False, tail='all', timestamps=1,
+            since=docker_time(start) if start else None,
+            until=docker_time(until) if until else None,
+        )
+        entries = []
+        skipped = 0
+        trailing = 0
+        try:
+            source = iter_log_entries(response, tty)
+            if line_filter is not None:
+                source = line_filter.select(source)
+            for entry in source:
+                if skipped < skip and entry[0] == skip_ts:
+                    skipped += 1
+                    continue
+                entries.append(entry)
+                if len(entries) > limit:
+                    break
+            if len(entries) > limit and entries[limit][0] == entries[0][0]:
+                # The page sits inside a burst of one timestamp; count the rest of it
+                trailing = 1 + sum(1 for _ in takewhile(lambda e: e[0] == entries[0][0], source))
+        finally:
+            response.close()
+        has_more = len(entries) > limit
+        entries = entries[:limit]
+        if not entries:
+            return entries, has_more, 0, 0
+        first_ts, last_ts = entries[0][0], entries[-1][0]
+        first_skip = sum(1 for entry in entries if entry[0] == first_ts) + trailing
+        last_skip = sum(1 for entry in entries if entry[0] == last_ts) + (skipped if last_ts == skip_ts else 0)
+        return entries, has_more, first_skip, last_skip
+
+    end, skip_ts, skip = until, None, 0
+    if before is not None:
+        end, skip = before
+        skip_ts = end
+    if end is None:
+        end = time.time_ns()
+    for window in BACKWARD_WINDOWS:
+        start = since
+        if window is not None:
+            start = max(since or 0, end - window * _NS)
+        kept = deque(maxlen=limit + skip + 1)
+        # Lengths of the last two runs of equal timestamps, which may be longer than `kept`
+        run_ts, run_len, previous_len = None, 0, 0
+        response, tty = open_container_logs(
+            api, container_id, follow=False, tail='all', timestamps=1,
+            since=docker_time(start) if start else None,
+            until=docker_time(end),
+        )
+        try:
+            source = iter_log_entries(response, tty)
+            if line_filter is not None:
+                # Each window rescans from its start, so context state starts fresh
+                line_filter.reset()
+                source = line_filter.select(source)
+            for entry in source:
+                kept.append(entry)
+                if run_len and entry[0] == run_ts:
+                    run_len += 1
+                else:
+                    run_ts, run_len, previous_len = entry[0], 1, run_len
+        finally:
+            response.close()
+        dropped = 0
+        while dropped < skip and kept and kept[-1][0] == skip_ts:
+            kept.pop()
+            dropped += 1
+        reached_start = window is None or (since is not None and start <= since)
+        if len(kept) > limit or reached_start:
+            has_more = len(kept) > limit
+            entries = list(kept)[-limit:]
+            if not entries:
+                return entries, has_more, 0, 0
+            first_ts = entries[0][0]
+            first_skip = sum(1 for entry in entries if entry[0] == first_ts) + (dropped if first_ts == skip_ts else 0)
+            last_skip = run_len - dropped if dropped < run_len else previous_len
+            return entries, has_more, first_skip, last_skip
+    return [], False, 0, 0
+
+
+class LineSplitter:
+    """
+    Splits payload chunks into lines per stream.
+
+    A line cut across two chunks is held back until its newline arrives;
+    stdout and stderr keep separate partial buffers.
+    """
+
+    def __init__(self):
+        self._partial = {}
+
+    def feed(self, stream, data):
+        buffered = self._partial.pop(stream, b'') + data
+        *lines, rest = buffered.split(b'\n')
+        if rest:
+            self._partial[stream] = rest
+        return [self._decode(line) for line in lines]
+
+    def flush(self):
+        """Return the (stream, line) pairs still waiting for a newline."""
+        leftovers = [(stream, self._decode(rest)) for stream, rest in self._partial.items()]
+        self._partial.clear()
+        return leftovers
+
+    @staticmethod
+    def _decode(line):
+        return line.decode('utf-8', errors='replace').rstrip('\r')
+
+
+class RateLimiter:
+    """
+    Token bucket allowing `rate` lines per second with bursts of one
+    second's worth, and at least one line (so rates below 1/s still let a
+    line through every 1/rate seconds).
+    """
+
+    def __init__(self, rate):
+        self.rate = rate
+        self.capacity = max(rate, 1)
+        self._tokens = self.capacity
+        self._last = time.monotonic()
+
+    def allow(self):
+        now = time.monotonic()
+        self._tokens = min(self.capacity, self._tokens + (now - self._last) * self.rate)
+        self._last = now
+        if self._tokens >= 1:
+            self._tokens -= 1
+            return True
+        return False
+
+
+_DONE = object()
+
+
+class LogBatcher:
+    """
+    Turns a container's followed log into coalesced SSE frames.
+
+    A reader thread pulls timestamped entry batches (see
+    iter_log_entry_batches) from the daemon; the consumer collects lines
+    and flushes once `max_bytes` are buffered or `max_latency` seconds have
+    passed since the first buffered line. Each flush sends one
+    `{"stream": ..., "lines": [...]}` event per run of consecutive lines
+    from the same stream, so stdout and stderr stay apart without losing
+    their relative order. With `rate` set, lines beyond that many per
+    second are dropped and the next event carries the count as `dropped`.
+    A LogFilter, if given, runs first so only selected lines are batched.
+
+    Every flush ends with a `cursor` (also sent as the SSE event id) for
+    the last line delivered. `resume`, a (ts, skip) pair decoded from such
+    a cursor, drops the lines a reconnecting client has already seen.
+
+    The hand-off queue is bounded, so a slow browser slows the reader, and
+    through it the daemon, instead of growing memory. After `keepalive`
+    seconds without a frame an SSE comment is sent, so a client that has
+    gone away from a quiet container is noticed and the stream torn down.
+    """
+
+    def __init__(self, batches, max_latency=0.05, max_bytes=64 * 1024, rate=None,
+                 resume=None, line_filter=None, on_close=None, keepalive=15):
+        self.batches = batches
+        self.line_filter = line_filter
+        self.max_latency = max_latency
+        self.max_bytes = max_bytes
+        self.limiter = RateLimiter(rate) if rate else None
+        self.on_close = on_close
+        self.keepalive = keepalive
+        self.dropped = 0
+        self._resume_ts, self._resume_skip = resume or (None, 0)
+        self._last_ts = None
+        self._same_ts = 0
+        self._queue = queue.Queue(maxsize=256)
+        self._error = None
+        self._stopping = False
+
+    def _read(self):
+        try:
+            for entries in self.batches:
+                if self._stopping:
+                    return
+                self._put(entries)
+        except Exception as e:
+            if not self._stopping:
+                self._error = e
+        finally:
+            self._put(_DONE)
+
+    def _put(self, item):
+        # Give up once the consumer has gone so the reader thread can exit
+        while not self._stopping:
+            try:
+                self._queue.put(item, timeout=0.5)
+                return
+            except queue.Full:
+                continue
+
+    def _accept(self, ts):
+        """Track the cursor position and skip lines already seen before a reconnect."""
+        if self._resume_skip and ts == self._resume_ts:
+            self._resume_skip -= 1
+            return False
+        if ts is not None:
+            if ts == self._last_ts:
+                self._same_ts += 1
+            else:
+                self._last_ts, self._same_ts = ts, 1
+        return True
+
+    def __iter__(self):
+        reader = threading.Thread(target=self._read, name='log-reader', daemon=True)
+        reader.start()
+        batch, size, deadline = [], 0, None
+        next_keepalive = time.monotonic() + self.keepalive
+        try:
+            while True:
+                wake = next_keepalive if deadline is None else min(deadline, next_keepalive)
+                timeout = max(0.0, wake - time.monotonic())
+                try:
+                    item = self._queue.get(timeout=timeout)
+                except queue.Empty:
+                    item = None
+
+                if item is not None and item is not _DONE:
+                    selected = [entry for entry in item if self._accept(entry[0])]
+                    if self.line_filter is not None:
+                        selected = list(self.line_filter.select(selected))
+                    for _, stream, line in selected:
+                        if self.limiter and not self.limiter.allow():
+                            self.dropped += 1
+                            continue
+                        batch.append((stream, line))
+                        size += len(line) + 1
+                    if (batch or self.dropped) and deadline is None:
+                        deadline = time.monotonic() + self.max_latency
+
+                # A steady trickle of small batches never lets get() time out, so check the deadline too
+                flush_due = (item is None or item is _DONE or size >= self.max_bytes
+                             or (deadline is not None and time.monotonic() >= deadline))
+                if flush_due and (batch or self.dropped):
+                    if logger.isEnabledFor(logging.DEBUG):
+                        kind = 'dropped' if self.dropped else 'flush'
+                        if flush_sampler.allow(kind):
+                            logger.debug(f"log batch: {len(batch)} lines, {size} bytes", extra={
+                                'dropped': self.dropped, 'sampled_out': flush_sampler.suppressed(kind),
+                            })
+                    yield self._frame(batch)
+                    batch, size, deadline = [], 0, None
+                    next_keepalive = time.monotonic() + self.keepalive
+                elif item is None:
+                    deadline = None
+                if item is _DONE:
+                    if self._error is not None:
+                        raise self._error
+                    return
+                if time.monotonic() >= next_keepalive:
+                    yield ": keepalive\n\n"
+                    next_keepalive = time.monotonic() + self.keepalive
+        finally:
+            self._stopping = True
+            if self.on_close:
+                self.on_close()
+
+    def _frame(self, batch):
+        events = []
+        for stream, line in batch:
+            if events and events[-1]['stream'] == stream:
+                events[-1]['lines'].append(line)
+            else:
+                events.append({'stream': stream, 'lines': [line]})
+        if not events:
+            events.append({'stream': 'stdout', 'lines': []})
+        if self.dropped:
+            events[-1]['dropped'] = self.dropped
+            self.dropped = 0
+        cursor = None
+        if self._last_ts is not None:
+            cursor = events[-1]['cursor'] = encode_log_cursor(self._last_ts, self._same_ts)
+        frames = [f"data: {json.dumps(event)}\n\n" for event in events]
+        if cursor:
+            frames[-1] = f"id: {cursor}\n" + frames[-1]
+        return ''.join(frames)
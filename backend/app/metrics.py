@@ -0,0 +1,229 @@
+# backend/app/metrics.py
+
+import re
+import threading
+from bisect import bisect_left
+from functools import lru_cache
+from urllib.parse import urlsplit
+
+# Latency buckets in seconds, from a local socket round trip to a slow pull
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+
+def _format_labels(names, values, extra=()):
+    pairs = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    pairs.extend(f'{n}="{v}"' for n, v in extra)
+    return '{' + ','.join(pairs) + '}' if pairs else ''
+
+
+def _format_value(value):
+    if value == float('inf'):
+        return '+Inf'
+    return repr(float(value)) if isinstance(value, float) and not value.is_integer() else str(int(value))
+
+
+class _Metric:
+    kind = None
+
+    def __init__(self, name, documentation, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def header(self):
+        return [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+
+
+class Counter(_Metric):
+    kind = 'counter'
+
+    def inc(self, *labels, amount=1):
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+    def value(self, *labels):
+        return self._values.get(labels, 0)
+
+    def render(self):
+        with self._lock:
+            items = sorted(self._values.items())
+        return self.header() + [
+            f"{self.name}{_format_labels(self.labelnames, labels)} {_format_value(v)}" for labels, v in items
+        ]
+
+
+class Gauge(Counter):
+    kind = 'gauge'
+
+    def dec(self, *labels, amount=1):
+        self.inc(*labels, amount=-amount)
+
+    def set(self, *labels, value):
+        with self._lock:
+            self._values[labels] = value
+
+
+class CallbackGauge(_Metric):
+    """Gauge whose unlabelled value is read from `func()` at scrape time."""
+
+    kind = 'gauge'
+
+    def __init__(self, name, documentation, func):
+        super().__init__(name, documentation)
+        self.func = func
+
+    def render(self):
+        return self.header() + [f"{self.name} {_format_value(self.func())}"]
+
+
+class Histogram(_Metric):
+    """
+    Cumulative histogram with fixed buckets.
+
+    Each label set holds one count per bucket plus sum and count; observe()
+    is a bisect and a few additions under the metric's lock.
+    """
+
+    kind = 'histogram'
+
+    def __init__(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value, *labels):
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._values.get(labels)
+            if series is None:
+                series = self._values[labels] = [[0] * (len(self.buckets) + 1), 0.0]
+            series[0][index] += 1
+            series[1] += value
+
+    def count(self, *labels):
+        series = self._values.get(labels)
+        return sum(series[0]) if series else 0
+
+    def render(self):
+        with self._lock:
+            items = sorted((labels, (list(s[0]), s[1])) for labels, s in self._values.items())
+        lines = self.header()
+        for labels, (counts, total) in items:
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float('inf'),), counts):
+                cumulative += count
+                le = (('le', _format_value(bound)),)
+                lines.append(f"{self.name}_bucket{_format_labels(self.labelnames, labels, le)} {cumulative}")
+            label_text = _format_labels(self.labelnames, labels)
+            lines.append(f"{self.name}_sum{label_text} {_format_value(total)}")
+            lines.append(f"{self.name}_count{label_text} {cumulative}")
+        return lines
+
+
+class Registry:
+    def __init__(self):
+        self._metrics = []
+
+    def register(self, metric):
+        self._metrics.append(metric)
+        return metric
+
+    def counter(self, name, documentation, labelnames=()):
+        return self.register(Counter(name, documentation, labelnames))
+
+    def gauge(self, name, documentation, labelnames=()):
+        return self.register(Gauge(name, documentation, labelnames))
+
+    def histogram(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+        return self.register(Histogram(name, documentation, labelnames, buckets))
+
+    def callback_gauge(self, name, documentation, func):
+        return self.register(CallbackGauge(name, documentation, func))
+
+    def render(self):
+        """All metrics in the Prometheus text exposition format (version 0.0.4)."""
+        lines = []
+        for metric in self._metrics:
+            lines.extend(metric.render())
+        return '\n'.join(lines) + '\n'
+
+
+registry = Registry()
+
+docker_call_seconds = registry.histogram(
+    'docker_api_request_duration_seconds',
+    'Docker Engine API latency until response headers, by host and operation.',
+    ('host', 'operation'),
+)
+docker_call_errors = registry.counter(
+    'docker_api_request_errors_total',
+    'Docker Engine API calls that raised or returned an HTTP error, by host, operation and reason.',
+    ('host', 'operation', 'reason'),
+)
+docker_calls_in_flight = registry.gauge(
+    'docker_api_requests_in_flight',
+    'Docker Engine API calls waiting for response headers, by host.',
+    ('host',),
+)
+docker_tls_handshakes = registry.counter(
+    'docker_tls_handshakes_total',
+    'TLS handshakes with Docker hosts, by host and whether a previous session was resumed.',
+    ('host', 'resumed'),
+)
+sse_streams_active = registry.gauge(
+    'sse_streams_active',
+    'Server-sent event streams currently open, by endpoint.',
+    ('endpoint',),
+)
+sse_streams_total = registry.counter(
+    'sse_streams_total',
+    'Server-sent event streams opened, by endpoint.',
+    ('endpoint',),
+)
+exec_sessions_active = registry.gauge(
+    'exec_sessions_active',
+    'Interactive exec sessions bridged over WebSocket.',
+)
+
+
+_API_VERSION_PREFIX = re.compile(r'^/v\d+\.\d+')
+# Second path segments that are endpoint names rather than object IDs
+_COLLECTION_ENDPOINTS = {'json', 'create', 'prune', 'load', 'get', 'search', 'df'}
+# Last path segments that name an action on one object
+_OBJECT_ACTIONS = {
+    'json', 'stats', 'logs', 'start', 'stop', 'restart', 'kill', 'pause', 'unpause', 'wait',
+    'attach', 'exec', 'archive', 'top', 'changes', 'export', 'rename', 'resize', 'update',
+    'history', 'push', 'tag', 'connect', 'disconnect',
+}
+
+
+@lru_cache(maxsize=4096)
+def docker_operation(method, url):
+    """
+    Low-cardinality operation label for a Docker API request URL, e.g.
+    'GET /containers/{id}/stats' for GET .../v1.43/containers/3f2a.../stats?stream=1.
+    Image names may contain slashes, so everything between the resource and
+    a trailing action collapses into one {id}.
+    """
+    path = _API_VERSION_PREFIX.sub('', urlsplit(url).path)
+    parts = [p for p in path.split('/') if p]
+    if len(parts) < 2 or parts[1] in _COLLECTION_ENDPOINTS:
+        return f"{method} /{'/'.join(parts[:2])}"
+    if len(parts) > 2 and parts[-1] in _OBJECT_ACTIONS:
+        return f"{method} /{parts[0]}/{{id}}/{parts[-1]}"
+    return f"{method} /{parts[0]}/{{id}}"
+
+
+def track_stream(endpoint, frames):
+    """Yield from `frames`, counting the stream as active for `endpoint` until it ends or is closed."""
+    sse_streams_total.inc(endpoint)
+    sse_streams_active.inc(endpoint)
+    try:
+        yield from frames
+    finally:
+        sse_streams_active.dec(endpoint)
@@ -0,0 +1,58 @@
+# backend/app/paging.py
+
+import base64
+import binascii
+
+# Hard upper bound for a single page, whatever the client asks for
+MAX_PAGE_SIZE = 1000
+
+
+def encode_cursor(offset):
+    """Opaque cursor for the row at `offset`."""
+    return base64.urlsafe_b64encode(f"o:{offset}".encode()).decode().rstrip('=')
+
+
+def decode_cursor(cursor):
+    """Turn a cursor from encode_cursor() back into an offset. Raises ValueError."""
+    if not cursor:
+        return 0
+    try:
+        raw = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)).decode()
+    except (binascii.Error, UnicodeDecodeError):
+        raise ValueError('Invalid cursor')
+    if not raw.startswith('o:') or not raw[2:].isdigit():
+        raise ValueError('Invalid cursor')
+    return int(raw[2:])
+
+
+def parse_limit(value, default=None):
+    """Validate a `limit` query argument. Raises ValueError."""
+    if value in (None, ''):
+        return default
+    limit = int(value)
+    if limit < 1:
+        raise ValueError('limit must be positive')
+    return min(limit, MAX_PAGE_SIZE)
+
+
+def parse_sort(value, allowed):
+    """
+    Split a `sort` argument such as `-created` into (field, descending).
+    Returns (None, False) when unset. Raises ValueError for unknown fields.
+    """
+    if not value:
+        return None, False
+    descending = value.startswith('-')
+    field = value.lstrip('-+')
+    if field not in allowed:
+        raise ValueError(f"Cannot sort by '{field}'. Allowed: {', '.join(sorted(allowed))}")
+    return field, descending
+
+
+def paginate(rows, limit, offset):
+    """Slice one page out of `rows`; returns (page, next_cursor or None)."""
+    if limit is None:
+        return rows[offset:], None
+    page = rows[offset:offset + limit]
+    next_cursor = encode_cursor(offset + limit) if offset + limit < len(rows) else None
+    return page, next_cursor
@@ -0,0 +1,180 @@
+# backend/app/pulls.py
+
+import logging
+import threading
+import time
+from collections import OrderedDict
+
+from .stats import sse_frame
+from .telemetry import LogSampler
+
+logger = logging.getLogger(__name__)
+# Progress chunks are logged by status, one in LOG_SAMPLE_EVERY
+chunk_sampler = LogSampler()
+
+
+class PullJob:
+    """
+    One upstream `docker pull` whose progress is shared by every viewer.
+
+    Progress chunks are folded into per-layer state: the daemon reports
+    cumulative current/total for each layer, so the latest chunk of a layer
+    is its aggregate. Every change bumps a version counter; a viewer asks
+    for everything newer than the last version it saw, so a late joiner
+    (starting from 0) first receives the current state of all layers and
+    then only what changed.
+    """
+
+    def __init__(self, broker, key, repository, tag):
+        self.broker = broker
+        self.key = key
+        self.repository = repository
+        self.tag = tag
+        self.started = time.time()
+        self.version = 0
+        self.result = None
+        self._layers = OrderedDict()
+        self._messages = []
+        self._cond = threading.Condition()
+
+    @property
+    def done(self):
+        return self.result is not None
+
+    def _apply(self, chunk):
+        with self._cond:
+            self.version += 1
+            layer_id = chunk.get('id')
+            if layer_id:
+                self._layers[layer_id] = (self.version, chunk)
+            else:
+                self._messages.append((self.version, chunk))
+            self._cond.notify_all()
+
+    def _finish(self, result):
+        with self._cond:
+            self.version += 1
+            self.result = result
+            self._cond.notify_all()
+
+    def wait(self, timeout=None):
+        """Block until the pull finishes; returns its last chunk, or None on timeout."""
+        with self._cond:
+            self._cond.wait_for(lambda: self.result is not None, timeout=timeout)
+            return self.result
+
+    def changes(self, since):
+        """Chunks (status messages first, then layers) newer than version `since`."""
+        chunks = [chunk for version, chunk in self._messages if version > since]
+        chunks.extend(chunk for version, chunk in self._layers.values() if version > since)
+        return chunks
+
+    def updates(self, min_interval, keepalive=15):
+        """
+        (chunks, result) pairs for one viewer, at most one every
+        `min_interval` seconds. `chunks` holds the changed layers and status
+        messages; `result` stays None until the last pair. A pair with
+        neither comes every `keepalive` seconds without progress.
+        """
+        seen = 0
+        while True:
+            with self._cond:
+                if self.version == seen:
+                    self._cond.wait(timeout=keepalive)
+                chunks = self.changes(seen)
+                seen = self.version
+                result = self.result
+            yield chunks, result
+            if result is not None:
+                return
+            time.sleep(min_interval)
+
+    def frames(self, min_interval, keepalive=15):
+        """
+        SSE text for one viewer (see updates()). Each write holds one event
+        per changed layer or status message, so the frontend sees ordinary
+        docker pull chunks, and the last one is {'status': 'completed'} or
+        {'error': ...}.
+        """
+        for chunks, result in self.updates(min_interval, keepalive):
+            if result is not None:
+                chunks.append(result)
+            yield ''.join(sse_frame(chunk) for chunk in chunks) if chunks else ": keepalive\n\n"
+
+    def run(self, config):
+        client = None
+        count = 0
+        try:
+            client = self.broker.client_factory(config)
+            logger.info(f"pull {self.repository}:{self.tag} started")
+            for chunk in client.api.pull(self.repository, tag=self.tag, stream=True, decode=True):
+                count += 1
+                if chunk.get('error'):
+                    self._finish({'error': f"Pull failed: {chunk['error']}"})
+                    break
+                self._apply(chunk)
+                if logger.isEnabledFor(logging.DEBUG):
+                    status = chunk.get('status', '')
+                    if chunk_sampler.allow(status):
+                        logger.debug(
+                            f"pull {self.repository}:{self.tag}: {status}",
+                            extra={'layer': chunk.get('id'), 'sampled_out': chunk_sampler.suppressed(status)},
+                        )
+            else:
+                self._finish({'status': 'completed'})
+            logger.info(
+                f"pull {self.repository}:{self.tag} finished after {count} chunks "
+                f"in {time.time() - self.started:.1f}s"
+            )
+        except Exception as e:
+            logger.exception(f"pull {self.repository}:{self.tag} failed")
+            self._finish({'error': f'Pull failed: {str(e)}'})
+        finally:
+            self.broker._drop(self)
+            if client:
+                try:
+                    client.close()
+                except Exception:
+                    pass
+
+
+class PullBroker:
+    """
+    Single-flight image pulls per (host, repository, tag).
+
+    The first request starts the pull in a background thread; concurrent
+    requests for the same image on the same host attach to it. The pull
+    runs to completion even if every viewer leaves, and the job is
+    forgotten once it finishes, so the next request pulls again.
+    """
+
+    def __init__(self, client_factory, min_interval=0.2):
+        self.client_factory = client_factory
+        self.min_interval = min_interval
+        self._jobs = {}
+        self._lock = threading.Lock()
+
+    def join(self, key, config, repository, tag):
+        """Return the running job for this image, starting one if needed."""
+        job_key = (key, repository, tag)
+        with self._lock:
+            job = self._jobs.get(job_key)
+            start = job is None
+            if start:
+                job = self._jobs[job_key] = PullJob(self, job_key, repository, tag)
+        if start:
+            threading.Thread(
+                target=job.run, args=(config,),
+                name=f"pull-{repository}:{tag}", daemon=True
+            ).start()
+        else:
+            logger.debug(f"pull {repository}:{tag}: joined running pull")
+        return job
+
+    def active_pulls(self):
+        return len(self._jobs)
+
+    def _drop(self, job):
+        with self._lock:
+            if self._jobs.get(job.key) is job:
+                del self._jobs[job.key]
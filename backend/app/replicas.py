@@ -0,0 +1,158 @@
+# backend/app/replicas.py
+
+import logging
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, as_completed, wait
+
+import docker
+
+logger = logging.getLogger(__name__)
+
+# Daemon messages for a host port another process or container already holds
+_PORT_CONFLICTS = ('port is already allocated', 'address already in use')
+_PORT_ATTEMPTS = 3
+
+
+def parse_host_port(value, replicas):
+    """
+    A port item's hostPort as None (the daemon picks a free port), a fixed
+    port, or a (first, last) range that replicas take ports from in order.
+    """
+    if value in (None, ''):
+        return None
+    text = str(value).strip()
+    first, sep, last = text.partition('-')
+    try:
+        first, last = int(first), int(last) if sep else int(first)
+    except ValueError:
+        raise ValueError(f"Invalid host port '{text}'; use a number, a range like 8000-8049, or leave it empty")
+    if not 0 < first <= last <= 65535:
+        raise ValueError(f"Invalid host port range '{text}'")
+    if not sep:
+        if replicas > 1:
+            raise ValueError(
+                f"Host port {first} cannot be shared by {replicas} replicas; "
+                f"use a range like {first}-{first + replicas - 1} or leave it empty"
+            )
+        return first
+    if last - first + 1 < replicas:
+        raise ValueError(f"Host port range {text} is smaller than {replicas} replicas")
+    return (first, last)
+
+
+def replica_name(template, n, replicas):
+    """`{n}` in the template becomes the 1-based replica number; otherwise `-n` is appended."""
+    if not template:
+        return None
+    if '{n}' in template:
+        return template.replace('{n}', str(n))
+    return f"{template}-{n}" if replicas > 1 else template
+
+
+class PortAllocator:
+    """Hands out host ports from ranges, skipping ports already published on the host."""
+
+    def __init__(self, used=()):
+        self._used = set(used)
+        self._lock = threading.Lock()
+
+    def assign(self, port_specs):
+        """Docker-py `ports` mapping for one replica."""
+        ports = {}
+        with self._lock:
+            for container_port, spec in port_specs.items():
+                if not isinstance(spec, tuple):
+                    ports[container_port] = spec
+                    continue
+                first, last = spec
+                port = next((p for p in range(first, last + 1) if p not in self._used), None)
+                if port is None:
+                    raise ValueError(f"No free host port left in {first}-{last}")
+                self._used.add(port)
+                ports[container_port] = port
+        return ports
+
+
+def _launch(client, create_args, port_specs, allocator, n, name):
+    """Create and start one replica; a host-port conflict is retried with the next port in its range."""
+    started = time.monotonic()
+    result = {'replica': n, 'name': name, 'ok': False}
+    retry_ports = any(isinstance(spec, tuple) for spec in port_specs.values())
+    for attempt in range(1, _PORT_ATTEMPTS + 1):
+        container = None
+        try:
+            args = dict(create_args, name=name)
+            if port_specs:
+                args['ports'] = allocator.assign(port_specs)
+            container = client.containers.create(**args)
+            container.start()
+            result.update(ok=True, id=container.id, name=container.name, ports=args.get('ports') or {})
+            break
+        except Exception as e:
+            message = e.explanation if isinstance(e, docker.errors.APIError) and e.explanation else str(e)
+            result['error'] = message
+            if container is not None:
+                try:
+                    container.remove(force=True)
+                except Exception:
+                    logger.warning(f"replica {name or n}: could not remove failed container {container.short_id}")
+            if not (retry_ports and any(c in message for c in _PORT_CONFLICTS)):
+                break
+            logger.info(f"replica {name or n}: host port taken, retrying ({attempt}/{_PORT_ATTEMPTS})")
+    if result['ok']:
+        result.pop('error', None)
+    result['elapsed_ms'] = round((time.monotonic() - started) * 1000, 1)
+    return result
+
+
+def _remove(client, result):
+    try:
+        client.api.remove_container(result['id'], force=True)
+        return {'stage': 'rollback', 'id': result['id'], 'name': result['name'], 'ok': True}
+    except Exception as e:
+        return {'stage': 'rollback', 'id': result['id'], 'name': result['name'], 'ok': False, 'error': str(e)}
+
+
+def create_replicas(executor, client, create_args, port_specs, replicas, name_template, concurrency,
+                    max_failures, allocator):
+    """
+    Create and start `replicas` copies of one container spec, yielding one
+    result per replica as it finishes.
+
+    At most `concurrency` replicas are in flight on the shared `executor`.
+    Once more than `max_failures` replicas have failed, no new replica is
+    started; after the in-flight ones finish, every replica created so far
+    is removed again and a `rollback` result is yielded for each.
+    """
+    remaining = iter(range(1, replicas + 1))
+    pending = set()
+    created = []
+    failures = 0
+
+    def fill():
+        while len(pending) < concurrency and failures <= max_failures:
+            n = next(remaining, None)
+            if n is None:
+                return
+            name = replica_name(name_template, n, replicas)
+            pending.add(executor.submit(_launch, client, create_args, port_specs, allocator, n, name))
+
+    fill()
+    while pending:
+        done, _ = wait(pending, return_when=FIRST_COMPLETED)
+        for future in done:
+            pending.discard(future)
+            result = future.result()
+            if result['ok']:
+                created.append(result)
+            else:
+                failures += 1
+            yield result
+        fill()
+
+    if failures > max_failures and created:
+        logger.warning(f"replicas: {failures} failures (max {max_failures}); removing {len(created)} replicas")
+        removals = [executor.submit(_remove, client, result) for result in created]
+        for future in as_completed(removals):
+            yield future.result()
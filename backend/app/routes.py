@@ -5,27 +5,185 @@ import logging
 import docker
 import requests
 from flask import Blueprint, jsonify, request, Response, session
-import json, uuid, shutil, time
+from flask_sock import Sock
+import hashlib
+import json, shutil, time
+import math
+import mimetypes
+import posixpath
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from urllib.parse import quote
+
+from .archive import (
+    archive_root, iter_archive, iter_body, iter_file, list_directory, open_archive, parse_range, stat_path,
+    tar_single_file,
+)
+from .bulk import BULK_ACTIONS, run_bulk
+from .cache import TTLCache
+from .docker_pool import DockerClientPool
+from .exec_bridge import ExecBridge
+from .fleet import HOST_NAME, FanOut, FleetRegistry, write_tls_material
+from .history import HistorySampler, StatsHistory
+from .hubcache import DOCKER_HUB_API_URL, HubMetadataCache
+from .inventory import InventoryRegistry, list_raw
+from .logstream import (
+    LogBatcher, LogFilter, decode_log_cursor, docker_time, encode_log_cursor, format_log_time,
+    iter_log_entry_batches, open_container_logs, parse_time_arg, read_log_page,
+)
+from .metrics import registry as metrics_registry, track_stream
+from .paging import decode_cursor, paginate, parse_limit, parse_sort
+from .pulls import PullBroker
+from .replicas import PortAllocator, create_replicas, parse_host_port
+from .stats import StatsBroker, StatsTable, sse_frame, stats_table_row
+from .tls_contexts import ContextTLSConfig, TLSContextCache
 
 main = Blueprint('main', __name__)
+# WebSocket routes, registered on the blueprint
+sock = Sock()
 
-# Module logger
+# Module logger; handlers and level are set up by telemetry.configure_logging()
 logger = logging.getLogger(__name__)
-logger.setLevel(logging.DEBUG)
-if not logger.handlers:
-    handler = logging.StreamHandler()
-    formatter = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
-    handler.setFormatter(formatter)
-    logger.addHandler(handler)
 
 # Directory to store temporary certs
 temp_certs_dir = os.path.join(os.getcwd(), 'temp_certs')
 os.makedirs(temp_certs_dir, exist_ok=True)
 
+# Files kept across restarts (Hub metadata cache, fleet registry)
+data_dir = os.environ.get('DATA_DIR', os.path.join(os.getcwd(), 'data'))
+
+# Parsed client SSLContexts by certificate fingerprint, shared by every
+# session and fleet host that uses the same credentials
+tls_contexts = TLSContextCache(max_entries=int(os.environ.get('TLS_CONTEXT_CACHE_SIZE', 256)))
+
+# Warm Docker clients shared by all requests, keyed by connection details
+docker_pool = DockerClientPool(
+    max_clients=int(os.environ.get('DOCKER_POOL_MAX_CLIENTS', 64)),
+    idle_ttl=float(os.environ.get('DOCKER_POOL_IDLE_TTL', 300)),
+    max_pool_size=int(os.environ.get('DOCKER_POOL_MAX_CONNECTIONS', 10)),
+)
+
+# Node summaries are served from cache and refreshed in the background once stale
+node_info_cache = TTLCache(
+    ttl=float(os.environ.get('NODE_INFO_TTL', 5)),
+    stale_ttl=float(os.environ.get('NODE_INFO_STALE_TTL', 60)),
+)
+node_info_executor = ThreadPoolExecutor(max_workers=int(os.environ.get('NODE_INFO_WORKERS', 16)))
+host_agent_session = requests.Session()
+
+# Event-fed in-memory copy of each host's objects, read by the list endpoints
+inventory_enabled = os.environ.get('DOCKER_INVENTORY', '1') != '0'
+host_inventories = InventoryRegistry(
+    client_factory=lambda config: get_docker_client(config=config),
+    reconcile_interval=float(os.environ.get('INVENTORY_RECONCILE_INTERVAL', 60)),
+    idle_timeout=float(os.environ.get('INVENTORY_IDLE_TIMEOUT', 600)),
+)
+
+# One upstream stats stream per (host, container), shared by all viewers
+stats_broker = StatsBroker(client_factory=lambda config: get_docker_client(config=config))
+
+# Bounded metric history per container, fed by the stats streams and, for running
+# containers nobody is streaming, by a background sampler (0 disables it)
+stats_history = StatsHistory(max_containers=int(os.environ.get('STATS_HISTORY_MAX_CONTAINERS', 1000)))
+stats_broker.listeners.append(stats_history.record)
+history_sampler = HistorySampler(
+    host_inventories, stats_history.record, stats_broker.has_stream,
+    interval=float(os.environ.get('STATS_HISTORY_SAMPLE_INTERVAL', 10)),
+    workers=int(os.environ.get('STATS_HISTORY_SAMPLE_WORKERS', 8)),
+)
+if inventory_enabled and history_sampler.interval > 0:
+    history_sampler.start()
+
+# Docker Hub repository metadata: memory LRU, then files under HUB_CACHE_DIR, then the Hub API
+hub_metadata = HubMetadataCache(
+    base_url=os.environ.get('DOCKER_HUB_API_URL', DOCKER_HUB_API_URL),
+    cache_dir=os.environ.get('HUB_CACHE_DIR', os.path.join(data_dir, 'hub_cache')),
+    ttl=float(os.environ.get('HUB_CACHE_TTL', 3600)),
+    stale_ttl=float(os.environ.get('HUB_CACHE_STALE_TTL', 86400)),
+    negative_ttl=float(os.environ.get('HUB_CACHE_NEGATIVE_TTL', 300)),
+)
+
+# Image inspect documents by (host, content ID), LRU-bounded, and the
+# short-lived reference -> ID resolution in front of them. The ID fixes the
+# content, but tags and other attributes in the document are per host.
+image_inspect_cache = TTLCache(ttl=float('inf'), max_entries=int(os.environ.get('IMAGE_INSPECT_CACHE_SIZE', 512)))
+image_refs = TTLCache(ttl=float(os.environ.get('IMAGE_REF_TTL', 5)))
+
+# Scrape-time gauges for the shared upstreams; Docker call metrics are recorded by the pool
+metrics_registry.callback_gauge('docker_pool_clients', 'Warm Docker clients in the pool.', lambda: len(docker_pool))
+metrics_registry.callback_gauge(
+    'docker_tls_contexts', 'Client TLS contexts cached by certificate fingerprint.', lambda: len(tls_contexts)
+)
+metrics_registry.callback_gauge(
+    'stats_upstream_streams', 'Upstream container stats streams shared by viewers.', lambda: stats_broker.active_streams()
+)
+
+# Image pulls shared per (host, repository, tag); progress frames at most every PULL_FRAME_INTERVAL seconds
+image_pulls = PullBroker(
+    client_factory=lambda config: get_docker_client(config=config),
+    min_interval=float(os.environ.get('PULL_FRAME_INTERVAL', 0.2)),
+)
+metrics_registry.callback_gauge('image_pulls_active', 'Shared image pulls in progress.', lambda: image_pulls.active_pulls())
+
+# Bulk container actions share one pool; each request keeps at most its `concurrency` operations in it
+bulk_executor = ThreadPoolExecutor(max_workers=int(os.environ.get('BULK_MAX_WORKERS', 64)))
+BULK_DEFAULT_CONCURRENCY = int(os.environ.get('BULK_DEFAULT_CONCURRENCY', 8))
+BULK_MAX_CONCURRENCY = int(os.environ.get('BULK_MAX_CONCURRENCY', 32))
+BULK_MAX_ITEMS = int(os.environ.get('BULK_MAX_ITEMS', 1000))
+REPLICAS_MAX = int(os.environ.get('REPLICAS_MAX', 200))
+
+# Named hosts shared by all users, queried concurrently by the /api/fleet endpoints
+fleet_registry = FleetRegistry(
+    path=os.environ.get('FLEET_REGISTRY_FILE', os.path.join(data_dir, 'fleet_hosts.json')),
+    certs_dir=temp_certs_dir,
+)
+fleet_fan_out = FanOut(
+    ThreadPoolExecutor(max_workers=int(os.environ.get('FLEET_MAX_WORKERS', 64))),
+    cooldown=float(os.environ.get('FLEET_HOST_COOLDOWN', 30)),
+)
+FLEET_HOST_TIMEOUT = float(os.environ.get('FLEET_HOST_TIMEOUT', 5))
+metrics_registry.callback_gauge('fleet_hosts', 'Docker hosts in the fleet registry.', lambda: len(fleet_registry))
+
+
+def docker_pool_key(config):
+    """
+    Identify a pooled client by the connection fields of a docker_config.
+    Configs with the same certificates share one client per host.
+    """
+    return (config.get('base_url'), config.get('mode'), config.get('tls_fingerprint') or config.get('session_id'))
+
+
+def tls_context_for(config):
+    """
+    SSLContext for an https docker_config, from memory by its certificate
+    fingerprint. The session's TLS files are only read when this worker has
+    not seen the bundle yet (after a restart, or in another worker).
+    """
+    context = tls_contexts.get(config.get('tls_fingerprint'))
+    if context is not None:
+        return context
+
+    session_id = config.get('session_id')
+    if not session_id:
+        raise Exception("Session is missing required TLS information.")
+
+    session_cert_dir = os.path.join(temp_certs_dir, session_id)
+    paths = [os.path.join(session_cert_dir, name) for name in ("ca.pem", "cert.pem", "key.pem")]
+    if not all(os.path.exists(p) for p in paths):
+        raise Exception("Certificate files not found for this session. Please reconnect.")
+
+    pems = []
+    for path in paths:
+        with open(path) as f:
+            pems.append(f.read())
+    _, context = tls_contexts.put(*pems)
+    logger.info(f"Loaded TLS context for session {session_id[:8]} from disk")
+    return context
+
 
 def get_docker_client(config=None):
     """
-    Create a Docker client based on a passed-in config or the current session.
+    Lease a pooled Docker client for a passed-in config or the current session.
     """
     logger.debug("get_docker_client() called")
     if config is None:
@@ -39,94 +197,114 @@ def get_docker_client(config=None):
         logger.error('get_docker_client: base_url missing in config')
         raise Exception('Connection details are incomplete in session.')
 
-    tls_config = None
-    if config.get('mode') == 'https':
-        session_id = config.get('session_id')
-        if not session_id:
-            raise Exception("Session is missing required TLS information.")
+    def client_kwargs():
+        tls_config = None
+        if config.get('mode') == 'https':
+            tls_config = ContextTLSConfig(tls_context_for(config), pool_maxsize=docker_pool.max_pool_size)
 
-        session_cert_dir = os.path.join(temp_certs_dir, session_id)
-        ca_path = os.path.join(session_cert_dir, "ca.pem")
-        cert_path = os.path.join(session_cert_dir, "cert.pem")
-        key_path = os.path.join(session_cert_dir, "key.pem")
+        logger.info(f"Creating DockerClient base_url={base_url}, tls={'on' if tls_config else 'off'}")
+        return {'base_url': base_url, 'tls': tls_config, 'timeout': 10}
 
-        if not all(os.path.exists(p) for p in [ca_path, cert_path, key_path]):
-            raise Exception("Certificate files not found for this session. Please reconnect.")
+    # close() on the returned client hands it back to the pool
+    return docker_pool.acquire(docker_pool_key(config), client_kwargs)
 
-        tls_config = docker.tls.TLSConfig(
-            client_cert=(cert_path, key_path),
-            ca_cert=ca_path,
-            verify=True
-        )
-
-    logger.info(f"Creating DockerClient base_url={base_url}, tls={'on' if tls_config else 'off'}")
-    return docker.DockerClient(
-        base_url=base_url,
-        tls=tls_config,
-        timeout=10
-    )
 
+def list_host_objects(kind, config=None):
+    """
+    Raw list rows ('containers', 'images', 'networks' or 'volumes') for the
+    given or the session's host, answered from the host inventory when it
+    is enabled.
+    """
+    if config is None:
+        if 'docker_config' not in session:
+            raise Exception('Not connected to any Docker host. Please connect first.')
+        config = dict(session['docker_config'])
+    if inventory_enabled:
+        return host_inventories.get(docker_pool_key(config), config).rows(kind)
 
-def get_node_info():
-    client = None
+    client = get_docker_client(config=config)
     try:
-        logger.info('Fetching node info via Docker client')
-        client = get_docker_client()
-        info = client.info()
-        version = client.version()
+        return list_raw(client.api, kind)
+    finally:
+        client.close()
 
-        # Memory (in MB)
-        memory_total_mb = info['MemTotal'] // (1024 * 1024)
 
-        containers = client.containers.list(all=True)
-        total_containers = len(containers)
-        running_containers = len([c for c in containers if c.status == 'running'])
+def fetch_host_stats(host_ip):
+    """Read memory/CPU/uptime from the host agent listening on :8000."""
+    try:
+        if not host_ip:
+            raise Exception('No host IP configured in session')
+        return host_agent_session.get(f"http://{host_ip}:8000", timeout=5).json()
+    except Exception as e:
+        logger.warning(f"host agent stats unavailable for {host_ip}: {e}")
+        return None
 
-        images = client.images.list()
-        total_images = len(images)
 
-        networks = client.networks.list()
-        total_networks = len(networks)
+def load_node_info(config):
+    """
+    Build the node summary for one host.
 
-        volumes = client.volumes.list()
-        total_volumes = len(volumes)
+    The daemon calls and the host agent request run concurrently, so the
+    latency is that of the slowest call rather than the sum. Container and
+    image counts come from `info`; networks and volumes use the raw list
+    endpoints so no model objects are built.
+    """
+    client = get_docker_client(config=config)
+    try:
+        info_f = node_info_executor.submit(client.api.info)
+        version_f = node_info_executor.submit(client.api.version)
+        networks_f = node_info_executor.submit(client.api.networks)
+        volumes_f = node_info_executor.submit(client.api.volumes)
+        host_stats_f = node_info_executor.submit(fetch_host_stats, config.get('host_ip'))
+
+        info = info_f.result()
+        version = version_f.result()
+        total_networks = len(networks_f.result() or [])
+        total_volumes = len((volumes_f.result() or {}).get('Volumes') or [])
+        host_stats = host_stats_f.result()
+    finally:
+        client.close()
 
-        try:
-            host_ip = session.get('docker_config', {}).get('host_ip')
-            if not host_ip:
-                raise Exception('No host IP configured in session')
+    # Memory (in MB)
+    memory_total_mb = info['MemTotal'] // (1024 * 1024)
 
-            host_stats = requests.get(f"http://{host_ip}:8000", timeout=5).json()
+    if host_stats is not None:
+        memory_usage_mb = host_stats.get('memory_used_mb', 0)
+        cpu_usage_percent = host_stats.get('cpu_usage_percent', 0.0)
+        uptime = host_stats.get('uptime', 'Unknown')
+    else:
+        memory_usage_mb = int(memory_total_mb * 0.3)
+        cpu_usage_percent = 25.0
+        uptime = 'Unknown'
 
-            memory_usage_mb = host_stats.get('memory_used_mb', 0)
-            cpu_usage_percent = host_stats.get('cpu_usage_percent', 0.0)
-            uptime = host_stats.get('uptime', 'Unknown')
-        except Exception as e:
-            print(f"⚠️ Failed to fetch host stats: {str(e)}")
-            memory_usage_mb = int(memory_total_mb * 0.3)
-            cpu_usage_percent = 25.0
-            uptime = 'Unknown'
+    return {
+        'docker_version': version.get('Version', 'unknown'),
+        'os': info.get('OperatingSystem', 'unknown'),
+        'kernel_version': info.get('KernelVersion', 'unknown'),
+        'total_containers': info.get('Containers', 0),
+        'running_containers': info.get('ContainersRunning', 0),
+        'total_images': info.get('Images', 0),
+        'total_networks': total_networks,
+        'total_volumes': total_volumes,
+        'memory_total_mb': memory_total_mb,
+        'memory_usage_mb': memory_usage_mb,
+        'cpu_cores': info.get('NCPU', 1),
+        'cpu_usage_percent': cpu_usage_percent,
+        'uptime': uptime,
+        'docker_root': info.get('DockerRootDir', '/var/lib/docker'),
+        'hostname': info.get('Name', 'docker-host')
+    }
 
-        return {
-            'docker_version': version.get('Version', 'unknown'),
-            'os': info.get('OperatingSystem', 'unknown'),
-            'kernel_version': info.get('KernelVersion', 'unknown'),
-            'total_containers': total_containers,
-            'running_containers': running_containers,
-            'total_images': total_images,
-            'total_networks': total_networks,
-            'total_volumes': total_volumes,
-            'memory_total_mb': memory_total_mb,
-            'memory_usage_mb': memory_usage_mb,
-            'cpu_cores': info.get('NCPU', 1),
-            'cpu_usage_percent': cpu_usage_percent,
-            'uptime': uptime,
-            'docker_root': info.get('DockerRootDir', '/var/lib/docker'),
-            'hostname': info.get('Name', 'docker-host')
-        }
 
-    except Exception as e:
-        print(f"❌ Error fetching node info: {str(e)}")
+def get_node_info():
+    try:
+        logger.info('Fetching node info via Docker client')
+        if 'docker_config' not in session:
+            raise Exception('Not connected to any Docker host. Please connect first.')
+        config = dict(session['docker_config'])
+        return node_info_cache.get(docker_pool_key(config), lambda: load_node_info(config))
+
+    except Exception:
         logger.exception('get_node_info failed')
         return {
             'docker_version': 'N/A',
@@ -145,24 +323,58 @@ def get_node_info():
             'docker_root': '',
             'hostname': 'unknown'
         }
-    finally:
-        if client:
-            try:
-                client.close()
-            except Exception:
-                pass
 
 
 @main.route('/api/logs')
 def api_logs():
+    """
+    Follow a container's logs as batched SSE events.
+
+    Lines are coalesced into `{"stream": "stdout"|"stderr", "lines": [...]}`
+    events, flushed every `max_latency_ms` (default 50) or 64 KB. `rate`
+    caps the lines per second sent to the browser; the number of lines
+    skipped is reported as `dropped`.
+
+    Each flush carries a `cursor`, also sent as the SSE id. Passing it back
+    as `since` (or via Last-Event-ID on an EventSource reconnect) resumes
+    right after the last line received. `since` also accepts a timestamp;
+    without it the stream starts with the last 250 lines.
+
+    `grep`, `invert`, `ignore_case`, `level` and the context counts `A`, `B`
+    and `C` select lines on the server (see LogFilter).
+    """
     container_id = request.args.get('container')
-    print(f"=== API LOGS CALLED === container={container_id}")
     logger.info(f"/api/logs called for container={container_id}")
 
     if not container_id:
-        print("❌ No container ID provided")
         return jsonify({"error": "Container ID is required"}), 400
 
+    try:
+        rate = float(request.args['rate']) if request.args.get('rate') else None
+        max_latency = min(max(float(request.args.get('max_latency_ms', 50)), 1.0), 1000.0) / 1000
+    except ValueError:
+        return jsonify({"error": "rate and max_latency_ms must be numbers"}), 400
+    if rate is not None and not (math.isfinite(rate) and rate > 0):
+        return jsonify({"error": "rate must be a positive number"}), 400
+
+    try:
+        line_filter = LogFilter.from_args(request.args)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    since = request.args.get('since') or request.headers.get('Last-Event-ID')
+    resume = None
+    since_ns = None
+    if since:
+        try:
+            position = decode_log_cursor(since)
+            since_ns, resume = position['ts'], (position['ts'], position['skip'])
+        except ValueError:
+            try:
+                since_ns = parse_time_arg(since)
+            except ValueError:
+                return jsonify({"error": "since must be a cursor or a timestamp"}), 400
+
     # Capture docker_config from session while we are in the request context
     docker_config = session.get('docker_config')
     if not docker_config:
@@ -171,28 +383,31 @@ def api_logs():
     def generate(config):
         logger.debug('api_logs.generate: starting stream')
         client = None
+        response = None
         try:
             # Pass the captured config to get a client without needing the session
             client = get_docker_client(config=config)
-            container = client.containers.get(container_id)
-
-            # Stream logs
-            for chunk in container.logs(stdout=True, stderr=True, stream=True, tail=250, follow=True):
-                if isinstance(chunk, bytes):
-                    line = chunk.decode('utf-8', errors='replace').strip()
-                else:
-                    line = str(chunk).strip()
-                if line:
-                    yield f"data: {json.dumps({'line': line})}\n\n"
+            response, tty = open_container_logs(
+                client.api, container_id, follow=True, timestamps=1,
+                tail='all' if since_ns else 250,
+                since=docker_time(since_ns) if since_ns else None,
+            )
+            batcher = LogBatcher(
+                iter_log_entry_batches(response, tty),
+                max_latency=max_latency, rate=rate, resume=resume,
+                line_filter=line_filter, on_close=response.close
+            )
+            yield from batcher
 
         except docker.errors.NotFound:
             logger.warning(f"api_logs.generate: container not found: {container_id}")
             yield f"data: {json.dumps({'error': 'Container not found'})}\n\n"
         except Exception as e:
-            print(f"❌ Log stream error: {str(e)}")
             logger.exception('api_logs.generate encountered an error')
             yield f"data: {json.dumps({'error': f'Log stream error: {str(e)}'})}\n\n"
         finally:
+            if response is not None:
+                response.close()
             if client:
                 try:
                     client.close()
@@ -200,11 +415,87 @@ def api_logs():
                     pass
 
     return Response(
-        generate(docker_config),
+        track_stream('/api/logs', generate(docker_config)),
         mimetype='text/event-stream',
         headers={'Cache-Control': 'no-cache', 'Connection': 'keep-alive', 'X-Accel-Buffering': 'no'}
     )
 
+@main.route('/api/logs/history')
+def api_logs_history():
+    """
+    Page through a container's past logs without following.
+
+    Takes `container`, an optional `since`/`until` window (RFC 3339 or epoch
+    seconds), `limit` (default 200) and `cursor`. Without a cursor the page
+    ends at `until` (or now) unless only `since` is given, in which case it
+    starts there. Entries are always returned oldest first with their
+    timestamps; `before` and `after` are cursors for the neighbouring pages.
+    Accepts the same line filters as /api/logs; pass them again with each
+    cursor.
+    """
+    container_id = request.args.get('container')
+    if not container_id:
+        return jsonify({"error": "Container ID is required"}), 400
+    try:
+        limit = parse_limit(request.args.get('limit'), default=200)
+        line_filter = LogFilter.from_args(request.args)
+        cursor = request.args.get('cursor')
+        if cursor:
+            position = decode_log_cursor(cursor)
+            since, until = position.get('since'), position.get('until')
+            direction = position.get('dir', 'forward')
+        else:
+            position = None
+            since = parse_time_arg(request.args.get('since'))
+            until = parse_time_arg(request.args.get('until'))
+            direction = 'forward' if since and not until else 'backward'
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    at = (position['ts'], position['skip']) if position else None
+    client = None
+    try:
+        client = get_docker_client()
+        entries, has_more, first_skip, last_skip = read_log_page(
+            client.api, container_id, limit, direction=direction, since=since, until=until,
+            after=at if direction == 'forward' else None,
+            before=at if direction == 'backward' else None,
+            line_filter=line_filter,
+        )
+    except docker.errors.NotFound:
+        return jsonify({"error": "Container not found"}), 404
+    except Exception as e:
+        logger.exception('api_logs_history failed')
+        return jsonify({"error": f"Log read error: {str(e)}"}), 500
+    finally:
+        if client:
+            client.close()
+
+    def edge_cursor(ts, skip, new_direction):
+        return encode_log_cursor(ts, skip, dir=new_direction, since=since, until=until)
+
+    before = after = None
+    if entries:
+        first_ts, last_ts = entries[0][0], entries[-1][0]
+        if first_ts is not None and (direction == 'forward' or has_more):
+            before = edge_cursor(first_ts, first_skip, 'backward')
+        if last_ts is not None:
+            # Also given at the end of the log, so the client can poll from there
+            after = edge_cursor(last_ts, last_skip, 'forward')
+    elif cursor and direction == 'forward':
+        after = cursor
+
+    return jsonify({
+        'entries': [
+            {'ts': format_log_time(ts), 'stream': stream, 'line': line}
+            for ts, stream, line in entries
+        ],
+        'before': before,
+        'after': after,
+        'has_more': has_more,
+    })
+
+
 @main.route('/api/connect', methods=['POST'])
 def api_connect():
     data = request.get_json()
@@ -220,8 +511,8 @@ def api_connect():
 
     base_url = f"https://{host_ip}:2376"
 
-    tls_config = None
     session_id = None
+    tls_fingerprint = None
 
     if mode == "https":
         ca_cert = data.get('caCert', '').strip()
@@ -231,33 +522,12 @@ def api_connect():
         if not all([ca_cert, client_cert, client_key]):
             return jsonify({"error": "CA Certificate, Client Certificate, and Client Key are required for HTTPS mode"}), 400
 
-        session_id = uuid.uuid4().hex
-        session_cert_dir = os.path.join(temp_certs_dir, session_id)
-        os.makedirs(session_cert_dir, exist_ok=True)
-
-        ca_path = os.path.join(session_cert_dir, "ca.pem")
-        cert_path = os.path.join(session_cert_dir, "cert.pem")
-        key_path = os.path.join(session_cert_dir, "key.pem")
-
         try:
-            with open(ca_path, 'w') as f:
-                f.write(ca_cert)
-            with open(cert_path, 'w') as f:
-                f.write(client_cert)
-            with open(key_path, 'w') as f:
-                f.write(client_key)
-
-            os.chmod(ca_path, 0o600)
-            os.chmod(cert_path, 0o600)
-            os.chmod(key_path, 0o600)
-
-            tls_config = docker.tls.TLSConfig(
-                client_cert=(cert_path, key_path),
-                ca_cert=ca_path,
-                verify=True
-            )
+            tls_fingerprint, _ = tls_contexts.put(ca_cert, client_cert, client_key)
+            # Kept on disk so other workers and restarts can rebuild the context
+            session_id = write_tls_material(temp_certs_dir, ca_cert, client_cert, client_key)
         except Exception as e:
-            logger.exception('api_connect: failed to write TLS files')
+            logger.exception('api_connect: failed to set up TLS')
             return jsonify({"error": f"Failed to configure TLS: {str(e)}"}), 400
 
     session['docker_config'] = {
@@ -265,18 +535,17 @@ def api_connect():
         "mode": mode,
         "base_url": base_url,
         "session_id": session_id,
+        "tls_fingerprint": tls_fingerprint,
     }
 
     try:
-        client = docker.DockerClient(
-            base_url=base_url,
-            tls=tls_config,
-            timeout=10
-        )
+        # Warms the pooled client that subsequent requests will reuse
+        client = get_docker_client(config=session['docker_config'])
         client.ping()
         client.close()
     except Exception as e:
         logger.exception('api_connect: ping failed')
+        docker_pool.evict(docker_pool_key(session['docker_config']))
         session.pop('docker_config', None)
         if session_id:
             shutil.rmtree(os.path.join(temp_certs_dir, session_id), ignore_errors=True)
@@ -298,18 +567,184 @@ def api_connect():
 def api_disconnect():
     """Disconnects the user by clearing session data and certs."""
     docker_config = session.pop('docker_config', None)
+    if docker_config:
+        forget_host(docker_config)
     if docker_config and docker_config.get('session_id'):
         session_id = docker_config['session_id']
         session_cert_dir = os.path.join(temp_certs_dir, session_id)
         if os.path.isdir(session_cert_dir):
             try:
                 shutil.rmtree(session_cert_dir)
-                print(f"Cleaned up cert directory: {session_cert_dir}")
+                logger.debug(f"disconnect: removed cert directory {session_cert_dir}")
             except Exception as e:
-                print(f"Error removing cert directory {session_cert_dir}: {e}")
+                logger.warning(f"disconnect: could not remove cert directory {session_cert_dir}: {e}")
 
     return jsonify({"success": True, "message": "Disconnected successfully."})
 
+
+# ---------- Fleet (many hosts) ----------
+def forget_host(config):
+    """Drop the pooled client, inventory and cached node summary for a host."""
+    key = docker_pool_key(config)
+    docker_pool.evict(key)
+    node_info_cache.invalidate(key)
+    host_inventories.evict(key)
+
+
+def fleet_query(func):
+    """
+    Run `func(name, config)` on the registered hosts (all, or those named by
+    repeated `host` arguments) within `timeout` seconds (default
+    FLEET_HOST_TIMEOUT). Returns (results by host, statuses by host).
+    """
+    timeout = min(max(float(request.args.get('timeout') or FLEET_HOST_TIMEOUT), 0.5), 60.0)
+    wanted = set(v for v in request.args.getlist('host') if v)
+    hosts = [
+        (entry['name'], entry['config']) for entry in fleet_registry.entries()
+        if not wanted or entry['name'] in wanted
+    ]
+    return fleet_fan_out.run(hosts, func, timeout)
+
+
+@main.route('/api/fleet/hosts', methods=['GET'])
+def fleet_hosts():
+    """Registered hosts, without their TLS material."""
+    return jsonify({'hosts': [{
+        'name': entry['name'],
+        'host': entry['config']['host_ip'],
+        'apiUrl': entry['config']['base_url'],
+        'labels': entry['labels'],
+        'added': entry['added'],
+    } for entry in fleet_registry.entries()]})
+
+
+@main.route('/api/fleet/hosts', methods=['POST'])
+def fleet_add_host():
+    """
+    Register a host: `name`, `hostIp`, optional `port` (default 2376) and
+    `labels`, and the same `caCert`/`clientCert`/`clientKey` as
+    /api/connect. The host must answer a ping before it is added.
+    """
+    data = request.get_json(silent=True) or {}
+    name = (data.get('name') or '').strip()
+    host_ip = (data.get('hostIp') or '').strip()
+    ca_cert = (data.get('caCert') or '').strip()
+    client_cert = (data.get('clientCert') or '').strip()
+    client_key = (data.get('clientKey') or '').strip()
+    if not HOST_NAME.match(name):
+        return jsonify({"error": "name must be 1-63 letters, digits, '.', '_' or '-'"}), 400
+    if not host_ip:
+        return jsonify({"error": "Host IP is required"}), 400
+    if not all([ca_cert, client_cert, client_key]):
+        return jsonify({"error": "CA Certificate, Client Certificate, and Client Key are required"}), 400
+    try:
+        port = int(data.get('port') or 2376)
+    except (TypeError, ValueError):
+        return jsonify({"error": "port must be a number"}), 400
+    if fleet_registry.get(name) is not None:
+        return jsonify({"error": f"A host named '{name}' is already registered"}), 409
+
+    try:
+        tls_fingerprint, _ = tls_contexts.put(ca_cert, client_cert, client_key)
+        config = fleet_registry.build_config(host_ip, ca_cert, client_cert, client_key, port=port)
+        config['tls_fingerprint'] = tls_fingerprint
+    except Exception as e:
+        logger.exception('fleet: failed to set up TLS')
+        return jsonify({"error": f"Failed to configure TLS: {str(e)}"}), 400
+    try:
+        client = get_docker_client(config=config)
+        try:
+            client.ping()
+        finally:
+            client.close()
+        fleet_registry.add(name, config, labels=data.get('labels') or {})
+    except ValueError as e:
+        forget_host(config)
+        fleet_registry.discard_config(config)
+        return jsonify({"error": str(e)}), 409
+    except Exception as e:
+        logger.warning(f"fleet: adding {name} ({host_ip}) failed: {e}")
+        forget_host(config)
+        fleet_registry.discard_config(config)
+        return jsonify({"error": f"Connection failed: {str(e)}"}), 502
+
+    logger.info(f"fleet: added host {name} ({config['base_url']})")
+    return jsonify({"success": True, "name": name, "apiUrl": config['base_url']}), 201
+
+
+@main.route('/api/fleet/hosts/<name>', methods=['DELETE'])
+def fleet_remove_host(name):
+    config = fleet_registry.remove(name)
+    if config is None:
+        return jsonify({"error": "Host not found"}), 404
+    forget_host(config)
+    logger.info(f"fleet: removed host {name}")
+    return jsonify({"success": True, "message": f"Host '{name}' removed."})
+
+
+@main.route('/api/fleet/containers', methods=['GET'])
+def fleet_containers():
+    """
+    Containers on every registered host, newest first, each with a `host`
+    field. Rows come from each host's inventory; `limit`/`cursor` page the
+    merged list (next cursor in X-Next-Cursor). `hosts` reports per host
+    whether it answered, so partial results are marked as such.
+    """
+    try:
+        limit = parse_limit(request.args.get('limit'))
+        offset = decode_cursor(request.args.get('cursor'))
+        results, statuses = fleet_query(lambda name, config: list_host_objects('containers', config=config))
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    rows = []
+    for name, host_rows in results.items():
+        statuses[name]['count'] = len(host_rows)
+        rows.extend((name, row) for row in host_rows)
+    rows.sort(key=lambda item: item[1].get('Created') or 0, reverse=True)
+    page, next_cursor = paginate(rows, limit, offset)
+
+    response = jsonify({
+        'containers': [dict(format_container_row(row), host=name) for name, row in page],
+        'hosts': statuses,
+        'partial': not all(status['ok'] for status in statuses.values()),
+    })
+    if next_cursor:
+        response.headers['X-Next-Cursor'] = next_cursor
+    return response
+
+
+@main.route('/api/fleet/node-info', methods=['GET'])
+def fleet_node_info():
+    """Node summary per registered host (cached like /api/node-info), plus fleet totals."""
+    try:
+        results, statuses = fleet_query(
+            lambda name, config: node_info_cache.get(docker_pool_key(config), lambda: load_node_info(config))
+        )
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    totals = {
+        key: sum(node.get(key, 0) for node in results.values())
+        for key in ('total_containers', 'running_containers', 'total_images', 'cpu_cores',
+                    'memory_total_mb', 'memory_usage_mb')
+    }
+    totals['hosts'] = len(statuses)
+    totals['hosts_up'] = len(results)
+    return jsonify({
+        'nodes': results,
+        'hosts': statuses,
+        'totals': totals,
+        'partial': len(results) < len(statuses),
+    })
+
+
+@main.route('/metrics', methods=['GET'])
+def metrics():
+    """Prometheus text exposition of Docker API latency, errors, in-flight calls and open streams."""
+    return Response(metrics_registry.render(), mimetype='text/plain; version=0.0.4; charset=utf-8')
+
+
 @main.route('/api/node-info', methods=['GET'])
 def api_node_info():
     return jsonify(get_node_info())
@@ -340,62 +775,138 @@ def api_image_detail(image_name):
         return jsonify({"error": "Image name is required"}), 400
 
     # If no namespace provided, default to 'library'
-    if "/" in image_name:
-        namespace, name = image_name.split("/", 1)
-        api_url = f"https://hub.docker.com/v2/repositories/{namespace}/{name}"
-    else:
-        api_url = f"https://hub.docker.com/v2/repositories/library/{image_name}"
+    repository = image_name if "/" in image_name else f"library/{image_name}"
 
     try:
-        resp = requests.get(api_url, timeout=10)
-        if resp.status_code == 404:
+        status, data = hub_metadata.get(repository)
+        if status == 404:
             return jsonify({"error": "Image not found"}), 404
-        resp.raise_for_status()
-        data = resp.json()
         return jsonify(format_image_data(data))
     except Exception as e:
-        print(f"❌ API request failed: {str(e)}")
+        logger.warning(f"image detail: Docker Hub lookup failed for {repository}: {e}")
         return jsonify({"error": "Failed to fetch"}), 500
 
 
 # ---------- Images list (on connected host) ----------
+IMAGE_SORT_KEYS = {
+    'repository': lambda entry: (entry[1], entry[2]),
+    'tag': lambda entry: entry[2],
+    'created': lambda entry: entry[0].get('Created') or 0,
+    'size': lambda entry: entry[0].get('Size') or 0,
+}
+
+# Filtered, sorted tag rows per (host, inventory version, query), so a changed
+# page or sort does not expand the whole image list again
+image_list_views = TTLCache(ttl=float('inf'), max_entries=int(os.environ.get('IMAGE_LIST_VIEW_CACHE_SIZE', 64)))
+
+
+def image_tag_rows(images, include, name_filter, sort_field, descending):
+    """
+    One (image row, repository, tag) entry per tag, newest image first.
+
+    Untagged images are left out unless `include` is 'dangling' (untagged
+    images no other image is built on) or 'all' (intermediate layers too).
+    """
+    parents = {img.get('ParentId') for img in images} if include == 'dangling' else ()
+    entries = []
+    for img in images:
+        tags = [t for t in img.get('RepoTags') or () if t != '<none>:<none>']
+        if not tags:
+            if include is None or (include == 'dangling' and img.get('Id') in parents):
+                continue
+            tags = ['<none>:<none>']
+        for tag in tags:
+            if name_filter and name_filter not in tag.lower():
+                continue
+            # rpartition, so a registry port (host:5000/app:1) stays in the repository
+            repository, sep, tag_name = tag.rpartition(':')
+            if not sep or '/' in tag_name:
+                repository, tag_name = tag, 'latest'
+            entries.append((img, repository, tag_name))
+    entries.sort(key=IMAGE_SORT_KEYS['created'], reverse=True)
+    if sort_field is not None:
+        entries.sort(key=IMAGE_SORT_KEYS[sort_field], reverse=descending)
+    return entries
+
+
 @main.route('/api/my-images', methods=['GET'])
 def api_my_images():
-    client = None
+    """
+    Tagged images on the connected host, one row per tag.
+
+    Dangling and intermediate images are left out unless `dangling=1` or
+    `all=1`. `filter` keeps rows whose repository:tag contains it
+    (case-insensitive); `sort` is repository, tag, created or size (prefix
+    `-` for descending, default newest first), and `limit`/`cursor` page
+    the result; the next cursor is sent in X-Next-Cursor and the row count
+    before paging as `total`.
+
+    The ETag is derived from the host's image set and the query, so an
+    unchanged poll with If-None-Match gets a 304 without a body.
+    """
     try:
-        print("[my-images] creating docker client")
-        client = get_docker_client()
-        imgs = client.images.list(all=True)
-        print(f"[my-images] fetched {len(imgs)} images")
-        rows = []
-        for img in imgs:
-            tags = getattr(img, 'tags', None) or ["<none>:<none>"]
-            created_raw = img.attrs.get('Created', '') if hasattr(img, 'attrs') else ''
-            size_bytes = img.attrs.get('Size', 0) if hasattr(img, 'attrs') else 0
-            size_mb = round(size_bytes / (1024 * 1024), 1)
-            for tag in tags:
-                if ':' in tag:
-                    repository, tag_name = tag.split(':', 1)
-                else:
-                    repository, tag_name = tag, 'latest'
-                rows.append({
-                    'repository': repository,
-                    'tag': tag_name,
-                    'id': (img.short_id or ''),
-                    'createdAt': created_raw,
-                    'size': f"{size_mb} MB"
-                })
-        print(f"[my-images] returning {len(rows)} rows")
-        return jsonify({'images': rows})
+        limit = parse_limit(request.args.get('limit'))
+        offset = decode_cursor(request.args.get('cursor'))
+        sort_field, descending = parse_sort(request.args.get('sort'), IMAGE_SORT_KEYS)
+    except ValueError as e:
+        return jsonify({'images': [], 'error': str(e)}), 400
+    include = 'all' if request.args.get('all') == '1' else 'dangling' if request.args.get('dangling') == '1' else None
+    name_filter = (request.args.get('filter') or '').strip().lower()
+    query = '&'.join(f"{k}={v}" for k, v in sorted(request.args.items(multi=True)))
+
+    def etag_for(version):
+        return hashlib.sha1(f"{version}|{query}".encode()).hexdigest()
+
+    try:
+        if 'docker_config' not in session:
+            raise Exception('Not connected to any Docker host. Please connect first.')
+        config = dict(session['docker_config'])
+        host = docker_pool_key(config)
+        if inventory_enabled:
+            inventory = host_inventories.get(host, config)
+            # Cheap check first: an unchanged image set answers without reading any rows
+            etag = etag_for(inventory.version('images'))
+            if request.if_none_match.contains(etag):
+                return Response(status=304, headers={'ETag': f'"{etag}"', 'Cache-Control': 'no-cache'})
+            version, imgs = inventory.snapshot('images')
+        else:
+            imgs = list_host_objects('images', config=config)
+            version = hashlib.sha1(json.dumps(
+                sorted((i.get('Id'), i.get('RepoTags'), i.get('Size')) for i in imgs), default=str
+            ).encode()).hexdigest()
+            if request.if_none_match.contains(etag_for(version)):
+                return Response(status=304, headers={'ETag': f'"{etag_for(version)}"', 'Cache-Control': 'no-cache'})
+
+        entries = image_list_views.get(
+            (host, version, include, name_filter, sort_field, descending),
+            lambda: image_tag_rows(imgs, include, name_filter, sort_field, descending),
+        )
+        page, next_cursor = paginate(entries, limit, offset)
+        rows = [{
+            'repository': repository,
+            'tag': tag_name,
+            'id': image_short_id(img.get('Id') or ''),
+            'createdAt': img.get('Created', ''),
+            'size': f"{round((img.get('Size') or 0) / (1024 * 1024), 1)} MB"
+        } for img, repository, tag_name in page]
+        logger.debug(f"my-images: {len(imgs)} images, {len(entries)} rows, page of {len(rows)}")
+
+        response = jsonify({'images': rows, 'total': len(entries)})
+        response.headers['ETag'] = f'"{etag_for(version)}"'
+        response.headers['Cache-Control'] = 'no-cache'
+        if next_cursor:
+            response.headers['X-Next-Cursor'] = next_cursor
+        return response
     except Exception as e:
-        print(f"[my-images] error: {e}")
+        logger.warning(f"my-images: {e}")
         return jsonify({'images': [], 'error': str(e)}), 200
-    finally:
-        if client:
-            try:
-                client.close()
-            except Exception:
-                pass
+
+
+def image_short_id(image_id):
+    """Same shortening as docker-py's Image.short_id."""
+    if image_id.startswith('sha256:'):
+        return image_id[:19]
+    return image_id[:12]
 
 
 # ---------- Pull image via SSE ----------
@@ -403,98 +914,113 @@ def api_my_images():
 def pull_image():
     repository = request.args.get('repository', '').strip()
     tag = request.args.get('tag', 'latest').strip()
+    headers = {
+        'Cache-Control': 'no-cache', 'Connection': 'keep-alive', 'X-Accel-Buffering': 'no', 'Access-Control-Allow-Origin': '*'
+    }
 
-    print(f"[pull-image] [DEBUG] Request received for repo='{repository}', tag='{tag}'")
     if not repository:
-        def generate_error():
-            print("[pull-image] [DEBUG] Repository is missing, sending error.")
-            yield f"data: {json.dumps({'error': 'Missing repository'})}\n\n"
-        return Response(generate_error(), mimetype='text/event-stream', headers={
-            'Cache-Control': 'no-cache', 'Connection': 'keep-alive', 'X-Accel-Buffering': 'no'
-        })
+        return Response(sse_frame({'error': 'Missing repository'}), mimetype='text/event-stream', headers=headers)
 
     docker_config = session.get('docker_config')
     if not docker_config:
-        def generate_no_connect_error():
-            print("[pull-image] [DEBUG] Not connected to Docker host, sending error.")
-            yield f"data: {json.dumps({'error': 'Not connected to any Docker host.'})}\\n\n"
-        return Response(generate_no_connect_error(), mimetype='text/event-stream', headers={
-            'Cache-Control': 'no-cache', 'Connection': 'keep-alive', 'X-Accel-Buffering': 'no'
-        })
+        return Response(sse_frame({'error': 'Not connected to any Docker host.'}), mimetype='text/event-stream', headers=headers)
 
-    def generate(config):
-        client = None
+    # Concurrent pulls of the same image on the same host share one upstream pull
+    config = dict(docker_config)
+    job = image_pulls.join(docker_pool_key(config), config, repository, tag)
+    logger.debug(f"pull-image: {repository}:{tag} ({image_pulls.active_pulls()} pulls running)")
+    return Response(
+        track_stream('/api/pull-image', job.frames(image_pulls.min_interval)),
+        mimetype='text/event-stream', headers=headers
+    )
+
+
+# ---------- Inspect and Delete Image ----------
+def find_image_row(rows, ref):
+    """Match an image list row by full ID, short ID, repo:tag or repo@digest."""
+    names = {ref}
+    if '@' not in ref and ':' not in ref.rsplit('/', 1)[-1]:
+        names.add(f"{ref}:latest")
+    prefixed = ref if ref.startswith('sha256:') else f"sha256:{ref}"
+    by_prefix = []
+    for row in rows:
+        image_id = row.get('Id') or ''
+        if image_id == prefixed or names.intersection(row.get('RepoTags') or ()) \
+                or names.intersection(row.get('RepoDigests') or ()):
+            return row
+        if len(ref) >= 4 and image_id.startswith(prefixed):
+            by_prefix.append(row)
+    return by_prefix[0] if len(by_prefix) == 1 else None
+
+
+def resolve_image(ref, config):
+    """
+    Map an image reference to (image ID, list row) on the given host.
+
+    Answered from the host inventory when possible; otherwise the daemon
+    inspects the reference, and the document is kept for inspect_image_by_id.
+    """
+    if inventory_enabled:
+        row = find_image_row(list_host_objects('images', config=config), ref)
+        if row is not None:
+            return row['Id'], row
+    client = get_docker_client(config=config)
+    try:
+        attrs = client.api.inspect_image(ref)
+    finally:
+        client.close()
+    image_inspect_cache.set((docker_pool_key(config), attrs['Id']), attrs)
+    return attrs['Id'], None
+
+
+def inspect_image_by_id(image_id, config):
+    def load():
+        client = get_docker_client(config=config)
         try:
-            print("[pull-image] [DEBUG] Generator started. Creating Docker client.")
-            client = get_docker_client(config=config)
-            client.ping()
-            print("[pull-image] [DEBUG] Docker ping OK. Starting pull stream from Docker API.")
-            for i, chunk in enumerate(client.api.pull(repository, tag=tag, stream=True, decode=True)):
-                try:
-                    # Log condensed event
-                    status = chunk.get('status', '')
-                    progress = chunk.get('progress', '')
-                    log_msg = f"status='{status}'"
-                    if progress:
-                        log_msg += f", progress='{progress}'"
-                    print(f"[pull-image] [DEBUG] Sending chunk {i+1}: {log_msg}")
-                    yield f"data: {json.dumps(chunk)}\\n\n"
-                except Exception as inner_e:
-                    print(f"[pull-image] [DEBUG] Error processing chunk: {inner_e}")
-                    yield f"data: {json.dumps({'error': f'Stream error: {str(inner_e)}'})}\n\n"
-            print("[pull-image] [DEBUG] Pull stream finished. Sending 'completed' event.")
-            yield f"data: {json.dumps({'status': 'completed'})}\n\n"
-            print("[pull-image] [DEBUG] 'completed' event sent.")
-        except Exception as e:
-            print(f"[pull-image] [DEBUG] An exception occurred during pull: {e}")
-            yield f"data: {json.dumps({'error': f'Pull failed: {str(e)}'})}\n\n"
+            return client.api.inspect_image(image_id)
         finally:
-            if client:
-                print("[pull-image] [DEBUG] Closing Docker client.")
-                try:
-                    client.close()
-                except Exception:
-                    pass
-            print("[pull-image] [DEBUG] Generator finished.")
-
-    return Response(generate(docker_config), mimetype='text/event-stream', headers={
-        'Cache-Control': 'no-cache', 'Connection': 'keep-alive', 'X-Accel-Buffering': 'no', 'Access-Control-Allow-Origin': '*'
-    })
+            client.close()
+    return image_inspect_cache.get((docker_pool_key(config), image_id), load)
 
 
-# ---------- Inspect and Delete Image ----------
 @main.route('/api/inspect-image', methods=['GET'])
 def api_inspect_image():
     image_name = request.args.get('image', '').strip()
     if not image_name:
         return jsonify({"error": "Image name is required"}), 400
-    client = None
+    if 'docker_config' not in session:
+        return jsonify({"error": "Not connected to any Docker host. Please connect first."}), 500
+    config = dict(session['docker_config'])
     try:
-        client = get_docker_client()
-        image = client.images.get(image_name)
-        return jsonify(image.attrs)
+        image_id, row = image_refs.get(
+            (docker_pool_key(config), image_name), lambda: resolve_image(image_name, config)
+        )
+        # The ID is the content hash, so it doubles as a validator
+        if request.if_none_match.contains(image_id):
+            return Response(status=304, headers={'ETag': f'"{image_id}"'})
+
+        attrs = inspect_image_by_id(image_id, config)
+        if row is not None:
+            # Tags and digests are per host and can change; take them from the live list row
+            attrs = {**attrs, 'RepoTags': row.get('RepoTags') or [], 'RepoDigests': row.get('RepoDigests') or []}
+        resp = jsonify(attrs)
+        resp.headers['ETag'] = f'"{image_id}"'
+        return resp
+    except docker.errors.ImageNotFound as e:
+        return jsonify({"error": str(e)}), 404
     except Exception as e:
         return jsonify({"error": str(e)}), 500
-    finally:
-        if client:
-            try:
-                client.close()
-            except Exception:
-                pass
 
 
 # ---------- Networks ----------
 @main.route('/api/networks', methods=['GET'])
 def api_networks_list():
     try:
-        client = get_docker_client()
-        networks = client.networks.list()
         network_data = []
-        for net in networks:
-            inspect = getattr(net, 'attrs', {}) or {}
+        for inspect in list_host_objects('networks'):
             network_data.append({
-                'Name': net.name,
-                'Id': net.id,
+                'Name': inspect.get('Name'),
+                'Id': inspect.get('Id'),
                 'Driver': inspect.get('Driver', 'N/A'),
                 'Scope': inspect.get('Scope', 'N/A'),
                 'IPAM': inspect.get('IPAM', {}),
@@ -506,11 +1032,6 @@ def api_networks_list():
         return jsonify(network_data)
     except Exception as e:
         return jsonify({'error': str(e)}), 500
-    finally:
-        try:
-            client.close()
-        except Exception:
-            pass
 
 
 @main.route('/api/networks', methods=['POST'])
@@ -575,40 +1096,34 @@ def prune_networks():
 @main.route('/api/volumes', methods=['GET'])
 def api_list_volumes():
     try:
-        print('[volumes][list] start')
-        client = get_docker_client()
-        volumes = client.volumes.list()
-        print(f"[volumes][list] found {len(volumes)} volumes")
+        volumes = list_host_objects('volumes')
         volume_data = []
-        for vol in volumes:
-            inspect = getattr(vol, 'attrs', {}) or {}
+        for inspect in volumes:
             volume_data.append({
-                'Name': vol.name,
+                'Name': inspect.get('Name'),
                 'Mountpoint': inspect.get('Mountpoint', 'N/A'),
                 'Driver': inspect.get('Driver', 'local'),
                 'Scope': inspect.get('Scope', 'local'),
                 'CreatedAt': inspect.get('CreatedAt', 'Unknown')
             })
-        print('[volumes][list] returning payload')
+        logger.debug(f"volumes: listed {len(volume_data)} volumes")
         return jsonify(volume_data)
     except Exception as e:
-        print(f"[volumes][list] error: {e}")
+        logger.warning(f"volumes: list failed: {e}")
         return jsonify({'error': str(e)}), 500
 
 
 @main.route('/api/volumes', methods=['POST'])
 def api_create_volume():
     data = request.get_json(silent=True) or {}
-    print(f"[volumes][create] payload: {data}")
     name = data.get('Name') or data.get('name')
 
     if not name:
-        print('[volumes][create] missing name')
         return jsonify({'error': 'Volume name is required'}), 400
 
+    client = None
     try:
         client = get_docker_client()
-        print(f"[volumes][create] creating volume {name}")
         volume = client.volumes.create(name=name)
         attrs = getattr(volume, 'attrs', {}) or {}
         resp = {
@@ -617,206 +1132,397 @@ def api_create_volume():
             'Driver': attrs.get('Driver'),
             'CreatedAt': attrs.get('CreatedAt')
         }
-        print('[volumes][create] success')
+        logger.info(f"volumes: created {name}")
         return jsonify(resp)
     except Exception as e:
-        print(f"[volumes][create] error: {e}")
+        logger.warning(f"volumes: create {name} failed: {e}")
         return jsonify({'error': str(e)}), 500
+    finally:
+        if client:
+            try:
+                client.close()
+            except Exception:
+                pass
 
 
 @main.route('/api/volumes/<volume_name>', methods=['DELETE'])
 def api_delete_volume(volume_name):
+    client = None
     try:
-        print(f"[volumes][delete] deleting {volume_name}")
         client = get_docker_client()
         volume = client.volumes.get(volume_name)
         volume.remove()
-        print('[volumes][delete] success')
+        logger.info(f"volumes: deleted {volume_name}")
         return jsonify({'message': f'Volume {volume_name} deleted'})
     except Exception as e:
-        print(f"[volumes][delete] error: {e}")
+        logger.warning(f"volumes: delete {volume_name} failed: {e}")
         return jsonify({'error': str(e)}), 500
+    finally:
+        if client:
+            try:
+                client.close()
+            except Exception:
+                pass
 
 
 @main.route('/api/volumes/prune', methods=['POST'])
 def api_prune_volumes():
+    client = None
     try:
-        print('[volumes][prune] start')
         client = get_docker_client()
         result = client.api.prune_volumes()
-        print(f"[volumes][prune] result: {result}")
+        logger.info(f"volumes: pruned {len(result.get('VolumesDeleted') or [])} volumes")
         return jsonify(result)
     except Exception as e:
-        print(f"[volumes][prune] error: {e}")
+        logger.warning(f"volumes: prune failed: {e}")
         return jsonify({'error': str(e)}), 500
+    finally:
+        if client:
+            try:
+                client.close()
+            except Exception:
+                pass
 
 
 # ---------- Containers ----------
+# Query arguments passed straight through to the daemon as /containers/json filters
+CONTAINER_FILTER_ARGS = ('status', 'label', 'name', 'ancestor', 'network')
+CONTAINER_SORT_KEYS = {
+    'created': lambda row: row.get('Created') or 0,
+    'name': lambda row: container_name(row),
+    'image': lambda row: row.get('Image') or '',
+    'state': lambda row: row.get('State') or '',
+}
+
+
+def container_name(row):
+    names = row.get('Names') or []
+    return names[0].lstrip('/') if names else row.get('Id', '')[:12]
+
+
+def format_container_ports(ports):
+    """Render the Ports array of a /containers/json row like `docker ps`."""
+    port_info = []
+    for port in ports or []:
+        container_port = f"{port.get('PrivatePort')}/{port.get('Type', 'tcp')}"
+        if port.get('PublicPort'):
+            port_info.append(f"{port.get('IP', '0.0.0.0')}:{port['PublicPort']}->{container_port}")
+        else:
+            port_info.append(f"{container_port}(unmapped)")
+    return ", ".join(port_info)
+
+
+def format_container_row(row):
+    """Shape a raw /containers/json entry for the UI without a per-container inspect."""
+    created = row.get('Created')
+    state = (row.get('State') or 'unknown').lower()
+    return {
+        "id": row.get('Id', '')[:12],
+        "name": container_name(row),
+        "image": row.get('Image', 'unknown'),
+        "status": state,
+        "created": datetime.fromtimestamp(created, timezone.utc).isoformat() if created else None,
+        "ports": format_container_ports(row.get('Ports')),
+        "state": state
+    }
+
+
 @main.route('/api/containers', methods=['GET'])
 def api_containers():
-    print("--- DEBUG: api_containers ---")
+    """
+    List containers without inspecting each one.
+
+    Unfiltered requests are answered from the host inventory; `status`,
+    `label`, `name`, `ancestor` and `network` filters (repeatable) are
+    evaluated by the daemon in a single /containers/json call. Also supports
+    `sort` (created, name, image or state; prefix with `-` for descending)
+    and `limit`/`cursor` paging. The body stays a plain array; the cursor
+    for the next page, if any, is sent in the X-Next-Cursor header.
+    """
+    try:
+        limit = parse_limit(request.args.get('limit'))
+        offset = decode_cursor(request.args.get('cursor'))
+        sort_field, descending = parse_sort(request.args.get('sort'), CONTAINER_SORT_KEYS)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    filters = {}
+    for arg in CONTAINER_FILTER_ARGS:
+        values = [v for v in request.args.getlist(arg) if v]
+        if values:
+            filters[arg] = values
+
     client = None
     try:
-        print("[api_containers] Getting Docker client...")
-        client = get_docker_client()
-        print("[api_containers] Docker client obtained. Listing all containers...")
-        containers = client.containers.list(all=True)
-        print(f"[api_containers] Found {len(containers)} containers.")
-        container_data = []
-        for i, container in enumerate(containers):
-            attrs = container.attrs
-            state = attrs.get('State', {})
-            print(f"[api_containers] Processing container {i+1}/{len(containers)}: ID={container.short_id}, Name={container.name}")
-
-            # Format port mappings
-            port_info = []
-            port_settings = attrs.get('NetworkSettings', {}).get('Ports') or {}
-            for container_port, host_bindings in port_settings.items():
-                if host_bindings:
-                    for binding in host_bindings:
-                        host_ip = binding.get('HostIp', '0.0.0.0')
-                        host_port = binding.get('HostPort', '')
-                        port_info.append(f"{host_ip}:{host_port}->{container_port}")
-                else:
-                    port_info.append(f"{container_port}(unmapped)")
-            
-            print(f"[api_containers]   - Ports: {', '.join(port_info) if port_info else 'N/A'}")
-
-            container_data.append({
-                "id": container.short_id,
-                "name": container.name,
-                "image": attrs.get('Config', {}).get('Image', 'unknown'),
-                "status": attrs.get('Status', state.get('Status', 'unknown')),
-                "created": attrs.get('Created'),
-                "ports": ", ".join(port_info),
-                "state": state.get('Status', 'unknown').lower()
-            })
-        print(f"[api_containers] Finished processing. Returning data for {len(container_data)} containers.")
-        return jsonify(container_data)
+        if filters or not inventory_enabled:
+            client = get_docker_client()
+            list_args = {'all': True, 'filters': filters or None}
+            if limit is not None and sort_field is None:
+                # The daemon already returns newest first, so only fetch what this page
+                # needs plus one row to tell whether there is a next page.
+                list_args['limit'] = offset + limit + 1
+            rows = client.api.containers(**list_args)
+        else:
+            # Unfiltered listings come from the event-fed inventory, newest first
+            # like the daemon returns them.
+            rows = list_host_objects('containers')
+            if sort_field is None:
+                rows.sort(key=CONTAINER_SORT_KEYS['created'], reverse=True)
+
+        if sort_field is not None:
+            rows.sort(key=CONTAINER_SORT_KEYS[sort_field], reverse=descending)
+        page, next_cursor = paginate(rows, limit, offset)
+
+        response = jsonify([format_container_row(row) for row in page])
+        if next_cursor:
+            response.headers['X-Next-Cursor'] = next_cursor
+        return response
     except Exception as e:
-        print(f"--- ERROR in api_containers: {str(e)} ---")
+        logger.warning(f"containers: list failed: {e}")
         return jsonify({"error": "Failed to fetch containers", "details": str(e)}), 500
     finally:
         if client:
-            print("[api_containers] Closing Docker client.")
             client.close()
-        print("--- END DEBUG: api_containers ---")
+
+
+@main.route('/api/containers/<container_id>', methods=['GET'])
+def api_inspect_container(container_id):
+    """Full inspect document for one container, fetched only on demand."""
+    client = None
+    try:
+        client = get_docker_client()
+        return jsonify(client.api.inspect_container(container_id))
+    except docker.errors.NotFound:
+        return jsonify({"error": "Container not found"}), 404
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+    finally:
+        if client:
+            client.close()
+
+
+def build_create_args(data, replicas=1):
+    """
+    docker-py containers.create() arguments for a create request, without
+    `ports`: host ports come back separately as {container port: spec} (see
+    parse_host_port), since replicas each get their own. Raises ValueError
+    for invalid input.
+    """
+    create_args = {
+        'image': data['image'],
+        'name': data.get('name') or None,
+        'command': data.get('command') or None,
+        'detach': True,  # Always run in detached mode
+    }
+
+    # Environment variables
+    env_vars = data.get('env', [])
+    if any(item.get('key') for item in env_vars):
+        create_args['environment'] = [
+            f"{item['key']}={item['value']}" for item in env_vars if item.get('key')
+        ]
+
+    # Port bindings
+    port_specs = {}
+    for item in data.get('ports', []):
+        if item.get('containerPort'):
+            container_port_str = str(item['containerPort'])
+            if '/tcp' not in container_port_str and '/udp' not in container_port_str:
+                container_port_str += '/tcp'
+            port_specs[container_port_str] = parse_host_port(item.get('hostPort'), replicas)
+
+    # Volume mounts
+    volumes = data.get('volumes', [])
+    if any(item.get('hostPath') for item in volumes):
+        create_args['volumes'] = {
+            item['hostPath']: {'bind': item['containerPath'], 'mode': 'rw'}
+            for item in volumes if item.get('hostPath') and item.get('containerPath')
+        }
+
+    # Restart policy
+    restart_policy = data.get('restartPolicy')
+    if restart_policy and restart_policy != 'no':
+        create_args['restart_policy'] = {'Name': restart_policy}
+
+    # Network
+    if data.get('network'):
+        create_args['network'] = data['network']
+    return create_args, port_specs
+
+
+def create_replicas_response(data, create_args, port_specs, replicas):
+    """
+    Streamed creation of `replicas` copies of one container spec.
+
+    The image is made present once (pulled through the shared pull broker
+    if missing), then the replicas are created and started in parallel,
+    `concurrency` (default BULK_DEFAULT_CONCURRENCY) at a time. `name` may
+    contain `{n}` for the 1-based replica number, otherwise `-n` is
+    appended. A host port given as a range hands each replica the next
+    free port in it; an empty one lets the daemon pick. If more than
+    `max_failures` (default 0) replicas fail, the ones already created are
+    removed again.
+
+    Events are NDJSON lines (or SSE with ?format=sse / Accept:
+    text/event-stream): `{"stage": "image", ...}`, one result per replica,
+    `{"stage": "rollback", ...}` per removed replica, then a `done` summary.
+    While the image is pulled, each docker pull chunk comes as
+    `{"stage": "image", "status": "pulling", "progress": chunk}`, and an
+    empty line (an SSE comment) is sent when the pull shows no progress.
+    """
+    docker_config = session.get('docker_config')
+    if not docker_config:
+        return jsonify({"error": "Not connected to any Docker host. Please connect first."}), 401
+    try:
+        concurrency = min(max(int(data.get('concurrency') or BULK_DEFAULT_CONCURRENCY), 1), BULK_MAX_CONCURRENCY)
+        max_failures = max(int(data.get('max_failures') or 0), 0)
+    except (TypeError, ValueError):
+        return jsonify({"error": "concurrency and max_failures must be numbers"}), 400
+
+    config = dict(docker_config)
+    image = create_args['image']
+    name_template = create_args.pop('name')
+    sse = request.args.get('format') == 'sse' or 'text/event-stream' in request.headers.get('Accept', '')
+    encode = sse_frame if sse else (lambda payload: json.dumps(payload) + '\n')
+    keepalive = ": keepalive\n\n" if sse else '\n'
+    logger.info(f"create_container: {replicas} replicas of {image}, concurrency {concurrency}")
+
+    def generate():
+        started = time.monotonic()
+        created = failed = rolled_back = 0
+        client = None
+        try:
+            try:
+                resolve_image(image, config)
+                yield encode({'stage': 'image', 'image': image, 'status': 'present'})
+            except docker.errors.ImageNotFound:
+                repository, tag = docker.utils.parse_repository_tag(image)
+                yield encode({'stage': 'image', 'image': image, 'status': 'pulling'})
+                job = image_pulls.join(docker_pool_key(config), config, repository, tag or 'latest')
+                for chunks, result in job.updates(image_pulls.min_interval):
+                    if not chunks and result is None:
+                        yield keepalive
+                    for chunk in chunks:
+                        yield encode({'stage': 'image', 'image': image, 'status': 'pulling', 'progress': chunk})
+                if 'error' in result:
+                    yield encode({'stage': 'image', 'image': image, 'status': 'failed', 'error': result['error']})
+                    return
+                yield encode({'stage': 'image', 'image': image, 'status': 'pulled'})
+
+            used_ports = set()
+            if any(isinstance(spec, tuple) for spec in port_specs.values()):
+                for row in list_host_objects('containers', config=config):
+                    used_ports.update(p['PublicPort'] for p in row.get('Ports') or () if p.get('PublicPort'))
+
+            client = get_docker_client(config=config)
+            for result in create_replicas(
+                bulk_executor, client, create_args, port_specs, replicas, name_template,
+                concurrency, max_failures, PortAllocator(used_ports),
+            ):
+                if result.get('stage') == 'rollback':
+                    rolled_back += result['ok']
+                elif result['ok']:
+                    created += 1
+                else:
+                    failed += 1
+                yield encode(result)
+        except Exception as e:
+            logger.exception('create_container: replicas failed')
+            yield encode({'error': str(e)})
+        finally:
+            if client:
+                client.close()
+        logger.info(
+            f"create_container: {created} of {replicas} replicas of {image} started, {failed} failed, "
+            f"{rolled_back} rolled back in {time.monotonic() - started:.1f}s"
+        )
+        yield encode({
+            'done': True, 'requested': replicas, 'created': created - rolled_back, 'failed': failed,
+            'rolled_back': rolled_back, 'elapsed_ms': round((time.monotonic() - started) * 1000, 1),
+        })
+
+    if sse:
+        return Response(
+            track_stream('/api/containers/create', generate()),
+            mimetype='text/event-stream',
+            headers={'Cache-Control': 'no-cache', 'Connection': 'keep-alive', 'X-Accel-Buffering': 'no'}
+        )
+    return Response(generate(), mimetype='application/x-ndjson', headers={'X-Accel-Buffering': 'no'})
 
 
 @main.route('/api/containers/create', methods=['POST'])
 def create_container():
-    print("--- DEBUG: create_container ---")
+    """Create and start one container, or stream the creation of `replicas` of it (see create_replicas_response)."""
     client = None
     try:
         data = request.get_json()
-        print(f"[create_container] Received payload: {json.dumps(data, indent=2)}")
         if not data:
-            print("[create_container] ERROR: Invalid JSON payload.")
             return jsonify({"error": "Invalid JSON payload"}), 400
 
         image = data.get('image')
         if not image:
-            print("[create_container] ERROR: Image is a required field.")
             return jsonify({"error": "Image is a required field"}), 400
 
-        # --- Prepare arguments for docker-py's create() method ---
-        create_args = {
-            'image': image,
-            'name': data.get('name') or None,
-            'command': data.get('command') or None,
-            'detach': True,  # Always run in detached mode
-        }
-        print(f"[create_container] Basic args: Image='{create_args['image']}', Name='{create_args['name']}'")
-
-        # Environment variables
-        env_vars = data.get('env', [])
-        if any(item.get('key') for item in env_vars):
-            create_args['environment'] = [
-                f"{item['key']}={item['value']}" for item in env_vars if item.get('key')
-            ]
-            print(f"[create_container]   - Env vars: {create_args['environment']}")
-
-        # Port bindings
-        ports = data.get('ports', [])
-        if any(item.get('containerPort') for item in ports):
-            port_bindings = {}
-            for item in ports:
-                if item.get('containerPort'):
-                    container_port_str = str(item['containerPort'])
-                    if '/tcp' not in container_port_str and '/udp' not in container_port_str:
-                        container_port_str += '/tcp'
-                    port_bindings[container_port_str] = int(item['hostPort']) if item.get('hostPort') else None
-            create_args['ports'] = port_bindings
-            print(f"[create_container]   - Port bindings: {port_bindings}")
-
-        # Volume mounts
-        volumes = data.get('volumes', [])
-        if any(item.get('hostPath') for item in volumes):
-            create_args['volumes'] = {
-                item['hostPath']: {'bind': item['containerPath'], 'mode': 'rw'}
-                for item in volumes if item.get('hostPath') and item.get('containerPath')
+        try:
+            replicas = int(data.get('replicas') or 1)
+            if not 1 <= replicas <= REPLICAS_MAX:
+                raise ValueError(f"replicas must be between 1 and {REPLICAS_MAX}")
+            create_args, port_specs = build_create_args(data, replicas)
+        except (TypeError, ValueError) as e:
+            return jsonify({"error": str(e)}), 400
+        if replicas > 1:
+            return create_replicas_response(data, create_args, port_specs, replicas)
+        if port_specs:
+            # A range on a single container is left to the daemon to pick from
+            create_args['ports'] = {
+                port: f"{spec[0]}-{spec[1]}" if isinstance(spec, tuple) else spec for port, spec in port_specs.items()
             }
-            print(f"[create_container]   - Volumes: {create_args['volumes']}")
-
-        # Restart policy
-        restart_policy = data.get('restartPolicy')
-        if restart_policy and restart_policy != 'no':
-            create_args['restart_policy'] = {'Name': restart_policy}
-            print(f"[create_container]   - Restart policy: {create_args['restart_policy']}")
-
-        # Network
-        if data.get('network'):
-            create_args['network'] = data['network']
-            print(f"[create_container]   - Network: {create_args['network']}")
 
         # --- Create and start the container ---
-        print("[create_container] Getting Docker client...")
+        if logger.isEnabledFor(logging.DEBUG):
+            # Environment values can hold secrets; only their names are logged
+            logger.debug(
+                f"create_container: image={image} name={create_args['name']} "
+                f"env={[e.split('=', 1)[0] for e in create_args.get('environment', [])]} "
+                f"ports={create_args.get('ports')} volumes={list(create_args.get('volumes') or ())} "
+                f"restart={create_args.get('restart_policy')} network={create_args.get('network')}"
+            )
         client = get_docker_client()
-        print(f"[create_container] Docker client obtained. Creating container with args: {create_args}")
         container = client.containers.create(**create_args)
-        print(f"[create_container] Container '{container.name}' ({container.id}) created. Starting it...")
         container.start()
-        print(f"[create_container] Container '{container.name}' started successfully.")
+        logger.info(f"create_container: started {container.name} ({container.short_id}) from {image}")
 
         return jsonify({"message": f"Container '{container.name}' created successfully.", "id": container.id}), 201
 
     except Exception as e:
         error_message = str(e)
-        print(f"--- ERROR in create_container: {error_message} ---")
+        logger.warning(f"create_container: failed: {error_message}")
         if "Conflict" in error_message and "is already in use by container" in error_message:
             error_message = "A container with this name already exists."
         return jsonify({"error": "Failed to create container", "details": error_message}), 500
     finally:
         if client:
-            print("[create_container] Closing Docker client.")
             try:
                 client.close()
             except Exception:
                 pass
-        print("--- END DEBUG: create_container ---")
 
 
 @main.route('/api/containers/<container_id>/start', methods=['POST'])
 def start_container(container_id):
-    print(f"--- DEBUG: start_container (ID: {container_id}) ---")
     client = None
     try:
-        print(f"[start_container] Getting Docker client...")
         client = get_docker_client()
-        print(f"[start_container] Docker client obtained. Getting container '{container_id}'...")
         container = client.containers.get(container_id)
-        print(f"[start_container] Found container '{container.name}'. Starting it...")
         container.start()
-        print(f"[start_container] Container '{container.name}' started successfully.")
+        logger.info(f"start_container: started {container.name}")
         return jsonify({"message": f"Container '{container.name}' started successfully."})
     except Exception as e:
-        print(f"--- ERROR in start_container: {str(e)} ---")
+        logger.warning(f"start_container: {container_id}: {e}")
         return jsonify({"error": str(e)}), 500
     finally:
         if client:
-            print("[start_container] Closing Docker client.")
             client.close()
-        print(f"--- END DEBUG: start_container (ID: {container_id}) ---")
 
 
 @main.route('/api/containers/<container_id>/stop', methods=['POST'])
@@ -836,26 +1542,120 @@ def stop_container(container_id):
 
 @main.route('/api/containers/<container_id>', methods=['DELETE'])
 def delete_container(container_id):
-    print(f"--- DEBUG: delete_container (ID: {container_id}) ---")
     client = None
     try:
-        print(f"[delete_container] Getting Docker client...")
         client = get_docker_client()
-        print(f"[delete_container] Docker client obtained. Getting container '{container_id}'...")
         container = client.containers.get(container_id)
         container_name = container.name
-        print(f"[delete_container] Found container '{container_name}'. Removing it forcefully...")
         container.remove(force=True)
-        print(f"[delete_container] Container '{container_name}' removed successfully.")
+        logger.info(f"delete_container: removed {container_name}")
         return jsonify({"message": f"Container '{container_name}' was removed."})
     except Exception as e:
-        print(f"--- ERROR in delete_container: {str(e)} ---")
+        logger.warning(f"delete_container: {container_id}: {e}")
         return jsonify({"error": str(e)}), 500
     finally:
         if client:
-            print("[delete_container] Closing Docker client.")
             client.close()
-        print(f"--- END DEBUG: delete_container (ID: {container_id}) ---")
+
+
+@main.route('/api/containers/bulk', methods=['POST'])
+def bulk_containers():
+    """
+    Run one lifecycle action on many containers and stream each result as it completes.
+
+    The JSON body names an `action` (start, stop, restart, kill or delete)
+    and either `ids` or a selector: `label` (key or key=value) and/or
+    `name`, each a string or a list, evaluated by the daemon. A selector
+    only picks containers the action changes: start picks created or exited
+    ones, stop and kill running ones.
+
+    `concurrency` (default BULK_DEFAULT_CONCURRENCY, at most
+    BULK_MAX_CONCURRENCY) caps the operations in flight, `timeout` (default
+    30) is the per-container limit in seconds and `stop_timeout` (default
+    10) the grace period for stop/restart before the daemon kills.
+
+    Results are NDJSON lines `{"id", "action", "ok", "error"?, "elapsed_ms"}`
+    followed by a `{"done": true, ...}` summary, or SSE events of the same
+    objects when the client accepts text/event-stream or passes ?format=sse.
+    """
+    docker_config = session.get('docker_config')
+    if not docker_config:
+        return jsonify({"error": "Not connected to any Docker host. Please connect first."}), 401
+
+    data = request.get_json(silent=True) or {}
+    action = (data.get('action') or '').strip().lower()
+    if action not in BULK_ACTIONS:
+        return jsonify({"error": f"action must be one of {', '.join(BULK_ACTIONS)}"}), 400
+    try:
+        concurrency = min(max(int(data.get('concurrency') or BULK_DEFAULT_CONCURRENCY), 1), BULK_MAX_CONCURRENCY)
+        timeout = min(max(float(data.get('timeout') or 30), 1.0), 600.0)
+        stop_timeout = min(max(int(data.get('stop_timeout', 10)), 0), 600)
+    except (TypeError, ValueError):
+        return jsonify({"error": "concurrency, timeout and stop_timeout must be numbers"}), 400
+
+    def as_list(value):
+        return [value] if isinstance(value, str) else [v for v in (value or []) if v]
+
+    ids = as_list(data.get('ids'))
+    labels, names = as_list(data.get('label')), as_list(data.get('name'))
+    config = dict(docker_config)
+    if not ids:
+        if not labels and not names:
+            return jsonify({"error": "Provide ids or a label/name selector"}), 400
+        # Resolved by the daemon rather than the inventory, so a selector sees
+        # the effect of a bulk action that has just finished
+        filters = {'label': labels, 'name': names}
+        statuses = {'start': ['created', 'exited'], 'stop': ['running'], 'kill': ['running']}.get(action)
+        if statuses:
+            filters['status'] = statuses
+        client = None
+        try:
+            client = get_docker_client(config=config)
+            ids = [row['Id'] for row in client.api.containers(all=True, filters={k: v for k, v in filters.items() if v})]
+        except Exception as e:
+            return jsonify({"error": "Failed to fetch containers", "details": str(e)}), 500
+        finally:
+            if client:
+                client.close()
+    ids = list(dict.fromkeys(ids))
+    if len(ids) > BULK_MAX_ITEMS:
+        return jsonify({"error": f"At most {BULK_MAX_ITEMS} containers per request"}), 400
+
+    sse = request.args.get('format') == 'sse' or 'text/event-stream' in request.headers.get('Accept', '')
+    encode = sse_frame if sse else (lambda payload: json.dumps(payload) + '\n')
+    logger.info(f"bulk {action}: {len(ids)} containers, concurrency {concurrency}")
+
+    def generate():
+        started = time.monotonic()
+        succeeded = failed = 0
+        client = None
+        try:
+            client = get_docker_client(config=config)
+            for result in run_bulk(bulk_executor, client.api, action, ids, concurrency, timeout, stop_timeout):
+                if result['ok']:
+                    succeeded += 1
+                else:
+                    failed += 1
+                yield encode(result)
+        except Exception as e:
+            logger.exception(f"bulk {action} failed")
+            yield encode({'error': str(e)})
+        finally:
+            if client:
+                client.close()
+        logger.info(f"bulk {action}: {succeeded} succeeded, {failed} failed in {time.monotonic() - started:.1f}s")
+        yield encode({
+            'done': True, 'action': action, 'total': len(ids), 'succeeded': succeeded, 'failed': failed,
+            'elapsed_ms': round((time.monotonic() - started) * 1000, 1),
+        })
+
+    if sse:
+        return Response(
+            track_stream('/api/containers/bulk', generate()),
+            mimetype='text/event-stream',
+            headers={'Cache-Control': 'no-cache', 'Connection': 'keep-alive', 'X-Accel-Buffering': 'no'}
+        )
+    return Response(generate(), mimetype='application/x-ndjson', headers={'X-Accel-Buffering': 'no'})
 
 
 @main.route('/api/containers/<container_id>/stats', methods=['GET'])
@@ -866,69 +1666,146 @@ def stream_container_stats(container_id):
         return jsonify({"error": "Not connected to any Docker host. Please connect first."} ), 401
 
     def generate(config):
-        logger.debug(f"stats.generate starting for container={container_id}")
-        client = None
+        logger.debug(f"stats.generate subscribing to container={container_id}")
+        subscription = stats_broker.subscribe(docker_pool_key(config), config, container_id)
         try:
-            client = get_docker_client(config=config)
-            container = client.containers.get(container_id)
-            for stat in container.stats(stream=True, decode=True):
-                cpu_stats = stat.get('cpu_stats', {})
-                pre_cpu_stats = stat.get('precpu_stats', {})
-                
-                cpu_usage = cpu_stats.get('cpu_usage', {})
-                pre_cpu_usage = pre_cpu_stats.get('cpu_usage', {})
-
-                cpu_delta = cpu_usage.get('total_usage', 0) - pre_cpu_usage.get('total_usage', 0)
-                system_delta = cpu_stats.get('system_cpu_usage', 0) - pre_cpu_stats.get('system_cpu_usage', 0)
-                
-                cpu_percent = 0.0
-                if system_delta > 0 and cpu_delta > 0:
-                    online_cpus = cpu_stats.get('online_cpus', len(cpu_usage.get('percpu_usage', [])))
-                    if online_cpus > 0:
-                        cpu_percent = (cpu_delta / system_delta) * online_cpus * 100.0
-
-                memory_stats = stat.get('memory_stats', {})
-                mem_usage = memory_stats.get('usage', 0)
-                mem_limit = memory_stats.get('limit', 1)
-                mem_percent = (mem_usage / mem_limit) * 100 if mem_limit > 0 else 0
-
-                networks = {}
-                if 'networks' in stat:
-                    for net_name, net_data in stat['networks'].items():
-                        networks[net_name] = {
-                            'rx': net_data.get('rx_bytes', 0),
-                            'tx': net_data.get('tx_bytes', 0)
-                        }
-
-                output = {
-                    "timestamp": stat.get('read'),
-                    "cpu_percent": round(cpu_percent, 2),
-                    "memory_mb": {
-                        "usage": mem_usage // (1024 * 1024),
-                        "limit": mem_limit // (1024 * 1024),
-                        "percent": round(mem_percent, 2)
-                    },
-                    "network": networks,
-                    "block_io": stat.get('blkio_stats', {}),
-                    "pids": stat.get('pids_stats', {}).get('current', 0)
-                }
-                # print(f"[Backend Stats] Raw stat: {stat}")
-                yield f"data: {json.dumps(output)}\\n\n"
-        except docker.errors.NotFound:
-            logger.warning(f"stats.generate: container not found {container_id}")
-            yield f"data: {json.dumps({'error': 'Container not found'})}\n\n"
+            for frame in subscription:
+                yield frame
+        finally:
+            subscription.close()
+
+    return Response(
+        track_stream('/api/containers/<id>/stats', generate(dict(docker_config))),
+        mimetype='text/event-stream',
+        headers={'Cache-Control': 'no-cache', 'Connection': 'keep-alive', 'X-Accel-Buffering': 'no'}
+    )
+
+
+@main.route('/api/containers/<container_id>/stats/history', methods=['GET'])
+def container_stats_history(container_id):
+    """
+    Recorded metrics for one container as columnar arrays.
+
+    `from` and `to` are epoch seconds (default: the last 5 minutes) and
+    `step` the wanted spacing in seconds; the response's `step` is the one
+    actually used, which is never finer than the stored resolution.
+
+    History is recorded every second while a stats stream for the container
+    is open. Otherwise running containers are sampled every
+    STATS_HISTORY_SAMPLE_INTERVAL seconds, but only on hosts whose
+    inventory is running (it stops after INVENTORY_IDLE_TIMEOUT seconds
+    without list requests) and not with DOCKER_INVENTORY=0. Periods outside
+    those have no history.
+    """
+    docker_config = session.get('docker_config')
+    if not docker_config:
+        return jsonify({"error": "Not connected to any Docker host. Please connect first."} ), 401
+    try:
+        end = float(request.args.get('to') or time.time())
+        start = float(request.args.get('from') or end - 300)
+        step = float(request.args['step']) if request.args.get('step') else None
+    except ValueError:
+        return jsonify({"error": "from, to and step must be numbers"}), 400
+    if start > end or (step is not None and step <= 0):
+        return jsonify({"error": "Invalid time range"}), 400
+
+    series = stats_history.find(docker_pool_key(docker_config), container_id)
+    if series is None:
+        return jsonify({"error": "No history recorded for this container"}), 404
+    return jsonify(series.query(start, end, step))
+
+
+def row_matches(row, labels, names):
+    """In-memory equivalent of the daemon's `label` and `name` container filters."""
+    row_labels = row.get('Labels') or {}
+    for label in labels:
+        key, sep, value = label.partition('=')
+        if key not in row_labels or (sep and row_labels[key] != value):
+            return False
+    if names:
+        name = container_name(row)
+        if not any(n in name for n in names):
+            return False
+    return True
+
+
+@main.route('/api/stats', methods=['GET'])
+def stream_host_stats():
+    """
+    Live CPU/memory/network/PIDs table for every running container on the host.
+
+    Every `interval` seconds (default 2) sends one SSE frame: the full table
+    first, then only the cells that changed. `label` (key or key=value) and
+    `name` narrow the set of containers and may be repeated. Samples come
+    from the shared per-container stats streams, so viewers of this table
+    and of /api/containers/<id>/stats reuse the same daemon streams.
+    """
+    docker_config = session.get('docker_config')
+    if not docker_config:
+        return jsonify({"error": "Not connected to any Docker host. Please connect first."} ), 401
+    try:
+        interval = min(max(float(request.args.get('interval', 2)), 0.5), 60.0)
+    except ValueError:
+        return jsonify({"error": "interval must be a number of seconds"}), 400
+    labels = [v for v in request.args.getlist('label') if v]
+    names = [v for v in request.args.getlist('name') if v]
+
+    def running_containers(config):
+        if inventory_enabled:
+            rows = list_host_objects('containers', config=config)
+            return [r for r in rows if r.get('State') == 'running' and row_matches(r, labels, names)]
+        filters = {'status': ['running']}
+        if labels:
+            filters['label'] = labels
+        if names:
+            filters['name'] = names
+        client = get_docker_client(config=config)
+        try:
+            return client.api.containers(filters=filters)
+        finally:
+            client.close()
+
+    def generate(config):
+        key = docker_pool_key(config)
+        subscriptions = {}
+        table = StatsTable()
+        last_sent = 0.0
+        try:
+            while True:
+                running = {row['Id']: container_name(row) for row in running_containers(config)}
+                for cid in list(subscriptions):
+                    if cid not in running or not subscriptions[cid].active:
+                        subscriptions.pop(cid).close()
+                for cid in running:
+                    if cid not in subscriptions:
+                        subscriptions[cid] = stats_broker.subscribe(key, config, cid)
+
+                rows = {}
+                for cid, subscription in subscriptions.items():
+                    sample = subscription.latest_sample
+                    if sample is not None:
+                        rows[cid[:12]] = stats_table_row(running[cid], sample)
+
+                payload = table.update(rows)
+                now = time.monotonic()
+                if payload is not None:
+                    payload['interval'] = interval
+                    yield sse_frame(payload)
+                    last_sent = now
+                elif now - last_sent >= 15:
+                    # Comment frame so dead connections are noticed
+                    yield ": keepalive\n\n"
+                    last_sent = now
+                time.sleep(interval)
         except Exception as e:
-            logger.exception('stats.generate error')
-            yield f"data: {json.dumps({'error': f'Stream failed: {str(e)}'})}\n\n"
+            logger.exception('host stats stream error')
+            yield sse_frame({'error': f'Stream failed: {str(e)}'})
         finally:
-            if client:
-                try:
-                    client.close()
-                except Exception:
-                    pass
+            for subscription in subscriptions.values():
+                subscription.close()
 
     return Response(
-        generate(docker_config),
+        track_stream('/api/stats', generate(dict(docker_config))),
         mimetype='text/event-stream',
         headers={'Cache-Control': 'no-cache', 'Connection': 'keep-alive', 'X-Accel-Buffering': 'no'}
     )
@@ -944,6 +1821,7 @@ def api_delete_image():
     try:
         client = get_docker_client()
         client.images.remove(image_id, force=True)
+        image_refs.invalidate((docker_pool_key(session['docker_config']), image_id))
         return jsonify({"message": f"Image {image_id} deleted"})
     except Exception as e:
         return jsonify({"error": str(e)}), 500
@@ -952,4 +1830,320 @@ def api_delete_image():
             try:
                 client.close()
             except Exception:
-                pass
\ No newline at end of file
+                pass
+
+
+# ---------- Container files ----------
+# zlib level for ?compress=gzip downloads, which are compressed while they stream;
+# level 1 is several times faster than the default 6 and only slightly larger
+ARCHIVE_GZIP_LEVEL = int(os.environ.get('ARCHIVE_GZIP_LEVEL', 1))
+
+
+def container_path_arg():
+    """The absolute in-container `path` query argument. Raises ValueError."""
+    path = (request.args.get('path') or '').strip()
+    if not path.startswith('/'):
+        raise ValueError('path must be an absolute path in the container')
+    return path
+
+
+def attachment_header(filename):
+    """Content-Disposition for a download, with an ASCII fallback name for old clients."""
+    fallback = filename.encode('ascii', 'replace').decode().replace('"', '_').replace('\\', '_')
+    return f"attachment; filename=\"{fallback}\"; filename*=UTF-8''{quote(filename)}"
+
+
+def streamed_response(client, archive, chunks, **kwargs):
+    """
+    Response streaming `chunks` read from the Docker `archive` response.
+    When the WSGI server closes it (finished or abandoned), the archive
+    stream is closed and the client goes back to the pool.
+    """
+    response = Response(chunks, **kwargs)
+
+    @response.call_on_close
+    def release():
+        archive.close()
+        client.close()
+
+    return response
+
+
+@main.route('/api/containers/<container_id>/files', methods=['GET'])
+def api_container_files(container_id):
+    """
+    Entries directly inside a directory of a container (?path=), with
+    `limit`/`cursor` paging and the next cursor in X-Next-Cursor.
+
+    The listing is read from the tar headers of the directory's archive;
+    file contents stream past unparsed, and the transfer is cut off once
+    the page plus one more entry has been seen.
+    """
+    try:
+        path = container_path_arg()
+        limit = parse_limit(request.args.get('limit'), default=200)
+        offset = decode_cursor(request.args.get('cursor'))
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    client = None
+    try:
+        client = get_docker_client()
+        archive, stat = open_archive(client.api, container_id, path)
+        if stat is None or stat['type'] != 'directory':
+            archive.close()
+            return jsonify({"error": f"{path} is not a directory"}), 400
+        entries = list_directory(archive, archive_root(stat), max_entries=offset + limit + 1)
+        page, next_cursor = paginate(entries, limit, offset)
+        response = jsonify({"path": path, "entries": page})
+        if next_cursor:
+            response.headers['X-Next-Cursor'] = next_cursor
+        return response
+    except docker.errors.NotFound as e:
+        return jsonify({"error": e.explanation or "Not found"}), 404
+    except docker.errors.APIError as e:
+        return jsonify({"error": e.explanation or str(e)}), e.status_code or 500
+    except Exception as e:
+        logger.warning(f"files: listing {path} in {container_id[:12]} failed: {e}")
+        return jsonify({"error": str(e)}), 500
+    finally:
+        if client:
+            client.close()
+
+
+@main.route('/api/containers/<container_id>/archive', methods=['GET'])
+def api_download_archive(container_id):
+    """
+    Download a file or directory from a container as a tar archive
+    (?path=), or as .tar.gz with ?compress=gzip, compressed on the fly.
+    The archive is relayed chunk by chunk as the daemon produces it.
+    """
+    try:
+        path = container_path_arg()
+        compress = request.args.get('compress') or None
+        if compress not in (None, 'gzip'):
+            raise ValueError("compress must be 'gzip'")
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    client = None
+    try:
+        client = get_docker_client()
+        archive, stat = open_archive(client.api, container_id, path)
+        filename = f"{archive_root(stat).strip('.') or 'root'}.tar" + ('.gz' if compress else '')
+        response = streamed_response(
+            client, archive, iter_archive(archive, compress, ARCHIVE_GZIP_LEVEL),
+            mimetype='application/gzip' if compress else 'application/x-tar',
+            headers={'Content-Disposition': attachment_header(filename), 'X-Accel-Buffering': 'no'},
+        )
+        client = None
+        return response
+    except docker.errors.NotFound as e:
+        return jsonify({"error": e.explanation or "Not found"}), 404
+    except docker.errors.APIError as e:
+        return jsonify({"error": e.explanation or str(e)}), e.status_code or 500
+    except Exception as e:
+        logger.warning(f"archive: download of {path} from {container_id[:12]} failed: {e}")
+        return jsonify({"error": str(e)}), 500
+    finally:
+        if client:
+            client.close()
+
+
+@main.route('/api/containers/<container_id>/file', methods=['GET'])
+def api_download_file(container_id):
+    """
+    Download one regular file from a container (?path=); a symlink is
+    followed once. Single `Range: bytes=` requests get a 206 (or 416), and
+    If-Range is checked against an ETag built from the file's size and
+    mtime, so interrupted downloads can resume. HEAD is answered from a
+    stat without transferring the file.
+    """
+    try:
+        path = container_path_arg()
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    client = archive = None
+    try:
+        client = get_docker_client()
+        api = client.api
+
+        def fetch(file_path):
+            if request.method == 'HEAD':
+                return None, stat_path(api, container_id, file_path)
+            return open_archive(api, container_id, file_path)
+
+        archive, stat = fetch(path)
+        if stat and stat['type'] == 'symlink':
+            if archive is not None:
+                archive.close()
+            path = posixpath.normpath(posixpath.join(posixpath.dirname(path), stat['linkTarget']))
+            archive, stat = fetch(path)
+        if stat is None or stat['type'] != 'file':
+            return jsonify({"error": f"{path} is not a regular file"}), 400
+
+        size = stat['size']
+        etag = hashlib.sha1(f"{container_id}|{path}|{size}|{stat.get('mtime')}".encode()).hexdigest()
+        headers = {
+            'Accept-Ranges': 'bytes', 'ETag': f'"{etag}"',
+            'Content-Disposition': attachment_header(stat['name']),
+        }
+        byte_range = None
+        if 'If-Range' not in request.headers or request.if_range.etag == etag:
+            try:
+                byte_range = parse_range(request.headers.get('Range'), size)
+            except ValueError:
+                headers['Content-Range'] = f"bytes */{size}"
+                return Response(status=416, headers=headers)
+        start, end = byte_range or (0, size - 1)
+        headers['Content-Length'] = str(end - start + 1)
+        if byte_range:
+            headers['Content-Range'] = f"bytes {start}-{end}/{size}"
+        mimetype = mimetypes.guess_type(stat['name'])[0] or 'application/octet-stream'
+        status = 206 if byte_range else 200
+
+        if archive is None:
+            return Response(status=status, headers=headers, mimetype=mimetype)
+        response = streamed_response(
+            client, archive, iter_file(archive, start, end), status=status, headers=headers, mimetype=mimetype,
+        )
+        client = archive = None
+        return response
+    except docker.errors.NotFound as e:
+        return jsonify({"error": e.explanation or "Not found"}), 404
+    except docker.errors.APIError as e:
+        return jsonify({"error": e.explanation or str(e)}), e.status_code or 500
+    except Exception as e:
+        logger.warning(f"file: download of {path} from {container_id[:12]} failed: {e}")
+        return jsonify({"error": str(e)}), 500
+    finally:
+        if archive is not None:
+            archive.close()
+        if client:
+            client.close()
+
+
+@main.route('/api/containers/<container_id>/archive', methods=['PUT'])
+def api_upload_archive(container_id):
+    """
+    Extract an uploaded tar archive (plain, gzip, bzip2 or xz) into a
+    directory of a container (?path=). The body is passed on to the
+    daemon as it arrives, as a chunked request. With ?name=<file>, the
+    body is instead the raw contents of one file, which needs a
+    Content-Length and is wrapped in a tar header on the fly.
+    """
+    try:
+        path = container_path_arg()
+        name = request.args.get('name')
+        if name is not None and (not name or '/' in name or name in ('.', '..')):
+            raise ValueError('name must be a plain file name')
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    body = iter_body(request.stream)
+    if name is not None:
+        if request.content_length is None:
+            return jsonify({"error": "Content-Length is required when uploading a single file"}), 411
+        body = tar_single_file(name, request.content_length, body)
+
+    client = None
+    try:
+        client = get_docker_client()
+        client.api.put_archive(container_id, path, body)
+        logger.info(f"archive: extracted upload into {path} in {container_id[:12]}")
+        return jsonify({"message": f"Uploaded to {path}"})
+    except docker.errors.NotFound as e:
+        return jsonify({"error": e.explanation or "Not found"}), 404
+    except docker.errors.APIError as e:
+        return jsonify({"error": e.explanation or str(e)}), e.status_code or 500
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    except Exception as e:
+        logger.warning(f"archive: upload to {path} in {container_id[:12]} failed: {e}")
+        return jsonify({"error": str(e)}), 500
+    finally:
+        if client:
+            client.close()
+
+
+# ---------- Interactive exec (WebSocket) ----------
+def exec_params(ws):
+    """
+    Container, command and terminal size for /ws/exec: from the query
+    string, or else from a first JSON text message shaped like the SSH
+    console's ({containerId, command, cols, rows}).
+    """
+    if request.args.get('container'):
+        return request.args.to_dict()
+    raw = ws.receive(timeout=10)
+    if not raw:
+        raise ValueError('Initial parameters not received within 10s')
+    try:
+        init = json.loads(raw)
+    except ValueError:
+        raise ValueError('Initial parameters must be JSON')
+    return {
+        'container': init.get('containerId') or init.get('container'),
+        'cmd': init.get('command') or init.get('cmd'),
+        'cols': init.get('cols'),
+        'rows': init.get('rows'),
+        'user': init.get('user'),
+        'workdir': init.get('workdir'),
+    }
+
+
+@sock.route('/ws/exec', bp=main)
+def ws_exec(ws):
+    """
+    Interactive shell in a container through the Docker exec API, on the
+    session's pooled (TLS) connection to the host.
+
+    After the parameters, binary and text frames are terminal input, except
+    text {"type": "resize", "cols": .., "rows": ..}. Output arrives as
+    binary frames; the session ends with a text {"type": "exit", "code": ..}
+    message, and failures are sent as {"type": "error", "error": ..}.
+    """
+    def fail(message, reason=1011):
+        ws.send(json.dumps({'type': 'error', 'error': message}))
+        ws.close(reason=reason, message=message[:120])
+
+    try:
+        params = exec_params(ws)
+        container_id = (params.get('container') or '').strip()
+        if not container_id:
+            raise ValueError('container is required')
+        cols = int(params.get('cols') or 80)
+        rows = int(params.get('rows') or 24)
+    except (TypeError, ValueError) as e:
+        return fail(str(e), reason=1008)
+    command = params.get('cmd') or '/bin/sh'
+
+    client = None
+    try:
+        client = get_docker_client()
+        api = client.api
+        exec_id = api.exec_create(
+            container_id, command, stdin=True, tty=True, environment={'TERM': 'xterm-256color'},
+            user=params.get('user') or '', workdir=params.get('workdir') or None,
+        )['Id']
+        stream = api.exec_start(exec_id, tty=True, socket=True)
+        api.exec_resize(exec_id, height=rows, width=cols)
+        logger.info(f"exec session started in {container_id[:12]}: {command} ({cols}x{rows})")
+        ExecBridge(
+            ws, stream,
+            resize=lambda height, width: api.exec_resize(exec_id, height=height, width=width),
+            exec_inspect=lambda: api.exec_inspect(exec_id),
+        ).run()
+    except docker.errors.NotFound:
+        fail('Container not found')
+    except docker.errors.APIError as e:
+        fail(e.explanation or str(e))
+    except Exception as e:
+        logger.exception(f"exec session in {container_id[:12]} failed")
+        fail(str(e))
+    finally:
+        if client:
+            try:
+                client.close()
+            except Exception:
+                pass
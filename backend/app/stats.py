@@ -0,0 +1,290 @@
+# backend/app/stats.py
+
+import json
+import logging
+import threading
+
+import docker
+
+from .telemetry import LogSampler
+
+logger = logging.getLogger(__name__)
+# One stats sample in LOG_SAMPLE_EVERY is logged per container
+sample_sampler = LogSampler()
+
+
+def derive_container_stats(stat):
+    """Turn one raw /containers/<id>/stats document into the UI's CPU/memory/network sample."""
+    cpu_stats = stat.get('cpu_stats', {})
+    pre_cpu_stats = stat.get('precpu_stats', {})
+
+    cpu_usage = cpu_stats.get('cpu_usage', {})
+    pre_cpu_usage = pre_cpu_stats.get('cpu_usage', {})
+
+    cpu_delta = cpu_usage.get('total_usage', 0) - pre_cpu_usage.get('total_usage', 0)
+    system_delta = cpu_stats.get('system_cpu_usage', 0) - pre_cpu_stats.get('system_cpu_usage', 0)
+
+    cpu_percent = 0.0
+    if system_delta > 0 and cpu_delta > 0:
+        online_cpus = cpu_stats.get('online_cpus', len(cpu_usage.get('percpu_usage', [])))
+        if online_cpus > 0:
+            cpu_percent = (cpu_delta / system_delta) * online_cpus * 100.0
+
+    memory_stats = stat.get('memory_stats', {})
+    mem_usage = memory_stats.get('usage', 0)
+    mem_limit = memory_stats.get('limit', 1)
+    mem_percent = (mem_usage / mem_limit) * 100 if mem_limit > 0 else 0
+
+    networks = {}
+    if 'networks' in stat:
+        for net_name, net_data in stat['networks'].items():
+            networks[net_name] = {
+                'rx': net_data.get('rx_bytes', 0),
+                'tx': net_data.get('tx_bytes', 0)
+            }
+
+    return {
+        "timestamp": stat.get('read'),
+        "cpu_percent": round(cpu_percent, 2),
+        "memory_mb": {
+            "usage": mem_usage // (1024 * 1024),
+            "limit": mem_limit // (1024 * 1024),
+            "percent": round(mem_percent, 2)
+        },
+        "network": networks,
+        "block_io": stat.get('blkio_stats', {}),
+        "pids": stat.get('pids_stats', {}).get('current', 0)
+    }
+
+
+def sse_frame(payload):
+    return f"data: {json.dumps(payload)}\n\n"
+
+
+class StatsSubscription:
+    """
+    One viewer of a shared stats stream.
+
+    Holds only the most recent frame: a subscriber that falls behind skips
+    to the latest sample instead of queueing. Iterating yields frames until
+    the upstream ends; close() detaches from the broker.
+    """
+
+    def __init__(self, channel):
+        self._channel = channel
+        self._frame = None
+        self._done = False
+        self._ready = threading.Event()
+
+    def offer(self, frame, done=False):
+        self._frame = frame
+        self._done = self._done or done
+        self._ready.set()
+
+    def __iter__(self):
+        while True:
+            self._ready.wait()
+            self._ready.clear()
+            frame, self._frame = self._frame, None
+            if frame is not None:
+                yield frame
+            if self._done and self._frame is None:
+                return
+
+    @property
+    def latest_sample(self):
+        """Most recent derived sample of the shared stream, or None before the first one."""
+        return self._channel.last_sample
+
+    @property
+    def active(self):
+        return not self._channel.closed
+
+    def close(self):
+        self._channel.unsubscribe(self)
+
+
+class _StatsChannel:
+    """Single upstream stats stream for one container, fanned out to subscribers."""
+
+    def __init__(self, broker, key, container_id):
+        self.broker = broker
+        self.key = key
+        self.container_id = container_id
+        self.subscribers = set()
+        self.last_frame = None
+        self.last_sample = None
+        self.closed = False
+
+    def subscribe(self):
+        subscription = StatsSubscription(self)
+        self.subscribers.add(subscription)
+        if self.last_frame is not None:
+            # New viewers see the current sample straight away
+            subscription.offer(self.last_frame)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self.broker._lock:
+            self.subscribers.discard(subscription)
+            if not self.subscribers:
+                self.broker._drop_locked(self)
+
+    def publish(self, frame, done=False):
+        with self.broker._lock:
+            self.last_frame = frame
+            subscribers = list(self.subscribers)
+        for subscription in subscribers:
+            subscription.offer(frame, done=done)
+
+    def run(self, config):
+        client = None
+        stream = None
+        try:
+            client = self.broker.client_factory(config)
+            stream = client.api.stats(self.container_id, stream=True, decode=True)
+            for stat in stream:
+                sample = derive_container_stats(stat)
+                self.last_sample = sample
+                self.publish(sse_frame(sample))
+                if logger.isEnabledFor(logging.DEBUG) and sample_sampler.allow(self.container_id):
+                    logger.debug(
+                        f"stats {self.container_id[:12]}: cpu={sample['cpu_percent']}%",
+                        extra={'subscribers': len(self.subscribers),
+                               'sampled_out': sample_sampler.suppressed(self.container_id)},
+                    )
+                for listener in self.broker.listeners:
+                    listener(self.key, stat, sample)
+                if self.closed:
+                    break
+            else:
+                self.publish(sse_frame({'error': 'Stats stream ended'}), done=True)
+        except docker.errors.NotFound:
+            logger.warning(f"stats channel: container not found {self.container_id}")
+            self.publish(sse_frame({'error': 'Container not found'}), done=True)
+        except Exception as e:
+            logger.exception('stats channel error')
+            self.publish(sse_frame({'error': f'Stream failed: {str(e)}'}), done=True)
+        finally:
+            with self.broker._lock:
+                self.broker._drop_locked(self)
+            if stream is not None:
+                try:
+                    stream.close()
+                except Exception:
+                    pass
+            if client:
+                try:
+                    client.close()
+                except Exception:
+                    pass
+
+
+class StatsBroker:
+    """
+    Shares one upstream stats stream per (host, container) between viewers.
+
+    The derived sample is computed and serialized once per tick and the same
+    SSE frame is handed to every subscriber. The upstream is torn down after
+    the last subscriber leaves (at the next sample, since the daemon's stats
+    stream cannot be interrupted between samples). Each callable in
+    `listeners` is called with (key, raw stat, derived sample) once per
+    sample, whatever the number of subscribers.
+    """
+
+    def __init__(self, client_factory):
+        self.client_factory = client_factory
+        self.listeners = []
+        self._channels = {}
+        self._lock = threading.Lock()
+
+    def subscribe(self, key, config, container_id):
+        with self._lock:
+            channel = self._channels.get((key, container_id))
+            start = channel is None
+            if start:
+                channel = self._channels[(key, container_id)] = _StatsChannel(self, key, container_id)
+            subscription = channel.subscribe()
+        if start:
+            threading.Thread(
+                target=channel.run, args=(config,),
+                name=f"stats-{container_id}", daemon=True
+            ).start()
+        return subscription
+
+    def active_streams(self):
+        return len(self._channels)
+
+    def has_stream(self, key, container_id):
+        return (key, container_id) in self._channels
+
+    def _drop_locked(self, channel):
+        channel.closed = True
+        if self._channels.get((channel.key, channel.container_id)) is channel:
+            del self._channels[(channel.key, channel.container_id)]
+
+
+# Columns of the host-wide stats table, in order
+STATS_TABLE_COLUMNS = (
+    'name', 'cpu_percent', 'memory_usage_mb', 'memory_limit_mb', 'memory_percent',
+    'network_rx', 'network_tx', 'pids',
+)
+
+
+def stats_table_row(name, sample):
+    """Flatten a derived sample into the values of STATS_TABLE_COLUMNS."""
+    memory = sample.get('memory_mb', {})
+    networks = (sample.get('network') or {}).values()
+    return (
+        name,
+        sample.get('cpu_percent', 0.0),
+        memory.get('usage', 0),
+        memory.get('limit', 0),
+        memory.get('percent', 0.0),
+        sum(net.get('rx', 0) for net in networks),
+        sum(net.get('tx', 0) for net in networks),
+        sample.get('pids', 0),
+    )
+
+
+class StatsTable:
+    """
+    Tracks what a host-wide stats viewer has already been sent.
+
+    update() takes the current {container_id: row} table and returns the
+    payload to send: the full table the first time, afterwards only the
+    cells that changed plus the containers that went away, or None when
+    nothing changed.
+    """
+
+    def __init__(self):
+        self._rows = None
+
+    def update(self, rows):
+        if self._rows is None:
+            self._rows = dict(rows)
+            return {
+                'type': 'snapshot',
+                'columns': list(STATS_TABLE_COLUMNS),
+                'rows': {cid: list(row) for cid, row in rows.items()},
+            }
+
+        changed = {}
+        for cid, row in rows.items():
+            previous = self._rows.get(cid)
+            if previous is None:
+                changed[cid] = dict(zip(STATS_TABLE_COLUMNS, row))
+            elif previous != row:
+                changed[cid] = {
+                    column: value
+                    for column, value, old in zip(STATS_TABLE_COLUMNS, row, previous)
+                    if value != old
+                }
+        removed = [cid for cid in self._rows if cid not in rows]
+        self._rows = dict(rows)
+        if not changed and not removed:
+            return None
+        payload = {'type': 'delta', 'changed': changed}
+        if removed:
+            payload['removed'] = removed
+        return payload
@@ -0,0 +1,199 @@
+# backend/app/telemetry.py
+
+import atexit
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import threading
+import time
+import uuid
+
+from flask import g, has_request_context, request
+from flask.json.provider import DefaultJSONProvider
+
+# Route timing spans are logged here at DEBUG; enable with ROUTE_TIMING=1
+timing_logger = logging.getLogger('app.timing')
+
+# Attributes every LogRecord has; anything else was passed via `extra=`
+_RECORD_FIELDS = set(vars(logging.LogRecord('', 0, '', 0, '', None, None))) | {'message', 'asctime', 'request_id'}
+
+
+class RequestIdFilter(logging.Filter):
+    """Stamp each record with the ID of the request it was logged under ('-' outside requests)."""
+
+    def filter(self, record):
+        if not hasattr(record, 'request_id'):
+            record.request_id = g.get('request_id', '-') if has_request_context() else '-'
+        return True
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line: time, level, logger, request_id, message and any `extra` fields."""
+
+    converter = time.gmtime
+
+    def format(self, record):
+        entry = {
+            'ts': self.formatTime(record, '%Y-%m-%dT%H:%M:%S') + f".{int(record.msecs):03d}Z",
+            'level': record.levelname,
+            'logger': record.name,
+            'request_id': getattr(record, 'request_id', '-'),
+            'msg': record.getMessage(),
+        }
+        for key, value in vars(record).items():
+            if key not in _RECORD_FIELDS:
+                entry[key] = value
+        if record.exc_info:
+            entry['exc'] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str)
+
+
+class TextFormatter(logging.Formatter):
+    def __init__(self):
+        super().__init__('%(asctime)s %(levelname)s %(name)s [%(request_id)s] %(message)s')
+
+    def format(self, record):
+        line = super().format(record)
+        extra = {k: v for k, v in vars(record).items() if k not in _RECORD_FIELDS}
+        if extra:
+            line += ' ' + ' '.join(f"{k}={v}" for k, v in extra.items())
+        return line
+
+
+def configure_logging():
+    """
+    Route every `app.*` logger through one queue.
+
+    Callers only enqueue the record; a QueueListener thread formats it and
+    writes to stderr, so a slow terminal or pipe never stalls a request or
+    a streaming loop. LOG_LEVEL (default INFO) sets the level, LOG_FORMAT
+    picks 'json' (default) or 'text', and ROUTE_TIMING=1 turns on the
+    per-route timing spans.
+    """
+    root = logging.getLogger('app')
+    if getattr(root, '_queue_listener', None) is not None:
+        return root
+
+    handler = logging.StreamHandler()
+    handler.setFormatter(TextFormatter() if os.environ.get('LOG_FORMAT', 'json') == 'text' else JsonFormatter())
+
+    records = queue.SimpleQueue()
+    queue_handler = logging.handlers.QueueHandler(records)
+    # The request ID has to be read on the calling thread, before the record is queued
+    queue_handler.addFilter(RequestIdFilter())
+    listener = logging.handlers.QueueListener(records, handler, respect_handler_level=True)
+    listener.start()
+    atexit.register(listener.stop)
+
+    root.handlers[:] = [queue_handler]
+    root.setLevel(os.environ.get('LOG_LEVEL', 'INFO').upper())
+    root.propagate = False
+    root._queue_listener = listener
+    if os.environ.get('ROUTE_TIMING', '0') == '1':
+        timing_logger.setLevel(logging.DEBUG)
+    return root
+
+
+# Default sampling interval for LogSampler, from LOG_SAMPLE_EVERY
+SAMPLE_EVERY = int(os.environ.get('LOG_SAMPLE_EVERY', 100))
+
+
+class LogSampler:
+    """
+    Per-message-type sampling for hot loops.
+
+    allow(kind) is true for the first message of each kind and then for
+    every `every`-th one. It records how many were skipped before the one
+    it allowed (0 for the first, every - 1 after that), and suppressed()
+    returns that count so it can be reported alongside the message. Callers
+    check logger.isEnabledFor() first so a disabled level costs nothing.
+    """
+
+    def __init__(self, every=None):
+        self.every = max(1, every or SAMPLE_EVERY)
+        self._counts = {}
+        self._suppressed = {}
+        self._lock = threading.Lock()
+
+    def allow(self, kind):
+        with self._lock:
+            count = self._counts.get(kind, 0)
+            self._counts[kind] = count + 1
+            if count % self.every:
+                return False
+            self._suppressed[kind] = self.every - 1 if count else 0
+            return True
+
+    def suppressed(self, kind):
+        """Messages of `kind` skipped before the last one allow() let through."""
+        return self._suppressed.get(kind, 0)
+
+
+class RouteSpan:
+    __slots__ = ('started', 'docker_seconds', 'docker_calls', 'serialize_seconds')
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.docker_seconds = 0.0
+        self.docker_calls = 0
+        self.serialize_seconds = 0.0
+
+
+def current_span():
+    if has_request_context():
+        return g.get('span')
+    return None
+
+
+def record_docker_call(seconds):
+    """Add one Docker API round trip to the current request's span, if any."""
+    span = current_span()
+    if span is not None:
+        span.docker_seconds += seconds
+        span.docker_calls += 1
+
+
+class TimedJSONProvider(DefaultJSONProvider):
+    """jsonify() provider that adds its serialization time to the request span."""
+
+    def response(self, *args, **kwargs):
+        span = current_span()
+        if span is None:
+            return super().response(*args, **kwargs)
+        started = time.perf_counter()
+        try:
+            return super().response(*args, **kwargs)
+        finally:
+            span.serialize_seconds += time.perf_counter() - started
+
+
+def init_app(app):
+    """Assign request IDs and, when timing is enabled, time every route."""
+    app.json_provider_class = TimedJSONProvider
+    app.json = TimedJSONProvider(app)
+
+    @app.before_request
+    def _start_request():
+        g.request_id = request.headers.get('X-Request-ID') or uuid.uuid4().hex[:16]
+        if timing_logger.isEnabledFor(logging.DEBUG):
+            g.span = RouteSpan()
+
+    @app.after_request
+    def _finish_request(response):
+        response.headers['X-Request-ID'] = g.get('request_id', '')
+        span = g.get('span')
+        if span is not None:
+            total = time.perf_counter() - span.started
+            timing_logger.debug('route timing', extra={
+                'route': request.url_rule.rule if request.url_rule else request.path,
+                'method': request.method,
+                'status': response.status_code,
+                'total_ms': round(total * 1000, 2),
+                'docker_ms': round(span.docker_seconds * 1000, 2),
+                'docker_calls': span.docker_calls,
+                'serialize_ms': round(span.serialize_seconds * 1000, 2),
+                'streamed': response.is_streamed,
+            })
+        return response
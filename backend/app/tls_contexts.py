@@ -0,0 +1,202 @@
+# backend/app/tls_contexts.py
+
+import hashlib
+import logging
+import os
+import ssl
+import tempfile
+import threading
+from collections import OrderedDict
+
+import docker
+import requests
+
+from .metrics import docker_tls_handshakes
+
+logger = logging.getLogger(__name__)
+
+
+def bundle_fingerprint(ca_cert, client_cert, client_key):
+    """SHA-256 (hex) of a CA/client certificate/key bundle."""
+    digest = hashlib.sha256()
+    for part in (ca_cert, client_cert, client_key):
+        data = part.strip().encode()
+        digest.update(len(data).to_bytes(4, 'big'))
+        digest.update(data)
+    return digest.hexdigest()
+
+
+def _load_cert_chain(context, client_cert, client_key):
+    """
+    load_cert_chain() only takes paths, so the PEMs go through an anonymous
+    in-memory file where the platform has one, else a private temp file
+    that is removed right away.
+    """
+    pem = f"{client_cert.strip()}\n{client_key.strip()}\n".encode()
+    if hasattr(os, 'memfd_create'):
+        fd = os.memfd_create('docker-client-cert', os.MFD_CLOEXEC)
+        try:
+            view = memoryview(pem)
+            while view:
+                view = view[os.write(fd, view):]
+            context.load_cert_chain(f"/proc/self/fd/{fd}")
+        finally:
+            os.close(fd)
+        return
+    with tempfile.TemporaryDirectory(prefix='daas-tls-') as directory:
+        path = os.path.join(directory, 'client.pem')
+        with open(os.open(path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600), 'wb') as f:
+            f.write(pem)
+        context.load_cert_chain(path)
+
+
+class _ResumingSocket(ssl.SSLSocket):
+    """SSLSocket that hands its TLS session back to its context once the session can be resumed."""
+
+    _resume_key = None
+
+    def read(self, len=1024, buffer=None):
+        data = super().read(len, buffer)
+        if self._resume_key is not None:
+            session = self.session
+            # TLS 1.3 sessions become resumable when the server's ticket arrives, after the handshake
+            if session is not None and (session.has_ticket or (session.id and self.version() != 'TLSv1.3')):
+                self.context._remember(self._resume_key, session)
+                self._resume_key = None
+        return data
+
+
+class ResumingSSLContext(ssl.SSLContext):
+    """
+    Client SSLContext that keeps the latest TLS session per peer and offers
+    it on the next connection, so reconnects (new pooled connections,
+    streams) resume the session instead of doing a full handshake.
+    """
+
+    sslsocket_class = _ResumingSocket
+
+    def __init__(self, *args, **kwargs):
+        super().__init__()
+        self._sessions = {}
+        self._sessions_lock = threading.Lock()
+
+    def _remember(self, key, session):
+        with self._sessions_lock:
+            self._sessions[key] = session
+
+    def wrap_socket(self, sock, server_side=False, do_handshake_on_connect=True, suppress_ragged_eofs=True,
+                    server_hostname=None, session=None):
+        try:
+            key = (server_hostname, sock.getpeername()[1])
+        except OSError:
+            key = None
+        if session is None and key is not None:
+            session = self._sessions.get(key)
+        try:
+            tls_sock = super().wrap_socket(
+                sock, server_side=server_side, do_handshake_on_connect=do_handshake_on_connect,
+                suppress_ragged_eofs=suppress_ragged_eofs, server_hostname=server_hostname, session=session,
+            )
+        except ssl.SSLError:
+            if key is not None:
+                with self._sessions_lock:
+                    self._sessions.pop(key, None)
+            raise
+        if key is not None:
+            tls_sock._resume_key = key
+            if do_handshake_on_connect:
+                docker_tls_handshakes.inc(
+                    f"https://{key[0]}:{key[1]}", 'true' if tls_sock.session_reused else 'false'
+                )
+        return tls_sock
+
+
+def build_client_context(ca_cert, client_cert, client_key):
+    """Verifying client context for one CA/certificate/key bundle, built from the PEM strings."""
+    context = ResumingSSLContext(ssl.PROTOCOL_TLS_CLIENT)
+    context.load_verify_locations(cadata=ca_cert.strip())
+    _load_cert_chain(context, client_cert, client_key)
+    return context
+
+
+class TLSContextCache:
+    """
+    Parsed client SSLContexts keyed by the SHA-256 of their certificate
+    bundle, LRU-bounded. Sessions and fleet hosts that use the same
+    credentials share one context, and with it its resumable TLS sessions.
+    """
+
+    def __init__(self, max_entries=256):
+        self.max_entries = max_entries
+        self._contexts = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, fingerprint):
+        """Cached context for a fingerprint, or None."""
+        if not fingerprint:
+            return None
+        with self._lock:
+            context = self._contexts.get(fingerprint)
+            if context is not None:
+                self._contexts.move_to_end(fingerprint)
+            return context
+
+    def put(self, ca_cert, client_cert, client_key):
+        """
+        Return (fingerprint, context) for a bundle, building the context if
+        it is not cached. Raises ssl.SSLError for unusable PEM material.
+        """
+        fingerprint = bundle_fingerprint(ca_cert, client_cert, client_key)
+        context = self.get(fingerprint)
+        if context is not None:
+            return fingerprint, context
+        context = build_client_context(ca_cert, client_cert, client_key)
+        with self._lock:
+            context = self._contexts.setdefault(fingerprint, context)
+            self._contexts.move_to_end(fingerprint)
+            while len(self._contexts) > self.max_entries:
+                self._contexts.popitem(last=False)
+        logger.debug(f"tls: cached client context {fingerprint[:12]}")
+        return fingerprint, context
+
+    def __len__(self):
+        return len(self._contexts)
+
+
+class SSLContextAdapter(requests.adapters.HTTPAdapter):
+    """
+    HTTPAdapter whose HTTPS connections take verification and the client
+    certificate from one prepared SSLContext. requests would otherwise load
+    CA and certificate files into the context on every new connection.
+    """
+
+    def __init__(self, ssl_context, **kwargs):
+        self.ssl_context = ssl_context
+        super().__init__(**kwargs)
+
+    def init_poolmanager(self, *args, **kwargs):
+        kwargs['ssl_context'] = self.ssl_context
+        super().init_poolmanager(*args, **kwargs)
+
+    def build_connection_pool_key_attributes(self, request, verify, cert=None):
+        host_params, _ = super().build_connection_pool_key_attributes(request, True, None)
+        return host_params, {'cert_reqs': 'CERT_REQUIRED'}
+
+    def cert_verify(self, conn, url, verify, cert):
+        conn.cert_reqs = 'CERT_REQUIRED'
+        conn.ca_certs = conn.ca_cert_dir = None
+        conn.cert_file = conn.key_file = None
+
+
+class ContextTLSConfig(docker.tls.TLSConfig):
+    """docker-py TLS settings that mount an SSLContextAdapter instead of pointing requests at PEM files."""
+
+    def __init__(self, ssl_context, pool_maxsize=10):
+        super().__init__()
+        self.ssl_context = ssl_context
+        self.pool_maxsize = pool_maxsize
+
+    def configure_client(self, client):
+        client.verify = True
+        client.cert = None
+        client.mount('https://', SSLContextAdapter(self.ssl_context, pool_maxsize=self.pool_maxsize))
@@ -0,0 +1,476 @@
+# Latency and throughput of every backend route against the fake Docker Engine.
+#
+#   cd backend && python -m benchmarks.bench_routes --containers 5000 --latency-ms 1
+#   cd backend && python -m benchmarks.bench_routes --json after.json --compare before.json
+#
+# Starts benchmarks.fake_engine in-process, points a Flask test client at it
+# through the session's docker_config, and times each route:
+#   - JSON routes: p50/p99 latency and requests/s (over --concurrency threads)
+#   - mutating routes: create/delete and start/stop run as pairs on objects
+#     the suite creates itself
+#   - SSE routes: time to first frame and frames/s over --stream-seconds
+#   - container files: listing, file (full and Range) and archive downloads,
+#     and single-file uploads, on the fake engine's per-container files
+#   - /ws/exec: session setup and keystroke round trip, over a local server
+#   - fleet routes: the fake engine registered as --fleet-hosts hosts
+# /api/connect, /api/disconnect and POST /api/fleet/hosts are not covered:
+# they need TLS client certificates for the host.
+import argparse
+import json
+import os
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from .fake_engine import FakeEngine, start_fake_engine, stop_fake_engine
+
+
+def percentile(sorted_samples, q):
+    if not sorted_samples:
+        return 0.0
+    return sorted_samples[min(len(sorted_samples) - 1, int(round(q * (len(sorted_samples) - 1))))]
+
+
+class Bench:
+    def __init__(self, app, docker_config, iterations, warmup, concurrency):
+        self.app = app
+        self.docker_config = docker_config
+        self.iterations = iterations
+        self.warmup = warmup
+        self.concurrency = concurrency
+        self.results = []
+        self._local = threading.local()
+        self._server = None
+
+    def client(self):
+        """A connected test client per thread, so session cookies are not shared across threads."""
+        client = getattr(self._local, 'client', None)
+        if client is None:
+            client = self._local.client = self.app.test_client()
+            with client.session_transaction() as sess:
+                sess['docker_config'] = dict(self.docker_config)
+        return client
+
+    def record(self, name, samples, elapsed, errors, **extra):
+        samples.sort()
+        result = {
+            'route': name, 'n': len(samples), 'errors': errors,
+            'p50_ms': percentile(samples, 0.50) * 1000, 'p99_ms': percentile(samples, 0.99) * 1000,
+            'rps': len(samples) / elapsed if elapsed else 0.0, **extra,
+        }
+        self.results.append(result)
+        if 'first_frame_ms' in result:
+            print(f"  {name:48s} first frame {result['first_frame_ms']:8.1f} ms   "
+                  f"{result['frames_per_s']:7.1f} frames/s   {result['bytes_per_s'] / 1024:8.1f} KB/s"
+                  + (f"   errors {errors}" if errors else ''), flush=True)
+        else:
+            print(f"  {name:48s} p50 {result['p50_ms']:8.2f} ms   p99 {result['p99_ms']:8.2f} ms   "
+                  f"{result['rps']:8.1f} req/s" + (f"   errors {errors}" if errors else ''), flush=True)
+        return result
+
+    # ---------- request/response routes ----------
+
+    def timed(self, method, path, **kwargs):
+        started = time.perf_counter()
+        response = self.client().open(path, method=method, **kwargs)
+        response.get_data()
+        return time.perf_counter() - started, response
+
+    def json_route(self, name, method, path, expect=(200,), **kwargs):
+        """Same request repeated; latency per request and throughput over all threads."""
+        for _ in range(self.warmup):
+            self.timed(method, path, **kwargs)
+
+        def one(_):
+            seconds, response = self.timed(method, path, **kwargs)
+            return seconds, response.status_code in expect
+
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=self.concurrency) as pool:
+            outcomes = list(pool.map(one, range(self.iterations)))
+        elapsed = time.perf_counter() - started
+        return self.record(name, [s for s, _ in outcomes], elapsed, sum(1 for _, ok in outcomes if not ok))
+
+    def paired_routes(self, first_name, second_name, first, second, iterations=None):
+        """
+        Alternate two requests that undo each other (create/delete, start/stop).
+        `first(i)` returns (seconds, ok, state) and `second(i, state)` (seconds, ok).
+        """
+        first_samples, second_samples, errors = [], [], [0, 0]
+        started = time.perf_counter()
+        for i in range(iterations or self.iterations):
+            seconds, ok, state = first(i)
+            first_samples.append(seconds)
+            errors[0] += not ok
+            seconds, ok = second(i, state)
+            second_samples.append(seconds)
+            errors[1] += not ok
+        elapsed = time.perf_counter() - started
+        self.record(first_name, first_samples, elapsed, errors[0])
+        self.record(second_name, second_samples, elapsed, errors[1])
+
+    # ---------- SSE routes ----------
+
+    def stream_route(self, name, path, seconds, until_done=False):
+        """
+        Open the stream `self.concurrency` times in parallel and read for
+        `seconds` (or until the server ends it, with until_done). Frames are
+        SSE events; keepalive comments are not counted.
+        """
+
+        def one(_):
+            client = self.app.test_client()
+            with client.session_transaction() as sess:
+                sess['docker_config'] = dict(self.docker_config)
+            started = time.perf_counter()
+            response = client.get(path, buffered=False)
+            first = None
+            frames = size = 0
+            pending = ''
+            try:
+                if response.status_code != 200:
+                    return None
+                for chunk in response.response:
+                    text = chunk.decode() if isinstance(chunk, bytes) else chunk
+                    size += len(text)
+                    pending += text
+                    *events, pending = pending.split('\n\n')
+                    data_events = sum(1 for e in events if e and not e.startswith(':'))
+                    if data_events and first is None:
+                        first = time.perf_counter() - started
+                    frames += data_events
+                    if not until_done and time.perf_counter() - started >= seconds:
+                        break
+            finally:
+                response.close()
+            return first, frames, size, time.perf_counter() - started
+
+        with ThreadPoolExecutor(max_workers=self.concurrency) as pool:
+            outcomes = list(pool.map(one, range(self.concurrency)))
+        ok = [o for o in outcomes if o and o[0] is not None]
+        errors = len(outcomes) - len(ok)
+        duration = max((o[3] for o in ok), default=0.0)
+        firsts = sorted(o[0] for o in ok)
+        return self.record(
+            name, [o[3] for o in ok], duration, errors,
+            first_frame_ms=percentile(firsts, 0.5) * 1000,
+            frames_per_s=sum(o[1] for o in ok) / duration if duration else 0.0,
+            bytes_per_s=sum(o[2] for o in ok) / duration if duration else 0.0,
+        )
+
+
+    # ---------- WebSocket routes ----------
+
+    def serve(self):
+        """Serve the app from a local port (the test client cannot do WebSockets); returns host:port."""
+        if self._server is None:
+            from werkzeug.serving import WSGIRequestHandler, make_server
+
+            class QuietHandler(WSGIRequestHandler):
+                def log_request(self, *args, **kwargs):
+                    pass
+
+            self._server = make_server('127.0.0.1', 0, self.app, threaded=True, request_handler=QuietHandler)
+            threading.Thread(target=self._server.serve_forever, name='bench-server', daemon=True).start()
+        return f"127.0.0.1:{self._server.server_port}"
+
+    def close(self):
+        if self._server is not None:
+            self._server.shutdown()
+
+    def session_cookie(self):
+        serializer = self.app.session_interface.get_signing_serializer(self.app)
+        value = serializer.dumps({'docker_config': dict(self.docker_config)})
+        return f"{self.app.config['SESSION_COOKIE_NAME']}={value}"
+
+    def exec_route(self, name, path, keystrokes):
+        """
+        Open `self.concurrency` exec sessions in parallel. Each is timed
+        until its terminal echoes a first keystroke, then for the round
+        trip of `keystrokes` single-byte inputs.
+        """
+        from simple_websocket import Client, ConnectionClosed
+
+        def one(_):
+            started = time.perf_counter()
+            ws = Client(f"ws://{self.serve()}{path}", headers={'Cookie': self.session_cookie()})
+            try:
+                ws.send(b'x')
+                if not isinstance(ws.receive(timeout=10), bytes):
+                    return None
+                opened = time.perf_counter() - started
+                trips = []
+                for _ in range(keystrokes):
+                    sent = time.perf_counter()
+                    ws.send(b'x')
+                    if not isinstance(ws.receive(timeout=10), bytes):
+                        return None
+                    trips.append(time.perf_counter() - sent)
+                ws.send(b'\rexit\r')
+                return opened, trips
+            except ConnectionClosed:
+                return None
+            finally:
+                ws.close()
+
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=self.concurrency) as pool:
+            outcomes = list(pool.map(one, range(self.concurrency)))
+        elapsed = time.perf_counter() - started
+        ok = [o for o in outcomes if o]
+        errors = len(outcomes) - len(ok)
+        self.record(f"{name} (open)", [o[0] for o in ok], elapsed, errors)
+        self.record(f"{name} keystroke round trip", [t for o in ok for t in o[1]], elapsed, errors)
+
+
+def run_suite(bench, engine, args):
+    running = next(c for c in engine.containers.values() if c['Running'])
+    stopped = next(c for c in engine.containers.values() if not c['Running'])
+    image = next(iter(engine.images.values()))
+    image_ref = image['RepoTags'][0]
+    client = bench.client()
+
+    # Inventory and caches warm up on the first listing; every timed request below is steady state
+    client.get('/api/containers')
+
+    print(f"request/response routes ({bench.iterations} requests, concurrency {bench.concurrency})")
+    bench.json_route('GET /metrics', 'GET', '/metrics')
+    bench.json_route('GET /api/node-info', 'GET', '/api/node-info')
+    bench.json_route('GET /api/containers', 'GET', '/api/containers')
+    bench.json_route('GET /api/containers?limit=50', 'GET', '/api/containers?limit=50')
+    bench.json_route('GET /api/containers?sort=name&limit=50', 'GET', '/api/containers?sort=name&limit=50')
+    bench.json_route('GET /api/containers?status=running&limit=50', 'GET',
+                     '/api/containers?status=running&limit=50')
+    bench.json_route('GET /api/containers/<id>', 'GET', f"/api/containers/{running['Id']}")
+    bench.json_route('GET /api/my-images', 'GET', '/api/my-images')
+    bench.json_route('GET /api/inspect-image', 'GET', f"/api/inspect-image?image={image_ref}")
+    bench.json_route('GET /api/images/<name> (Hub)', 'GET', '/api/images/nginx')
+    bench.json_route('GET /api/networks', 'GET', '/api/networks')
+    bench.json_route('GET /api/volumes', 'GET', '/api/volumes')
+    bench.json_route('GET /api/logs/history', 'GET', f"/api/logs/history?container={running['Id']}&limit=200")
+    bench.json_route('POST /api/networks/prune', 'POST', '/api/networks/prune')
+    bench.json_route('POST /api/volumes/prune', 'POST', '/api/volumes/prune')
+
+    files = f"/api/containers/{running['Id']}"
+    bench.json_route('GET /api/containers/<id>/files?limit=100', 'GET', f"{files}/files?path=/data/files&limit=100")
+    bench.json_route('GET /api/containers/<id>/file', 'GET', f"{files}/file?path=/var/log/app.log")
+    bench.json_route('GET /api/containers/<id>/file Range (last 64 KB)', 'GET', f"{files}/file?path=/data/blob.bin",
+                     expect=(206,), headers={'Range': 'bytes=-65536'})
+    bench.json_route('GET /api/containers/<id>/archive', 'GET', f"{files}/archive?path=/var/log")
+    bench.json_route('GET /api/containers/<id>/archive?compress=gzip', 'GET',
+                     f"{files}/archive?path=/var/log&compress=gzip")
+    bench.json_route('PUT /api/containers/<id>/archive?name= (64 KB)', 'PUT',
+                     f"{files}/archive?path=/data&name=bench-upload.bin", data=os.urandom(64 * 1024))
+
+    print(f"mutating routes ({bench.iterations} pairs, sequential)")
+    run_id = int(time.time())
+
+    def create_container(i):
+        seconds, response = bench.timed('POST', '/api/containers/create',
+                                        json={'image': image_ref, 'name': f"bench-{run_id}-{i}"})
+        return seconds, response.status_code == 201, (response.get_json() or {}).get('id')
+
+    def delete_container(i, container_id):
+        seconds, response = bench.timed('DELETE', f"/api/containers/{container_id}")
+        return seconds, response.status_code == 200
+
+    bench.paired_routes('POST /api/containers/create', 'DELETE /api/containers/<id>',
+                        create_container, delete_container)
+
+    def start(i):
+        seconds, response = bench.timed('POST', f"/api/containers/{stopped['Id']}/start")
+        return seconds, response.status_code == 200, None
+
+    def stop(i, _):
+        seconds, response = bench.timed('POST', f"/api/containers/{stopped['Id']}/stop")
+        return seconds, response.status_code == 200
+
+    bench.paired_routes('POST /api/containers/<id>/start', 'POST /api/containers/<id>/stop', start, stop)
+
+    def bulk(action):
+        seconds, response = bench.timed('POST', '/api/containers/bulk', json={
+            'action': action, 'label': args.bulk_label, 'concurrency': args.bulk_concurrency,
+        })
+        summary = json.loads(response.get_data(as_text=True).splitlines()[-1])
+        return seconds, response.status_code == 200 and bool(summary.get('total')) and not summary.get('failed')
+
+    bench.paired_routes(f'POST /api/containers/bulk stop label={args.bulk_label}',
+                        f'POST /api/containers/bulk start label={args.bulk_label}',
+                        lambda i: (*bulk('stop'), None), lambda i, _: bulk('start'),
+                        iterations=max(1, bench.iterations // 10))
+
+    def create_network(i):
+        seconds, response = bench.timed('POST', '/api/networks', json={'Name': f"bench-net-{run_id}-{i}"})
+        return seconds, response.status_code == 200, f"bench-net-{run_id}-{i}"
+
+    def delete_network(i, name):
+        seconds, response = bench.timed('DELETE', f"/api/networks/{name}")
+        return seconds, response.status_code == 200
+
+    bench.paired_routes('POST /api/networks', 'DELETE /api/networks/<name>', create_network, delete_network)
+
+    def create_volume(i):
+        seconds, response = bench.timed('POST', '/api/volumes', json={'Name': f"bench-vol-{run_id}-{i}"})
+        return seconds, response.status_code in (200, 201), f"bench-vol-{run_id}-{i}"
+
+    def delete_volume(i, name):
+        seconds, response = bench.timed('DELETE', f"/api/volumes/{name}")
+        return seconds, response.status_code == 200
+
+    bench.paired_routes('POST /api/volumes', 'DELETE /api/volumes/<name>', create_volume, delete_volume)
+
+    # Pull a throwaway image, then delete it again
+    def pull(i):
+        ref = f"bench/pulled-{run_id}-{i}"
+        seconds, response = bench.timed('GET', f"/api/pull-image?repository={ref}&tag=latest")
+        return seconds, response.status_code == 200 and b'completed' in response.get_data(), ref
+
+    def delete_image(i, ref):
+        seconds, response = bench.timed('POST', f"/api/delete-image?id={ref}:latest")
+        return seconds, response.status_code == 200
+
+    bench.paired_routes('GET /api/pull-image (to completion)', 'POST /api/delete-image', pull, delete_image,
+                        iterations=max(1, bench.iterations // 10))
+
+    print(f"SSE routes ({bench.concurrency} concurrent streams, {args.stream_seconds:.0f}s each)")
+    bench.stream_route('SSE /api/logs', f"/api/logs?container={running['Id']}", args.stream_seconds)
+    bench.stream_route('SSE /api/containers/<id>/stats', f"/api/containers/{running['Id']}/stats",
+                       args.stream_seconds)
+    bench.stream_route(f'SSE /api/stats?label={args.stats_label}',
+                       f"/api/stats?interval=0.5&label={args.stats_label}", args.stream_seconds)
+    bench.stream_route('SSE /api/pull-image', f"/api/pull-image?repository=bench/stream-{run_id}&tag=latest",
+                       args.stream_seconds, until_done=True)
+
+    # Recorded while the stats streams above ran
+    bench.json_route('GET /api/containers/<id>/stats/history', 'GET',
+                     f"/api/containers/{running['Id']}/stats/history")
+
+    print(f"WebSocket routes ({bench.concurrency} concurrent sessions, {bench.iterations} keystrokes each)")
+    bench.exec_route('WS /ws/exec', f"/ws/exec?container={running['Id']}", bench.iterations)
+
+    if args.fleet_hosts:
+        run_fleet_routes(bench, args.fleet_hosts)
+
+
+def run_fleet_routes(bench, hosts):
+    """
+    Fleet fan-out over `hosts` registrations of the fake engine. Each gets
+    its own pool key, so every host has its own client and inventory as
+    separate machines would. Registered directly, since adding a host
+    through the API requires TLS.
+    """
+    from app.routes import fleet_registry
+
+    names = [f"bench-{i:03d}" for i in range(hosts)]
+    for i, name in enumerate(names):
+        fleet_registry.add(name, dict(bench.docker_config, session_id=f"bench-fleet-{i}"))
+    print(f"fleet routes ({hosts} hosts, {bench.iterations} requests, concurrency {bench.concurrency})")
+    try:
+        # Fills every host's inventory and node summary cache
+        bench.client().get('/api/fleet/containers?limit=1')
+        bench.json_route('GET /api/fleet/hosts', 'GET', '/api/fleet/hosts')
+        bench.json_route('GET /api/fleet/containers?limit=50', 'GET', '/api/fleet/containers?limit=50')
+        bench.json_route('GET /api/fleet/node-info', 'GET', '/api/fleet/node-info')
+    finally:
+        for name in names:
+            fleet_registry.remove(name)
+
+
+def compare(results, baseline_path, threshold):
+    """Print changes against a saved run; returns the number of regressions beyond `threshold` percent."""
+    with open(baseline_path) as f:
+        baseline = {r['route']: r for r in json.load(f)['results']}
+    regressions = 0
+    print(f"\nchange against {baseline_path} (regression threshold {threshold:.0f}%)")
+    for result in results:
+        before = baseline.get(result['route'])
+        if not before:
+            continue
+        if 'first_frame_ms' in result:
+            metrics = (('first_frame_ms', 1), ('frames_per_s', -1))
+        else:
+            metrics = (('p50_ms', 1), ('p99_ms', 1), ('rps', -1))
+        changes = []
+        for key, worse_when in metrics:
+            if not before.get(key):
+                continue
+            change = 100 * (result[key] - before[key]) / before[key]
+            flagged = change * worse_when > threshold
+            regressions += flagged
+            changes.append(f"{key} {change:+6.1f}%" + (' !' if flagged else ''))
+        print(f"  {result['route']:48s} " + '   '.join(changes))
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark every backend route against a fake Docker Engine.')
+    parser.add_argument('--containers', type=int, default=1000)
+    parser.add_argument('--images', type=int, default=100)
+    parser.add_argument('--networks', type=int, default=10)
+    parser.add_argument('--volumes', type=int, default=100)
+    parser.add_argument('--latency-ms', type=float, default=0.0, help='fake engine latency per response')
+    parser.add_argument('--jitter-ms', type=float, default=0.0)
+    parser.add_argument('--unix', action='store_true', help='serve the fake engine on a unix socket')
+    parser.add_argument('--iterations', type=int, default=200, help='timed requests per route')
+    parser.add_argument('--warmup', type=int, default=10)
+    parser.add_argument('--concurrency', type=int, default=1, help='client threads (and streams) per route')
+    parser.add_argument('--stream-seconds', type=float, default=5.0)
+    parser.add_argument('--stats-interval', type=float, default=0.25, help='fake engine seconds per stats sample')
+    parser.add_argument('--log-rate', type=float, default=200.0, help='fake engine followed log lines per second')
+    parser.add_argument('--file-size', type=int, default=1024 * 1024, help='bytes in the fake /data/blob.bin')
+    parser.add_argument('--stats-label', default='app=app1', help='label filter for the /api/stats table')
+    parser.add_argument('--bulk-label', default='app=app2', help='label selector for the bulk stop/start pair')
+    parser.add_argument('--bulk-concurrency', type=int, default=8)
+    parser.add_argument('--fleet-hosts', type=int, default=4, help='fleet registrations of the fake engine (0 skips)')
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--json', help='write results to this file')
+    parser.add_argument('--compare', help='earlier --json output to compare against')
+    parser.add_argument('--threshold', type=float, default=20.0, help='percent change counted as a regression')
+    args = parser.parse_args()
+
+    engine = FakeEngine(
+        containers=args.containers, images=args.images, networks=args.networks, volumes=args.volumes,
+        latency=args.latency_ms / 1000, jitter=args.jitter_ms / 1000, stats_interval=args.stats_interval,
+        log_rate=args.log_rate, file_size=args.file_size, seed=args.seed,
+    )
+    workdir = tempfile.mkdtemp(prefix='bench-routes-')
+    server, base_url = start_fake_engine(
+        engine, unix_path=os.path.join(workdir, 'docker.sock') if args.unix else None
+    )
+
+    # The Docker Hub stand-in is always on TCP
+    hub_server, hub_url = (server, base_url) if not args.unix else start_fake_engine(engine)
+
+    # app.routes reads its configuration at import time
+    os.environ['DOCKER_HUB_API_URL'] = hub_url.replace('tcp://', 'http://')
+    os.environ['HUB_CACHE_DIR'] = os.path.join(workdir, 'hub_cache')
+    os.environ['FLEET_REGISTRY_FILE'] = os.path.join(workdir, 'fleet_hosts.json')
+    os.environ.setdefault('LOG_LEVEL', 'ERROR')
+    from app import create_app
+
+    app = create_app()
+    docker_config = {'base_url': base_url, 'mode': 'http', 'session_id': None, 'host_ip': '127.0.0.1'}
+    bench = Bench(app, docker_config, args.iterations, args.warmup, args.concurrency)
+
+    print(f"fake engine {base_url}: {len(engine.containers)} containers, {len(engine.images)} images, "
+          f"{len(engine.networks)} networks, {len(engine.volumes)} volumes, "
+          f"latency {args.latency_ms:g} ms (+{args.jitter_ms:g} ms jitter)")
+    try:
+        run_suite(bench, engine, args)
+    finally:
+        bench.close()
+        stop_fake_engine(server)
+        if hub_server is not server:
+            stop_fake_engine(hub_server)
+
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump({'args': vars(args), 'results': bench.results}, f, indent=2)
+    if args.compare and compare(bench.results, args.compare, args.threshold):
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
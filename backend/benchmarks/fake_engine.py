@@ -0,0 +1,1175 @@
+# Fake Docker Engine API server for benchmarks and local development.
+#
+#   cd backend && python -m benchmarks.fake_engine --port 2375 --containers 5000 --latency-ms 2
+#
+# Serves enough of the Engine API (v1.43) for every route in app/routes.py:
+# object lists, inspect, create/start/stop/remove, prune, info/version,
+# and synthetic /events, /containers/{id}/stats, /containers/{id}/logs and
+# /images/create (pull) streams, exec sessions backed by a small echo
+# shell (builtins: `size`, `exit [code]`), and a small per-container
+# filesystem behind /containers/{id}/archive (HEAD, GET and PUT). It also answers the Docker Hub repository
+# endpoint (/v2/repositories/...) so DOCKER_HUB_API_URL can point here.
+# Listens on TCP (plain or TLS) or a unix socket. All data is generated
+# from --seed, so runs are repeatable.
+import argparse
+import base64
+import hashlib
+import io
+import json
+import posixpath
+import queue
+import random
+import re
+import socketserver
+import ssl
+import struct
+import sys
+import tarfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+API_VERSION = '1.43'
+_VERSION_PREFIX = re.compile(r'^/v\d+\.\d+')
+_LOG_HEADER = struct.Struct('>BxxxL')
+
+
+def _hex_id(*parts):
+    return hashlib.sha256('/'.join(str(p) for p in parts).encode()).hexdigest()
+
+
+def _rfc3339(ts_ns):
+    seconds, nanos = divmod(ts_ns, 1_000_000_000)
+    return time.strftime('%Y-%m-%dT%H:%M:%S', time.gmtime(seconds)) + f".{nanos:09d}Z"
+
+
+def _parse_docker_time(value):
+    """Docker's since/until: unix seconds with optional fractional nanoseconds."""
+    if value in (None, ''):
+        return None
+    seconds, _, fraction = str(value).partition('.')
+    return int(seconds) * 1_000_000_000 + int((fraction + '000000000')[:9])
+
+
+class FakeEngine:
+    """
+    In-memory Docker host: containers, images, networks and volumes, plus
+    the knobs that shape the synthetic streams. Thread-safe.
+    """
+
+    def __init__(self, containers=1000, images=100, networks=10, volumes=100, running_ratio=0.5,
+                 latency=0.0, jitter=0.0, stats_interval=1.0, log_history=1000, log_rate=10.0,
+                 pull_layers=4, pull_chunks=10, pull_interval=0.01, event_rate=0.0, file_size=4 * 1024 * 1024,
+                 dir_entries=200, seed=1):
+        self.latency = latency
+        self.jitter = jitter
+        self.stats_interval = stats_interval
+        self.log_history = log_history
+        self.log_rate = log_rate
+        self.pull_layers = pull_layers
+        self.pull_chunks = pull_chunks
+        self.pull_interval = pull_interval
+        self.event_rate = event_rate
+        self.file_size = file_size
+        self.dir_entries = dir_entries
+        self.started_ns = time.time_ns()
+        self.stopping = threading.Event()
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self._subscribers = set()
+        self.containers = {}
+        self.images = {}
+        self.networks = {}
+        self.volumes = {}
+        self.execs = {}
+        self.filesystems = {}
+        self._populate(containers, images, networks, volumes, running_ratio)
+
+    # ---------- data ----------
+
+    def _populate(self, n_containers, n_images, n_networks, n_volumes, running_ratio):
+        created = int(self.started_ns // 1_000_000_000) - 86400
+        for i in range(max(n_images, 1)):
+            self._add_image(f"bench/app{i:04d}", 'latest', created - i)
+        for i in range(n_networks):
+            self._add_network(f"net-{i:03d}")
+        self._add_network('bridge')
+        for i in range(n_volumes):
+            self._add_volume(f"vol-{i:05d}")
+        images = list(self.images.values())
+        for i in range(n_containers):
+            image = images[i % len(images)]
+            running = self._random.random() < running_ratio
+            self._add_container(f"svc-{i:05d}", image['RepoTags'][0], running, created + i, labels={
+                'app': f"app{i % 20}", 'tier': ('web', 'worker', 'db')[i % 3],
+            })
+
+    def _add_image(self, repository, tag, created):
+        image_id = 'sha256:' + _hex_id('image', repository, tag)
+        self.images[image_id] = {
+            'Id': image_id, 'ParentId': '', 'RepoTags': [f"{repository}:{tag}"],
+            'RepoDigests': [f"{repository}@sha256:{_hex_id('digest', repository, tag)}"],
+            'Created': created, 'Size': 5_000_000 + self._random.randrange(500_000_000),
+            'SharedSize': -1, 'VirtualSize': 0, 'Labels': {}, 'Containers': -1,
+        }
+        return self.images[image_id]
+
+    def _add_network(self, name, driver='bridge'):
+        network_id = _hex_id('network', name)
+        self.networks[network_id] = {
+            'Name': name, 'Id': network_id, 'Created': _rfc3339(self.started_ns), 'Scope': 'local',
+            'Driver': driver, 'EnableIPv6': False, 'Internal': False, 'Attachable': True, 'Ingress': False,
+            'IPAM': {'Driver': 'default', 'Options': None,
+                     'Config': [{'Subnet': f"172.{18 + len(self.networks) % 200}.0.0/16"}]},
+            'ConfigFrom': {'Network': ''}, 'ConfigOnly': False, 'Containers': {}, 'Options': {}, 'Labels': {},
+        }
+        return self.networks[network_id]
+
+    def _add_volume(self, name):
+        self.volumes[name] = {
+            'Name': name, 'Driver': 'local', 'Mountpoint': f"/var/lib/docker/volumes/{name}/_data",
+            'CreatedAt': _rfc3339(self.started_ns), 'Labels': {}, 'Scope': 'local', 'Options': {},
+        }
+        return self.volumes[name]
+
+    def _add_container(self, name, image_ref, running, created, labels=None, ports=None, env=None):
+        container_id = _hex_id('container', name, created)
+        image = self.find_image(image_ref)
+        index = len(self.containers)
+        if ports is None:
+            ports = {'80/tcp': [{'HostIp': '0.0.0.0', 'HostPort': str(20000 + index % 40000)}]}
+        self.containers[container_id] = {
+            'Id': container_id, 'Name': f"/{name}", 'Created': created, 'Image': image_ref,
+            'ImageID': image['Id'] if image else '', 'Running': running, 'Labels': labels or {},
+            'Ports': ports, 'Env': env or [], 'Tty': False,
+            'StartedAt': self.started_ns if running else 0,
+        }
+        return self.containers[container_id]
+
+    def container_row(self, c):
+        ports = []
+        for port, bindings in (c['Ports'] or {}).items():
+            private, _, proto = port.partition('/')
+            for binding in bindings or [{}]:
+                row = {'PrivatePort': int(private), 'Type': proto or 'tcp'}
+                if c['Running'] and binding.get('HostPort'):
+                    row.update(IP=binding.get('HostIp') or '0.0.0.0', PublicPort=int(binding['HostPort']))
+                ports.append(row)
+        state = 'running' if c['Running'] else 'exited'
+        return {
+            'Id': c['Id'], 'Names': [c['Name']], 'Image': c['Image'], 'ImageID': c['ImageID'],
+            'Command': '/docker-entrypoint.sh', 'Created': c['Created'], 'Ports': ports, 'Labels': c['Labels'],
+            'State': state, 'Status': 'Up 2 hours' if c['Running'] else 'Exited (0) 3 hours ago',
+            'HostConfig': {'NetworkMode': 'bridge'},
+            'NetworkSettings': {'Networks': {'bridge': {'IPAddress': '172.17.0.2' if c['Running'] else ''}}},
+            'Mounts': [],
+        }
+
+    def container_inspect(self, c):
+        running = c['Running']
+        return {
+            'Id': c['Id'], 'Name': c['Name'], 'Created': _rfc3339(c['Created'] * 1_000_000_000),
+            'Path': '/docker-entrypoint.sh', 'Args': [], 'Image': c['ImageID'],
+            'State': {'Status': 'running' if running else 'exited', 'Running': running, 'Paused': False,
+                      'Restarting': False, 'OOMKilled': False, 'Dead': False, 'Pid': 4242 if running else 0,
+                      'ExitCode': 0, 'Error': '', 'StartedAt': _rfc3339(c['StartedAt'] or self.started_ns),
+                      'FinishedAt': '0001-01-01T00:00:00Z'},
+            'RestartCount': 0, 'Driver': 'overlay2', 'Platform': 'linux', 'MountLabel': '', 'ProcessLabel': '',
+            'Config': {'Hostname': c['Id'][:12], 'Image': c['Image'], 'Tty': c['Tty'], 'Env': c['Env'],
+                       'Cmd': None, 'Labels': c['Labels'], 'ExposedPorts': {p: {} for p in c['Ports'] or {}}},
+            'HostConfig': {'NetworkMode': 'bridge', 'PortBindings': c['Ports'],
+                           'RestartPolicy': {'Name': 'no', 'MaximumRetryCount': 0}},
+            'NetworkSettings': {'Ports': c['Ports'] if running else {},
+                                'Networks': {'bridge': {'IPAddress': '172.17.0.2' if running else ''}}},
+            'Mounts': [],
+        }
+
+    def image_inspect(self, image):
+        return {
+            **{k: image[k] for k in ('Id', 'RepoTags', 'RepoDigests', 'Size')},
+            'Parent': '', 'Comment': '', 'Created': _rfc3339(image['Created'] * 1_000_000_000),
+            'DockerVersion': '', 'Author': '', 'Architecture': 'amd64', 'Os': 'linux',
+            'Config': {'Env': ['PATH=/usr/local/sbin:/usr/local/bin:/usr/sbin:/usr/bin:/sbin:/bin'],
+                       'Cmd': ['/bin/sh'], 'Labels': image['Labels'], 'ExposedPorts': {'80/tcp': {}}},
+            'GraphDriver': {'Name': 'overlay2', 'Data': {}},
+            'RootFS': {'Type': 'layers', 'Layers': [f"sha256:{_hex_id('layer', image['Id'], n)}" for n in range(4)]},
+            'Metadata': {'LastTagTime': '0001-01-01T00:00:00Z'},
+        }
+
+    def find_container(self, ref):
+        c = self.containers.get(ref)
+        if c is not None:
+            return c
+        for c in self.containers.values():
+            if c['Name'] == f"/{ref}" or (len(ref) >= 4 and c['Id'].startswith(ref)):
+                return c
+        return None
+
+    def find_image(self, ref):
+        if ref in self.images:
+            return self.images[ref]
+        names = {ref, f"{ref}:latest"}
+        prefixed = ref if ref.startswith('sha256:') else f"sha256:{ref}"
+        for image in self.images.values():
+            if names.intersection(image['RepoTags']) or (len(ref) >= 4 and image['Id'].startswith(prefixed)):
+                return image
+        return None
+
+    def find_network(self, ref):
+        if ref in self.networks:
+            return self.networks[ref]
+        for network in self.networks.values():
+            if network['Name'] == ref or (len(ref) >= 4 and network['Id'].startswith(ref)):
+                return network
+        return None
+
+    # ---------- events ----------
+
+    def emit(self, kind, action, object_id, **attributes):
+        now = time.time_ns()
+        event = {
+            'status': action, 'id': object_id, 'Type': kind, 'Action': action,
+            'Actor': {'ID': object_id, 'Attributes': attributes}, 'scope': 'local',
+            'time': now // 1_000_000_000, 'timeNano': now,
+        }
+        with self._lock:
+            subscribers = list(self._subscribers)
+        for subscriber in subscribers:
+            subscriber.put(event)
+
+    def subscribe(self):
+        subscriber = queue.Queue()
+        with self._lock:
+            self._subscribers.add(subscriber)
+        return subscriber
+
+    def unsubscribe(self, subscriber):
+        with self._lock:
+            self._subscribers.discard(subscriber)
+
+    def run_event_generator(self):
+        """Emit `event_rate` health_status events per second for random running containers."""
+        if not self.event_rate:
+            return
+        rng = random.Random(7)
+        while not self.stopping.wait(1.0 / self.event_rate):
+            with self._lock:
+                running = [c['Id'] for c in self.containers.values() if c['Running']]
+            if running:
+                self.emit('container', 'health_status: healthy', rng.choice(running))
+
+    def filesystem(self, c):
+        """
+        The container's files as {absolute path: [kind, permissions, mtime, data]}, where kind is
+        'dir', 'file' or 'link' and data is the file's bytes or the link target. Built on first use.
+        """
+        with self._lock:
+            files = self.filesystems.get(c['Id'])
+            if files is None:
+                files = self.filesystems[c['Id']] = self._seed_filesystem(c)
+            return files
+
+    def _seed_filesystem(self, c):
+        mtime = c['Created']
+        block = random.Random(c['Id']).randbytes(64 * 1024)
+        directories = ('/', '/etc', '/var', '/var/log', '/data', '/data/files')
+        files = {path: ['dir', 0o755, mtime, None] for path in directories}
+        files['/etc/hostname'] = ['file', 0o644, mtime, c['Id'][:12].encode() + b'\n']
+        files['/var/log/app.log'] = ['file', 0o644, mtime, ''.join(
+            f"{self.log_line(c, i)[2]}\n" for i in range(self.log_history)).encode()]
+        files['/var/log/current'] = ['link', 0o777, mtime, 'app.log']
+        files['/data/blob.bin'] = ['file', 0o600, mtime, (block * (self.file_size // len(block) + 1))[:self.file_size]]
+        for i in range(self.dir_entries):
+            files[f"/data/files/file-{i:04d}.txt"] = ['file', 0o644, mtime + i, f"file {i}\n".encode()]
+        return files
+
+    # ---------- streams ----------
+
+    def stats_samples(self, c):
+        rng = random.Random(c['Id'])
+        cpu_total = system = rx = tx = 0
+        previous = None
+        while True:
+            cpu_total += int(rng.uniform(0.01, 0.4) * self.stats_interval * 1e9)
+            system += int(4 * self.stats_interval * 1e9)
+            rx += rng.randrange(0, 200_000)
+            tx += rng.randrange(0, 100_000)
+            current = {'cpu_usage': {'total_usage': cpu_total, 'percpu_usage': []},
+                       'system_cpu_usage': system, 'online_cpus': 4}
+            yield {
+                'read': _rfc3339(time.time_ns()), 'preread': '', 'id': c['Id'], 'name': c['Name'],
+                'num_procs': 0, 'pids_stats': {'current': rng.randrange(5, 60)},
+                'cpu_stats': current, 'precpu_stats': previous or {'cpu_usage': {'total_usage': 0}},
+                'memory_stats': {'usage': rng.randrange(50, 500) * 1024 * 1024, 'limit': 8 * 1024 ** 3},
+                'networks': {'eth0': {'rx_bytes': rx, 'tx_bytes': tx}},
+                'blkio_stats': {'io_service_bytes_recursive': []},
+            }
+            previous = current
+
+    def log_line(self, c, index, ts_ns=None):
+        """(stream id, timestamp ns, text) of the container's index-th log line."""
+        span = 3600 * 1_000_000_000
+        if ts_ns is None:
+            ts_ns = self.started_ns - span + index * (span // max(self.log_history, 1))
+        if index % 10 == 0:
+            return 2, ts_ns, f"ERROR request {index} failed: upstream timed out"
+        level = 'WARN' if index % 5 == 0 else 'INFO'
+        return 1, ts_ns, f"{level} {c['Name'][1:]} handled request {index} in {index % 97} ms"
+
+    def pull_chunks_for(self, repository, tag):
+        layers = [_hex_id('layer', repository, tag, n)[:12] for n in range(self.pull_layers)]
+        yield {'status': f"Pulling from {repository}", 'id': tag}
+        for layer in layers:
+            yield {'status': 'Pulling fs layer', 'progressDetail': {}, 'id': layer}
+        total = 10 * 1024 * 1024
+        for step in range(1, self.pull_chunks + 1):
+            for layer in layers:
+                current = total * step // self.pull_chunks
+                yield {'status': 'Downloading', 'id': layer, 'progressDetail': {'current': current, 'total': total},
+                       'progress': f"[{'=' * (step * 50 // self.pull_chunks)}>] {current}/{total}"}
+        for layer in layers:
+            yield {'status': 'Download complete', 'progressDetail': {}, 'id': layer}
+            yield {'status': 'Pull complete', 'progressDetail': {}, 'id': layer}
+        yield {'status': f"Digest: sha256:{_hex_id('digest', repository, tag)}"}
+        yield {'status': f"Status: Downloaded newer image for {repository}:{tag}"}
+
+
+class EngineHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    disable_nagle_algorithm = True
+    server_version = 'FakeDocker/' + API_VERSION
+
+    ROUTES = []
+
+    def log_message(self, *args):
+        pass
+
+    @property
+    def engine(self):
+        return self.server.engine
+
+    # ---------- plumbing ----------
+
+    def _dispatch(self, method):
+        url = urlsplit(self.path)
+        path = _VERSION_PREFIX.sub('', url.path)
+        self.query = {k: v[-1] for k, v in parse_qs(url.query).items()}
+        self.raw_body = self._read_body()
+        try:
+            self.body = json.loads(self.raw_body) if self.raw_body else None
+        except ValueError:
+            self.body = None
+        for route_method, pattern, name in self.ROUTES:
+            if route_method != method:
+                continue
+            match = pattern.fullmatch(path)
+            if match:
+                delay = self.engine.latency + (random.random() * self.engine.jitter if self.engine.jitter else 0)
+                if delay:
+                    time.sleep(delay)
+                try:
+                    getattr(self, name)(*match.groups())
+                except (BrokenPipeError, ConnectionResetError, ssl.SSLError):
+                    self.close_connection = True
+                return
+        self.send_json(404, {'message': f"page not found: {method} {path}"})
+
+    def _read_body(self):
+        if self.headers.get('Transfer-Encoding', '').lower() == 'chunked':
+            chunks = []
+            while True:
+                size = int(self.rfile.readline().split(b';', 1)[0], 16)
+                if not size:
+                    while self.rfile.readline() not in (b'\r\n', b'\n', b''):
+                        pass
+                    return b''.join(chunks)
+                chunks.append(self.rfile.read(size))
+                self.rfile.readline()
+        length = int(self.headers.get('Content-Length') or 0)
+        return self.rfile.read(length) if length else b''
+
+    def do_GET(self):
+        self._dispatch('GET')
+
+    def do_POST(self):
+        self._dispatch('POST')
+
+    def do_PUT(self):
+        self._dispatch('PUT')
+
+    def do_DELETE(self):
+        self._dispatch('DELETE')
+
+    def do_HEAD(self):
+        self._dispatch('HEAD')
+
+    def send_json(self, status, payload):
+        body = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Api-Version', API_VERSION)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def send_empty(self, status=204):
+        self.send_response(status)
+        self.send_header('Content-Length', '0')
+        self.end_headers()
+
+    def not_found(self, what, ref):
+        self.send_json(404, {'message': f"No such {what}: {ref}"})
+
+    def start_stream(self, content_type, headers=()):
+        self.send_response(200)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Api-Version', API_VERSION)
+        for name, value in headers:
+            self.send_header(name, value)
+        self.send_header('Transfer-Encoding', 'chunked')
+        self.end_headers()
+
+    def write_chunk(self, data):
+        if data:
+            self.wfile.write(b'%x\r\n%s\r\n' % (len(data), data))
+
+    def end_stream(self):
+        self.wfile.write(b'0\r\n\r\n')
+
+    def flag(self, name, default=False):
+        value = self.query.get(name)
+        if value is None:
+            return default
+        return value.lower() in ('1', 'true', 'yes')
+
+    def filters(self):
+        return json.loads(self.query.get('filters') or '{}')
+
+    # ---------- system ----------
+
+    def ping(self):
+        body = b'OK'
+        self.send_response(200)
+        self.send_header('Api-Version', API_VERSION)
+        self.send_header('Content-Type', 'text/plain')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        if self.command != 'HEAD':
+            self.wfile.write(body)
+
+    def version(self):
+        self.send_json(200, {
+            'Version': '24.0.7', 'ApiVersion': API_VERSION, 'MinAPIVersion': '1.12', 'Os': 'linux',
+            'Arch': 'amd64', 'KernelVersion': '6.1.0-fake', 'GoVersion': 'go1.20.10', 'GitCommit': 'fake',
+        })
+
+    def info(self):
+        engine = self.engine
+        with engine._lock:
+            running = sum(1 for c in engine.containers.values() if c['Running'])
+            total, images = len(engine.containers), len(engine.images)
+        self.send_json(200, {
+            'ID': 'FAKE', 'Containers': total, 'ContainersRunning': running, 'ContainersPaused': 0,
+            'ContainersStopped': total - running, 'Images': images, 'Driver': 'overlay2',
+            'MemTotal': 16 * 1024 ** 3, 'NCPU': 4, 'OperatingSystem': 'Fake Linux', 'KernelVersion': '6.1.0-fake',
+            'Name': 'fake-docker', 'DockerRootDir': '/var/lib/docker', 'ServerVersion': '24.0.7',
+        })
+
+    def system_df(self):
+        with self.engine._lock:
+            self.send_json(200, {
+                'LayersSize': 0, 'Images': list(self.engine.images.values()),
+                'Containers': [self.engine.container_row(c) for c in self.engine.containers.values()],
+                'Volumes': list(self.engine.volumes.values()), 'BuildCache': [],
+            })
+
+    def events(self):
+        engine = self.engine
+        subscriber = engine.subscribe()
+        try:
+            self.start_stream('application/json')
+            while not engine.stopping.is_set():
+                try:
+                    event = subscriber.get(timeout=0.5)
+                except queue.Empty:
+                    continue
+                self.write_chunk(json.dumps(event).encode() + b'\n')
+            self.end_stream()
+        finally:
+            engine.unsubscribe(subscriber)
+            self.close_connection = True
+
+    # ---------- containers ----------
+
+    def containers_list(self):
+        engine = self.engine
+        filters = self.filters()
+        include_all = self.flag('all')
+        ids = filters.get('id') or []
+        statuses = filters.get('status') or []
+        names = filters.get('name') or []
+        labels = filters.get('label') or []
+        with engine._lock:
+            rows = []
+            for c in engine.containers.values():
+                if not include_all and not c['Running'] and not statuses:
+                    continue
+                if ids and not any(c['Id'].startswith(i) for i in ids):
+                    continue
+                if statuses and ('running' if c['Running'] else 'exited') not in statuses:
+                    continue
+                if names and not any(n in c['Name'] for n in names):
+                    continue
+                if labels and not all(
+                    (c['Labels'].get(k) == v) if sep else k in c['Labels']
+                    for k, sep, v in (label.partition('=') for label in labels)
+                ):
+                    continue
+                rows.append(engine.container_row(c))
+        rows.sort(key=lambda r: r['Created'], reverse=True)
+        limit = int(self.query.get('limit') or -1)
+        self.send_json(200, rows[:limit] if limit > 0 else rows)
+
+    def container_inspect(self, ref):
+        with self.engine._lock:
+            c = self.engine.find_container(ref)
+            payload = self.engine.container_inspect(c) if c else None
+        if payload is None:
+            return self.not_found('container', ref)
+        self.send_json(200, payload)
+
+    def container_create(self):
+        engine = self.engine
+        name = self.query.get('name') or f"fake-{_hex_id('anon', time.time_ns())[:8]}"
+        body = self.body or {}
+        with engine._lock:
+            existing = engine.find_container(name)
+            if existing is not None:
+                return self.send_json(409, {'message': (
+                    f'Conflict. The container name "/{name}" is already in use by container "{existing["Id"]}".'
+                )})
+            if engine.find_image(body.get('Image', '')) is None:
+                return self.send_json(404, {'message': f"No such image: {body.get('Image')}"})
+            c = engine._add_container(
+                name, body['Image'], False, int(time.time()), labels=body.get('Labels') or {},
+                ports=(body.get('HostConfig') or {}).get('PortBindings') or {}, env=body.get('Env') or [],
+            )
+        engine.emit('container', 'create', c['Id'], name=name, image=c['Image'])
+        self.send_json(201, {'Id': c['Id'], 'Warnings': []})
+
+    def _set_running(self, ref, running, action):
+        engine = self.engine
+        with engine._lock:
+            c = engine.find_container(ref)
+            if c is not None:
+                changed = c['Running'] != running
+                c['Running'] = running
+                if running and changed:
+                    c['StartedAt'] = time.time_ns()
+        if c is None:
+            return self.not_found('container', ref)
+        if not changed and action in ('start', 'stop'):
+            return self.send_empty(304)
+        engine.emit('container', action, c['Id'], name=c['Name'][1:], image=c['Image'])
+        self.send_empty(204)
+
+    def container_start(self, ref):
+        engine = self.engine
+        with engine._lock:
+            c = engine.find_container(ref)
+            taken = c and not c['Running'] and {
+                binding.get('HostPort')
+                for other in engine.containers.values() if other['Running']
+                for bindings in (other['Ports'] or {}).values() for binding in bindings or ()
+            }
+            for bindings in ((c['Ports'] or {}).values() if taken else ()):
+                for binding in bindings or ():
+                    if binding.get('HostPort') and binding['HostPort'] in taken:
+                        return self.send_json(500, {'message': (
+                            'driver failed programming external connectivity on endpoint '
+                            f"{c['Name'][1:]}: Bind for 0.0.0.0:{binding['HostPort']} failed: port is already allocated"
+                        )})
+        self._set_running(ref, True, 'start')
+
+    def container_stop(self, ref):
+        self._set_running(ref, False, 'stop')
+
+    def container_restart(self, ref):
+        self._set_running(ref, True, 'restart')
+
+    def container_kill(self, ref):
+        self._set_running(ref, False, 'kill')
+
+    def container_delete(self, ref):
+        engine = self.engine
+        with engine._lock:
+            c = engine.find_container(ref)
+            if c is not None and c['Running'] and not self.flag('force'):
+                return self.send_json(409, {'message': 'You cannot remove a running container. Stop it first.'})
+            if c is not None:
+                del engine.containers[c['Id']]
+        if c is None:
+            return self.not_found('container', ref)
+        engine.emit('container', 'destroy', c['Id'], name=c['Name'][1:], image=c['Image'])
+        self.send_empty(204)
+
+    def container_stats(self, ref):
+        engine = self.engine
+        with engine._lock:
+            c = engine.find_container(ref)
+        if c is None:
+            return self.not_found('container', ref)
+        samples = engine.stats_samples(c)
+        if not self.flag('stream', True):
+            next(samples)
+            return self.send_json(200, next(samples))
+        self.start_stream('application/json')
+        for sample in samples:
+            if engine.stopping.is_set():
+                break
+            self.write_chunk(json.dumps(sample).encode() + b'\n')
+            if engine.stopping.wait(engine.stats_interval):
+                break
+        self.end_stream()
+        self.close_connection = True
+
+    def container_logs(self, ref):
+        engine = self.engine
+        with engine._lock:
+            c = engine.find_container(ref)
+        if c is None:
+            return self.not_found('container', ref)
+        timestamps = self.flag('timestamps')
+        since = _parse_docker_time(self.query.get('since'))
+        until = _parse_docker_time(self.query.get('until'))
+        tail = self.query.get('tail', 'all')
+        wanted = {1} if self.flag('stdout') else set()
+        if self.flag('stderr'):
+            wanted.add(2)
+
+        def frame(stream_id, ts_ns, text):
+            payload = ((_rfc3339(ts_ns) + ' ') if timestamps else '') + text + '\n'
+            data = payload.encode()
+            return _LOG_HEADER.pack(stream_id, len(data)) + data
+
+        history = []
+        for index in range(engine.log_history):
+            stream_id, ts_ns, text = engine.log_line(c, index)
+            if stream_id not in wanted or (since and ts_ns <= since) or (until and ts_ns > until):
+                continue
+            history.append((stream_id, ts_ns, text))
+        if tail not in ('all', '') and int(tail) >= 0:
+            history = history[len(history) - int(tail):] if int(tail) else []
+
+        self.start_stream('application/vnd.docker.multiplexed-stream')
+        buffered = []
+        size = 0
+        for line in history:
+            buffered.append(frame(*line))
+            size += len(buffered[-1])
+            if size >= 64 * 1024:
+                self.write_chunk(b''.join(buffered))
+                buffered, size = [], 0
+        self.write_chunk(b''.join(buffered))
+
+        if self.flag('follow'):
+            index = engine.log_history
+            while not engine.stopping.wait(1.0 / engine.log_rate if engine.log_rate else 1.0):
+                if not engine.log_rate:
+                    continue
+                stream_id, ts_ns, text = engine.log_line(c, index, ts_ns=time.time_ns())
+                index += 1
+                if until and ts_ns > until:
+                    break
+                if stream_id in wanted:
+                    self.write_chunk(frame(stream_id, ts_ns, text))
+            self.close_connection = True
+        self.end_stream()
+
+    # ---------- archive ----------
+
+    def _archive_target(self, ref):
+        """(files, path, entry) for ?path= in a container; entry is None (and a 404 sent) if missing."""
+        with self.engine._lock:
+            c = self.engine.find_container(ref)
+        if c is None:
+            self.not_found('container', ref)
+            return None, None, None
+        files = self.engine.filesystem(c)
+        path = posixpath.normpath('/' + self.query.get('path', '').lstrip('/'))
+        with self.engine._lock:
+            entry = files.get(path)
+        if entry is None:
+            self.send_json(404, {'message': f"Could not find the file {path} in container {ref}"})
+        return files, path, entry
+
+    @staticmethod
+    def _path_stat(path, entry):
+        kind, permissions, mtime, data = entry
+        stat = {
+            'name': posixpath.basename(path) or '/',
+            'size': len(data) if kind != 'dir' else 4096,
+            'mode': permissions | {'dir': 1 << 31, 'link': 1 << 27, 'file': 0}[kind],
+            'mtime': _rfc3339(mtime * 1_000_000_000),
+            'linkTarget': data if kind == 'link' else '',
+        }
+        return base64.b64encode(json.dumps(stat).encode()).decode()
+
+    def archive_head(self, ref):
+        _, path, entry = self._archive_target(ref)
+        if entry is None:
+            return
+        self.send_response(200)
+        self.send_header('X-Docker-Container-Path-Stat', self._path_stat(path, entry))
+        self.send_header('Content-Length', '0')
+        self.end_headers()
+
+    def archive_get(self, ref):
+        files, path, entry = self._archive_target(ref)
+        if entry is None:
+            return
+        root = posixpath.basename(path) or '.'
+        prefix = path.rstrip('/') + '/'
+        with self.engine._lock:
+            members = sorted((p, list(e)) for p, e in files.items() if p == path or p.startswith(prefix))
+        self.start_stream('application/x-tar', [('X-Docker-Container-Path-Stat', self._path_stat(path, entry))])
+        with tarfile.open(fileobj=_ChunkWriter(self), mode='w|', bufsize=64 * 1024, format=tarfile.PAX_FORMAT) as tar:
+            for member_path, (kind, permissions, mtime, data) in members:
+                if self.engine.stopping.is_set():
+                    break
+                info = tarfile.TarInfo(root + member_path[len(path.rstrip('/')):] if member_path != path else root)
+                info.mode, info.mtime = permissions, mtime
+                if kind == 'dir':
+                    info.type = tarfile.DIRTYPE
+                elif kind == 'link':
+                    info.type, info.linkname = tarfile.SYMTYPE, data
+                else:
+                    info.size = len(data)
+                tar.addfile(info, io.BytesIO(data) if kind == 'file' else None)
+        self.end_stream()
+
+    def archive_put(self, ref):
+        files, path, entry = self._archive_target(ref)
+        if entry is None:
+            return
+        if entry[0] != 'dir':
+            return self.send_json(400, {'message': f"extraction point is not a directory: {path}"})
+        try:
+            with tarfile.open(fileobj=io.BytesIO(self.raw_body), mode='r:*') as tar:
+                extracted = []
+                for member in tar:
+                    name = posixpath.normpath(posixpath.join(path, member.name))
+                    if member.isdir():
+                        extracted.append((name, ['dir', member.mode & 0o7777, int(member.mtime), None]))
+                    elif member.issym():
+                        extracted.append((name, ['link', 0o777, int(member.mtime), member.linkname]))
+                    elif member.isreg():
+                        data = tar.extractfile(member).read()
+                        extracted.append((name, ['file', member.mode & 0o7777, int(member.mtime), data]))
+        except (tarfile.TarError, EOFError, OSError) as e:
+            return self.send_json(400, {'message': f"Error processing tar file: {e}"})
+        with self.engine._lock:
+            for name, new_entry in extracted:
+                parent = posixpath.dirname(name)
+                while parent not in files:
+                    files[parent] = ['dir', 0o755, new_entry[2], None]
+                    parent = posixpath.dirname(parent)
+                files[name] = new_entry
+        self.send_empty(200)
+
+    # ---------- exec ----------
+
+    def exec_create(self, ref):
+        engine = self.engine
+        body = self.body or {}
+        with engine._lock:
+            c = engine.find_container(ref)
+            if c is None:
+                return self.not_found('container', ref)
+            if not c['Running']:
+                return self.send_json(409, {'message': f"Container {c['Id']} is not running"})
+            exec_id = _hex_id('exec', c['Id'], time.time_ns())
+            engine.execs[exec_id] = {
+                'ID': exec_id, 'ContainerID': c['Id'], 'Running': False, 'ExitCode': None,
+                'ProcessConfig': {'entrypoint': (body.get('Cmd') or [''])[0], 'arguments': (body.get('Cmd') or [])[1:],
+                                  'tty': bool(body.get('Tty'))},
+                'OpenStdin': bool(body.get('AttachStdin')), 'Size': [24, 80],
+            }
+        self.send_json(201, {'Id': exec_id})
+
+    def exec_start(self, exec_id):
+        """
+        Hijack the connection and run an echo shell: input is echoed back as
+        a TTY would, `size` prints the last resize and `exit [code]` ends the
+        session. Nothing is written before the first input, so no output
+        can get stuck behind the response headers in the client's buffer.
+        """
+        engine = self.engine
+        with engine._lock:
+            e = engine.execs.get(exec_id)
+            if e is not None:
+                e['Running'] = True
+        if e is None:
+            return self.not_found('exec instance', exec_id)
+        upgrade = self.headers.get('Upgrade', '').lower() == 'tcp'
+        self.send_response(101 if upgrade else 200)
+        self.send_header('Content-Type', 'application/vnd.docker.raw-stream')
+        if upgrade:
+            self.send_header('Connection', 'Upgrade')
+            self.send_header('Upgrade', 'tcp')
+        self.end_headers()
+        self.wfile.flush()
+        self.close_connection = True
+        line = bytearray()
+        exit_code = 0
+        try:
+            while True:
+                data = self.rfile.read1(65536)
+                if not data:
+                    break
+                out = bytearray()
+                done = False
+                for byte in data:
+                    if byte in (13, 10):
+                        out += b'\r\n'
+                        command = line.decode(errors='replace').split()
+                        line.clear()
+                        if command and command[0] == 'exit':
+                            exit_code = int(command[1]) if len(command) > 1 and command[1].isdigit() else 0
+                            done = True
+                            break
+                        if command == ['size']:
+                            out += b'%d %d\r\n' % tuple(e['Size'])
+                    else:
+                        line.append(byte)
+                        out.append(byte)
+                self.wfile.write(bytes(out))
+                if done:
+                    break
+        except (OSError, ssl.SSLError):
+            pass
+        finally:
+            with engine._lock:
+                e['Running'] = False
+                e['ExitCode'] = exit_code
+
+    def exec_resize(self, exec_id):
+        with self.engine._lock:
+            e = self.engine.execs.get(exec_id)
+            if e is not None:
+                e['Size'] = [int(self.query.get('h') or 24), int(self.query.get('w') or 80)]
+        if e is None:
+            return self.not_found('exec instance', exec_id)
+        self.send_empty(200)
+
+    def exec_inspect(self, exec_id):
+        with self.engine._lock:
+            e = self.engine.execs.get(exec_id)
+            payload = dict(e) if e is not None else None
+        if payload is None:
+            return self.not_found('exec instance', exec_id)
+        self.send_json(200, payload)
+
+    # ---------- images ----------
+
+    def images_list(self):
+        with self.engine._lock:
+            rows = sorted(self.engine.images.values(), key=lambda r: r['Created'], reverse=True)
+        self.send_json(200, rows)
+
+    def image_inspect(self, ref):
+        with self.engine._lock:
+            image = self.engine.find_image(ref)
+            payload = self.engine.image_inspect(image) if image else None
+        if payload is None:
+            return self.not_found('image', ref)
+        self.send_json(200, payload)
+
+    def image_delete(self, ref):
+        engine = self.engine
+        with engine._lock:
+            image = engine.find_image(ref)
+            if image is not None:
+                del engine.images[image['Id']]
+        if image is None:
+            return self.not_found('image', ref)
+        engine.emit('image', 'untag', image['Id'], name=ref)
+        engine.emit('image', 'delete', image['Id'], name=ref)
+        self.send_json(200, [{'Untagged': tag} for tag in image['RepoTags']] + [{'Deleted': image['Id']}])
+
+    def image_create(self):
+        engine = self.engine
+        repository = self.query.get('fromImage', '')
+        tag = self.query.get('tag') or 'latest'
+        if ':' in repository.rsplit('/', 1)[-1]:
+            repository, tag = repository.rsplit(':', 1)
+        self.start_stream('application/json')
+        if 'notfound' in repository:
+            self.write_chunk(json.dumps({
+                'errorDetail': {'message': f"pull access denied for {repository}"},
+                'error': f"pull access denied for {repository}",
+            }).encode() + b'\n')
+            return self.end_stream()
+        for chunk in engine.pull_chunks_for(repository, tag):
+            if engine.stopping.is_set():
+                break
+            self.write_chunk(json.dumps(chunk).encode() + b'\n')
+            if engine.pull_interval:
+                time.sleep(engine.pull_interval)
+        with engine._lock:
+            image = engine.find_image(f"{repository}:{tag}") or engine._add_image(repository, tag, int(time.time()))
+        engine.emit('image', 'pull', f"{repository}:{tag}", name=f"{repository}:{tag}")
+        engine.emit('image', 'tag', image['Id'], name=f"{repository}:{tag}")
+        self.end_stream()
+
+    # ---------- networks ----------
+
+    def networks_list(self):
+        filters = self.filters()
+        ids = filters.get('id') or []
+        names = filters.get('name') or []
+        with self.engine._lock:
+            rows = [
+                n for n in self.engine.networks.values()
+                if (not ids or any(n['Id'].startswith(i) for i in ids)) and (not names or n['Name'] in names)
+            ]
+        self.send_json(200, rows)
+
+    def network_inspect(self, ref):
+        with self.engine._lock:
+            network = self.engine.find_network(ref)
+        if network is None:
+            return self.not_found('network', ref)
+        self.send_json(200, network)
+
+    def network_create(self):
+        body = self.body or {}
+        name = body.get('Name', '')
+        with self.engine._lock:
+            if self.engine.find_network(name) is not None:
+                return self.send_json(409, {'message': f"network with name {name} already exists"})
+            network = self.engine._add_network(name, body.get('Driver') or 'bridge')
+        self.engine.emit('network', 'create', network['Id'], name=name, type=network['Driver'])
+        self.send_json(201, {'Id': network['Id'], 'Warning': ''})
+
+    def network_delete(self, ref):
+        with self.engine._lock:
+            network = self.engine.find_network(ref)
+            if network is not None:
+                del self.engine.networks[network['Id']]
+        if network is None:
+            return self.not_found('network', ref)
+        self.engine.emit('network', 'destroy', network['Id'], name=network['Name'], type=network['Driver'])
+        self.send_empty(204)
+
+    def networks_prune(self):
+        self.send_json(200, {'NetworksDeleted': []})
+
+    # ---------- volumes ----------
+
+    def volumes_list(self):
+        with self.engine._lock:
+            self.send_json(200, {'Volumes': list(self.engine.volumes.values()), 'Warnings': None})
+
+    def volume_inspect(self, name):
+        with self.engine._lock:
+            volume = self.engine.volumes.get(name)
+        if volume is None:
+            return self.not_found('volume', name)
+        self.send_json(200, volume)
+
+    def volume_create(self):
+        name = (self.body or {}).get('Name') or _hex_id('volume', time.time_ns())
+        with self.engine._lock:
+            volume = self.engine.volumes.get(name) or self.engine._add_volume(name)
+        self.engine.emit('volume', 'create', name, driver='local')
+        self.send_json(201, volume)
+
+    def volume_delete(self, name):
+        with self.engine._lock:
+            volume = self.engine.volumes.pop(name, None)
+        if volume is None:
+            return self.not_found('volume', name)
+        self.engine.emit('volume', 'destroy', name, driver='local')
+        self.send_empty(204)
+
+    def volumes_prune(self):
+        self.send_json(200, {'VolumesDeleted': [], 'SpaceReclaimed': 0})
+
+    # ---------- Docker Hub ----------
+
+    def hub_repository(self, namespace, name):
+        if name.startswith('missing'):
+            return self.send_json(404, {'message': 'object not found'})
+        self.send_json(200, {
+            'user': namespace, 'name': name, 'namespace': namespace, 'repository_type': 'image', 'status': 1,
+            'description': f"Fake {name} image", 'is_private': False, 'star_count': len(name) * 11,
+            'pull_count': len(name) * 1_000_003, 'last_updated': '2026-01-01T00:00:00.000000Z',
+            'is_official': namespace == 'library', 'full_description': f"# {name}\n\nServed by the fake engine.",
+        })
+
+
+class _ChunkWriter:
+    """File-like object that sends each write as one HTTP chunk."""
+
+    def __init__(self, handler):
+        self.handler = handler
+
+    def write(self, data):
+        self.handler.write_chunk(bytes(data))
+
+
+_ID = r'([^/]+)'
+_IMAGE = r'(.+?)'
+EngineHandler.ROUTES = [(m, re.compile(p), n) for m, p, n in (
+    ('GET', r'/_ping', 'ping'),
+    ('HEAD', r'/_ping', 'ping'),
+    ('GET', r'/version', 'version'),
+    ('GET', r'/info', 'info'),
+    ('GET', r'/system/df', 'system_df'),
+    ('GET', r'/events', 'events'),
+    ('GET', r'/containers/json', 'containers_list'),
+    ('POST', r'/containers/create', 'container_create'),
+    ('GET', rf'/containers/{_ID}/json', 'container_inspect'),
+    ('POST', rf'/containers/{_ID}/start', 'container_start'),
+    ('POST', rf'/containers/{_ID}/stop', 'container_stop'),
+    ('POST', rf'/containers/{_ID}/restart', 'container_restart'),
+    ('POST', rf'/containers/{_ID}/kill', 'container_kill'),
+    ('GET', rf'/containers/{_ID}/stats', 'container_stats'),
+    ('GET', rf'/containers/{_ID}/logs', 'container_logs'),
+    ('DELETE', rf'/containers/{_ID}', 'container_delete'),
+    ('HEAD', rf'/containers/{_ID}/archive', 'archive_head'),
+    ('GET', rf'/containers/{_ID}/archive', 'archive_get'),
+    ('PUT', rf'/containers/{_ID}/archive', 'archive_put'),
+    ('POST', rf'/containers/{_ID}/exec', 'exec_create'),
+    ('POST', rf'/exec/{_ID}/start', 'exec_start'),
+    ('POST', rf'/exec/{_ID}/resize', 'exec_resize'),
+    ('GET', rf'/exec/{_ID}/json', 'exec_inspect'),
+    ('GET', r'/images/json', 'images_list'),
+    ('POST', r'/images/create', 'image_create'),
+    ('GET', rf'/images/{_IMAGE}/json', 'image_inspect'),
+    ('DELETE', rf'/images/{_IMAGE}', 'image_delete'),
+    ('GET', r'/networks', 'networks_list'),
+    ('POST', r'/networks/create', 'network_create'),
+    ('POST', r'/networks/prune', 'networks_prune'),
+    ('GET', rf'/networks/{_ID}', 'network_inspect'),
+    ('DELETE', rf'/networks/{_ID}', 'network_delete'),
+    ('GET', r'/volumes', 'volumes_list'),
+    ('POST', r'/volumes/create', 'volume_create'),
+    ('POST', r'/volumes/prune', 'volumes_prune'),
+    ('GET', rf'/volumes/{_ID}', 'volume_inspect'),
+    ('DELETE', rf'/volumes/{_ID}', 'volume_delete'),
+    ('GET', rf'/v2/repositories/{_ID}/{_ID}/?', 'hub_repository'),
+)]
+
+
+class _EngineServerMixin:
+    daemon_threads = True
+    allow_reuse_address = True
+    request_queue_size = 1024
+
+    def handle_error(self, request, client_address):
+        # Clients drop keep-alive connections mid-body (a Range read or a capped
+        # directory listing closes the archive early); that is not an engine error
+        if isinstance(sys.exc_info()[1], (BrokenPipeError, ConnectionResetError, ssl.SSLError)):
+            return
+        super().handle_error(request, client_address)
+
+
+class EngineServer(_EngineServerMixin, ThreadingHTTPServer):
+    pass
+
+
+class UnixEngineHandler(EngineHandler):
+    # TCP_NODELAY does not exist on unix sockets
+    disable_nagle_algorithm = False
+
+
+class UnixEngineServer(_EngineServerMixin, socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    def get_request(self):
+        request, _ = super().get_request()
+        return request, ('unix', 0)
+
+
+def start_fake_engine(engine, host='127.0.0.1', port=0, unix_path=None, tls_cert=None, tls_key=None,
+                      tls_ca=None):
+    """
+    Serve `engine` from a background thread. Returns (server, base_url) where
+    base_url is what docker.DockerClient(base_url=...) expects.
+    """
+    if unix_path:
+        server = UnixEngineServer(unix_path, UnixEngineHandler)
+        base_url = f"unix://{unix_path}"
+    else:
+        server = EngineServer((host, port), EngineHandler)
+        scheme = 'https' if tls_cert else 'tcp'
+        base_url = f"{scheme}://{host}:{server.server_address[1]}"
+        if tls_cert:
+            context = ssl.SSLContext(ssl.PROTOCOL_TLS_SERVER)
+            context.load_cert_chain(tls_cert, tls_key)
+            if tls_ca:
+                context.load_verify_locations(tls_ca)
+                context.verify_mode = ssl.CERT_REQUIRED
+            server.socket = context.wrap_socket(server.socket, server_side=True)
+    server.engine = engine
+    threading.Thread(target=server.serve_forever, name='fake-engine', daemon=True).start()
+    threading.Thread(target=engine.run_event_generator, name='fake-engine-events', daemon=True).start()
+    return server, base_url
+
+
+def stop_fake_engine(server):
+    server.engine.stopping.set()
+    server.shutdown()
+    server.server_close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Serve a fake Docker Engine API.')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=2375)
+    parser.add_argument('--unix', help='listen on this unix socket path instead of TCP')
+    parser.add_argument('--tls-cert')
+    parser.add_argument('--tls-key')
+    parser.add_argument('--tls-ca', help='require client certificates signed by this CA')
+    parser.add_argument('--containers', type=int, default=1000)
+    parser.add_argument('--images', type=int, default=100)
+    parser.add_argument('--networks', type=int, default=10)
+    parser.add_argument('--volumes', type=int, default=100)
+    parser.add_argument('--running-ratio', type=float, default=0.5)
+    parser.add_argument('--latency-ms', type=float, default=0.0, help='added to every response')
+    parser.add_argument('--jitter-ms', type=float, default=0.0, help='random extra latency, up to this much')
+    parser.add_argument('--stats-interval', type=float, default=1.0, help='seconds between stats samples')
+    parser.add_argument('--log-history', type=int, default=1000, help='log lines per container before start')
+    parser.add_argument('--log-rate', type=float, default=10.0, help='followed log lines per second')
+    parser.add_argument('--pull-layers', type=int, default=4)
+    parser.add_argument('--pull-chunks', type=int, default=10, help='progress chunks per layer')
+    parser.add_argument('--pull-interval', type=float, default=0.01, help='seconds between pull chunks')
+    parser.add_argument('--event-rate', type=float, default=0.0, help='synthetic container events per second')
+    parser.add_argument('--file-size', type=int, default=4 * 1024 * 1024, help='bytes in /data/blob.bin')
+    parser.add_argument('--dir-entries', type=int, default=200, help='files in /data/files')
+    parser.add_argument('--seed', type=int, default=1)
+    args = parser.parse_args()
+
+    engine = FakeEngine(
+        containers=args.containers, images=args.images, networks=args.networks, volumes=args.volumes,
+        running_ratio=args.running_ratio, latency=args.latency_ms / 1000, jitter=args.jitter_ms / 1000,
+        stats_interval=args.stats_interval, log_history=args.log_history, log_rate=args.log_rate,
+        pull_layers=args.pull_layers, pull_chunks=args.pull_chunks, pull_interval=args.pull_interval,
+        event_rate=args.event_rate, file_size=args.file_size, dir_entries=args.dir_entries, seed=args.seed,
+    )
+    server, base_url = start_fake_engine(
+        engine, host=args.host, port=args.port, unix_path=args.unix,
+        tls_cert=args.tls_cert, tls_key=args.tls_key, tls_ca=args.tls_ca,
+    )
+    print(f"fake Docker Engine on {base_url}: {len(engine.containers)} containers, {len(engine.images)} images, "
+          f"{len(engine.networks)} networks, {len(engine.volumes)} volumes", flush=True)
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        stop_fake_engine(server)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,24 @@
+# gunicorn settings for the production entry point (wsgi.py)
+import os
+
+bind = os.environ.get('GUNICORN_BIND', '0.0.0.0:5001')
+
+# Shared upstreams (stats, pulls, inventories, client pool) live per process,
+# so one worker sees the most sharing. Add workers for CPU, not for streams.
+workers = int(os.environ.get('GUNICORN_WORKERS', 1))
+worker_class = 'gevent'
+# Concurrent connections per worker, long-lived SSE and WebSocket included
+worker_connections = int(os.environ.get('GUNICORN_WORKER_CONNECTIONS', 2000))
+
+# With gevent workers this is only the heartbeat timeout, not a request limit
+timeout = int(os.environ.get('GUNICORN_TIMEOUT', 60))
+graceful_timeout = int(os.environ.get('GUNICORN_GRACEFUL_TIMEOUT', 10))
+keepalive = int(os.environ.get('GUNICORN_KEEPALIVE', 5))
+backlog = int(os.environ.get('GUNICORN_BACKLOG', 2048))
+
+# Load the app in each worker, after the gevent worker has patched it
+preload_app = False
+
+accesslog = os.environ.get('GUNICORN_ACCESS_LOG') or None
+errorlog = '-'
+loglevel = os.environ.get('GUNICORN_LOG_LEVEL', 'info')
@@ -0,0 +1,154 @@
+# SSE load test: hold many concurrent event streams open against one backend.
+#
+#   gunicorn -c gunicorn.conf.py wsgi:app            # one gevent worker
+#   python loadtest_sse.py --host-ip 10.0.0.5 --ca ca.pem --cert cert.pem --key key.pem \
+#       --path /api/containers/<id>/stats --streams 1000 --duration 120 --pid <worker pid>
+#
+# Every stream is a plain socket reading a chunked text/event-stream response.
+# A status line is printed every --interval seconds with open/failed streams,
+# events received and, when --pid is given, the worker's resident memory.
+# Exits non-zero unless all --streams streams were open at once and none failed.
+from gevent import monkey
+
+monkey.patch_all()
+
+import argparse  # noqa: E402
+import socket  # noqa: E402
+import sys  # noqa: E402
+import time  # noqa: E402
+from urllib.parse import urlsplit  # noqa: E402
+
+import gevent  # noqa: E402
+import requests  # noqa: E402
+
+
+class Totals:
+    def __init__(self):
+        self.open = 0
+        self.peak = 0
+        self.failed = 0
+        self.events = 0
+        self.bytes = 0
+        self.errors = {}
+
+
+def rss_mb(pid):
+    try:
+        with open(f"/proc/{pid}/status") as f:
+            for line in f:
+                if line.startswith('VmRSS:'):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        return None
+    return None
+
+
+def connect_session(args):
+    """Log in through /api/connect and return the session cookie header."""
+    if args.cookie:
+        return args.cookie
+    if not args.host_ip:
+        return ''
+    with open(args.ca) as ca, open(args.cert) as cert, open(args.key) as key:
+        payload = {'hostIp': args.host_ip, 'caCert': ca.read(), 'clientCert': cert.read(), 'clientKey': key.read()}
+    resp = requests.post(f"{args.base_url}/api/connect", json=payload, timeout=30)
+    resp.raise_for_status()
+    return '; '.join(f"{k}={v}" for k, v in resp.cookies.items())
+
+
+def hold_stream(args, cookie, totals):
+    url = urlsplit(args.base_url)
+    sock = None
+    opened = False
+    try:
+        sock = socket.create_connection((url.hostname, url.port or 80), timeout=args.read_timeout)
+        request = (
+            f"GET {args.path} HTTP/1.1\r\nHost: {url.netloc}\r\n"
+            f"Accept: text/event-stream\r\nCookie: {cookie}\r\n\r\n"
+        )
+        sock.sendall(request.encode())
+        buffered = b''
+        deadline = time.monotonic() + args.duration
+        while time.monotonic() < deadline:
+            data = sock.recv(65536)
+            if not data:
+                raise ConnectionError('server closed the stream')
+            if not opened:
+                status = data.split(b'\r\n', 1)[0]
+                if b' 200 ' not in status:
+                    raise ConnectionError(status.decode(errors='replace'))
+                opened = True
+                totals.open += 1
+                totals.peak = max(totals.peak, totals.open)
+            totals.bytes += len(data)
+            buffered += data
+            totals.events += buffered.count(b'\n\n')
+            buffered = buffered[buffered.rfind(b'\n\n') + 2:] if b'\n\n' in buffered else buffered[-4096:]
+    except Exception as e:
+        totals.failed += 1
+        reason = type(e).__name__ if not str(e) else str(e)[:60]
+        totals.errors[reason] = totals.errors.get(reason, 0) + 1
+    finally:
+        if opened:
+            totals.open -= 1
+        if sock is not None:
+            sock.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Hold many concurrent SSE streams open against the backend.')
+    parser.add_argument('--base-url', default='http://127.0.0.1:5001')
+    parser.add_argument('--path', required=True, help='SSE endpoint, e.g. /api/containers/<id>/stats')
+    parser.add_argument('--streams', type=int, default=1000)
+    parser.add_argument('--duration', type=float, default=60, help='seconds each stream stays open')
+    parser.add_argument('--ramp', type=float, default=10, help='seconds over which streams are opened')
+    parser.add_argument('--interval', type=float, default=5)
+    parser.add_argument('--read-timeout', type=float, default=60)
+    parser.add_argument('--pid', type=int, help='worker pid to sample VmRSS from')
+    parser.add_argument('--cookie', help='session cookie header to send instead of connecting')
+    parser.add_argument('--host-ip')
+    parser.add_argument('--ca')
+    parser.add_argument('--cert')
+    parser.add_argument('--key')
+    args = parser.parse_args()
+
+    cookie = connect_session(args)
+    totals = Totals()
+    started = time.monotonic()
+    rss_start = rss_mb(args.pid) if args.pid else None
+    rss_peak = rss_start or 0
+
+    workers = []
+    for _ in range(args.streams):
+        workers.append(gevent.spawn(hold_stream, args, cookie, totals))
+        gevent.sleep(args.ramp / args.streams)
+
+    def report():
+        nonlocal rss_peak
+        rss = rss_mb(args.pid) if args.pid else None
+        if rss:
+            rss_peak = max(rss_peak, rss)
+        elapsed = time.monotonic() - started
+        print(
+            f"[{elapsed:6.1f}s] open={totals.open} peak={totals.peak} failed={totals.failed} "
+            f"events={totals.events} ({totals.events / elapsed:.0f}/s) "
+            f"received={totals.bytes / 1e6:.1f}MB"
+            + (f" rss={rss:.1f}MB" if rss else ''),
+            flush=True,
+        )
+
+    while not all(w.dead for w in workers):
+        gevent.joinall(workers, timeout=args.interval)
+        report()
+
+    print(f"peak concurrent streams: {totals.peak} of {args.streams}")
+    if rss_start:
+        print(f"worker rss: start {rss_start:.1f}MB, peak {rss_peak:.1f}MB, "
+              f"{(rss_peak - rss_start) * 1024 / max(totals.peak, 1):.1f}KB per stream")
+    for reason, count in sorted(totals.errors.items(), key=lambda item: -item[1]):
+        print(f"  {count} x {reason}")
+    return 0 if totals.peak >= args.streams and not totals.failed else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,218 @@
+# backend/ssh_pool.py
+#
+# Authenticated SSH connections shared by the terminal sessions in
+# test_backend.py: one key exchange and login per (host, port, user,
+# password), with each terminal running as its own channel over the shared
+# transport.
+
+import hashlib
+import hmac
+import logging
+import os
+import socket
+import threading
+import time
+
+import paramiko
+
+logger = logging.getLogger(__name__)
+
+# Keys passwords into the pool without keeping them; new every process
+_CREDENTIAL_SALT = os.urandom(16)
+# A refused channel lowers that connection's cap and is retried on another (possibly new) connection
+_OPEN_ATTEMPTS = 5
+
+
+class _Connection:
+    __slots__ = ('client', 'channels', 'max_channels', 'last_used')
+
+    def __init__(self, client, max_channels):
+        self.client = client
+        self.channels = 0
+        self.max_channels = max_channels
+        self.last_used = time.monotonic()
+
+    @property
+    def transport(self):
+        return self.client.get_transport()
+
+    def active(self):
+        transport = self.transport
+        return transport is not None and transport.is_active()
+
+
+def credential_digest(password):
+    """Salted HMAC of a password, so pooled connections are only reused by callers who know it."""
+    return hmac.new(_CREDENTIAL_SALT, (password or '').encode(), hashlib.sha256).digest()
+
+
+class SSHTransportPool:
+    """
+    Authenticated paramiko connections keyed by (host, port, user) and a
+    digest of the password they logged in with, each carrying up to
+    `max_channels` session channels (sshd's MaxSessions defaults to 10).
+    A caller only gets a channel on a connection that authenticated with
+    the same credentials it presents.
+
+    open_channel() reuses the least busy live connection for the key and
+    only connects and authenticates when all of them are full; concurrent
+    callers for one key wait for a single login instead of each doing
+    their own. If the server refuses a channel before the cap, that
+    connection's cap is lowered to what it accepted. Connections send SSH
+    keepalives every `keepalive` seconds, and a reaper closes those that
+    have had no channel for `idle_ttl` seconds or have died.
+    """
+
+    def __init__(self, max_channels=10, idle_ttl=300, keepalive=30, connect_timeout=10):
+        self.max_channels = max_channels
+        self.idle_ttl = idle_ttl
+        self.keepalive = keepalive
+        self.connect_timeout = connect_timeout
+        self.connects = 0
+        self._connections = {}
+        self._owners = {}
+        self._key_locks = {}
+        self._lock = threading.Lock()
+        self._reaper = None
+
+    def _connect(self, key, password):
+        host, port, user, _ = key
+        client = paramiko.SSHClient()
+        client.set_missing_host_key_policy(paramiko.AutoAddPolicy())
+        started = time.monotonic()
+        client.connect(hostname=host, port=port, username=user, password=password, timeout=self.connect_timeout)
+        transport = client.get_transport()
+        transport.set_keepalive(self.keepalive)
+        # Keystrokes and channel requests are tiny packets; don't let Nagle hold them for an ACK
+        transport.sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        self.connects += 1
+        logger.info(f"ssh pool: connected {user}@{host}:{port} in {time.monotonic() - started:.2f}s")
+        return _Connection(client, self.max_channels)
+
+    def _lease(self, key):
+        """Reserve a channel slot on the least busy live connection for `key`, or return None."""
+        with self._lock:
+            live = [c for c in self._connections.get(key, ()) if c.channels < c.max_channels and c.active()]
+            if not live:
+                return None
+            connection = min(live, key=lambda c: c.channels)
+            connection.channels += 1
+            connection.last_used = time.monotonic()
+            return connection
+
+    def _open_on(self, connection, timeout):
+        try:
+            channel = connection.transport.open_session(timeout=timeout)
+        except (paramiko.SSHException, EOFError, OSError) as e:
+            with self._lock:
+                connection.channels -= 1
+            if not connection.active():
+                self._discard(connection)
+                return None
+            # A refusal on a live connection (paramiko reports concurrent ones as a plain
+            # SSHException): the server allows fewer sessions than our cap
+            with self._lock:
+                connection.max_channels = max(min(connection.max_channels, connection.channels), 1)
+            logger.warning(f"ssh pool: channel refused ({e}); capping connection at {connection.max_channels}")
+            return None
+        with self._lock:
+            self._owners[channel] = connection
+        return channel
+
+    def open_channel(self, host, user, password, port=22, timeout=10):
+        """A new session channel to user@host:port; hand it back with release()."""
+        key = (host, int(port), user, credential_digest(password))
+        self._start_reaper()
+        for _ in range(_OPEN_ATTEMPTS):
+            connection = self._lease(key)
+            if connection is None:
+                with self._lock:
+                    key_lock = self._key_locks.setdefault(key, threading.Lock())
+                try:
+                    with key_lock:
+                        # Another caller may have connected while we waited
+                        connection = self._lease(key)
+                        if connection is None:
+                            connection = self._connect(key, password)
+                            connection.channels = 1
+                            with self._lock:
+                                self._connections.setdefault(key, []).append(connection)
+                except BaseException:
+                    with self._lock:
+                        self._drop_key_lock(key)
+                    raise
+            channel = self._open_on(connection, timeout)
+            if channel is not None:
+                return channel
+        raise paramiko.SSHException(f"Could not open a channel to {user}@{host}:{port}")
+
+    def release(self, channel):
+        """Close a channel from open_channel() and free its slot on the shared connection."""
+        try:
+            channel.close()
+        except Exception:
+            pass
+        with self._lock:
+            connection = self._owners.pop(channel, None)
+            if connection is not None:
+                connection.channels -= 1
+                connection.last_used = time.monotonic()
+
+    def _drop_key_lock(self, key):
+        """Forget the login lock of a key with no connections left; the caller holds self._lock."""
+        key_lock = self._key_locks.get(key)
+        # A held lock means a login for this key is in progress
+        if key not in self._connections and key_lock is not None and not key_lock.locked():
+            del self._key_locks[key]
+
+    def _discard(self, connection):
+        with self._lock:
+            for key, connections in list(self._connections.items()):
+                if connection in connections:
+                    connections.remove(connection)
+                    if not connections:
+                        del self._connections[key]
+                        self._drop_key_lock(key)
+        try:
+            connection.client.close()
+        except Exception:
+            pass
+
+    def reap(self):
+        """Close connections that are dead, or idle with no channels for idle_ttl seconds."""
+        now = time.monotonic()
+        with self._lock:
+            stale = [
+                c for connections in self._connections.values() for c in connections
+                if not c.active() or (c.channels == 0 and now - c.last_used > self.idle_ttl)
+            ]
+        for connection in stale:
+            logger.info(f"ssh pool: closing {'dead' if not connection.active() else 'idle'} connection")
+            self._discard(connection)
+        return len(stale)
+
+    def _start_reaper(self):
+        if self._reaper is not None:
+            return
+        with self._lock:
+            if self._reaper is not None:
+                return
+            self._reaper = threading.Thread(target=self._reap_forever, name='ssh-pool-reaper', daemon=True)
+        self._reaper.start()
+
+    def _reap_forever(self):
+        while True:
+            time.sleep(max(min(self.idle_ttl, self.keepalive) / 2, 1))
+            try:
+                self.reap()
+            except Exception:
+                logger.exception('ssh pool: reaper failed')
+
+    def stats(self):
+        with self._lock:
+            connections = [c for cs in self._connections.values() for c in cs]
+        return {
+            'connections': len(connections),
+            'channels': sum(c.channels for c in connections),
+            'connects': self.connects,
+        }
@@ -12,6 +12,8 @@ from flask import Flask
 from flask_cors import CORS
 from flask_sock import Sock
 
+from ssh_pool import SSHTransportPool
+
 # Configure detailed logging
 logging.basicConfig(
     level=logging.DEBUG,
@@ -43,6 +45,13 @@ logger.info(
 if os.getenv('SSH_HOST') is None:
     logger.warning("⚠️  SSH_HOST not set via environment; using default. You can override by sending hostIp in the WebSocket init payload.")
 
+# --- Shared SSH connections: one login per (host, user), one channel per terminal ---
+ssh_pool = SSHTransportPool(
+    max_channels=int(os.getenv('SSH_POOL_MAX_CHANNELS', 10)),
+    idle_ttl=float(os.getenv('SSH_POOL_IDLE_TTL', 300)),
+    keepalive=float(os.getenv('SSH_POOL_KEEPALIVE', 30)),
+)
+
 @sock.route('/ws')
 def ssh_websocket_handler(ws):
     """
@@ -57,7 +66,6 @@ def ssh_websocket_handler(ws):
     logger.debug(f"🔍 [{session_id}] Client address: {getattr(ws, 'environ', {}).get('REMOTE_ADDR', 'Unknown')}")
     
     print(f"[TEST_BACKEND] [{session_id}] WebSocket connection received.")
-    ssh_client = None
     channel = None
 
     try:
@@ -122,26 +130,15 @@ def ssh_websocket_handler(ws):
             ws.close(reason=1008, message='Container ID not provided.')
             return
 
-        # 2. Establish SSH connection with Paramiko
+        # 2. Open a channel on the pooled SSH connection (logs in only if none has room)
         ssh_start_time = time.time()
-        logger.info(f"🔐 [{session_id}] Attempting SSH connection to {SSH_USER}@{target_host}...")
+        logger.info(f"🔐 [{session_id}] Opening SSH channel to {SSH_USER}@{target_host}...")
         print(f"[TEST_BACKEND] [{session_id}] Attempting to connect to {SSH_USER}@{target_host}...")
         
-        ssh_client = paramiko.SSHClient()
-        logger.debug(f"🔍 [{session_id}] SSH client created: {ssh_client}")
-        
-        ssh_client.set_missing_host_key_policy(paramiko.AutoAddPolicy())
-        logger.debug(f"🔍 [{session_id}] SSH host key policy set to AutoAddPolicy")
-        
         try:
-            ssh_client.connect(
-                hostname=target_host,
-                username=SSH_USER,
-                password=SSH_PASS,
-                timeout=10
-            )
+            channel = ssh_pool.open_channel(target_host, SSH_USER, SSH_PASS, timeout=10)
             ssh_connect_time = time.time() - ssh_start_time
-            logger.info(f"✅ [{session_id}] SSH connection successful in {ssh_connect_time:.2f}s")
+            logger.info(f"✅ [{session_id}] SSH channel open in {ssh_connect_time:.2f}s (pool: {ssh_pool.stats()})")
             print(f"[TEST_BACKEND] [{session_id}] SSH connection successful.")
         except paramiko.AuthenticationException as e:
             error_msg = f"SSH authentication failed: {str(e)}"
@@ -173,22 +170,13 @@ def ssh_websocket_handler(ws):
         logger.debug(f"🔍 [{session_id}] Environment: {{'TERM': 'xterm-color'}}")
         
         try:
-            stdin, stdout, stderr = ssh_client.exec_command(
-                command_to_run,
-                get_pty=True,
-                environment={'TERM': 'xterm-color'}
-            )
+            logger.info(f"📐 [{session_id}] Requesting {term_cols}x{term_rows} PTY")
+            channel.get_pty(term='xterm-color', width=term_cols, height=term_rows)
+            channel.exec_command(command_to_run)
             exec_setup_time = time.time() - exec_start_time
             logger.info(f"✅ [{session_id}] SSH command execution setup completed in {exec_setup_time:.2f}s")
-            
-            channel = stdout.channel
-            logger.debug(f"🔍 [{session_id}] SSH channel obtained: {channel}")
             logger.debug(f"🔍 [{session_id}] Channel active: {channel.active}")
             
-            logger.info(f"📐 [{session_id}] Resizing PTY to {term_cols}x{term_rows}")
-            channel.resize_pty(width=term_cols, height=term_rows)
-            logger.debug(f"✅ [{session_id}] PTY resize completed")
-            
         except Exception as e:
             error_msg = f"Failed to execute Docker command: {str(e)}"
             logger.error(f"❌ [{session_id}] {error_msg}")
@@ -319,20 +307,10 @@ def ssh_websocket_handler(ws):
         print(f"[TEST_BACKEND] [{session_id}] Cleaning up and closing connections.")
         
         if channel:
-            try:
-                logger.debug(f"🔌 [{session_id}] Closing SSH channel")
-                channel.close()
-                logger.debug(f"✅ [{session_id}] SSH channel closed successfully")
-            except Exception as e:
-                logger.error(f"❌ [{session_id}] Error closing SSH channel: {str(e)}")
-                
-        if ssh_client:
-            try:
-                logger.debug(f"🔌 [{session_id}] Closing SSH client")
-                ssh_client.close()
-                logger.debug(f"✅ [{session_id}] SSH client closed successfully")
-            except Exception as e:
-                logger.error(f"❌ [{session_id}] Error closing SSH client: {str(e)}")
+            # Closes only this channel; the SSH connection stays pooled for other terminals
+            logger.debug(f"🔌 [{session_id}] Releasing SSH channel")
+            ssh_pool.release(channel)
+            logger.debug(f"✅ [{session_id}] SSH channel released (pool: {ssh_pool.stats()})")
                 
         if ws.connected:
             try:
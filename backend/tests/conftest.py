@@ -0,0 +1,34 @@
+# backend/tests/conftest.py
+
+import os
+import sys
+import tempfile
+
+import pytest
+
+# Tests import the backend as `app`, the way run.py and wsgi.py do
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Keep what app.routes writes at import out of the working tree, and its background sampler off
+_workdir = tempfile.mkdtemp(prefix='daas-tests-')
+os.environ.setdefault('DATA_DIR', _workdir)
+os.environ.setdefault('STATS_HISTORY_SAMPLE_INTERVAL', '0')
+
+DOCKER_CONFIG = {'base_url': 'tcp://127.0.0.1:2375', 'mode': 'http', 'session_id': None, 'host_ip': '127.0.0.1'}
+
+
+@pytest.fixture(scope='session')
+def flask_app():
+    from app import create_app
+    flask_app = create_app()
+    flask_app.testing = True
+    return flask_app
+
+
+@pytest.fixture
+def client(flask_app):
+    """Test client whose session is connected to DOCKER_CONFIG."""
+    client = flask_app.test_client()
+    with client.session_transaction() as flask_session:
+        flask_session['docker_config'] = dict(DOCKER_CONFIG)
+    return client
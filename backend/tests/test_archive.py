@@ -0,0 +1,43 @@
+# backend/tests/test_archive.py
+
+import pytest
+
+from app.archive import parse_range
+
+
+@pytest.mark.parametrize('header, expected', [
+    ('bytes=0-499', (0, 499)),
+    ('bytes=500-', (500, 999)),
+    ('bytes=900-5000', (900, 999)),
+    ('bytes=999-999', (999, 999)),
+    ('bytes=-200', (800, 999)),
+    ('bytes=-5000', (0, 999)),
+    (' bytes=1-2 ', (1, 2)),
+])
+def test_parse_range(header, expected):
+    assert parse_range(header, 1000) == expected
+
+
+@pytest.mark.parametrize('header', [
+    None,
+    '',
+    'bytes=-',
+    'bytes=0-1,5-6',
+    'items=0-1',
+    'bytes=a-b',
+    'bytes=5-1',
+])
+def test_parse_range_sends_whole_file(header):
+    assert parse_range(header, 1000) is None
+
+
+@pytest.mark.parametrize('header, size', [
+    ('bytes=1000-', 1000),
+    ('bytes=1000-2000', 1000),
+    ('bytes=-0', 1000),
+    ('bytes=0-', 0),
+    ('bytes=-5', 0),
+])
+def test_parse_range_not_satisfiable(header, size):
+    with pytest.raises(ValueError):
+        parse_range(header, size)
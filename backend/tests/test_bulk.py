@@ -0,0 +1,163 @@
+# backend/tests/test_bulk.py
+
+import json
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import docker
+import pytest
+
+from app import routes
+from app.bulk import run_bulk
+
+
+class StubAPI:
+    """Lifecycle calls that sleep for `delays[id]` seconds or raise `errors[id]`."""
+
+    def __init__(self, delays=None, errors=None):
+        self.delays = delays or {}
+        self.errors = errors or {}
+        self.calls = []
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self._lock = threading.Lock()
+
+    def _call(self, action, container_id, **kwargs):
+        with self._lock:
+            self.calls.append((action, container_id, kwargs))
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            time.sleep(self.delays.get(container_id, 0.01))
+            if container_id in self.errors:
+                raise self.errors[container_id]
+        finally:
+            with self._lock:
+                self.in_flight -= 1
+
+    def start(self, container_id):
+        self._call('start', container_id)
+
+    def stop(self, container_id, timeout=None):
+        self._call('stop', container_id, timeout=timeout)
+
+    def restart(self, container_id, timeout=None):
+        self._call('restart', container_id, timeout=timeout)
+
+    def kill(self, container_id):
+        self._call('kill', container_id)
+
+    def remove_container(self, container_id, force=False):
+        self._call('delete', container_id, force=force)
+
+
+@pytest.fixture
+def executor():
+    with ThreadPoolExecutor(max_workers=16) as executor:
+        yield executor
+
+
+def by_id(results):
+    return {result['id']: result for result in results}
+
+
+def test_every_container_gets_one_result(executor):
+    api = StubAPI(errors={
+        'gone': docker.errors.NotFound('404 Client Error'),
+        'busy': docker.errors.APIError('409 Client Error', explanation='container is restarting'),
+        'odd': RuntimeError('unexpected'),
+    })
+    results = by_id(run_bulk(executor, api, 'stop', ['c1', 'gone', 'busy', 'odd'], 4, 5, 7))
+    assert results['c1']['ok'] and results['c1']['action'] == 'stop'
+    assert results['gone']['error'] == 'Container not found'
+    assert results['busy']['error'] == 'container is restarting'
+    assert results['odd']['error'] == 'unexpected'
+    assert all(call[2] == {'timeout': 7} for call in api.calls)
+
+
+@pytest.mark.parametrize('action, expected', [
+    ('start', {}), ('restart', {'timeout': 10}), ('kill', {}), ('delete', {'force': True}),
+])
+def test_actions_map_to_api_calls(executor, action, expected):
+    api = StubAPI()
+    list(run_bulk(executor, api, action, ['c1'], 1, 5, 10))
+    assert api.calls == [(action, 'c1', expected)]
+
+
+def test_concurrency_cap(executor):
+    api = StubAPI(delays={f"c{n}": 0.03 for n in range(12)})
+    ids = [f"c{n}" for n in range(12)]
+    results = list(run_bulk(executor, api, 'start', ids, 3, 5, 10))
+    assert sorted(r['id'] for r in results) == sorted(ids)
+    assert api.max_in_flight == 3
+
+
+def test_results_stream_in_completion_order(executor):
+    api = StubAPI(delays={'slow': 0.3, 'fast': 0.01})
+    results = run_bulk(executor, api, 'start', ['slow', 'fast'], 2, 5, 10)
+    started = time.monotonic()
+    assert next(results)['id'] == 'fast'
+    assert time.monotonic() - started < 0.2
+    assert next(results)['id'] == 'slow'
+
+
+def test_running_operation_times_out(executor):
+    api = StubAPI(delays={'hung': 0.6})
+    started = time.monotonic()
+    results = by_id(run_bulk(executor, api, 'stop', ['hung', 'c1'], 2, 0.2, 10))
+    assert time.monotonic() - started < 0.5
+    assert results['c1']['ok']
+    assert not results['hung']['ok']
+    assert results['hung']['error'] == 'Timed out after 0.2s; the operation may still complete'
+
+
+def test_queued_operation_times_out_before_starting():
+    # The shared pool is busy with another request, so this batch's operation never starts
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        blocker = threading.Event()
+        executor.submit(blocker.wait, 2)
+        api = StubAPI()
+        (result,) = run_bulk(executor, api, 'start', ['c1'], 1, 0.1, 10)
+        blocker.set()
+    assert result['error'] == 'Timed out after 0.1s before starting'
+    assert api.calls == []
+
+
+def test_closing_the_stream_cancels_queued_operations():
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        api = StubAPI(delays={'c0': 0.01, 'c1': 0.2})
+        results = run_bulk(executor, api, 'stop', ['c0', 'c1', 'c2', 'c3', 'c4'], 3, 5, 10)
+        assert next(results)['id'] == 'c0'
+        # c1 is running now, c2 and c3 are queued behind it and c4 not submitted
+        results.close()
+    assert [call[1] for call in api.calls] == ['c0', 'c1']
+
+
+@pytest.fixture
+def bulk_api(monkeypatch):
+    api = StubAPI(errors={'gone': docker.errors.NotFound('404 Client Error')})
+
+    class StubClient:
+        def __init__(self):
+            self.api = api
+
+        def close(self):
+            pass
+
+    monkeypatch.setattr(routes, 'get_docker_client', lambda config=None: StubClient())
+    return api
+
+
+def test_bulk_route_streams_ndjson(client, bulk_api):
+    response = client.post('/api/containers/bulk', json={'action': 'kill', 'ids': ['c1', 'gone', 'c1']})
+    assert response.mimetype == 'application/x-ndjson'
+    lines = [json.loads(line) for line in response.get_data(as_text=True).splitlines()]
+    assert sorted(line['id'] for line in lines[:-1]) == ['c1', 'gone']
+    assert lines[-1]['done'] and (lines[-1]['succeeded'], lines[-1]['failed']) == (1, 1)
+
+
+def test_bulk_route_rejects_bad_input(client, bulk_api):
+    assert client.post('/api/containers/bulk', json={'action': 'explode', 'ids': ['c1']}).status_code == 400
+    assert client.post('/api/containers/bulk', json={'action': 'stop'}).status_code == 400
+    assert client.post('/api/containers/bulk', json={'action': 'stop', 'ids': ['c1'], 'timeout': 'x'}).status_code == 400
@@ -0,0 +1,162 @@
+# backend/tests/test_cache.py
+
+import threading
+import time
+
+import pytest
+
+from app.cache import TTLCache
+
+
+class Loader:
+    """Counts calls; each call returns the next number, optionally after a wait."""
+
+    def __init__(self, delay=0):
+        self.delay = delay
+        self.calls = 0
+        self.error = None
+        self.release = threading.Event()
+        self.release.set()
+
+    def __call__(self):
+        self.calls += 1
+        self.release.wait(2)
+        time.sleep(self.delay)
+        if self.error:
+            raise self.error
+        return self.calls
+
+
+def wait_for(predicate, timeout=2):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if predicate():
+            return True
+        time.sleep(0.01)
+    return predicate()
+
+
+def test_fresh_value_is_not_reloaded():
+    cache = TTLCache(ttl=60)
+    loader = Loader()
+    assert cache.get('k', loader) == 1
+    assert cache.get('k', loader) == 1
+    assert loader.calls == 1
+
+
+def test_concurrent_misses_call_the_loader_once():
+    cache = TTLCache(ttl=60)
+    loader = Loader(delay=0.1)
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(cache.get('k', loader))) for _ in range(10)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert loader.calls == 1
+    assert results == [1] * 10
+
+
+def test_concurrent_misses_share_the_loader_error():
+    cache = TTLCache(ttl=60)
+    loader = Loader(delay=0.1)
+    loader.error = ConnectionError('upstream down')
+    errors = []
+
+    def get():
+        try:
+            cache.get('k', loader)
+        except ConnectionError as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=get) for _ in range(5)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert loader.calls == 1
+    assert len(errors) == 5
+    # Nothing is cached, so the next call tries again
+    loader.error = None
+    assert cache.get('k', loader) == 2
+
+
+def test_stale_value_is_served_while_one_refresh_runs():
+    cache = TTLCache(ttl=0.05, stale_ttl=60)
+    loader = Loader()
+    assert cache.get('k', loader) == 1
+    time.sleep(0.1)
+
+    loader.release.clear()
+    started = time.monotonic()
+    assert [cache.get('k', loader) for _ in range(5)] == [1] * 5
+    assert time.monotonic() - started < 0.5
+    assert wait_for(lambda: loader.calls == 2)
+    time.sleep(0.05)
+    assert loader.calls == 2
+
+    loader.release.set()
+    assert wait_for(lambda: cache.get('k', loader) == 2)
+    assert loader.calls == 2
+
+
+def test_refresh_error_keeps_the_stale_value():
+    cache = TTLCache(ttl=0.05, stale_ttl=60)
+    loader = Loader()
+    cache.get('k', loader)
+    time.sleep(0.1)
+
+    loader.error = ConnectionError('upstream down')
+    assert cache.get('k', loader) == 1
+    assert wait_for(lambda: loader.calls == 2)
+    time.sleep(0.05)
+    assert cache.get('k', loader) == 1
+    # The failed refresh is not in flight any more, so the next stale read retries
+    assert wait_for(lambda: loader.calls >= 3)
+
+    loader.error = None
+    assert wait_for(lambda: cache.get('k', loader) > 1)
+
+
+def test_value_past_the_stale_window_is_loaded_synchronously():
+    cache = TTLCache(ttl=0.05, stale_ttl=0.05)
+    loader = Loader()
+    cache.get('k', loader)
+    time.sleep(0.15)
+    assert cache.get('k', loader) == 2
+
+    loader.error = ConnectionError('upstream down')
+    time.sleep(0.15)
+    with pytest.raises(ConnectionError):
+        cache.get('k', loader)
+
+
+def test_ttl_for_and_age_of():
+    cache = TTLCache(ttl=60, ttl_for=lambda value: 60 if value['ok'] else 0.05,
+                     age_of=lambda value: value.get('age', 0))
+    cache.set('bad', {'ok': False})
+    cache.set('old', {'ok': True, 'age': 3600})
+    time.sleep(0.1)
+    assert cache.get('bad', lambda: {'ok': True}) == {'ok': True}
+    assert cache.get('old', lambda: {'ok': True, 'fresh': True}) == {'ok': True, 'fresh': True}
+
+
+def test_least_recently_used_entry_is_dropped():
+    cache = TTLCache(ttl=60, max_entries=2)
+    cache.set('a', 1)
+    cache.set('b', 2)
+    cache.get('a', Loader())
+    cache.set('c', 3)
+    assert cache.peek('b') is None
+    assert (cache.peek('a'), cache.peek('c')) == (1, 3)
+    assert len(cache) == 2
+
+
+def test_invalidate_and_clear():
+    cache = TTLCache(ttl=60)
+    cache.set('a', 1)
+    cache.set('b', 2)
+    cache.invalidate('a')
+    assert cache.peek('a') is None
+    cache.clear()
+    assert len(cache) == 0
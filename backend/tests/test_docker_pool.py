@@ -0,0 +1,129 @@
+# backend/tests/test_docker_pool.py
+
+import time
+
+import pytest
+
+from app.docker_pool import DockerClientPool, PooledDockerClient
+
+
+@pytest.fixture
+def shut_down(monkeypatch):
+    """Base URLs of the pooled clients shut down so far."""
+    closed = []
+    monkeypatch.setattr(PooledDockerClient, 'shutdown', lambda self: closed.append(self.api.base_url))
+    return closed
+
+
+def kwargs_for(port, opened=None):
+    def client_kwargs():
+        if opened is not None:
+            opened.append(port)
+        return {'base_url': f"tcp://127.0.0.1:{port}", 'version': '1.41'}
+    return client_kwargs
+
+
+def url(port):
+    return f"http://127.0.0.1:{port}"
+
+
+def test_leases_of_one_key_share_a_client(shut_down):
+    pool = DockerClientPool()
+    opened = []
+    first = pool.acquire('a', kwargs_for(1, opened))
+    second = pool.acquire('a', kwargs_for(1, opened))
+    other = pool.acquire('b', kwargs_for(2, opened))
+    assert opened == [1, 2]
+    assert first.api is second.api
+    assert other.api is not first.api
+    assert first.api.base_url == url(1)
+    for lease in (first, second, other):
+        lease.close()
+    assert len(pool) == 2
+    assert shut_down == []
+
+
+def test_closing_a_lease_twice_releases_it_once(shut_down):
+    pool = DockerClientPool()
+    first = pool.acquire('a', kwargs_for(1))
+    second = pool.acquire('a', kwargs_for(1))
+    first.close()
+    first.close()
+    pool.evict('a')
+    # The second lease is still in use
+    assert shut_down == []
+    second.close()
+    assert shut_down == [url(1)]
+    second.close()
+    assert shut_down == [url(1)]
+
+
+def test_evicting_an_idle_client_shuts_it_down(shut_down):
+    pool = DockerClientPool()
+    pool.acquire('a', kwargs_for(1)).close()
+    pool.evict('a')
+    assert shut_down == [url(1)]
+    assert len(pool) == 0
+
+
+def test_client_evicted_on_disconnect_is_retired_until_released(shut_down):
+    pool = DockerClientPool()
+    opened = []
+    stream = pool.acquire('a', kwargs_for(1, opened))
+    pool.evict('a')
+    assert shut_down == []
+
+    # A reconnect gets a new client while the stream keeps the old one
+    fresh = pool.acquire('a', kwargs_for(1, opened))
+    assert opened == [1, 1]
+    assert fresh.api is not stream.api
+    stream.close()
+    assert shut_down == [url(1)]
+    fresh.close()
+    assert len(pool) == 1
+    assert shut_down == [url(1)]
+
+
+def test_idle_sweep_follows_release_order(shut_down):
+    pool = DockerClientPool(idle_ttl=0.2)
+    a = pool.acquire('a', kwargs_for(1))
+    b = pool.acquire('b', kwargs_for(2))
+    b.close()
+    time.sleep(0.15)
+    a.close()
+    time.sleep(0.1)
+    # 'b' has been idle for 0.25 s, 'a' (acquired first) for 0.1 s
+    pool.acquire('c', kwargs_for(3)).close()
+    assert shut_down == [url(2)]
+    assert len(pool) == 2
+
+
+def test_idle_sweep_keeps_leased_clients(shut_down):
+    pool = DockerClientPool(idle_ttl=0.05)
+    held = pool.acquire('a', kwargs_for(1))
+    pool.acquire('b', kwargs_for(2)).close()
+    time.sleep(0.1)
+    pool.acquire('c', kwargs_for(3)).close()
+    assert shut_down == [url(2)]
+    held.close()
+    assert len(pool) == 2
+
+
+def test_pool_beyond_max_clients_drops_least_recently_used(shut_down):
+    pool = DockerClientPool(max_clients=2)
+    pool.acquire('a', kwargs_for(1)).close()
+    pool.acquire('b', kwargs_for(2)).close()
+    pool.acquire('a', kwargs_for(1)).close()
+    pool.acquire('c', kwargs_for(3)).close()
+    assert shut_down == [url(2)]
+    assert len(pool) == 2
+
+
+def test_clear_retires_every_client(shut_down):
+    pool = DockerClientPool()
+    held = pool.acquire('a', kwargs_for(1))
+    pool.acquire('b', kwargs_for(2)).close()
+    pool.clear()
+    assert shut_down == [url(2)]
+    held.close()
+    assert shut_down == [url(2), url(1)]
@@ -0,0 +1,155 @@
+# backend/tests/test_fleet.py
+
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from app import routes
+from app.cache import TTLCache
+from app.fleet import FanOut, FleetRegistry
+
+
+class StubHosts:
+    """func(name, config) for FanOut: each host answers, fails or hangs as configured."""
+
+    def __init__(self, **behaviour):
+        self.behaviour = behaviour
+        self.calls = []
+        self.release = threading.Event()
+
+    def __call__(self, name, config):
+        self.calls.append(name)
+        action = self.behaviour.get(name, 'ok')
+        if action == 'fail':
+            raise ConnectionError(f"{name} refused the connection")
+        if action == 'hang':
+            self.release.wait(2)
+        return f"answer from {name}"
+
+
+@pytest.fixture
+def executor():
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        yield executor
+
+
+def hosts(*names):
+    return [(name, {'base_url': f"tcp://{name}:2375"}) for name in names]
+
+
+def test_partial_results_mark_failed_and_slow_hosts(executor):
+    stub = StubHosts(b='fail', c='hang')
+    started = time.monotonic()
+    results, statuses = FanOut(executor).run(hosts('a', 'b', 'c'), stub, timeout=0.2)
+    stub.release.set()
+    # The hung host does not hold up the others beyond the timeout
+    assert time.monotonic() - started < 0.5
+    assert results == {'a': 'answer from a'}
+    assert statuses['a']['ok']
+    assert statuses['b'] == {'ok': False, 'elapsed_ms': statuses['b']['elapsed_ms'], 'error': 'b refused the connection'}
+    assert statuses['c']['timed_out'] and statuses['c']['error'] == 'No answer within 0.2s'
+
+
+def test_failed_host_is_skipped_during_the_cooldown(executor):
+    stub = StubHosts(b='fail')
+    fan_out = FanOut(executor, cooldown=0.2)
+    fan_out.run(hosts('a', 'b'), stub, timeout=1)
+    results, statuses = fan_out.run(hosts('a', 'b'), stub, timeout=1)
+    assert stub.calls.count('b') == 1
+    assert statuses['b']['skipped'] and not statuses['b']['ok']
+    assert 'retrying in' in statuses['b']['error']
+    assert list(results) == ['a']
+
+    time.sleep(0.25)
+    stub.behaviour['b'] = 'ok'
+    results, statuses = fan_out.run(hosts('a', 'b'), stub, timeout=1)
+    assert statuses['b']['ok'] and results['b'] == 'answer from b'
+
+
+def test_timed_out_host_cools_down_until_a_late_answer_arrives(executor):
+    stub = StubHosts(c='hang')
+    fan_out = FanOut(executor, cooldown=60)
+    fan_out.run(hosts('c'), stub, timeout=0.05)
+    _, statuses = fan_out.run(hosts('c'), stub, timeout=0.05)
+    assert statuses['c']['skipped']
+
+    # The first call finishes after its deadline: the host counts as up again
+    stub.release.set()
+    time.sleep(0.05)
+    results, _ = fan_out.run(hosts('c'), stub, timeout=1)
+    assert results == {'c': 'answer from c'}
+
+
+def test_queued_call_is_cancelled_at_the_deadline():
+    stub = StubHosts(a='hang')
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        results, statuses = FanOut(executor).run(hosts('a', 'b'), stub, timeout=0.1)
+        stub.release.set()
+    # 'b' waited behind 'a' on the only worker and never ran
+    assert stub.calls == ['a']
+    assert results == {}
+    assert statuses['b']['timed_out']
+
+
+@pytest.fixture
+def fleet(monkeypatch, tmp_path):
+    registry = FleetRegistry(str(tmp_path / 'fleet_hosts.json'), str(tmp_path))
+    for name in ('east', 'west', 'down'):
+        registry.add(name, {'host_ip': name, 'base_url': f"tcp://{name}:2375", 'mode': 'http', 'session_id': None})
+    rows = {
+        'east': [{'Id': 'e1' * 8, 'Names': ['/api'], 'State': 'running', 'Created': 300},
+                 {'Id': 'e2' * 8, 'Names': ['/db'], 'State': 'exited', 'Created': 100}],
+        'west': [{'Id': 'w1' * 8, 'Names': ['/web'], 'State': 'running', 'Created': 200}],
+    }
+
+    def list_host_objects(kind, config=None):
+        if config['host_ip'] not in rows:
+            raise ConnectionError('connection refused')
+        return rows[config['host_ip']]
+
+    monkeypatch.setattr(routes, 'fleet_registry', registry)
+    # A fresh FanOut on the app's executor, so no cooldown carries over between tests
+    monkeypatch.setattr(routes, 'fleet_fan_out', FanOut(routes.fleet_fan_out.executor))
+    monkeypatch.setattr(routes, 'list_host_objects', list_host_objects)
+    return registry
+
+
+def test_fleet_containers_merges_hosts_newest_first(client, fleet):
+    body = client.get('/api/fleet/containers').get_json()
+    assert [(c['host'], c['name']) for c in body['containers']] == [('east', 'api'), ('west', 'web'), ('east', 'db')]
+    assert body['partial']
+    assert body['hosts']['east']['count'] == 2
+    assert body['hosts']['down'] == {
+        'ok': False, 'elapsed_ms': body['hosts']['down']['elapsed_ms'], 'error': 'connection refused'
+    }
+
+
+def test_fleet_containers_pages_the_merged_list(client, fleet):
+    response = client.get('/api/fleet/containers', query_string={'limit': 2, 'host': ['east', 'west']})
+    body = response.get_json()
+    assert [c['name'] for c in body['containers']] == ['api', 'web']
+    assert not body['partial']
+    page = client.get('/api/fleet/containers', query_string={
+        'limit': 2, 'host': ['east', 'west'], 'cursor': response.headers['X-Next-Cursor'],
+    })
+    assert [c['name'] for c in page.get_json()['containers']] == ['db']
+    assert 'X-Next-Cursor' not in page.headers
+
+
+def test_fleet_node_info_totals_cover_the_hosts_that_answered(client, fleet, monkeypatch):
+    def load_node_info(config):
+        if config['host_ip'] == 'down':
+            raise ConnectionError('connection refused')
+        return {'total_containers': 2, 'running_containers': 1, 'cpu_cores': 4, 'memory_total_mb': 1024}
+
+    monkeypatch.setattr(routes, 'node_info_cache', TTLCache(ttl=0))
+    monkeypatch.setattr(routes, 'load_node_info', load_node_info)
+    body = client.get('/api/fleet/node-info').get_json()
+    assert sorted(body['nodes']) == ['east', 'west']
+    assert body['totals'] == {
+        'total_containers': 4, 'running_containers': 2, 'total_images': 0, 'cpu_cores': 8,
+        'memory_total_mb': 2048, 'memory_usage_mb': 0, 'hosts': 3, 'hosts_up': 2,
+    }
+    assert body['partial'] and not body['hosts']['down']['ok']
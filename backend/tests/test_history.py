@@ -0,0 +1,186 @@
+# backend/tests/test_history.py
+
+import time
+
+from app.history import HISTORY_METRICS, ContainerHistory, HistorySampler, RingTier, StatsHistory
+
+T0 = 1_700_000_000
+TIERS = ((1, 60), (10, 60), (60, 60))
+
+
+def sample(value):
+    return [float(value)] * len(HISTORY_METRICS)
+
+
+def test_ring_tier_averages_samples_in_a_bucket():
+    tier = RingTier(resolution=10, capacity=6)
+    tier.add(T0, sample(1))
+    tier.add(T0 + 4, sample(2))
+    tier.add(T0 + 9, sample(6))
+    assert list(tier.points(T0, T0 + 9)) == [(T0, sample(3))]
+
+
+def test_ring_tier_points_are_oldest_first_within_range():
+    tier = RingTier(resolution=10, capacity=6)
+    for i in range(5):
+        tier.add(T0 + i * 10, sample(i))
+    assert [ts for ts, _ in tier.points(T0, T0 + 40)] == [T0, T0 + 10, T0 + 20, T0 + 30, T0 + 40]
+    # The bucket holding `start` is included; the newest is still pending and served from its running sums
+    assert list(tier.points(T0 + 25, T0 + 45)) == [(T0 + 20, sample(2)), (T0 + 30, sample(3)), (T0 + 40, sample(4))]
+
+
+def test_ring_tier_skips_buckets_without_samples():
+    tier = RingTier(resolution=10, capacity=6)
+    tier.add(T0, sample(1))
+    tier.add(T0 + 30, sample(4))
+    assert list(tier.points(T0, T0 + 30)) == [(T0, sample(1)), (T0 + 30, sample(4))]
+
+
+def test_ring_tier_overwrites_oldest_buckets():
+    tier = RingTier(resolution=10, capacity=3)
+    for i in range(5):
+        tier.add(T0 + i * 10, sample(i))
+    assert list(tier.points(T0, T0 + 40)) == [(T0 + 20, sample(2)), (T0 + 30, sample(3)), (T0 + 40, sample(4))]
+
+
+def test_ring_tier_ignores_a_slot_left_by_an_older_lap():
+    tier = RingTier(resolution=10, capacity=3)
+    tier.add(T0, sample(1))
+    tier.add(T0 + 40, sample(5))
+    # The slot for T0 + 30 still holds the T0 bucket, which is out of range now
+    assert list(tier.points(T0, T0 + 40)) == [(T0 + 40, sample(5))]
+
+
+def test_ring_tier_covers():
+    tier = RingTier(resolution=10, capacity=3)
+    now = T0 + 25
+    assert tier.covers(T0, now)
+    assert not tier.covers(T0 - 1, now)
+
+
+def test_ring_tier_allocates_slots_as_time_passes():
+    tier = RingTier(resolution=10, capacity=6)
+    slot_bytes = tier.buckets.itemsize + len(HISTORY_METRICS) * tier.columns[0].itemsize
+    assert tier.nbytes == 0
+    tier.add(T0, sample(1))
+    tier.add(T0 + 20, sample(2))
+    tier.add(T0 + 30, sample(3))
+    # Buckets T0 and T0 + 20 have been flushed; T0 + 30 is still pending
+    assert tier.nbytes == 3 * slot_bytes
+    for i in range(4, 20):
+        tier.add(T0 + i * 10, sample(i))
+    assert tier.nbytes == 6 * slot_bytes
+    assert [ts for ts, _ in tier.points(T0, T0 + 190)] == [T0 + i * 10 for i in range(14, 20)]
+
+
+def test_container_history_picks_finest_covering_tier():
+    history = ContainerHistory(TIERS)
+    now = int(time.time())
+    for ts in range(now - 500, now + 1):
+        history.add(ts, {'cpu_percent': 1.0})
+
+    recent = history.query(now - 30, now)
+    assert recent['step'] == 1
+    assert len(recent['t']) == 31
+
+    # The 1 s tier only reaches back 60 s
+    older = history.query(now - 300, now)
+    assert older['step'] == 10
+    assert older['t'][0] == (now - 300) // 10 * 10
+
+
+def test_container_history_step_selects_tier_and_averages():
+    history = ContainerHistory(TIERS)
+    now = int(time.time())
+    for ts in range(now - 59, now + 1):
+        history.add(ts, {'cpu_percent': float(ts % 10)})
+
+    # Finest tier no coarser than the step, averaged into step-sized buckets
+    five = history.query(now - 59, now, step=5)
+    assert five['step'] == 5
+    assert all(t % 5 == 0 for t in five['t'])
+    assert five['cpu_percent'][1] == sum(t % 10 for t in range(five['t'][1], five['t'][1] + 5)) / 5
+
+    # The coarsest tier no coarser than the step
+    assert history.query(now - 59, now, step=60)['step'] == 60
+    # Never finer than the stored resolution
+    assert history.query(now - 59, now, step=0.5)['step'] == 1
+
+
+def test_container_history_query_is_columnar():
+    history = ContainerHistory(TIERS)
+    now = int(time.time())
+    history.add(now, {'cpu_percent': 12.5, 'memory_mb': {'usage': 64, 'percent': 50.0}, 'pids': 3})
+    result = history.query(now - 5, now)
+    assert set(result) == {'t', 'step', *HISTORY_METRICS}
+    assert result['t'] == [now]
+    assert result['cpu_percent'] == [12.5]
+    assert result['memory_usage_mb'] == [64]
+    assert result['memory_percent'] == [50.0]
+    assert result['pids'] == [3]
+
+
+def network(rx, tx):
+    return {'network': {'eth0': {'rx': rx / 2, 'tx': tx / 2}, 'eth1': {'rx': rx / 2, 'tx': tx / 2}}}
+
+
+def test_container_history_derives_network_rates():
+    history = ContainerHistory(TIERS)
+    now = int(time.time())
+    history.add(now - 4, network(1000, 500))
+    history.add(now - 2, network(3000, 1500))
+    # A counter that went backwards (container restarted) records no rate
+    history.add(now - 1, network(100, 50))
+    history.add(now, network(1100, 250))
+
+    result = history.query(now - 4, now)
+    assert result['t'] == [now - 4, now - 2, now - 1, now]
+    assert result['network_rx_bps'] == [0.0, 1000.0, 0.0, 1000.0]
+    assert result['network_tx_bps'] == [0.0, 500.0, 0.0, 200.0]
+
+
+class StubAPI:
+    def __init__(self, failing=()):
+        self.calls = []
+        self.failing = set(failing)
+
+    def stats(self, container_id, stream=True):
+        assert stream is False
+        self.calls.append(container_id)
+        if container_id in self.failing:
+            raise RuntimeError('gone')
+        return {'id': container_id, 'name': f"/{container_id}", 'cpu_stats': {}, 'precpu_stats': {},
+                'memory_stats': {'usage': 64 * 1024 * 1024, 'limit': 128 * 1024 * 1024}}
+
+
+class StubInventory:
+    def __init__(self, key, rows, api):
+        self.key = key
+        self._rows = rows
+        self.client = type('Client', (), {'api': api})()
+
+    def peek(self, kind):
+        assert kind == 'containers'
+        return self._rows
+
+
+def test_history_sampler_records_running_unstreamed_containers():
+    api = StubAPI(failing={'gone'})
+    rows = [
+        {'Id': 'web', 'State': 'running'},
+        {'Id': 'streamed', 'State': 'running'},
+        {'Id': 'stopped', 'State': 'exited'},
+        {'Id': 'gone', 'State': 'running'},
+    ]
+    registry = type('Registry', (), {'running': lambda self: [StubInventory('host-a', rows, api)]})()
+    history = StatsHistory(tiers=TIERS)
+    sampler = HistorySampler(
+        registry, history.record, lambda key, cid: (key, cid) == ('host-a', 'streamed'), workers=2
+    )
+
+    assert sampler.sample_once() == 1
+    assert sorted(api.calls) == ['gone', 'web']
+    series = history.find('host-a', 'web')
+    assert series.name == 'web'
+    assert series.query(time.time() - 5, time.time())['memory_percent'] == [50.0]
+    assert history.find('host-a', 'streamed') is None
@@ -0,0 +1,156 @@
+# backend/tests/test_hubcache.py
+
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+import requests
+
+from app.hubcache import HubMetadataCache
+
+
+class FakeHub:
+    """Local stand-in for hub.docker.com's /v2/repositories/<namespace>/<name>."""
+
+    def __init__(self):
+        self.requests = []
+        self.status = 200
+        self.delay = 0
+        hub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, *args):
+                pass
+
+            def do_GET(self):
+                hub.requests.append(self.path)
+                time.sleep(hub.delay)
+                status = 404 if 'missing' in self.path else hub.status
+                body = json.dumps({'path': self.path, 'fetch': len(hub.requests)}).encode() if status == 200 else b''
+                self.send_response(status)
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self.url = f"http://127.0.0.1:{self.server.server_port}"
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    def close(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+@pytest.fixture
+def hub():
+    hub = FakeHub()
+    yield hub
+    hub.close()
+
+
+def make_cache(hub, tmp_path, **kwargs):
+    return HubMetadataCache(base_url=hub.url, cache_dir=str(tmp_path), **{'ttl': 60, 'stale_ttl': 60, **kwargs})
+
+
+def wait_for(predicate, timeout=2):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if predicate():
+            return True
+        time.sleep(0.01)
+    return predicate()
+
+
+def test_fresh_hit_is_served_from_memory(hub, tmp_path):
+    cache = make_cache(hub, tmp_path)
+    status, data = cache.get('library/nginx')
+    assert (status, data['path'], data['fetch']) == (200, '/v2/repositories/library/nginx', 1)
+    assert cache.get('library/nginx') == (200, data)
+    assert len(hub.requests) == 1
+
+
+def test_concurrent_misses_fetch_once(hub, tmp_path):
+    hub.delay = 0.1
+    cache = make_cache(hub, tmp_path)
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(cache.get('library/redis'))) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert len(hub.requests) == 1
+    assert len({json.dumps(result) for result in results}) == 1
+
+
+def test_stale_record_is_served_while_refreshing(hub, tmp_path):
+    cache = make_cache(hub, tmp_path, ttl=0.1, stale_ttl=60)
+    assert cache.get('library/nginx')[1]['fetch'] == 1
+    time.sleep(0.15)
+    hub.delay = 0.2
+
+    started = time.monotonic()
+    assert cache.get('library/nginx')[1]['fetch'] == 1
+    assert time.monotonic() - started < 0.1
+    assert wait_for(lambda: cache.get('library/nginx')[1]['fetch'] == 2)
+    assert len(hub.requests) == 2
+
+
+def test_expired_record_is_fetched_synchronously(hub, tmp_path):
+    cache = make_cache(hub, tmp_path, ttl=0.05, stale_ttl=0.05)
+    cache.get('library/nginx')
+    time.sleep(0.15)
+    assert cache.get('library/nginx')[1]['fetch'] == 2
+
+
+def test_not_found_is_cached_for_the_negative_ttl(hub, tmp_path):
+    cache = make_cache(hub, tmp_path, negative_ttl=0.1, stale_ttl=0)
+    assert cache.get('nobody/missing') == (404, None)
+    assert cache.get('nobody/missing') == (404, None)
+    assert len(hub.requests) == 1
+    time.sleep(0.15)
+    assert cache.get('nobody/missing') == (404, None)
+    assert len(hub.requests) == 2
+
+
+def test_record_persisted_on_disk_survives_a_restart(hub, tmp_path):
+    first = make_cache(hub, tmp_path)
+    status, data = first.get('library/postgres')
+
+    restarted = make_cache(hub, tmp_path)
+    assert restarted.get('library/postgres') == (status, data)
+    assert len(hub.requests) == 1
+
+
+def test_disk_record_keeps_its_age_after_a_restart(hub, tmp_path):
+    make_cache(hub, tmp_path).get('library/postgres')
+    time.sleep(0.15)
+
+    # Older than ttl + stale_ttl by now, so the restarted cache fetches again
+    restarted = make_cache(hub, tmp_path, ttl=0.05, stale_ttl=0.05)
+    assert restarted.get('library/postgres')[1]['fetch'] == 2
+
+
+def test_upstream_error_falls_back_to_the_old_record(hub, tmp_path):
+    cache = make_cache(hub, tmp_path, ttl=0.05, stale_ttl=0.05)
+    status, data = cache.get('library/nginx')
+    time.sleep(0.15)
+    hub.status = 500
+    assert cache.get('library/nginx') == (status, data)
+    assert len(hub.requests) == 2
+
+
+def test_upstream_error_without_a_record_raises(hub, tmp_path):
+    hub.status = 503
+    cache = make_cache(hub, tmp_path)
+    with pytest.raises(requests.HTTPError):
+        cache.get('library/nginx')
+
+
+def test_invalidate_drops_memory_and_disk(hub, tmp_path):
+    cache = make_cache(hub, tmp_path)
+    cache.get('library/nginx')
+    cache.invalidate('library/nginx')
+    assert list(tmp_path.iterdir()) == []
+    assert cache.get('library/nginx')[1]['fetch'] == 2
@@ -0,0 +1,78 @@
+# backend/tests/test_image_inspect.py
+
+import docker
+import pytest
+
+from app import routes
+from app.cache import TTLCache
+from conftest import DOCKER_CONFIG
+
+IMAGE_ID = 'sha256:' + 'a' * 64
+
+
+class StubImagesAPI:
+    """inspect_image() of one host, where IMAGE_ID carries host-specific tags."""
+
+    def __init__(self, tags):
+        self.tags = tags
+        self.inspects = 0
+
+    def inspect_image(self, ref):
+        self.inspects += 1
+        if ref not in (IMAGE_ID, *self.tags):
+            raise docker.errors.ImageNotFound(f"No such image: {ref}")
+        return {'Id': IMAGE_ID, 'RepoTags': list(self.tags), 'Metadata': {'LastTagTime': self.tags[0]}}
+
+
+class StubClient:
+    def __init__(self, api):
+        self.api = api
+
+    def close(self):
+        pass
+
+
+@pytest.fixture
+def hosts(monkeypatch):
+    hosts = {
+        'tcp://east:2375': StubImagesAPI(['app:east']),
+        'tcp://west:2375': StubImagesAPI(['app:west']),
+    }
+    # Only west's inventory has the image row yet; east resolves through the daemon
+    inventory_rows = {'tcp://west:2375': [{'Id': IMAGE_ID, 'RepoTags': ['app:west']}]}
+    monkeypatch.setattr(routes, 'inventory_enabled', True)
+    monkeypatch.setattr(
+        routes, 'list_host_objects', lambda kind, config=None: inventory_rows.get(config['base_url'], [])
+    )
+    monkeypatch.setattr(routes, 'get_docker_client', lambda config=None: StubClient(hosts[config['base_url']]))
+    monkeypatch.setattr(routes, 'image_inspect_cache', TTLCache(ttl=float('inf')))
+    monkeypatch.setattr(routes, 'image_refs', TTLCache(ttl=60))
+    return hosts
+
+
+def inspect_on(client, base_url, image):
+    with client.session_transaction() as flask_session:
+        flask_session['docker_config'] = dict(DOCKER_CONFIG, base_url=base_url)
+    return client.get('/api/inspect-image', query_string={'image': image})
+
+
+def test_inspect_documents_are_kept_per_host(client, hosts):
+    east = inspect_on(client, 'tcp://east:2375', IMAGE_ID)
+    west = inspect_on(client, 'tcp://west:2375', IMAGE_ID)
+    assert east.get_json()['Metadata'] == {'LastTagTime': 'app:east'}
+    # West reads the document by ID after its inventory resolved the reference
+    assert west.get_json()['Metadata'] == {'LastTagTime': 'app:west'}
+    assert west.get_json()['RepoTags'] == ['app:west']
+    assert east.headers['ETag'] == west.headers['ETag'] == f'"{IMAGE_ID}"'
+
+
+def test_resolved_document_is_reused_on_its_host(client, hosts):
+    assert inspect_on(client, 'tcp://east:2375', 'app:east').get_json()['Id'] == IMAGE_ID
+    assert inspect_on(client, 'tcp://east:2375', IMAGE_ID).get_json()['RepoTags'] == ['app:east']
+    # Each new reference is resolved by one inspect, whose document is then reused
+    assert hosts['tcp://east:2375'].inspects == 2
+
+    response = inspect_on(client, 'tcp://east:2375', IMAGE_ID)
+    assert response.status_code == 200
+    assert hosts['tcp://east:2375'].inspects == 2
+    assert inspect_on(client, 'tcp://west:2375', 'app:east').status_code == 404
@@ -0,0 +1,275 @@
+# backend/tests/test_inventory.py
+
+import queue
+import threading
+import time
+
+import pytest
+
+from app.inventory import HostInventory, InventoryRegistry
+
+_CLOSED = object()
+
+
+class FakeEventStream:
+    """A decoded /events stream; close() fails the reader like a dropped HTTP response."""
+
+    def __init__(self, close_delay=0):
+        self.close_delay = close_delay
+        self._queue = queue.Queue()
+
+    def push(self, item):
+        self._queue.put(item)
+
+    def __iter__(self):
+        while True:
+            item = self._queue.get()
+            if item is _CLOSED:
+                raise OSError('stream closed')
+            if isinstance(item, Exception):
+                raise item
+            yield item
+
+    def close(self):
+        self._queue.put(_CLOSED)
+        # Give the reader time to see the closed stream before close() returns
+        time.sleep(self.close_delay)
+
+
+class FakeAPI:
+    def __init__(self, close_delay=0):
+        self.close_delay = close_delay
+        self.container_rows = {}
+        self.image_rows = []
+        self.network_rows = []
+        self.volume_rows = []
+        self.streams = []
+        self.reconciles = 0
+        self.broken_ids = set()
+
+    def events(self, decode=False):
+        stream = FakeEventStream(self.close_delay)
+        self.streams.append(stream)
+        return stream
+
+    def containers(self, all=False, filters=None):
+        if filters:
+            (container_id,) = filters['id']
+            if container_id in self.broken_ids:
+                raise RuntimeError('daemon error')
+            row = self.container_rows.get(container_id)
+            return [dict(row)] if row else []
+        self.reconciles += 1
+        return [dict(row) for row in self.container_rows.values()]
+
+    def images(self, all=False):
+        return [dict(row) for row in self.image_rows]
+
+    def networks(self, ids=None):
+        rows = [dict(row) for row in self.network_rows]
+        return [row for row in rows if row['Id'] in ids] if ids else rows
+
+    def volumes(self):
+        return {'Volumes': [dict(row) for row in self.volume_rows]}
+
+    def inspect_volume(self, name):
+        return next(dict(row) for row in self.volume_rows if row['Name'] == name)
+
+
+class FakeClient:
+    def __init__(self, api):
+        self.api = api
+        self.closed = False
+
+    def close(self):
+        self.closed = True
+
+
+def container(container_id, name, state='running'):
+    return {'Id': container_id, 'Names': [f"/{name}"], 'State': state}
+
+
+def event(kind, action, object_id, **attributes):
+    return {'Type': kind, 'Action': action, 'Actor': {'ID': object_id, 'Attributes': attributes}}
+
+
+def wait_for(predicate, timeout=2):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if predicate():
+            return True
+        time.sleep(0.01)
+    return predicate()
+
+
+@pytest.fixture
+def api():
+    api = FakeAPI()
+    api.container_rows['c1'] = container('c1', 'web')
+    api.image_rows = [{'Id': 'sha256:a'}]
+    api.network_rows = [{'Id': 'n1', 'Name': 'bridge'}]
+    api.volume_rows = [{'Name': 'data'}]
+    return api
+
+
+@pytest.fixture
+def inventory(api):
+    inventory = HostInventory('host', FakeClient(api), reconcile_interval=60)
+    inventory.start()
+    yield inventory
+    inventory.stop()
+
+
+def names(inventory):
+    return sorted(row['Names'][0] for row in inventory.rows('containers'))
+
+
+def test_start_takes_a_snapshot(inventory):
+    assert inventory.running
+    assert names(inventory) == ['/web']
+    assert [row['Name'] for row in inventory.rows('volumes')] == ['data']
+
+
+def test_container_lifecycle_events(api, inventory):
+    api.container_rows['c2'] = container('c2', 'db', state='created')
+    inventory._apply(event('container', 'create', 'c2'))
+    assert names(inventory) == ['/db', '/web']
+
+    api.container_rows['c2'] = container('c2', 'db-primary', state='created')
+    inventory._apply(event('container', 'rename', 'c2'))
+    assert names(inventory) == ['/db-primary', '/web']
+
+    api.container_rows['c1'] = container('c1', 'web', state='exited')
+    inventory._apply(event('container', 'die', 'c1', exitCode='0'))
+    assert {row['Id']: row['State'] for row in inventory.rows('containers')}['c1'] == 'exited'
+
+    del api.container_rows['c2']
+    inventory._apply(event('container', 'destroy', 'c2'))
+    assert names(inventory) == ['/web']
+
+
+def test_version_changes_only_with_rows(api, inventory):
+    version = inventory.version('containers')
+    inventory._apply(event('container', 'start', 'c1'))
+    assert inventory.version('containers') == version
+    inventory._apply(event('container', 'exec_start: sh', 'c1'))
+    assert inventory.version('containers') == version
+
+    api.container_rows['c1'] = container('c1', 'web', state='paused')
+    inventory._apply(event('container', 'pause', 'c1'))
+    assert inventory.version('containers') != version
+    assert inventory.version('images') == inventory.version('images')
+
+
+def test_refresh_of_a_vanished_container_discards_it(api, inventory):
+    del api.container_rows['c1']
+    inventory._apply(event('container', 'stop', 'c1'))
+    assert inventory.rows('containers') == []
+
+
+def test_image_network_and_volume_events(api, inventory):
+    api.image_rows.append({'Id': 'sha256:b'})
+    inventory._apply(event('image', 'pull', 'nginx:latest'))
+    assert [row['Id'] for row in inventory.rows('images')] == ['sha256:a', 'sha256:b']
+    inventory._apply(event('image', 'delete', 'sha256:a'))
+    assert [row['Id'] for row in inventory.rows('images')] == ['sha256:b']
+
+    api.network_rows.append({'Id': 'n2', 'Name': 'backend'})
+    inventory._apply(event('network', 'create', 'n2'))
+    assert sorted(row['Name'] for row in inventory.rows('networks')) == ['backend', 'bridge']
+    api.container_rows['c1'] = dict(container('c1', 'web'), NetworkSettings={'Networks': {'backend': {}}})
+    inventory._apply(event('network', 'connect', 'n2', container='c1'))
+    assert inventory.rows('containers')[0]['NetworkSettings'] == {'Networks': {'backend': {}}}
+    inventory._apply(event('network', 'destroy', 'n1'))
+    assert [row['Name'] for row in inventory.rows('networks')] == ['backend']
+
+    api.volume_rows.append({'Name': 'cache'})
+    inventory._apply(event('volume', 'create', 'cache'))
+    inventory._apply(event('volume', 'destroy', 'data'))
+    assert [row['Name'] for row in inventory.rows('volumes')] == ['cache']
+
+
+def test_events_from_the_stream_are_applied(api, inventory):
+    api.container_rows['c2'] = container('c2', 'db')
+    api.streams[-1].push(event('container', 'create', 'c2'))
+    assert wait_for(lambda: names(inventory) == ['/db', '/web'])
+
+
+def test_reconcile_repairs_an_event_that_failed_to_apply(api):
+    inventory = HostInventory('host', FakeClient(api), reconcile_interval=0.2)
+    inventory.start()
+    try:
+        api.container_rows['c2'] = container('c2', 'db')
+        api.broken_ids.add('c2')
+        api.streams[-1].push(event('container', 'create', 'c2'))
+        time.sleep(0.05)
+        assert names(inventory) == ['/web']
+        assert inventory.running
+        # The next cycle reads every list again
+        assert wait_for(lambda: names(inventory) == ['/db', '/web'])
+    finally:
+        inventory.stop()
+
+
+def test_timer_close_is_not_a_failure():
+    # close() returns well after the reader has seen the stream fail
+    api = FakeAPI(close_delay=0.2)
+    api.container_rows['c1'] = container('c1', 'web')
+    inventory = HostInventory('host', FakeClient(api), reconcile_interval=0.05)
+    inventory.start()
+    try:
+        assert wait_for(lambda: api.reconciles >= 3)
+        assert inventory.running
+    finally:
+        inventory.stop()
+
+
+def test_stream_failure_stops_the_inventory_and_registry_replaces_it(api):
+    clients = []
+
+    def client_factory(config):
+        clients.append(FakeClient(api))
+        return clients[-1]
+
+    registry = InventoryRegistry(client_factory, reconcile_interval=60)
+    first = registry.get('host', {})
+    assert registry.get('host', {}) is first
+
+    api.streams[-1].push(ConnectionError('daemon went away'))
+    assert wait_for(lambda: not first.running)
+    assert clients[0].closed
+
+    second = registry.get('host', {})
+    assert second is not first
+    assert second.running
+    assert registry.running() == [second]
+    registry.evict('host')
+    assert wait_for(lambda: clients[1].closed)
+
+
+def test_peek_does_not_count_as_a_read(inventory):
+    inventory.last_read = 0
+    inventory.peek('containers')
+    assert inventory.last_read == 0
+    inventory.rows('containers')
+    assert inventory.last_read > 0
+
+
+def test_concurrent_first_reads_start_one_inventory(api):
+    started = []
+
+    def client_factory(config):
+        started.append(config)
+        time.sleep(0.05)
+        return FakeClient(api)
+
+    registry = InventoryRegistry(client_factory)
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(registry.get('host', {}))) for _ in range(5)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert len(started) == 1
+    assert len({id(inventory) for inventory in results}) == 1
+    registry.evict('host')
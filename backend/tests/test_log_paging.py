@@ -0,0 +1,191 @@
+# backend/tests/test_log_paging.py
+
+import pytest
+
+from app import routes
+from app.logstream import decode_log_cursor, format_log_time, read_log_page
+
+NS = 1_000_000_000
+T0 = 1_700_000_000 * NS
+
+
+class StubResponse:
+    def __init__(self, data):
+        self.data = data
+        self.closed = False
+
+    def iter_content(self, chunk_size=None):
+        # Odd-sized chunks, so lines are cut across chunk boundaries
+        for i in range(0, len(self.data), 7):
+            yield self.data[i:i + 7]
+
+    def close(self):
+        self.closed = True
+
+
+class StubLogsAPI:
+    """The slice of docker.APIClient that open_container_logs() uses, over a fixed TTY log."""
+
+    timeout = 10
+
+    def __init__(self, lines):
+        self.lines = lines
+        self.requests = []
+
+    def inspect_container(self, container_id):
+        return {'Config': {'Tty': True}}
+
+    def _url(self, path, *args):
+        return path.format(*args)
+
+    def _get(self, url, params=None, stream=False, timeout=None):
+        self.requests.append(params)
+        since = self._parse(params.get('since'))
+        until = self._parse(params.get('until'))
+        # Like the daemon, both bounds are inclusive
+        selected = [
+            f"{format_log_time(ts)} {message}\n" for ts, message in self.lines
+            if (since is None or ts >= since) and (until is None or ts <= until)
+        ]
+        return StubResponse(''.join(selected).encode())
+
+    def _raise_for_status(self, response):
+        pass
+
+    @staticmethod
+    def _parse(value):
+        if value is None:
+            return None
+        seconds, _, fraction = value.partition('.')
+        return int(seconds) * NS + int(fraction or 0)
+
+
+class StubClient:
+    def __init__(self, api):
+        self.api = api
+
+    def close(self):
+        pass
+
+
+def make_log(*counts):
+    """One run of `count` lines per timestamp, a second apart, with unique messages."""
+    lines = []
+    for i, count in enumerate(counts):
+        for _ in range(count):
+            lines.append((T0 + i * NS, f"line {len(lines)}"))
+    return lines
+
+
+# Two bursts longer than the page size used below
+LOG = make_log(1, 2, 7, 1, 1, 5, 1)
+
+
+def messages(entries):
+    return [message for _, _, message in entries]
+
+
+def test_forward_page_counts_a_burst_beyond_the_page():
+    api = StubLogsAPI(LOG)
+    entries, has_more, first_skip, last_skip = read_log_page(
+        api, 'c1', 3, direction='forward', after=(T0 + 2 * NS, 2)
+    )
+    assert messages(entries) == ['line 5', 'line 6', 'line 7']
+    assert has_more
+    # Lines 3..9 share the first timestamp: 5 from the page start to the end of the burst
+    assert first_skip == 5
+    # ...and 5 up to the page end, counting the 2 the cursor skipped
+    assert last_skip == 5
+
+
+def test_backward_page_counts_a_burst_before_the_page():
+    api = StubLogsAPI(LOG)
+    entries, has_more, first_skip, last_skip = read_log_page(
+        api, 'c1', 3, direction='backward', before=(T0 + 2 * NS, 2)
+    )
+    assert messages(entries) == ['line 5', 'line 6', 'line 7']
+    assert has_more
+    assert first_skip == 5
+    # Lines 3..7 of the burst come up to the page end, 2 of them before the page
+    assert last_skip == 5
+
+
+def test_backward_page_whose_cursor_drops_a_whole_run():
+    api = StubLogsAPI(LOG)
+    entries, _, first_skip, last_skip = read_log_page(api, 'c1', 3, direction='backward', before=(T0 + 3 * NS, 1))
+    assert messages(entries) == ['line 7', 'line 8', 'line 9']
+    assert first_skip == 3
+    assert last_skip == 7
+
+
+def test_pages_close_their_responses():
+    api = StubLogsAPI(LOG)
+    responses = []
+    get = api._get
+    api._get = lambda *args, **kwargs: responses.append(get(*args, **kwargs)) or responses[-1]
+    read_log_page(api, 'c1', 2, direction='forward', since=T0)
+    read_log_page(api, 'c1', 2, direction='backward', until=T0 + 10 * NS)
+    assert responses and all(response.closed for response in responses)
+
+
+@pytest.fixture
+def logs_api(monkeypatch):
+    api = StubLogsAPI(LOG)
+    monkeypatch.setattr(routes, 'get_docker_client', lambda config=None: StubClient(api))
+    return api
+
+
+def get_page(client, **params):
+    response = client.get('/api/logs/history', query_string={'container': 'c1', 'limit': 3, **params})
+    assert response.status_code == 200, response.get_json()
+    return response.get_json()
+
+
+def page_lines(page):
+    return [entry['line'] for entry in page['entries']]
+
+
+ALL_LINES = [message for _, message in LOG]
+
+
+def test_walk_forward(client, logs_api):
+    page = get_page(client, since=T0 // NS)
+    seen = page_lines(page)
+    while page['entries']:
+        page = get_page(client, cursor=page['after'])
+        seen += page_lines(page)
+    assert seen == ALL_LINES
+    # At the end of the log the cursor stays put, so a client can poll from there
+    assert decode_log_cursor(page['after'])['ts'] == LOG[-1][0]
+
+
+def test_walk_backward(client, logs_api):
+    page = get_page(client, until=(T0 // NS) + 60)
+    seen = page_lines(page)
+    while page['before']:
+        page = get_page(client, cursor=page['before'])
+        seen = page_lines(page) + seen
+    assert seen == ALL_LINES
+
+
+def test_every_backward_page_links_forward_to_the_lines_after_it(client, logs_api):
+    page = get_page(client, until=(T0 // NS) + 60)
+    while page['before']:
+        page = get_page(client, cursor=page['before'])
+        end = ALL_LINES.index(page_lines(page)[-1]) + 1
+        assert page_lines(get_page(client, cursor=page['after'])) == ALL_LINES[end:end + 3]
+
+
+def test_every_forward_page_links_backward_to_the_lines_before_it(client, logs_api):
+    page = get_page(client, since=T0 // NS)
+    while True:
+        page = get_page(client, cursor=page['after'])
+        if not page['entries']:
+            break
+        start = ALL_LINES.index(page_lines(page)[0])
+        assert page_lines(get_page(client, cursor=page['before'])) == ALL_LINES[max(start - 3, 0):start]
+
+
+def test_bad_cursor_is_rejected(client, logs_api):
+    response = client.get('/api/logs/history', query_string={'container': 'c1', 'cursor': 'nope'})
+    assert response.status_code == 400
@@ -0,0 +1,247 @@
+# backend/tests/test_logstream.py
+
+import base64
+import json
+import re
+import time
+
+import pytest
+
+from app.logstream import (
+    MAX_CONTEXT_LINES, LineSplitter, LogBatcher, LogFilter, RateLimiter, decode_log_cursor, encode_log_cursor,
+)
+
+
+def entries(*lines):
+    return [(i, 'stdout', line) for i, line in enumerate(lines)]
+
+
+def test_log_cursor_round_trip():
+    cursor = encode_log_cursor(1700000000123456789, 3)
+    assert decode_log_cursor(cursor) == {'ts': 1700000000123456789, 'skip': 3}
+
+
+def test_log_cursor_carries_window_and_drops_unset_bounds():
+    cursor = encode_log_cursor(10, 0, since=5, until=None)
+    assert decode_log_cursor(cursor) == {'ts': 10, 'skip': 0, 'since': 5}
+
+
+def test_log_cursor_is_url_safe_without_padding():
+    cursor = encode_log_cursor(2 ** 62, 7, since=1, until=2 ** 62 + 1)
+    assert '=' not in cursor
+    assert not set(cursor) & set('+/')
+
+
+def test_log_cursor_skip_defaults_to_zero():
+    cursor = base64.urlsafe_b64encode(b'{"ts":"42"}').decode().rstrip('=')
+    assert decode_log_cursor(cursor) == {'ts': 42, 'skip': 0}
+
+
+@pytest.mark.parametrize('cursor', [
+    'not base64!',
+    base64.urlsafe_b64encode(b'not json').decode(),
+    base64.urlsafe_b64encode(b'[1, 2]').decode(),
+    base64.urlsafe_b64encode(b'{"skip": 1}').decode(),
+    base64.urlsafe_b64encode(b'{"ts": "soon"}').decode(),
+    base64.urlsafe_b64encode(b'{"ts": null}').decode(),
+])
+def test_log_cursor_rejects_garbage(cursor):
+    with pytest.raises(ValueError):
+        decode_log_cursor(cursor)
+
+
+def test_log_filter_grep():
+    log_filter = LogFilter(pattern=r'GET /api/\w+')
+    lines = entries('GET /api/logs 200', 'POST /api/logs 201', 'GET / 200')
+    assert list(log_filter.select(lines)) == lines[:1]
+
+
+def test_log_filter_invert_and_ignore_case():
+    log_filter = LogFilter(pattern='health', invert=True, ignore_case=True)
+    lines = entries('GET /Health 200', 'GET /api/logs 200')
+    assert list(log_filter.select(lines)) == lines[1:]
+
+
+def test_log_filter_level_keeps_at_least_as_severe():
+    log_filter = LogFilter(level='warn')
+    lines = entries('INFO started', 'WARNING disk 91% full', 'error: lost connection', 'no level here',
+                    'debug: ERROR in payload')
+    # The first severity word on the line decides
+    assert [entry[2] for entry in log_filter.select(lines)] == ['WARNING disk 91% full', 'error: lost connection']
+
+
+def test_log_filter_level_and_grep_both_apply():
+    log_filter = LogFilter(pattern='db', level='error')
+    lines = entries('ERROR db timeout', 'ERROR cache miss', 'INFO db connected')
+    assert list(log_filter.select(lines)) == lines[:1]
+
+
+def test_log_filter_context():
+    log_filter = LogFilter(pattern='boom', before=2, after=1)
+    lines = entries('a', 'b', 'c', 'boom', 'd', 'e', 'boom', 'f')
+    assert [entry[2] for entry in log_filter.select(lines)] == ['b', 'c', 'boom', 'd', 'e', 'boom', 'f']
+
+
+def test_log_filter_context_spans_calls_until_reset():
+    log_filter = LogFilter(pattern='boom', before=1, after=1)
+    assert list(log_filter.select(entries('a', 'b'))) == []
+    assert [entry[2] for entry in log_filter.select(entries('boom', 'c', 'd'))] == ['b', 'boom', 'c']
+    log_filter.feed((0, 'stdout', 'e'))
+    log_filter.reset()
+    assert [entry[2] for entry in log_filter.select(entries('boom'))] == ['boom']
+
+
+def test_log_filter_from_args():
+    assert LogFilter.from_args({}) is None
+    assert LogFilter.from_args({'grep': '', 'level': ' '}) is None
+
+    log_filter = LogFilter.from_args({'grep': 'x', 'C': '2', 'A': '5', 'invert': 'true', 'ignore_case': '1'})
+    assert log_filter.after == 5
+    assert log_filter._before.maxlen == 2
+    assert log_filter.invert
+    assert log_filter.regex.flags & re.IGNORECASE
+
+    assert LogFilter.from_args({'level': 'ERROR'}).min_level == 40
+
+
+@pytest.mark.parametrize('args', [
+    {'level': 'loud'},
+    {'grep': 'x', 'C': 'two'},
+    {'grep': 'x', 'A': '-1'},
+    {'grep': 'x', 'B': str(MAX_CONTEXT_LINES + 1)},
+    {'grep': '('},
+])
+def test_log_filter_from_args_rejects_bad_arguments(args):
+    with pytest.raises(ValueError):
+        LogFilter.from_args(args)
+
+
+def test_line_splitter_holds_partial_lines_per_stream():
+    splitter = LineSplitter()
+    assert splitter.feed('stdout', b'one\ntw') == ['one']
+    assert splitter.feed('stderr', b'oops') == []
+    assert splitter.feed('stdout', b'o\r\nthree\n') == ['two', 'three']
+    assert splitter.feed('stderr', b' happened\n') == ['oops happened']
+    assert splitter.flush() == []
+
+
+def test_line_splitter_flush_returns_leftovers():
+    splitter = LineSplitter()
+    splitter.feed('stdout', b'no newline')
+    splitter.feed('stderr', b'\xff\xfe')
+    assert sorted(splitter.flush()) == [('stderr', '\ufffd\ufffd'), ('stdout', 'no newline')]
+    assert splitter.flush() == []
+
+
+def test_rate_limiter_allows_a_burst_then_refills():
+    limiter = RateLimiter(20)
+    assert sum(limiter.allow() for _ in range(30)) == 20
+    time.sleep(0.12)
+    assert 1 <= sum(limiter.allow() for _ in range(30)) <= 4
+
+
+def test_rate_limiter_below_one_per_second_lets_one_line_through():
+    limiter = RateLimiter(0.5)
+    assert limiter.allow()
+    assert not limiter.allow()
+
+
+def frames(chunks):
+    """The JSON events of SSE frames, with the event id as '_id'."""
+    events = []
+    for chunk in chunks:
+        for frame in chunk.split('\n\n'):
+            if not frame or frame.startswith(':'):
+                continue
+            fields = dict(line.split(': ', 1) for line in frame.split('\n'))
+            event = json.loads(fields['data'])
+            if 'id' in fields:
+                event['_id'] = fields['id']
+            events.append(event)
+    return events
+
+
+def test_log_batcher_groups_runs_per_stream_and_ends_with_a_cursor():
+    batches = [[(1, 'stdout', 'a'), (2, 'stdout', 'b'), (3, 'stderr', 'c'), (3, 'stdout', 'd')]]
+    events = frames(LogBatcher(iter(batches), max_latency=0.01))
+    assert [(e['stream'], e['lines']) for e in events] == [('stdout', ['a', 'b']), ('stderr', ['c']), ('stdout', ['d'])]
+    assert events[-1]['_id'] == events[-1]['cursor']
+    assert decode_log_cursor(events[-1]['cursor']) == {'ts': 3, 'skip': 2}
+
+
+def test_log_batcher_resume_skips_lines_already_sent():
+    batches = [[(5, 'stdout', 'x'), (5, 'stdout', 'y'), (5, 'stdout', 'z'), (6, 'stdout', 'w')]]
+    events = frames(LogBatcher(iter(batches), max_latency=0.01, resume=(5, 2)))
+    assert [line for e in events for line in e['lines']] == ['z', 'w']
+
+
+def test_log_batcher_reports_rate_limited_lines_as_dropped():
+    batches = [[(i, 'stdout', f"line {i}") for i in range(10)]]
+    events = frames(LogBatcher(iter(batches), max_latency=0.01, rate=3))
+    assert [line for e in events for line in e['lines']] == ['line 0', 'line 1', 'line 2']
+    assert sum(e.get('dropped', 0) for e in events) == 7
+
+
+def test_log_batcher_flushes_on_max_bytes():
+    batches = [[(i, 'stdout', 'x' * 99)] for i in range(10)]
+    chunks = list(LogBatcher(iter(batches), max_latency=60, max_bytes=300))
+    assert [len(e['lines']) for e in frames(chunks)] == [3, 3, 3, 1]
+
+
+class SlowFilter:
+    """Pass-through line filter that makes the consumer slower than the reader."""
+
+    def select(self, entries):
+        time.sleep(0.002)
+        return entries
+
+
+def test_log_batcher_flushes_on_deadline_under_a_steady_backlog():
+    batches = [[(i, 'stdout', 'tick')] for i in range(200)]
+    batcher = LogBatcher(iter(batches), max_latency=0.02, max_bytes=1 << 30, line_filter=SlowFilter())
+    sizes = [len(e['lines']) for e in frames(batcher)]
+    assert sum(sizes) == 200
+    # About 0.4 s of backlog, flushed every 20 ms rather than once at the end
+    assert len(sizes) >= 5
+    assert max(sizes) < 100
+
+
+def test_log_batcher_sends_keepalives_while_idle():
+    def quiet():
+        time.sleep(0.35)
+        yield [(1, 'stdout', 'late')]
+
+    chunks = list(LogBatcher(quiet(), keepalive=0.1))
+    assert chunks.count(': keepalive\n\n') >= 2
+    assert frames(chunks)[0]['lines'] == ['late']
+
+
+def test_log_batcher_raises_reader_errors_and_runs_on_close():
+    closed = []
+
+    def failing():
+        yield [(1, 'stdout', 'before')]
+        raise ConnectionError('daemon went away')
+
+    batcher = LogBatcher(failing(), max_latency=0.01, on_close=lambda: closed.append(True))
+    chunks = []
+    with pytest.raises(ConnectionError):
+        for chunk in batcher:
+            chunks.append(chunk)
+    assert frames(chunks)[0]['lines'] == ['before']
+    assert closed == [True]
+
+
+def test_log_batcher_runs_on_close_when_the_client_goes_away():
+    closed = []
+
+    def endless():
+        i = 0
+        while True:
+            i += 1
+            yield [(i, 'stdout', 'spam')]
+
+    stream = iter(LogBatcher(endless(), max_latency=0.01, on_close=lambda: closed.append(True)))
+    next(stream)
+    stream.close()
+    assert closed == [True]
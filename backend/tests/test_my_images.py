@@ -0,0 +1,146 @@
+# backend/tests/test_my_images.py
+
+import pytest
+
+from app import routes
+from app.cache import TTLCache
+from app.routes import image_tag_rows
+
+MB = 1024 * 1024
+
+IMAGES = [
+    {'Id': 'sha256:' + 'a' * 64, 'RepoTags': ['nginx:1.25', 'nginx:latest'], 'Created': 300, 'Size': 180 * MB},
+    {'Id': 'sha256:' + 'b' * 64, 'RepoTags': ['registry.local:5000/app:2'], 'Created': 200, 'Size': 50 * MB,
+     'ParentId': 'sha256:' + 'c' * 64},
+    # Intermediate layer: the parent of app:2
+    {'Id': 'sha256:' + 'c' * 64, 'RepoTags': None, 'Created': 150, 'Size': 40 * MB},
+    # Dangling: untagged and nobody's parent
+    {'Id': 'sha256:' + 'd' * 64, 'RepoTags': ['<none>:<none>'], 'Created': 100, 'Size': 10 * MB},
+    {'Id': 'sha256:' + 'e' * 64, 'RepoTags': ['alpine'], 'Created': 50, 'Size': 7 * MB},
+]
+
+
+def tags(entries):
+    return [f"{repository}:{tag}" for _, repository, tag in entries]
+
+
+def test_image_tag_rows_leave_out_untagged_images_by_default():
+    assert tags(image_tag_rows(IMAGES, None, '', None, False)) == [
+        'nginx:1.25', 'nginx:latest', 'registry.local:5000/app:2', 'alpine:latest',
+    ]
+
+
+def test_image_tag_rows_include_dangling_or_all():
+    assert tags(image_tag_rows(IMAGES, 'dangling', '', None, False))[-2:] == ['<none>:<none>', 'alpine:latest']
+    assert tags(image_tag_rows(IMAGES, 'all', '', None, False)).count('<none>:<none>') == 2
+
+
+def test_image_tag_rows_filter_and_sort():
+    assert tags(image_tag_rows(IMAGES, None, 'nginx', None, False)) == ['nginx:1.25', 'nginx:latest']
+    assert tags(image_tag_rows(IMAGES, None, '', 'size', False))[0] == 'alpine:latest'
+    assert tags(image_tag_rows(IMAGES, None, '', 'repository', True))[0] == 'registry.local:5000/app:2'
+
+
+class StubInventory:
+    def __init__(self, images):
+        self.images = images
+        self.generation = 1
+        self.snapshots = 0
+
+    def version(self, kind):
+        return f"stub.{self.generation}"
+
+    def snapshot(self, kind):
+        self.snapshots += 1
+        return self.version(kind), list(self.images)
+
+
+class StubInventories:
+    def __init__(self, inventory):
+        self.inventory = inventory
+
+    def get(self, key, config):
+        return self.inventory
+
+
+@pytest.fixture
+def inventory(monkeypatch):
+    inventory = StubInventory(IMAGES)
+    monkeypatch.setattr(routes, 'inventory_enabled', True)
+    monkeypatch.setattr(routes, 'host_inventories', StubInventories(inventory))
+    monkeypatch.setattr(routes, 'image_list_views', TTLCache(ttl=float('inf')))
+    return inventory
+
+
+def get_images(client, headers=None, **params):
+    return client.get('/api/my-images', query_string=params, headers=headers or {})
+
+
+def test_default_listing(client, inventory):
+    response = get_images(client)
+    body = response.get_json()
+    assert body['total'] == 4
+    assert body['images'][0] == {
+        'repository': 'nginx', 'tag': '1.25', 'id': 'sha256:aaaaaaaaaaaa', 'createdAt': 300, 'size': '180.0 MB',
+    }
+    assert response.headers['Cache-Control'] == 'no-cache'
+    assert 'X-Next-Cursor' not in response.headers
+
+
+def test_filter_sort_and_dangling(client, inventory):
+    body = get_images(client, filter='app', sort='-size').get_json()
+    assert [(row['repository'], row['tag']) for row in body['images']] == [('registry.local:5000/app', '2')]
+    assert get_images(client, dangling='1').get_json()['total'] == 5
+    assert get_images(client, all='1').get_json()['total'] == 6
+
+
+def test_cursor_walks_every_row(client, inventory):
+    response = get_images(client, limit=3)
+    rows = response.get_json()['images']
+    assert len(rows) == 3
+    cursor = response.headers['X-Next-Cursor']
+    response = get_images(client, limit=3, cursor=cursor)
+    rows += response.get_json()['images']
+    assert 'X-Next-Cursor' not in response.headers
+    assert [row['tag'] for row in rows] == ['1.25', 'latest', '2', 'latest']
+
+
+@pytest.mark.parametrize('params', [{'cursor': 'nope'}, {'limit': '0'}, {'sort': 'colour'}])
+def test_bad_arguments_are_rejected(client, inventory, params):
+    assert get_images(client, **params).status_code == 400
+
+
+def test_unchanged_image_set_answers_304(client, inventory):
+    etag = get_images(client).headers['ETag']
+    snapshots = inventory.snapshots
+    response = get_images(client, headers={'If-None-Match': etag})
+    assert response.status_code == 304
+    assert response.get_data() == b''
+    assert response.headers['ETag'] == etag
+    # Answered from the version alone, without reading the rows
+    assert inventory.snapshots == snapshots
+
+
+def test_etag_changes_with_the_image_set_and_the_query(client, inventory):
+    etag = get_images(client).headers['ETag']
+    assert get_images(client, limit=2).headers['ETag'] != etag
+
+    inventory.generation += 1
+    inventory.images = IMAGES[:1]
+    response = get_images(client, headers={'If-None-Match': etag})
+    assert response.status_code == 200
+    assert response.headers['ETag'] != etag
+    assert response.get_json()['total'] == 2
+
+
+def test_etag_without_inventory(client, monkeypatch):
+    images = list(IMAGES)
+    monkeypatch.setattr(routes, 'inventory_enabled', False)
+    monkeypatch.setattr(routes, 'list_host_objects', lambda kind, config=None: images)
+    etag = get_images(client).headers['ETag']
+    assert get_images(client, headers={'If-None-Match': etag}).status_code == 304
+
+    images.append({'Id': 'sha256:' + 'f' * 64, 'RepoTags': ['redis:7'], 'Created': 400, 'Size': MB})
+    response = get_images(client, headers={'If-None-Match': etag})
+    assert response.status_code == 200
+    assert response.get_json()['images'][0]['repository'] == 'redis'
@@ -0,0 +1,51 @@
+# backend/tests/test_paging.py
+
+import pytest
+
+from app.paging import MAX_PAGE_SIZE, decode_cursor, encode_cursor, paginate, parse_limit, parse_sort
+
+
+def test_cursor_round_trip():
+    assert decode_cursor(encode_cursor(0)) == 0
+    assert decode_cursor(encode_cursor(1234)) == 1234
+    assert decode_cursor(None) == 0
+    assert decode_cursor('') == 0
+
+
+@pytest.mark.parametrize('cursor', ['!!!', 'bm9wZQ', encode_cursor('x')])
+def test_bad_cursor(cursor):
+    with pytest.raises(ValueError, match='Invalid cursor'):
+        decode_cursor(cursor)
+
+
+def test_parse_limit():
+    assert parse_limit(None) is None
+    assert parse_limit('', default=50) == 50
+    assert parse_limit('20') == 20
+    assert parse_limit(str(MAX_PAGE_SIZE * 10)) == MAX_PAGE_SIZE
+    with pytest.raises(ValueError):
+        parse_limit('0')
+    with pytest.raises(ValueError):
+        parse_limit('many')
+
+
+def test_parse_sort():
+    allowed = {'created': None, 'name': None}
+    assert parse_sort(None, allowed) == (None, False)
+    assert parse_sort('name', allowed) == ('name', False)
+    assert parse_sort('-created', allowed) == ('created', True)
+    with pytest.raises(ValueError, match="Cannot sort by 'size'"):
+        parse_sort('size', allowed)
+
+
+def test_paginate_walks_every_row_once():
+    rows = list(range(7))
+    seen, offset = [], 0
+    while True:
+        page, cursor = paginate(rows, 3, offset)
+        seen += page
+        if cursor is None:
+            break
+        offset = decode_cursor(cursor)
+    assert seen == rows
+    assert paginate(rows, None, 2) == (rows[2:], None)
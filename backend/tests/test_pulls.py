@@ -0,0 +1,169 @@
+# backend/tests/test_pulls.py
+
+import json
+import queue
+import threading
+import time
+
+import pytest
+
+from app.pulls import PullBroker
+
+_END = object()
+
+
+class ScriptedPull:
+    """docker pull stream fed by the test, one chunk per push()."""
+
+    def __init__(self):
+        self.calls = []
+        self._queue = queue.Queue()
+
+    def push(self, *chunks):
+        for chunk in chunks:
+            self._queue.put(chunk)
+
+    def end(self):
+        self._queue.put(_END)
+
+    def pull(self, repository, tag=None, stream=False, decode=False):
+        self.calls.append((repository, tag))
+        while True:
+            chunk = self._queue.get(timeout=5)
+            if chunk is _END:
+                return
+            if isinstance(chunk, Exception):
+                raise chunk
+            yield chunk
+
+
+class ScriptedClient:
+    def __init__(self, api):
+        self.api = api
+        self.closed = False
+
+    def close(self):
+        self.closed = True
+
+
+@pytest.fixture
+def upstream():
+    return ScriptedPull()
+
+
+@pytest.fixture
+def broker(upstream):
+    return PullBroker(lambda config: ScriptedClient(upstream), min_interval=0)
+
+
+def events(payload):
+    return [json.loads(line[len('data: '):]) for line in payload.split('\n\n') if line.startswith('data: ')]
+
+
+def next_events(frames):
+    """Run one step of a frames() generator in a thread, so a blocked step cannot hang the test."""
+    result = queue.Queue()
+    threading.Thread(target=lambda: result.put(next(frames)), daemon=True).start()
+    return events(result.get(timeout=2))
+
+
+def wait_for(predicate, timeout=2):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if predicate():
+            return True
+        time.sleep(0.01)
+    return predicate()
+
+
+def downloading(layer, current):
+    return {'status': 'Downloading', 'id': layer, 'progressDetail': {'current': current, 'total': 100}}
+
+
+def test_joiners_of_one_image_share_one_upstream_pull(broker, upstream):
+    first = broker.join('host', {}, 'nginx', 'latest')
+    second = broker.join('host', {}, 'nginx', 'latest')
+    assert second is first
+    assert broker.active_pulls() == 1
+
+    upstream.push(downloading('a', 50))
+    upstream.end()
+    assert first.wait(2) == {'status': 'completed'}
+    assert upstream.calls == [('nginx', 'latest')]
+    assert wait_for(lambda: broker.active_pulls() == 0)
+
+
+def test_other_tags_and_hosts_pull_separately(broker, upstream):
+    jobs = {broker.join(*args) for args in (
+        ('host', {}, 'nginx', 'latest'), ('host', {}, 'nginx', 'alpine'), ('other', {}, 'nginx', 'latest'),
+    )}
+    assert len(jobs) == 3
+    upstream.end()
+    upstream.end()
+    upstream.end()
+    for job in jobs:
+        assert job.wait(2) == {'status': 'completed'}
+
+
+def test_late_joiner_gets_the_backlog_then_live_frames(broker, upstream):
+    job = broker.join('host', {}, 'nginx', 'latest')
+    early = job.frames(0)
+    upstream.push({'status': 'Pulling from library/nginx'}, downloading('a', 10), downloading('b', 10))
+    assert wait_for(lambda: job.version == 3)
+    assert len(next_events(early)) == 3
+
+    upstream.push(downloading('a', 60))
+    assert wait_for(lambda: job.version == 4)
+
+    # Joins while the pull runs: one frame per layer, at its latest state
+    late = broker.join('host', {}, 'nginx', 'latest').frames(0)
+    assert next_events(late) == [
+        {'status': 'Pulling from library/nginx'}, downloading('a', 60), downloading('b', 10),
+    ]
+    assert next_events(early) == [downloading('a', 60)]
+
+    upstream.push(downloading('b', 100))
+    assert next_events(late) == [downloading('b', 100)]
+    assert next_events(early) == [downloading('b', 100)]
+
+    upstream.end()
+    assert next_events(late) == [{'status': 'completed'}]
+    assert next_events(early) == [{'status': 'completed'}]
+    with pytest.raises(StopIteration):
+        next(late)
+
+
+def test_joiner_after_the_pull_finished_starts_a_new_one(broker, upstream):
+    job = broker.join('host', {}, 'nginx', 'latest')
+    upstream.end()
+    job.wait(2)
+    assert wait_for(lambda: broker.active_pulls() == 0)
+
+    again = broker.join('host', {}, 'nginx', 'latest')
+    assert again is not job
+    upstream.end()
+    again.wait(2)
+    assert len(upstream.calls) == 2
+
+
+def test_error_chunk_finishes_the_pull(broker, upstream):
+    job = broker.join('host', {}, 'nginx', 'latest')
+    upstream.push(downloading('a', 10), {'error': 'toomanyrequests'})
+    assert job.wait(2) == {'error': 'Pull failed: toomanyrequests'}
+    assert events(''.join(job.frames(0)))[-1] == {'error': 'Pull failed: toomanyrequests'}
+
+
+def test_upstream_exception_finishes_the_pull(broker, upstream):
+    job = broker.join('host', {}, 'nginx', 'latest')
+    upstream.push(ConnectionError('daemon went away'))
+    assert job.wait(2) == {'error': 'Pull failed: daemon went away'}
+    assert wait_for(lambda: broker.active_pulls() == 0)
+
+
+def test_keepalive_while_the_pull_is_quiet(broker, upstream):
+    job = broker.join('host', {}, 'nginx', 'latest')
+    frames = job.frames(0, keepalive=0.05)
+    assert next(frames) == ": keepalive\n\n"
+    assert next(job.updates(0, keepalive=0.05)) == ([], None)
+    upstream.end()
+    assert events(next(frames)) == [{'status': 'completed'}]
@@ -0,0 +1,226 @@
+# backend/tests/test_replicas.py
+
+import json
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import docker
+import pytest
+
+from app import routes
+from app.pulls import PullBroker
+from app.replicas import PortAllocator, create_replicas, parse_host_port, replica_name
+
+
+def test_parse_host_port():
+    assert parse_host_port(None, 3) is None
+    assert parse_host_port('', 3) is None
+    assert parse_host_port('8080', 1) == 8080
+    assert parse_host_port(8080, 1) == 8080
+    assert parse_host_port(' 8000-8002 ', 3) == (8000, 8002)
+
+
+@pytest.mark.parametrize('value, replicas, message', [
+    ('http', 1, 'Invalid host port'),
+    ('0', 1, 'Invalid host port range'),
+    ('9000-8000', 1, 'Invalid host port range'),
+    ('8000-70000', 1, 'Invalid host port range'),
+    ('8080', 2, 'cannot be shared by 2 replicas'),
+    ('8000-8001', 3, 'smaller than 3 replicas'),
+])
+def test_parse_host_port_rejects(value, replicas, message):
+    with pytest.raises(ValueError, match=message):
+        parse_host_port(value, replicas)
+
+
+def test_replica_name():
+    assert replica_name(None, 1, 3) is None
+    assert replica_name('web', 2, 3) == 'web-2'
+    assert replica_name('web', 1, 1) == 'web'
+    assert replica_name('web-{n}-a', 2, 3) == 'web-2-a'
+
+
+def test_port_allocator_skips_used_ports():
+    allocator = PortAllocator(used={8000, 8002})
+    specs = {'80/tcp': (8000, 8003), '443/tcp': 9443, '53/udp': None}
+    assert allocator.assign(specs) == {'80/tcp': 8001, '443/tcp': 9443, '53/udp': None}
+    assert allocator.assign(specs)['80/tcp'] == 8003
+    with pytest.raises(ValueError, match='No free host port left in 8000-8003'):
+        allocator.assign(specs)
+
+
+class FakeContainer:
+    def __init__(self, daemon, name, ports):
+        self.daemon = daemon
+        self.id = f"id-{name}"
+        self.short_id = self.id[:12]
+        self.name = name
+        self.ports = ports
+
+    def start(self):
+        taken = self.daemon.taken_ports.intersection((self.ports or {}).values())
+        if taken:
+            raise docker.errors.APIError('500 Server Error', explanation=f"port is already allocated: {taken}")
+        if self.name in self.daemon.failing:
+            raise docker.errors.APIError('500 Server Error', explanation='cannot start')
+        time.sleep(self.daemon.delay)
+        self.daemon.running.add(self.id)
+
+    def remove(self, force=False):
+        self.daemon.created.discard(self.id)
+
+
+class FakeDaemon:
+    """Enough of DockerClient for create_replicas, tracking created and running containers."""
+
+    def __init__(self, failing=(), taken_ports=(), delay=0):
+        self.failing = set(failing)
+        self.taken_ports = set(taken_ports)
+        self.delay = delay
+        self.created = set()
+        self.running = set()
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self._lock = threading.Lock()
+        self.containers = self
+        self.api = self
+
+    def create(self, name=None, ports=None, **kwargs):
+        with self._lock:
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            time.sleep(self.delay)
+            container = FakeContainer(self, name, ports)
+            self.created.add(container.id)
+            return container
+        finally:
+            with self._lock:
+                self.in_flight -= 1
+
+    def remove_container(self, container_id, force=False):
+        self.created.discard(container_id)
+        self.running.discard(container_id)
+
+    def close(self):
+        pass
+
+
+@pytest.fixture(scope='module')
+def executor():
+    with ThreadPoolExecutor(max_workers=16) as executor:
+        yield executor
+
+
+def run(executor, daemon, replicas, port_specs=None, concurrency=4, max_failures=0, used=()):
+    return list(create_replicas(
+        executor, daemon, {'image': 'nginx'}, port_specs or {}, replicas, 'web', concurrency, max_failures,
+        PortAllocator(used),
+    ))
+
+
+def test_replicas_are_created_within_the_concurrency_cap(executor):
+    daemon = FakeDaemon(delay=0.02)
+    results = run(executor, daemon, 8, {'80/tcp': (8000, 8009)}, concurrency=3, used={8001})
+    assert sorted(r['name'] for r in results) == [f"web-{n}" for n in range(1, 9)]
+    assert all(r['ok'] for r in results)
+    assert daemon.max_in_flight <= 3
+    assert sorted(r['ports']['80/tcp'] for r in results) == [8000, 8002, 8003, 8004, 8005, 8006, 8007, 8008]
+    assert len(daemon.running) == 8
+
+
+def test_port_conflict_retries_with_the_next_port(executor):
+    daemon = FakeDaemon(taken_ports={8000})
+    (result,) = run(executor, daemon, 1, {'80/tcp': (8000, 8001)})
+    assert result['ok']
+    assert result['ports'] == {'80/tcp': 8001}
+    assert daemon.created == {'id-web'}
+
+
+def test_partial_failure_rolls_back_created_replicas(executor):
+    daemon = FakeDaemon(failing={'web-2'})
+    results = run(executor, daemon, 4, concurrency=1)
+    replicas = [r for r in results if 'stage' not in r]
+    rollbacks = [r for r in results if r.get('stage') == 'rollback']
+    # Replica 2 fails, so 3 and 4 are never started and replica 1 is removed
+    assert [(r['name'], r['ok']) for r in replicas] == [('web-1', True), ('web-2', False)]
+    assert replicas[1]['error'] == 'cannot start'
+    assert [(r['name'], r['ok']) for r in rollbacks] == [('web-1', True)]
+    assert daemon.created == set()
+
+
+def test_failures_within_max_failures_are_kept(executor):
+    daemon = FakeDaemon(failing={'web-2'})
+    results = run(executor, daemon, 4, concurrency=2, max_failures=1)
+    assert sum(r['ok'] for r in results) == 3
+    assert not any(r.get('stage') == 'rollback' for r in results)
+    assert len(daemon.created) == 3
+
+
+class PullingAPI:
+    """docker.APIClient.pull() that streams a few progress chunks."""
+
+    def __init__(self, chunks):
+        self.chunks = chunks
+
+    def pull(self, repository, tag=None, stream=False, decode=False):
+        for chunk in self.chunks:
+            time.sleep(0.02)
+            yield chunk
+
+
+class PullingClient:
+    def __init__(self, chunks):
+        self.api = PullingAPI(chunks)
+
+    def close(self):
+        pass
+
+
+PULL_CHUNKS = [
+    {'status': 'Pulling from library/nginx', 'id': 'latest'},
+    {'status': 'Downloading', 'id': 'layer1', 'progressDetail': {'current': 10, 'total': 100}},
+    {'status': 'Pull complete', 'id': 'layer1'},
+    {'status': 'Status: Downloaded newer image for nginx:latest'},
+]
+
+
+@pytest.fixture
+def missing_image(monkeypatch):
+    def resolve_image(ref, config):
+        raise docker.errors.ImageNotFound(f"No such image: {ref}")
+
+    daemon = FakeDaemon()
+    monkeypatch.setattr(routes, 'resolve_image', resolve_image)
+    monkeypatch.setattr(routes, 'get_docker_client', lambda config=None: daemon)
+    return daemon
+
+
+def post_replicas(client, **data):
+    response = client.post('/api/containers/create', json={'image': 'nginx', 'name': 'web', 'replicas': 2, **data})
+    assert response.status_code == 200
+    return [json.loads(line) for line in response.get_data(as_text=True).splitlines() if line]
+
+
+def test_replicas_stream_forwards_pull_progress(client, missing_image, monkeypatch):
+    monkeypatch.setattr(routes, 'image_pulls', PullBroker(lambda config: PullingClient(PULL_CHUNKS), min_interval=0))
+    events = post_replicas(client)
+    image_events = [e for e in events if e.get('stage') == 'image']
+    assert image_events[0]['status'] == 'pulling' and 'progress' not in image_events[0]
+    progress = [e['progress'] for e in image_events if 'progress' in e]
+    # Updates of a layer may be folded together, but the last state of each arrives
+    assert PULL_CHUNKS[-1] in progress
+    assert {'status': 'Pull complete', 'id': 'layer1'} in progress
+    assert image_events[-1]['status'] == 'pulled'
+    assert sorted(e['name'] for e in events if 'replica' in e) == ['web-1', 'web-2']
+    assert events[-1]['done'] and events[-1]['created'] == 2
+
+
+def test_replicas_stream_stops_on_a_failed_pull(client, missing_image, monkeypatch):
+    chunks = PULL_CHUNKS[:1] + [{'error': 'pull access denied'}]
+    monkeypatch.setattr(routes, 'image_pulls', PullBroker(lambda config: PullingClient(chunks), min_interval=0))
+    events = post_replicas(client)
+    assert events[-1] == {'stage': 'image', 'image': 'nginx', 'status': 'failed', 'error': 'Pull failed: pull access denied'}
+    assert not any('replica' in e for e in events)
+    assert missing_image.created == set()
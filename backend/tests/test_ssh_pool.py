@@ -0,0 +1,171 @@
+# backend/tests/test_ssh_pool.py
+
+import threading
+import time
+
+import paramiko
+import pytest
+
+import ssh_pool
+from ssh_pool import SSHTransportPool
+
+
+class FakeServer:
+    """sshd stand-in: counts logins, checks passwords and enforces MaxSessions per connection."""
+
+    def __init__(self, max_sessions=10, password='secret', login_delay=0):
+        self.max_sessions = max_sessions
+        self.password = password
+        self.login_delay = login_delay
+        self.logins = []
+
+
+class FakeChannel:
+    def __init__(self, transport):
+        self.transport = transport
+        self.closed = False
+
+    def close(self):
+        if not self.closed:
+            self.closed = True
+            self.transport.sessions -= 1
+
+
+class FakeSocket:
+    def setsockopt(self, *args):
+        pass
+
+
+class FakeTransport:
+    def __init__(self, server):
+        self.server = server
+        self.sessions = 0
+        self.active = True
+        self.sock = FakeSocket()
+
+    def set_keepalive(self, interval):
+        self.keepalive = interval
+
+    def is_active(self):
+        return self.active
+
+    def open_session(self, timeout=None):
+        if not self.active:
+            raise EOFError()
+        if self.sessions >= self.server.max_sessions:
+            raise paramiko.SSHException('administratively prohibited')
+        self.sessions += 1
+        return FakeChannel(self)
+
+
+@pytest.fixture
+def server(monkeypatch):
+    server = FakeServer()
+
+    class FakeSSHClient:
+        def __init__(self):
+            self.transport = None
+
+        def set_missing_host_key_policy(self, policy):
+            pass
+
+        def connect(self, hostname, port, username, password, timeout):
+            time.sleep(server.login_delay)
+            if password != server.password:
+                raise paramiko.AuthenticationException('Authentication failed.')
+            server.logins.append((hostname, port, username))
+            self.transport = FakeTransport(server)
+
+        def get_transport(self):
+            return self.transport
+
+        def close(self):
+            if self.transport:
+                self.transport.active = False
+
+    monkeypatch.setattr(ssh_pool.paramiko, 'SSHClient', FakeSSHClient)
+    return server
+
+
+def test_channels_share_a_connection_per_host_user_and_password(server):
+    pool = SSHTransportPool()
+    channels = [pool.open_channel('h1', 'root', 'secret') for _ in range(3)]
+    assert len({channel.transport for channel in channels}) == 1
+    assert server.logins == [('h1', 22, 'root')]
+
+    pool.open_channel('h1', 'admin', 'secret')
+    pool.open_channel('h1', 'root', 'secret', port=2222)
+    pool.open_channel('h2', 'root', 'secret')
+    assert len(server.logins) == 4
+    assert pool.stats() == {'connections': 4, 'channels': 6, 'connects': 4}
+
+
+def test_a_different_password_does_not_reuse_a_connection(server):
+    pool = SSHTransportPool()
+    pool.open_channel('h1', 'root', 'secret')
+    with pytest.raises(paramiko.AuthenticationException):
+        pool.open_channel('h1', 'root', 'guess')
+    assert server.logins == [('h1', 22, 'root')]
+
+
+def test_channel_cap_opens_another_connection(server):
+    pool = SSHTransportPool(max_channels=2)
+    channels = [pool.open_channel('h1', 'root', 'secret') for _ in range(5)]
+    assert len(server.logins) == 3
+    assert sorted(transport.sessions for transport in {channel.transport for channel in channels}) == [1, 2, 2]
+
+    # A released slot is reused before connecting again
+    pool.release(channels[0])
+    pool.release(channels[0])
+    pool.open_channel('h1', 'root', 'secret')
+    assert len(server.logins) == 3
+    assert pool.stats()['channels'] == 5
+
+
+def test_refused_channel_lowers_the_cap(server):
+    server.max_sessions = 2
+    pool = SSHTransportPool(max_channels=10)
+    channels = [pool.open_channel('h1', 'root', 'secret') for _ in range(3)]
+    assert len(server.logins) == 2
+    first = channels[0].transport
+    assert channels[1].transport is first and channels[2].transport is not first
+    assert pool._connections[('h1', 22, 'root', ssh_pool.credential_digest('secret'))][0].max_channels == 2
+
+
+def test_concurrent_callers_wait_for_one_login(server):
+    server.login_delay = 0.1
+    pool = SSHTransportPool()
+    channels = []
+    threads = [threading.Thread(target=lambda: channels.append(pool.open_channel('h1', 'root', 'secret')))
+               for _ in range(5)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert len(channels) == 5
+    assert len(server.logins) == 1
+
+
+def test_reaper_closes_idle_and_dead_connections(server):
+    pool = SSHTransportPool(idle_ttl=0.05)
+    idle = pool.open_channel('idle', 'root', 'secret')
+    busy = pool.open_channel('busy', 'root', 'secret')
+    dead = pool.open_channel('dead', 'root', 'secret')
+    pool.release(idle)
+    dead.transport.active = False
+    time.sleep(0.1)
+
+    assert pool.reap() == 2
+    assert not idle.transport.active
+    assert busy.transport.active
+    assert pool.stats()['connections'] == 1
+    # The login locks of the dropped hosts go with their connections
+    assert [key[0] for key in pool._key_locks] == ['busy']
+
+
+def test_failed_login_leaves_no_key_lock(server):
+    pool = SSHTransportPool()
+    with pytest.raises(paramiko.AuthenticationException):
+        pool.open_channel('h1', 'root', 'guess')
+    assert pool._key_locks == {}
+    assert pool.stats()['connections'] == 0
@@ -0,0 +1,63 @@
+# backend/tests/test_stats.py
+
+from app.stats import STATS_TABLE_COLUMNS, StatsTable, stats_table_row
+
+
+def row(name, cpu=0.0, pids=1):
+    return (name, cpu, 64.0, 512.0, 12.5, 1000, 2000, pids)
+
+
+def test_stats_table_row():
+    sample = {
+        'cpu_percent': 3.5,
+        'memory_mb': {'usage': 64.0, 'limit': 512.0, 'percent': 12.5},
+        'network': {'eth0': {'rx': 600, 'tx': 1500}, 'eth1': {'rx': 400, 'tx': 500}},
+        'pids': 7,
+    }
+    assert stats_table_row('web', sample) == ('web', 3.5, 64.0, 512.0, 12.5, 1000, 2000, 7)
+    assert stats_table_row('idle', {}) == ('idle', 0.0, 0, 0, 0.0, 0, 0, 0)
+    assert len(stats_table_row('idle', {})) == len(STATS_TABLE_COLUMNS)
+
+
+def test_stats_table_first_update_is_a_snapshot():
+    table = StatsTable()
+    assert table.update({'a': row('web'), 'b': row('db')}) == {
+        'type': 'snapshot',
+        'columns': list(STATS_TABLE_COLUMNS),
+        'rows': {'a': list(row('web')), 'b': list(row('db'))},
+    }
+
+
+def test_stats_table_unchanged_table_sends_nothing():
+    table = StatsTable()
+    table.update({'a': row('web')})
+    assert table.update({'a': row('web')}) is None
+
+
+def test_stats_table_sends_only_changed_cells():
+    table = StatsTable()
+    table.update({'a': row('web'), 'b': row('db')})
+    assert table.update({'a': row('web', cpu=4.0, pids=3), 'b': row('db')}) == {
+        'type': 'delta',
+        'changed': {'a': {'cpu_percent': 4.0, 'pids': 3}},
+    }
+
+
+def test_stats_table_new_and_removed_containers():
+    table = StatsTable()
+    table.update({'a': row('web'), 'b': row('db')})
+    assert table.update({'a': row('web'), 'c': row('cache')}) == {
+        'type': 'delta',
+        'changed': {'c': dict(zip(STATS_TABLE_COLUMNS, row('cache')))},
+        'removed': ['b'],
+    }
+    # The delta is against what was last sent, not the first snapshot
+    assert table.update({'a': row('web'), 'c': row('cache')}) is None
+
+
+def test_stats_table_keeps_its_own_copy():
+    table = StatsTable()
+    rows = {'a': row('web')}
+    table.update(rows)
+    rows['a'] = row('web', cpu=9.0)
+    assert table.update({'a': row('web')}) is None
@@ -0,0 +1,33 @@
+# backend/tests/test_telemetry.py
+
+from app.telemetry import LogSampler
+
+
+def test_log_sampler_allows_first_then_every_nth():
+    sampler = LogSampler(every=100)
+    allowed = [i for i in range(301) if sampler.allow('pull')]
+    assert allowed == [0, 100, 200, 300]
+
+
+def test_log_sampler_reports_skipped_messages():
+    sampler = LogSampler(every=100)
+    reported = []
+    for _ in range(301):
+        if sampler.allow('pull'):
+            reported.append(sampler.suppressed('pull'))
+    assert reported == [0, 99, 99, 99]
+
+
+def test_log_sampler_counts_kinds_separately():
+    sampler = LogSampler(every=3)
+    assert sampler.allow('a')
+    assert not sampler.allow('a')
+    assert sampler.allow('b')
+    assert sampler.suppressed('b') == 0
+    assert sampler.suppressed('never seen') == 0
+
+
+def test_log_sampler_every_one_keeps_everything():
+    sampler = LogSampler(every=1)
+    assert all(sampler.allow('x') for _ in range(5))
+    assert sampler.suppressed('x') == 0
@@ -0,0 +1,164 @@
+# backend/tests/test_tls_contexts.py
+
+import datetime
+import ipaddress
+import socket
+import ssl
+import threading
+from http.server import BaseHTTPRequestHandler, HTTPServer
+
+import pytest
+import requests
+
+from app import tls_contexts
+from app.tls_contexts import SSLContextAdapter, TLSContextCache, bundle_fingerprint
+
+x509 = pytest.importorskip('cryptography.x509')
+from cryptography.hazmat.primitives import hashes, serialization  # noqa: E402
+from cryptography.hazmat.primitives.asymmetric import ec  # noqa: E402
+from cryptography.x509.oid import NameOID  # noqa: E402
+
+
+def _issue(subject, issuer=None, issuer_key=None, ca=False, ip=None):
+    key = ec.generate_private_key(ec.SECP256R1())
+    now = datetime.datetime.now(datetime.timezone.utc)
+    name = x509.Name([x509.NameAttribute(NameOID.COMMON_NAME, subject)])
+    builder = (
+        x509.CertificateBuilder()
+        .subject_name(name)
+        .issuer_name(issuer.subject if issuer else name)
+        .public_key(key.public_key())
+        .serial_number(x509.random_serial_number())
+        .not_valid_before(now - datetime.timedelta(minutes=5))
+        .not_valid_after(now + datetime.timedelta(days=1))
+        .add_extension(x509.BasicConstraints(ca=ca, path_length=None), critical=True)
+    )
+    if ip:
+        builder = builder.add_extension(x509.SubjectAlternativeName([x509.IPAddress(ipaddress.ip_address(ip))]),
+                                        critical=False)
+    cert = builder.sign(issuer_key or key, hashes.SHA256())
+    return cert, key
+
+
+def _pem(cert, key):
+    return (
+        cert.public_bytes(serialization.Encoding.PEM).decode(),
+        key.private_bytes(serialization.Encoding.PEM, serialization.PrivateFormat.PKCS8,
+                          serialization.NoEncryption()).decode(),
+    )
+
+
+@pytest.fixture(scope='module')
+def pki():
+    """A CA, a server certificate for 127.0.0.1 and two client certificates, as PEM strings."""
+    ca, ca_key = _issue('test-ca', ca=True)
+    material = {'ca': _pem(ca, ca_key)[0]}
+    material['server'] = _pem(*_issue('docker-host', ca, ca_key, ip='127.0.0.1'))
+    material['client'] = _pem(*_issue('client', ca, ca_key))
+    material['client2'] = _pem(*_issue('client-rotated', ca, ca_key))
+    return material
+
+
+@pytest.fixture(scope='module')
+def server_context(pki, tmp_path_factory):
+    directory = tmp_path_factory.mktemp('tls')
+    (directory / 'ca.pem').write_text(pki['ca'])
+    (directory / 'server.pem').write_text(''.join(pki['server']))
+    context = ssl.SSLContext(ssl.PROTOCOL_TLS_SERVER)
+    context.load_cert_chain(str(directory / 'server.pem'))
+    context.load_verify_locations(str(directory / 'ca.pem'))
+    context.verify_mode = ssl.CERT_REQUIRED
+    return context
+
+
+def test_fingerprint_depends_on_every_part():
+    base = bundle_fingerprint('ca', 'cert', 'key')
+    assert bundle_fingerprint(' ca\n', 'cert\n', 'key') == base
+    assert bundle_fingerprint('ca', 'cert', 'key2') != base
+    # Parts are length-prefixed, so moving a boundary changes the fingerprint
+    assert bundle_fingerprint('c', 'acert', 'key') != base
+
+
+def test_identical_material_returns_the_same_context(pki, monkeypatch):
+    builds = []
+    build = tls_contexts.build_client_context
+    monkeypatch.setattr(tls_contexts, 'build_client_context', lambda *pems: builds.append(pems) or build(*pems))
+    cache = TLSContextCache()
+    fingerprint, context = cache.put(pki['ca'], *pki['client'])
+    again = cache.put(pki['ca'] + '\n', *pki['client'])
+    assert again == (fingerprint, context)
+    assert cache.get(fingerprint) is context
+    assert len(builds) == 1
+    assert cache.get(None) is None and cache.get('unknown') is None
+
+
+def test_changed_material_rotates_the_context(pki):
+    cache = TLSContextCache(max_entries=1)
+    old_fingerprint, old_context = cache.put(pki['ca'], *pki['client'])
+    new_fingerprint, new_context = cache.put(pki['ca'], *pki['client2'])
+    assert new_fingerprint != old_fingerprint
+    assert new_context is not old_context
+    # Only the newest bundle is kept at max_entries=1
+    assert cache.get(old_fingerprint) is None
+    assert cache.get(new_fingerprint) is new_context
+    assert len(cache) == 1
+
+
+def test_unusable_material_raises(pki):
+    with pytest.raises(ssl.SSLError):
+        TLSContextCache().put(pki['ca'], pki['client'][0], pki['client2'][1])
+
+
+class _Hello(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def log_message(self, *args):
+        pass
+
+    def do_GET(self):
+        body = b'hello'
+        self.send_response(200)
+        self.send_header('Content-Length', str(len(body)))
+        self.send_header('Connection', 'close')
+        self.end_headers()
+        self.wfile.write(body)
+
+
+@pytest.fixture
+def https_server(server_context):
+    server = HTTPServer(('127.0.0.1', 0), _Hello)
+    server.socket = server_context.wrap_socket(server.socket, server_side=True)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def _connect(context, port):
+    sock = context.wrap_socket(socket.create_connection(('127.0.0.1', port)), server_hostname='127.0.0.1')
+    try:
+        sock.sendall(b'GET / HTTP/1.1\r\nHost: 127.0.0.1\r\n\r\n')
+        while sock.recv(4096):
+            pass
+        return sock.session_reused
+    finally:
+        sock.close()
+
+
+def test_reconnect_resumes_the_tls_session(pki, https_server):
+    _, context = TLSContextCache().put(pki['ca'], *pki['client'])
+    port = https_server.server_address[1]
+    assert _connect(context, port) is False
+    assert _connect(context, port) is True
+    assert _connect(context, port) is True
+
+
+def test_requests_adapter_uses_the_shared_context(pki, https_server):
+    _, context = TLSContextCache().put(pki['ca'], *pki['client'])
+    session = requests.Session()
+    session.mount('https://', SSLContextAdapter(context))
+    url = f"https://127.0.0.1:{https_server.server_address[1]}/"
+    # Each response closes its connection, so the second request needs a new handshake
+    assert session.get(url).text == 'hello'
+    assert session.get(url).text == 'hello'
+    assert _connect(context, https_server.server_address[1]) is True
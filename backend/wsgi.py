@@ -0,0 +1,12 @@
+# Production entry point: gunicorn -c gunicorn.conf.py wsgi:app
+#
+# gevent must patch the standard library before docker, requests or urllib3
+# are imported, so Docker streams and the brokers' background threads become
+# cooperative greenlets instead of pinning an OS thread per SSE/WebSocket.
+from gevent import monkey
+
+monkey.patch_all()
+
+from app import create_app  # noqa: E402
+
+app = create_app()
@@ -113,6 +113,15 @@ export class LogsComponent implements OnInit, OnDestroy, AfterViewChecked {
           if (data.error) {
             this.logs += `\n--- ERROR: ${data.error} ---\n`;
             this.stopStreaming();
+          } else if (data.lines) {
+            // Batched frame: one run of lines from stdout or stderr
+            if (data.lines.length) {
+              this.logs += data.lines.join('\n') + '\n';
+            }
+            if (data.dropped) {
+              this.logs += `--- ${data.dropped} lines dropped (rate limit) ---\n`;
+            }
+            this.shouldScroll = true; // Trigger scroll on next check
           } else if (data.line) {
             this.logs += data.line + '\n';
             this.shouldScroll = true; // Trigger scroll on next check